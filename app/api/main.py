@@ -2,42 +2,126 @@
 FastAPI 앱: 강의 요약·저장, 퀴즈 생성, 업로드→Ingestion 큐 API.
 """
 
+import json
 import logging
 import os
 import tempfile
 import uuid
 from pathlib import Path
+from typing import Any
 
-from fastapi import File, HTTPException, UploadFile
+from fastapi import File, HTTPException, Request, UploadFile
+from fastapi.responses import Response, StreamingResponse
 
 from app.api.schemas import (
+    ChunkSearchHit,
+    ChunkSearchRequest,
+    ChunkSearchResponse,
+    HybridSearchHit,
+    HybridSearchRequest,
+    HybridSearchResponse,
     IngestionJobStatusResponse,
     IngestionEnqueueRequest,
+    LLMCacheStatsResponse,
+    LLMRateLimitStatsResponse,
+    LLMRetryStatsResponse,
+    LLMStructuredOutputStatsResponse,
     LectureSummarizeRequest,
     LectureSummarizeResponse,
     LectureUploadResponse,
+    CourseQuizGenerateRequest,
     QuizGenerateRequest,
     QuizGenerateResponse,
+    QuizJobEnqueueResponse,
+    QuizJobRequest,
+    QuizJobStatusResponse,
     QuizQuestionOption,
 )
+from app.core.config import settings
 from app.db.connection import get_session
 from app.db.repositories.ingestion_job import ingestion_job_repo
+from app.db.repositories.lecture_quiz import lecture_quiz_repo
+from app.db.repositories.quiz_job import quiz_job_repo
+from app.schema.quiz_lecture import (
+    QuizFromLectureResponse,
+    QuizQuestionItem,
+    ValidatedQuizFromLectureResponse,
+    ValidatedQuizQuestionItem,
+)
+from app.services.chunk_search import chunk_search_service
+from app.services.hybrid_search import hybrid_search_service
 from app.services.lecture_store import lecture_store_service
+from app.services.llm_cache import llm_cache
+from app.services.llm_usage import usage_context
+from app.services.metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE, metrics
+from app.services import profiling
+from app.services.rate_limiter import rate_limiter
+from app.services.resilience import resilient_caller
+from app.services.quiz_bank import quiz_bank_service
 from app.services.quiz_from_lecture import quiz_from_lecture_service
+from app.services.structured_output import structured_output_stats
+from app.services.tracing import inject, span
 
 logger = logging.getLogger(__name__)
 
 UPLOAD_DIR = Path(os.environ.get("UPLOAD_DIR", tempfile.gettempdir())) / "quiz_generator_uploads"
 UPLOAD_DIR.mkdir(parents=True, exist_ok=True)
 
+
+def _sse(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+def _bank_eligible(body: QuizGenerateRequest) -> bool:
+    """문항 은행은 기본 맥락으로 만든 문항이므로, 맥락 옵션을 바꾼 요청에는 쓰지 않는다."""
+    use_bank = settings.QUIZ_BANK_ENABLED if body.use_bank is None else body.use_bank
+    return (
+        use_bank
+        and not body.use_semantic_previous
+        and body.max_context_lectures is None
+        and body.use_chunk_retrieval is None
+        and body.chunk_top_k is None
+    )
+
+
 # FastAPI app은 router를 쓰지 않고 여기서 직접 등록 (또는 라우터 분리 가능)
 def create_app():
     from fastapi import FastAPI, Form
+    from fastapi.routing import APIRoute
+
+    class ProfiledRoute(APIRoute):
+        """동기 엔드포인트가 도는 스레드 풀 스레드를 요청 프로파일에 붙인다."""
+
+        def __init__(self, path: str, endpoint: Any, **kwargs: Any) -> None:
+            super().__init__(path, profiling.attach_endpoint(endpoint), **kwargs)
+
     app = FastAPI(
         title="Quiz Generator API",
         description="강의 전사 요약·저장, 요약 기준 퀴즈 생성, 업로드→Ingestion 큐",
         version="0.1.0",
     )
+    app.router.route_class = ProfiledRoute
+
+    @app.middleware("http")
+    async def request_context(request: Request, call_next):
+        """
+        요청 id(X-Request-Id, 없으면 생성)를 붙이고 이 요청의 LLM 사용량을 그 id로 기록.
+        PROFILING_ENABLED일 때 X-Profile: 1 헤더·?profile=1 요청은 프로파일 (SSE는 응답 시작까지만).
+        프로파일 종료·저장은 profile_async가 스레드에서 하므로 이벤트 루프를 막지 않는다.
+        """
+        request_id = request.headers.get("x-request-id") or uuid.uuid4().hex[:12]
+        with usage_context(job_type="request", job_id=request_id):
+            if profiling.request_selected(request.headers.get("x-profile"), request.query_params.get("profile")):
+                async with profiling.profile_async(
+                    "request", request_id, method=request.method, path=request.url.path
+                ) as result:
+                    response = await call_next(request)
+                if result.path is not None:
+                    response.headers["X-Profile-File"] = result.path.name  # PROFILE_DIR 기준 파일 이름
+            else:
+                response = await call_next(request)
+        response.headers["X-Request-Id"] = request_id
+        return response
 
     @app.post(
         "/lectures/upload",
@@ -52,6 +136,7 @@ def create_app():
         file: UploadFile = File(...),
         concept_hint: str | None = Form(None),
         lecture_title: str | None = Form(None),
+        profile: bool = False,
     ) -> LectureUploadResponse:
         try:
             suffix = Path(file.filename or "bin").suffix or ".bin"
@@ -63,15 +148,19 @@ def create_app():
                 payload["concept_hint"] = concept_hint.strip()
             if lecture_title and lecture_title.strip():
                 payload["lecture_title"] = lecture_title.strip()
-            with get_session() as session:
-                job = ingestion_job_repo.create(
-                    session,
-                    course_id=course_id,
-                    lecture_id=lecture_id,
-                    user_id=user_id,
-                    job_type="audio",
-                    payload=payload,
-                )
+            if profile:
+                payload["profile"] = True  # 워커도 이 job을 프로파일 (PROFILING_ENABLED일 때)
+            # trace는 적재 시점에 시작해 payload로 워커(run_pipeline)에 넘긴다
+            with span("ingestion.enqueue", course_id=course_id, lecture_id=lecture_id, job_type="audio", bytes=len(content)):
+                with get_session() as session:
+                    job = ingestion_job_repo.create(
+                        session,
+                        course_id=course_id,
+                        lecture_id=lecture_id,
+                        user_id=user_id,
+                        job_type="audio",
+                        payload=inject(payload),
+                    )
             return LectureUploadResponse(
                 job_id=job.id if job.id else 0,
                 message="Ingestion job enqueued. Run worker to process.",
@@ -85,7 +174,7 @@ def create_app():
         response_model=LectureUploadResponse,
         summary="전사 JSON으로 Ingestion Job Enqueue",
     )
-    def ingestion_enqueue(body: IngestionEnqueueRequest) -> LectureUploadResponse:
+    def ingestion_enqueue(body: IngestionEnqueueRequest, profile: bool = False) -> LectureUploadResponse:
         try:
             transcript = body.transcript or body.content
             if not transcript:
@@ -95,15 +184,18 @@ def create_app():
                 payload["concept_hint"] = body.concept_hint.strip()
             if body.lecture_title and body.lecture_title.strip():
                 payload["lecture_title"] = body.lecture_title.strip()
-            with get_session() as session:
-                job = ingestion_job_repo.create(
-                    session,
-                    course_id=body.course_id,
-                    lecture_id=body.lecture_id,
-                    user_id=body.user_id,
-                    job_type="transcript",
-                    payload=payload,
-                )
+            if profile:
+                payload["profile"] = True
+            with span("ingestion.enqueue", course_id=body.course_id, lecture_id=body.lecture_id, job_type="transcript"):
+                with get_session() as session:
+                    job = ingestion_job_repo.create(
+                        session,
+                        course_id=body.course_id,
+                        lecture_id=body.lecture_id,
+                        user_id=body.user_id,
+                        job_type="transcript",
+                        payload=inject(payload),
+                    )
             return LectureUploadResponse(
                 job_id=job.id if job.id else 0,
                 message="Ingestion job enqueued.",
@@ -147,6 +239,7 @@ def create_app():
                 course_title=body.course_title,
                 section_title=body.section_title,
                 lecture_title=body.lecture_title,
+                summary_mode=body.summary_mode,
             )
             return LectureSummarizeResponse(
                 summary=summary,
@@ -166,7 +259,22 @@ def create_app():
     )
     def quiz_generate(body: QuizGenerateRequest) -> QuizGenerateResponse:
         try:
-            if body.validate:
+            banked = None
+            if _bank_eligible(body):
+                banked = quiz_bank_service.sample(body.course_id, body.lecture_id, body.user_id, body.num_questions)
+            if banked is not None:
+                result = banked
+                questions_out = [
+                    QuizQuestionOption(
+                        question=q.question,
+                        options=q.options,
+                        answer=q.answer,
+                        explanation=q.explanation,
+                        verified=q.verified if body.validate else None,
+                    )
+                    for q in result.questions
+                ]
+            elif body.validate:
                 result = quiz_from_lecture_service.generate_validated(
                     course_id=body.course_id,
                     lecture_id=body.lecture_id,
@@ -175,6 +283,9 @@ def create_app():
                     use_semantic_previous=body.use_semantic_previous,
                     semantic_limit=body.semantic_limit,
                     max_context_lectures=body.max_context_lectures,
+                    use_chunk_retrieval=body.use_chunk_retrieval,
+                    chunk_top_k=body.chunk_top_k,
+                    fan_out=body.fan_out,
                 )
                 questions_out = [
                     QuizQuestionOption(
@@ -195,6 +306,9 @@ def create_app():
                     use_semantic_previous=body.use_semantic_previous,
                     semantic_limit=body.semantic_limit,
                     max_context_lectures=body.max_context_lectures,
+                    use_chunk_retrieval=body.use_chunk_retrieval,
+                    chunk_top_k=body.chunk_top_k,
+                    fan_out=body.fan_out,
                 )
                 questions_out = [
                     QuizQuestionOption(
@@ -214,13 +328,265 @@ def create_app():
                     result=result,
                 )
                 saved = True
-            return QuizGenerateResponse(questions=questions_out, saved=saved)
+            return QuizGenerateResponse(questions=questions_out, saved=saved, from_bank=banked is not None)
         except ValueError as e:
             raise HTTPException(status_code=400, detail=str(e))
         except Exception as e:
             logger.exception("퀴즈 생성 실패")
             raise HTTPException(status_code=500, detail=str(e))
 
+    @app.post(
+        "/quiz/generate/stream",
+        summary="퀴즈 생성 (SSE 스트리밍)",
+        description=(
+            "/quiz/generate와 같은 요청. 생성 응답을 스트림으로 받아 문항이 완성되는 즉시 `event: question`으로 보내고, "
+            "validate=true면 그 문항 검증을 바로 시작해 끝나는 대로 `event: validated` ({index, verified})를 보낸다. "
+            "마지막에 `event: done` ({count, invalid, saved}). 스트림 중 오류는 `event: error`."
+        ),
+    )
+    def quiz_generate_stream(body: QuizGenerateRequest) -> StreamingResponse:
+        try:
+            events = quiz_from_lecture_service.generate_stream(
+                course_id=body.course_id,
+                lecture_id=body.lecture_id,
+                user_id=body.user_id,
+                num_questions=body.num_questions,
+                validate=body.validate,
+                use_semantic_previous=body.use_semantic_previous,
+                semantic_limit=body.semantic_limit,
+                max_context_lectures=body.max_context_lectures,
+                use_chunk_retrieval=body.use_chunk_retrieval,
+                chunk_top_k=body.chunk_top_k,
+            )
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        except Exception as e:
+            logger.exception("스트리밍 퀴즈 생성 준비 실패")
+            raise HTTPException(status_code=500, detail=str(e))
+
+        def stream():
+            questions: dict[int, dict] = {}
+            try:
+                for event, data in events:
+                    if event == "question":
+                        questions[data["index"]] = {k: v for k, v in data.items() if k != "index"}
+                    elif event == "validated":
+                        questions[data["index"]]["verified"] = data["verified"]
+                    elif event == "done":
+                        data["saved"] = False
+                        if body.save and questions:
+                            items = [questions[i] for i in sorted(questions)]
+                            if body.validate:
+                                result = ValidatedQuizFromLectureResponse(
+                                    questions=[ValidatedQuizQuestionItem(**{**q, "verified": bool(q.get("verified"))}) for q in items]
+                                )
+                            else:
+                                result = QuizFromLectureResponse(questions=[QuizQuestionItem(**q) for q in items])
+                            quiz_from_lecture_service.save_result(body.course_id, body.lecture_id, result)
+                            data["saved"] = True
+                    yield _sse(event, data)
+            except Exception as e:
+                logger.exception("스트리밍 퀴즈 생성 실패")
+                yield _sse("error", {"detail": str(e)})
+
+        return StreamingResponse(
+            stream(),
+            media_type="text/event-stream",
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        )
+
+    @app.post(
+        "/quiz/course/generate",
+        summary="강좌 일괄 퀴즈 생성 (SSE 진행 상황)",
+        description=(
+            "강좌의 모든 강의(또는 lecture_ids) 퀴즈를 요약 1회 조회 후 강의 단위로 동시에 생성·검증한다. "
+            "강의가 끝날 때마다 `event: progress` ({done, total, lecture_id, ok, quiz_id, questions | error}), "
+            "마지막에 `event: done` ({total, succeeded, failed, saved, quiz_ids, elapsed_sec}). "
+            "save=true면 강의마다 끝나는 즉시 저장하므로 연결이 끊겨도 끝난 강의 결과는 남는다."
+        ),
+    )
+    def quiz_course_generate(body: CourseQuizGenerateRequest) -> StreamingResponse:
+        try:
+            events = quiz_from_lecture_service.generate_course(
+                body.course_id,
+                body.user_id,
+                body.num_questions,
+                validate=body.validate,
+                save=body.save,
+                lecture_ids=body.lecture_ids,
+                concurrency=body.concurrency,
+                use_chunk_retrieval=body.use_chunk_retrieval,
+                chunk_top_k=body.chunk_top_k,
+            )
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        except Exception as e:
+            logger.exception("강좌 일괄 퀴즈 생성 준비 실패")
+            raise HTTPException(status_code=500, detail=str(e))
+
+        def stream():
+            try:
+                for event, data in events:
+                    yield _sse(event, data)
+            except Exception as e:
+                logger.exception("강좌 일괄 퀴즈 생성 실패")
+                yield _sse("error", {"detail": str(e)})
+
+        return StreamingResponse(
+            stream(),
+            media_type="text/event-stream",
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        )
+
+    @app.post(
+        "/quiz/jobs",
+        response_model=QuizJobEnqueueResponse,
+        status_code=202,
+        summary="퀴즈 생성 Job Enqueue",
+        description="퀴즈 생성·검증을 quiz_jobs 큐에 적재하고 바로 job_id 반환. 워커가 처리해 lecture_quiz에 저장하며, 결과는 GET /quiz/jobs/{job_id}로 조회.",
+    )
+    def quiz_job_enqueue(body: QuizJobRequest) -> QuizJobEnqueueResponse:
+        try:
+            params = body.model_dump(exclude={"course_id", "lecture_id", "user_id"})
+            with get_session() as session:
+                job = quiz_job_repo.create(
+                    session,
+                    course_id=body.course_id,
+                    lecture_id=body.lecture_id,
+                    user_id=body.user_id,
+                    params=params,
+                )
+            return QuizJobEnqueueResponse(job_id=job.id if job.id else 0)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        except Exception as e:
+            logger.exception("퀴즈 job Enqueue 실패")
+            raise HTTPException(status_code=500, detail=str(e))
+
+    @app.get(
+        "/quiz/jobs/{job_id:int}",
+        response_model=QuizJobStatusResponse,
+        summary="퀴즈 생성 Job 상태·결과 조회",
+    )
+    def quiz_job_status(job_id: int) -> QuizJobStatusResponse:
+        with get_session() as session:
+            job = quiz_job_repo.get_by_id(session, job_id)
+            if not job:
+                raise HTTPException(status_code=404, detail="Job not found")
+            questions = None
+            if job.status == "done" and job.quiz_id is not None:
+                quiz = lecture_quiz_repo.get_by_id(session, job.quiz_id)
+                if quiz:
+                    questions = [QuizQuestionOption.model_validate(q) for q in quiz.questions]
+            return QuizJobStatusResponse(
+                job_id=job_id,
+                status=job.status,
+                error_message=job.error_message,
+                quiz_id=job.quiz_id,
+                questions=questions,
+            )
+
+    @app.post(
+        "/search/chunks",
+        response_model=ChunkSearchResponse,
+        summary="청크 시맨틱 검색",
+        description="query(텍스트) 또는 query_embedding(벡터)으로 lecture_chunk_vectors 검색. course/lecture/user, difficulty, concept 필터. 반복 쿼리는 캐시.",
+    )
+    def search_chunks(body: ChunkSearchRequest) -> ChunkSearchResponse:
+        try:
+            results, cached = chunk_search_service.search(
+                query=body.query,
+                query_embedding=body.query_embedding,
+                course_id=body.course_id,
+                lecture_id=body.lecture_id,
+                user_id=body.user_id,
+                difficulty=body.difficulty,
+                concept=body.concept,
+                limit=body.limit,
+            )
+            return ChunkSearchResponse(
+                results=[ChunkSearchHit(**r) for r in results],
+                cached=cached,
+            )
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        except Exception as e:
+            logger.exception("청크 검색 실패")
+            raise HTTPException(status_code=500, detail=str(e))
+
+    @app.post(
+        "/search/hybrid",
+        response_model=HybridSearchResponse,
+        summary="하이브리드 검색 (전문 검색 + 벡터, RRF)",
+        description="강의 요약 또는 청크를 Postgres 전문 검색(tsvector simple + trigram)과 pgvector 결과를 Reciprocal Rank Fusion으로 합쳐 검색.",
+    )
+    def search_hybrid(body: HybridSearchRequest) -> HybridSearchResponse:
+        try:
+            results = hybrid_search_service.search(
+                body.target,
+                body.query,
+                mode=body.mode,
+                course_id=body.course_id,
+                lecture_id=body.lecture_id,
+                user_id=body.user_id,
+                difficulty=body.difficulty,
+                concept=body.concept,
+                limit=body.limit,
+            )
+            return HybridSearchResponse(results=[HybridSearchHit(**r) for r in results])
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        except Exception as e:
+            logger.exception("하이브리드 검색 실패")
+            raise HTTPException(status_code=500, detail=str(e))
+
+    @app.get(
+        "/llm/cache/stats",
+        response_model=LLMCacheStatsResponse,
+        summary="LLM 응답 캐시 적중/미스 통계",
+        description="요약·개념/메타데이터/난이도 추출·정답 검증 호출의 캐시 적중률 (프로세스 기동 이후 누적).",
+    )
+    def llm_cache_stats() -> LLMCacheStatsResponse:
+        return LLMCacheStatsResponse(**llm_cache.stats())
+
+    @app.get(
+        "/llm/rate-limits",
+        response_model=LLMRateLimitStatsResponse,
+        summary="OpenAI 호출 한도 스케줄러 상태",
+        description="kind별 호출 수, 429 수, 한도 대기 시간, 현재 동시성 한도(AIMD). 프로세스 기동 이후 누적.",
+    )
+    def llm_rate_limits() -> LLMRateLimitStatsResponse:
+        return LLMRateLimitStatsResponse(shared=settings.RATE_LIMIT_SHARED, kinds=rate_limiter.stats())
+
+    @app.get(
+        "/llm/retries",
+        response_model=LLMRetryStatsResponse,
+        summary="OpenAI 호출 재시도·서킷 브레이커 통계",
+        description="엔드포인트별 시도·재시도·최종 실패·서킷 거부·헤지 수와 현재 서킷 상태. 프로세스 기동 이후 누적.",
+    )
+    def llm_retries() -> LLMRetryStatsResponse:
+        return LLMRetryStatsResponse(endpoints=resilient_caller.stats())
+
+    @app.get(
+        "/llm/structured-output",
+        response_model=LLMStructuredOutputStatsResponse,
+        summary="퀴즈 구조화 출력 복구 통계",
+        description="호출 지점별 응답 수, 스키마 위반으로 버린 문항 수, 모자란 문항만 재생성한 비율과 추가 지연. 프로세스 기동 이후 누적.",
+    )
+    def llm_structured_output() -> LLMStructuredOutputStatsResponse:
+        return LLMStructuredOutputStatsResponse(
+            strict=settings.LLM_STRICT_SCHEMA, call_sites=structured_output_stats.stats()
+        )
+
+    @app.get(
+        "/metrics",
+        summary="Prometheus 메트릭",
+        description="단계별 지연 히스토그램, LLM 토큰·지연, 캐시·재시도·한도 통계, 큐 상태별 작업 수·대기 시간 (텍스트 형식 0.0.4).",
+        response_class=Response,
+    )
+    def prometheus_metrics() -> Response:
+        return Response(content=metrics.render(), media_type=METRICS_CONTENT_TYPE)
+
     return app
 
 
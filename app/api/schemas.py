@@ -2,7 +2,7 @@
 API 요청/응답 스키마.
 """
 
-from typing import Any
+from typing import Any, Literal
 
 from pydantic import BaseModel, Field
 
@@ -21,6 +21,9 @@ class LectureSummarizeRequest(BaseModel):
     section_title: str | None = Field(None, description="섹션 제목 (소주제)")
     lecture_title: str | None = Field(None, description="강의 제목 (소주제)")
     summary: str | None = Field(None, description="미리 만든 요약문 (있으면 LLM 호출 생략)")
+    summary_mode: Literal["truncate", "map_reduce"] | None = Field(
+        None, description="truncate | map_reduce (없으면 서버 설정 SUMMARY_MODE). map_reduce는 긴 전사 전체를 요약"
+    )
 
 
 class LectureSummarizeResponse(BaseModel):
@@ -45,6 +48,10 @@ class QuizGenerateRequest(BaseModel):
     use_semantic_previous: bool = Field(False, description="이전 맥락을 id 순 전부 대신 벡터 유사도 상위 N건만 사용")
     semantic_limit: int = Field(5, ge=1, le=20, description="use_semantic_previous 시 참고할 이전 강의 요약 최대 건수")
     max_context_lectures: int | None = Field(None, ge=1, le=100, description="맥락에 쓸 이전 강의를 id 순 처음 N개로 제한. 예: 5면 1~5번만, 6번 이후 미반영")
+    use_chunk_retrieval: bool | None = Field(None, description="전사 앞부분 대신 MMR로 고른 청크를 출제 근거로 사용 (없으면 서버 설정)")
+    chunk_top_k: int | None = Field(None, ge=1, le=20, description="use_chunk_retrieval 시 사용할 청크 수 (없으면 서버 설정)")
+    fan_out: bool | None = Field(None, description="강의 구간별로 나눠 동시 생성 후 중복 제거 (없으면 서버 설정 QUIZ_FANOUT_ENABLED)")
+    use_bank: bool | None = Field(None, description="문항 은행에서 샘플링 (없으면 서버 설정 QUIZ_BANK_ENABLED). 맥락 옵션을 바꾼 요청은 항상 직접 생성")
 
 
 class QuizQuestionOption(BaseModel):
@@ -62,6 +69,170 @@ class QuizGenerateResponse(BaseModel):
 
     questions: list[QuizQuestionOption] = Field(..., description="퀴즈 문항 목록")
     saved: bool = Field(False, description="DB(lecture_quiz)에 저장했는지 여부")
+    from_bank: bool = Field(False, description="문항 은행에서 샘플링한 결과인지 여부")
+
+
+class CourseQuizGenerateRequest(BaseModel):
+    """강좌 일괄 퀴즈 생성 요청."""
+
+    course_id: str = Field(..., description="강좌 ID")
+    user_id: str = Field(..., description="사용자 ID")
+    lecture_ids: list[str] | None = Field(None, description="일부 강의만 생성 (없으면 강좌 전체)")
+    num_questions: int = Field(5, ge=1, le=20, description="강의별 문항 수")
+    validate: bool = Field(True, description="문항별 검증(LLM 정답 일치) 수행 여부")
+    save: bool = Field(True, description="강의마다 끝나는 즉시 lecture_quiz에 저장할지 여부")
+    concurrency: int | None = Field(None, ge=1, le=32, description="동시에 처리할 강의 수 (없으면 서버 설정 QUIZ_COURSE_CONCURRENCY)")
+    use_chunk_retrieval: bool | None = Field(None, description="MMR로 고른 청크를 출제 근거로 사용 (없으면 서버 설정)")
+    chunk_top_k: int | None = Field(None, ge=1, le=20, description="use_chunk_retrieval 시 사용할 청크 수 (없으면 서버 설정)")
+
+
+class QuizJobRequest(BaseModel):
+    """비동기 퀴즈 생성 job 적재 요청. 결과는 항상 lecture_quiz에 저장된다."""
+
+    course_id: str = Field(..., description="강좌 ID")
+    lecture_id: str = Field(..., description="강의 ID")
+    user_id: str = Field(..., description="사용자 ID")
+    num_questions: int = Field(5, ge=1, le=20, description="문항 수")
+    validate: bool = Field(True, description="문항별 검증(LLM 정답 일치) 수행 여부")
+    use_semantic_previous: bool = Field(False, description="이전 맥락을 id 순 전부 대신 벡터 유사도 상위 N건만 사용")
+    semantic_limit: int = Field(5, ge=1, le=20, description="use_semantic_previous 시 참고할 이전 강의 요약 최대 건수")
+    max_context_lectures: int | None = Field(None, ge=1, le=100, description="맥락에 쓸 이전 강의를 id 순 처음 N개로 제한")
+    use_chunk_retrieval: bool | None = Field(None, description="MMR로 고른 청크를 출제 근거로 사용 (없으면 서버 설정)")
+    chunk_top_k: int | None = Field(None, ge=1, le=20, description="use_chunk_retrieval 시 사용할 청크 수 (없으면 서버 설정)")
+    fan_out: bool | None = Field(None, description="강의 구간별로 나눠 동시 생성 후 중복 제거 (없으면 서버 설정)")
+
+
+class QuizJobEnqueueResponse(BaseModel):
+    """퀴즈 job 적재 응답."""
+
+    job_id: int
+    message: str = "Quiz job enqueued."
+
+
+class QuizJobStatusResponse(BaseModel):
+    """퀴즈 job 상태 조회 응답. done이면 저장된 퀴즈(quiz_id, questions) 포함."""
+
+    job_id: int
+    status: str = Field(..., description="pending | processing | done | failed")
+    error_message: str | None = None
+    quiz_id: int | None = Field(None, description="lecture_quiz.id (done일 때)")
+    questions: list[QuizQuestionOption] | None = Field(None, description="생성된 문항 (done일 때)")
+
+
+# ----- 청크 검색 -----
+
+
+class ChunkSearchRequest(BaseModel):
+    """청크 시맨틱 검색 요청. query 또는 query_embedding 중 하나 필수."""
+
+    query: str | None = Field(None, description="검색 문장 (서버에서 임베딩 1회)")
+    query_embedding: list[float] | None = Field(None, description="이미 만든 쿼리 벡터 (1536차원)")
+    course_id: str | None = Field(None, description="강좌 ID 필터")
+    lecture_id: str | None = Field(None, description="강의 ID 필터")
+    user_id: str | None = Field(None, description="사용자 ID 필터")
+    difficulty: str | None = Field(None, description="난이도 필터 (easy | medium | hard)")
+    concept: str | None = Field(None, description="개념 필터 (부분 일치)")
+    limit: int = Field(10, ge=1, le=100, description="최대 결과 수")
+
+
+class ChunkSearchHit(BaseModel):
+    """청크 검색 결과 한 건."""
+
+    chunk_id: int
+    course_id: str
+    lecture_id: str
+    user_id: str
+    chunk_index: int
+    text: str
+    start: float | None = None
+    end: float | None = None
+    concept: str | None = None
+    difficulty: str | None = None
+    score: float = Field(..., description="코사인 유사도 (높을수록 유사)")
+
+
+class ChunkSearchResponse(BaseModel):
+    """청크 검색 응답."""
+
+    results: list[ChunkSearchHit]
+    cached: bool = Field(False, description="캐시에서 반환했는지 여부")
+
+
+class HybridSearchRequest(BaseModel):
+    """하이브리드(전문 검색 + 벡터, RRF) 검색 요청."""
+
+    query: str = Field(..., min_length=1, description="검색 문장 (용어·코드 식별자 포함 가능)")
+    target: Literal["summaries", "chunks"] = Field("chunks", description="검색 대상: 강의 요약 | 청크")
+    mode: Literal["hybrid", "vector", "lexical"] = Field("hybrid", description="hybrid(RRF) | vector | lexical")
+    course_id: str | None = Field(None, description="강좌 ID (summaries는 필수)")
+    lecture_id: str | None = Field(None, description="강의 ID 필터 (chunks)")
+    user_id: str | None = Field(None, description="사용자 ID (summaries는 필수)")
+    difficulty: str | None = Field(None, description="난이도 필터 (chunks)")
+    concept: str | None = Field(None, description="개념 필터, 부분 일치 (chunks)")
+    limit: int = Field(10, ge=1, le=100, description="최대 결과 수")
+
+
+class HybridSearchHit(BaseModel):
+    """하이브리드 검색 결과 한 건. chunks면 chunk_* 필드 포함."""
+
+    lecture_id: str
+    text: str
+    score: float = Field(..., description="RRF 점수")
+    vector_rank: int | None = Field(None, description="벡터 검색 순위 (없으면 미포함)")
+    lexical_rank: int | None = Field(None, description="전문 검색 순위 (없으면 미포함)")
+    chunk_id: int | None = None
+    chunk_index: int | None = None
+    start: float | None = None
+    end: float | None = None
+    concept: str | None = None
+    difficulty: str | None = None
+
+
+class HybridSearchResponse(BaseModel):
+    """하이브리드 검색 응답."""
+
+    results: list[HybridSearchHit]
+
+
+# ----- LLM 응답 캐시 -----
+
+
+class LLMCacheStatsResponse(BaseModel):
+    """GET /llm/cache/stats 응답."""
+
+    enabled: bool
+    memory_entries: int = Field(..., description="메모리 LRU 항목 수")
+    hit_rate: float = Field(..., description="(memory_hits + disk_hits) / 전체 조회")
+    total: dict[str, int] = Field(..., description="memory_hits, disk_hits, misses, stores 합계")
+    by_call_site: dict[str, dict[str, int]] = Field(..., description="호출 지점(summary, extract_* 등)별 카운트")
+
+
+class LLMRateLimitStatsResponse(BaseModel):
+    """GET /llm/rate-limits 응답."""
+
+    shared: bool = Field(..., description="RPM/TPM을 Postgres로 프로세스 간 공유하는지")
+    kinds: dict[str, dict[str, Any]] = Field(
+        ..., description="kind(chat/embedding/transcription)별 calls, rate_limited, timeouts, wait_sec, concurrency_limit, in_flight"
+    )
+
+
+class LLMRetryStatsResponse(BaseModel):
+    """GET /llm/retries 응답."""
+
+    endpoints: dict[str, dict[str, Any]] = Field(
+        ...,
+        description="엔드포인트(chat/embedding/transcription)별 calls, retries, failures, breaker_rejected, hedges, hedge_wins, breaker_state",
+    )
+
+
+class LLMStructuredOutputStatsResponse(BaseModel):
+    """GET /llm/structured-output 응답."""
+
+    strict: bool = Field(..., description="json_schema strict 모드 사용 여부 (LLM_STRICT_SCHEMA)")
+    call_sites: dict[str, dict[str, Any]] = Field(
+        ...,
+        description="호출 지점(quiz_generator, quiz_from_lecture)별 responses, clean, repaired, repair_rate, dropped_items, missing_items, avg_repair_sec",
+    )
 
 
 # ----- Ingestion (Upload → Queue) -----
@@ -0,0 +1,161 @@
+"""
+축소 차원 halfvec(embedding_compact) 백필 + recall-vs-size 리포트 CLI.
+
+사용 예:
+  # embedding_compact가 비어 있는 행을 배치로 채움 (lecture_summary_embeddings, lecture_chunk_vectors)
+  python -m app.backfill_compact_embeddings --batch-size 500
+  # 저장된 벡터 샘플로 차원별 recall@k·저장 크기 비교 (DB 쓰기 없음)
+  python -m app.backfill_compact_embeddings --report --dims 64,128,256,512 -k 10
+로그는 stderr, 리포트(JSON)는 stdout.
+"""
+
+import argparse
+import json
+import logging
+import sys
+
+import numpy as np
+from sqlalchemy import text
+
+from app.core.config import settings
+from app.db.connection import get_session
+from app.db.vector import compact_vector, vector_literal
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s [%(levelname)s] %(name)s: %(message)s",
+    datefmt="%Y-%m-%d %H:%M:%S",
+    stream=sys.stderr,
+)
+logger = logging.getLogger(__name__)
+
+TABLES = ("lecture_summary_embeddings", "lecture_chunk_vectors")
+
+
+def backfill(table: str, batch_size: int) -> int:
+    """table의 embedding_compact IS NULL 행을 batch_size씩 채운다. 재실행해도 남은 행만 처리(재개 가능)."""
+    total = 0
+    while True:
+        with get_session() as session:
+            rows = session.execute(
+                text(f"""
+                    SELECT id, embedding FROM {table}
+                    WHERE embedding IS NOT NULL AND embedding_compact IS NULL
+                    ORDER BY id
+                    LIMIT :limit
+                """),
+                {"limit": batch_size},
+            ).fetchall()
+            if not rows:
+                break
+            session.execute(
+                text(f"UPDATE {table} SET embedding_compact = CAST(:v AS halfvec) WHERE id = :id"),
+                [{"id": r[0], "v": vector_literal(compact_vector(_parse_vector(r[1])))} for r in rows],
+            )
+            session.commit()
+        total += len(rows)
+        logger.info("%s 백필 진행 %d행", table, total)
+    return total
+
+
+def _parse_vector(value) -> np.ndarray:
+    """text()로 읽은 vector 컬럼은 '[..]' 문자열이므로 numpy 배열로 변환."""
+    if isinstance(value, str):
+        return np.asarray(json.loads(value), dtype=np.float32)
+    return np.asarray(value, dtype=np.float32)
+
+
+def recall_vs_size(
+    corpus: np.ndarray,
+    dims_list: list[int],
+    k: int = 10,
+    oversample: int = 4,
+    num_queries: int = 100,
+    seed: int = 0,
+) -> list[dict]:
+    """
+    corpus 일부를 쿼리로 삼아, 원본 벡터 정확 검색 top-k 대비
+    - compact_only: 축소 halfvec(float16)만으로 고른 top-k의 recall
+    - two_pass: 축소 벡터로 k×oversample 후보 → 저장된 원본(halfvec)으로 재정렬한 top-k의 recall
+    과 벡터당 저장 바이트(halfvec = 2바이트 × 차원)를 반환. 첫 행은 원본 차원 halfvec 자체의 recall.
+    """
+    full = corpus.astype(np.float32)
+    full /= np.maximum(np.linalg.norm(full, axis=1, keepdims=True), 1e-12)
+    n = full.shape[0]
+    k = min(k, n - 1)
+    rng = np.random.default_rng(seed)
+    queries = rng.choice(n, size=min(num_queries, n), replace=False)
+    exact_scores = full[queries] @ full.T
+    exact_scores[np.arange(len(queries)), queries] = -np.inf  # 자기 자신 제외
+    exact_top = np.argsort(-exact_scores, axis=1)[:, :k]
+
+    # 저장된 원본도 halfvec(float16)이므로 float32 정답 대비 그 반올림 손실부터 잰다
+    stored = full.astype(np.float16).astype(np.float32)
+    stored_scores = stored[queries] @ stored.T
+    stored_scores[np.arange(len(queries)), queries] = -np.inf
+    report = [{
+        "dims": full.shape[1],
+        "storage": "halfvec(float16)",
+        "bytes_per_vector": full.shape[1] * 2,
+        "recall_compact_only": _mean_recall(np.argsort(-stored_scores, axis=1)[:, :k], exact_top),
+        "recall_two_pass": None,
+    }]
+    for dims in dims_list:
+        compact = full[:, :dims].copy()
+        compact /= np.maximum(np.linalg.norm(compact, axis=1, keepdims=True), 1e-12)
+        compact = compact.astype(np.float16).astype(np.float32)
+        coarse = compact[queries] @ compact.T
+        coarse[np.arange(len(queries)), queries] = -np.inf
+        order = np.argsort(-coarse, axis=1)
+        compact_top = order[:, :k]
+        candidates = order[:, : k * oversample]
+        rerank = np.take_along_axis(stored_scores, candidates, axis=1)
+        two_pass_top = np.take_along_axis(candidates, np.argsort(-rerank, axis=1)[:, :k], axis=1)
+        report.append({
+            "dims": dims,
+            "storage": "halfvec(float16)",
+            "bytes_per_vector": dims * 2,
+            "recall_compact_only": _mean_recall(compact_top, exact_top),
+            "recall_two_pass": _mean_recall(two_pass_top, exact_top),
+        })
+    return report
+
+
+def _mean_recall(found: np.ndarray, truth: np.ndarray) -> float:
+    hits = [len(set(f) & set(t)) / len(t) for f, t in zip(found.tolist(), truth.tolist())]
+    return round(float(np.mean(hits)), 4)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="embedding_compact(halfvec) 백필 및 recall-vs-size 리포트")
+    parser.add_argument("--batch-size", type=int, default=500, help="백필 배치 크기 (기본 500)")
+    parser.add_argument("--table", choices=TABLES, default=None, help="한 테이블만 처리 (기본: 둘 다)")
+    parser.add_argument("--report", action="store_true", help="백필 대신 recall-vs-size 리포트 출력")
+    parser.add_argument("--dims", default="64,128,256,512", help="리포트할 축소 차원 CSV")
+    parser.add_argument("-k", type=int, default=10, help="recall@k의 k (기본 10)")
+    parser.add_argument("--sample", type=int, default=5000, help="리포트에 쓸 최대 벡터 수 (기본 5000)")
+    args = parser.parse_args()
+
+    tables = [args.table] if args.table else list(TABLES)
+    if args.report:
+        with get_session() as session:
+            rows = session.execute(
+                text(f"SELECT embedding FROM {tables[-1]} WHERE embedding IS NOT NULL ORDER BY random() LIMIT :n"),
+                {"n": args.sample},
+            ).fetchall()
+        if len(rows) < 2:
+            print("리포트에 필요한 벡터가 부족합니다", file=sys.stderr)
+            sys.exit(1)
+        corpus = np.stack([_parse_vector(r[0]) for r in rows])
+        dims_list = [int(d) for d in args.dims.split(",") if d.strip()]
+        report = recall_vs_size(corpus, dims_list, k=args.k, oversample=settings.VECTOR_SEARCH_OVERSAMPLE)
+        print(json.dumps({"table": tables[-1], "vectors": len(rows), "k": args.k, "rows": report}, indent=2))
+        return
+
+    for table in tables:
+        n = backfill(table, args.batch_size)
+        logger.info("%s 백필 완료 %d행 (dims=%d)", table, n, settings.EMBEDDING_COMPACT_DIMENSIONS)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""
+대량 ingestion CLI: pending transcript job들을 Batch API로 처리 (실시간 요금·한도 대신 배치).
+같은 --state로 다시 실행하면 중단된 단계부터 이어서 진행한다.
+
+실행 예:
+  python -m app.batch_ingest --state .cache/batch/backfill.json              # done까지 폴링
+  python -m app.batch_ingest --state .cache/batch/backfill.json --once       # 한 단계만 진행 후 종료 (cron용)
+  python -m app.batch_ingest --state /tmp/dev.json --backend local           # Batch API 대신 로컬 파일 대용
+"""
+
+import argparse
+import json
+import logging
+import sys
+from pathlib import Path
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s [%(levelname)s] %(name)s: %(message)s",
+    datefmt="%Y-%m-%d %H:%M:%S",
+    stream=sys.stderr,
+)
+logger = logging.getLogger(__name__)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="pending transcript job을 Batch API로 추출·요약·임베딩 후 DB 반영")
+    parser.add_argument("--state", type=Path, required=True, help="재개용 상태 파일 경로 (JSON)")
+    parser.add_argument(
+        "--backend",
+        choices=["openai", "local"],
+        default="openai",
+        help="openai: Batch API / local: 로컬 파일 대용 (요청을 실시간 API로 즉시 처리)",
+    )
+    parser.add_argument("--limit", type=int, default=500, help="한 번에 가져올 pending job 수 (기본 500)")
+    parser.add_argument("--poll-interval", type=float, default=60.0, help="배치 완료 폴링 간격 초 (기본 60)")
+    parser.add_argument("--once", action="store_true", help="한 단계만 진행하고 종료")
+    parser.add_argument("--no-summaries", action="store_true", help="강의 요약·요약 임베딩(lecture_summary_embeddings) 생략")
+    args = parser.parse_args()
+    # --help·인자 오류는 DB·LLM 모듈을 불러오지 않고 바로 끝나도록 파싱 뒤에 import
+    from app.services.batch_ingestion import BatchIngestion, LocalBatchBackend, OpenAIBatchBackend
+
+    if args.backend == "local":
+        backend = LocalBatchBackend(args.state.parent / f"{args.state.stem}_local")
+    else:
+        backend = OpenAIBatchBackend()
+    runner = BatchIngestion(args.state, backend, limit=args.limit, summaries=not args.no_summaries)
+    if args.once:
+        runner.step()
+        result = runner.summary()
+    else:
+        result = runner.run(poll_interval=args.poll_interval)
+    print(json.dumps(result, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
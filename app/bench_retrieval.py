@@ -0,0 +1,106 @@
+"""
+검색 벤치마크: 순수 벡터 검색 vs 전문 검색 vs 하이브리드(RRF)의 지연 시간·recall@k 비교.
+
+입력 JSONL 한 줄 = 쿼리 1건:
+  {"query": "docker-compose up", "course_id": "c1", "user_id": "u1", "relevant_lecture_ids": ["lecture_3"]}
+  (청크 대상이면 "relevant_chunk_ids": [12, 15] 도 가능, 없으면 lecture_id 기준으로 판정)
+
+사용 예:
+  python -m app.bench_retrieval --queries bench/queries.jsonl --target chunks -k 10
+쿼리 임베딩은 쿼리당 1회만 만들어 모든 모드에서 재사용하므로, 지연 시간은 DB 검색 구간만 잰다.
+로그는 stderr, 결과 표(JSON)는 stdout.
+"""
+
+import argparse
+import json
+import logging
+import statistics
+import sys
+import time
+from pathlib import Path
+
+logging.basicConfig(
+    level=logging.WARNING,
+    format="%(asctime)s [%(levelname)s] %(name)s: %(message)s",
+    datefmt="%Y-%m-%d %H:%M:%S",
+    stream=sys.stderr,
+)
+logger = logging.getLogger(__name__)
+
+
+def _recall(hits: list[dict], case: dict) -> float:
+    if case.get("relevant_chunk_ids"):
+        wanted = set(case["relevant_chunk_ids"])
+        found = {h.get("chunk_id") for h in hits}
+    else:
+        wanted = set(case.get("relevant_lecture_ids") or [])
+        found = {h.get("lecture_id") for h in hits}
+    return len(found & wanted) / len(wanted) if wanted else 0.0
+
+
+def _percentile(values: list[float], p: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    idx = min(len(ordered) - 1, max(0, round(p / 100 * (len(ordered) - 1))))
+    return ordered[idx]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="벡터 vs 전문 검색 vs 하이브리드(RRF) 지연 시간·recall@k 벤치마크")
+    parser.add_argument("--queries", type=Path, required=True, help="쿼리 JSONL 경로")
+    parser.add_argument("--target", choices=["summaries", "chunks"], default="chunks", help="검색 대상")
+    parser.add_argument("-k", type=int, default=10, help="recall@k의 k (기본 10)")
+    parser.add_argument("--repeat", type=int, default=3, help="쿼리당 반복 측정 횟수 (기본 3, 중앙값 사용)")
+    args = parser.parse_args()
+    # --help·인자 오류는 DB·LLM 모듈을 불러오지 않고 바로 끝나도록 파싱 뒤에 import
+    from app.services.embedding import embedding_service
+    from app.services.hybrid_search import SEARCH_MODES, hybrid_search_service
+
+    cases = [json.loads(line) for line in args.queries.read_text(encoding="utf-8").splitlines() if line.strip()]
+    if not cases:
+        print("쿼리가 없습니다", file=sys.stderr)
+        sys.exit(1)
+
+    latencies: dict[str, list[float]] = {m: [] for m in SEARCH_MODES}
+    recalls: dict[str, list[float]] = {m: [] for m in SEARCH_MODES}
+    for i, case in enumerate(cases, 1):
+        query_embedding = embedding_service.embed(case["query"])
+        for mode in SEARCH_MODES:
+            timings = []
+            hits: list[dict] = []
+            for _ in range(max(1, args.repeat)):
+                t0 = time.perf_counter()
+                hits = hybrid_search_service.search(
+                    args.target,
+                    case["query"],
+                    mode=mode,
+                    query_embedding=query_embedding,
+                    course_id=case.get("course_id"),
+                    lecture_id=case.get("lecture_id"),
+                    user_id=case.get("user_id"),
+                    limit=args.k,
+                )
+                timings.append((time.perf_counter() - t0) * 1000)
+            latencies[mode].append(statistics.median(timings))
+            recalls[mode].append(_recall(hits, case))
+        print(f"[{i}/{len(cases)}] {case['query'][:40]}", file=sys.stderr)
+
+    report = {
+        "target": args.target,
+        "k": args.k,
+        "queries": len(cases),
+        "modes": {
+            mode: {
+                f"recall@{args.k}": round(statistics.mean(recalls[mode]), 4),
+                "latency_ms_p50": round(_percentile(latencies[mode], 50), 2),
+                "latency_ms_p95": round(_percentile(latencies[mode], 95), 2),
+            }
+            for mode in SEARCH_MODES
+        },
+    }
+    print(json.dumps(report, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,4 @@
-from app.db.connection import engine, get_session
+from app.db.connection import get_engine, get_session
 from app.db.models import (
     IngestionJob,
     LectureChunk,
@@ -11,8 +11,18 @@ from app.db.repositories.lecture_chunk import lecture_chunk_repo
 from app.db.repositories.lecture_quiz import lecture_quiz_repo
 from app.db.repositories.lecture_summary_embeddings import lecture_summary_embeddings_repo
 
+
+
+def __getattr__(name: str):
+    # engine은 첫 접근 때 생성 (app.db.connection.get_engine)
+    if name == "engine":
+        return get_engine()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
 __all__ = [
     "engine",
+    "get_engine",
     "get_session",
     "IngestionJob",
     "LectureChunk",
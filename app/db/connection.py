@@ -1,11 +1,13 @@
 """
 SQLModel 엔진·세션 (PostgreSQL + pgvector).
+엔진(psycopg 드라이버 로드·커넥션 풀)과 스키마 준비(확장·테이블·인덱스)는 첫 get_session() 때 한 번만 한다.
 """
 
+import threading
 from contextlib import contextmanager
-from typing import Generator
+from typing import Any, Generator
 
-from sqlalchemy import text
+from sqlalchemy import Engine, text
 from sqlmodel import Session, SQLModel, create_engine
 
 from app.core.config import settings
@@ -13,26 +15,107 @@ from app.db.models import (  # noqa: F401 - 테이블 등록
     IngestionJob,
     LectureChunk,
     LectureChunkVector,
+    LLMRateWindow,
+    LLMUsage,
     LectureQuiz,
     LectureSummaryEmbedding,
+    QuizBankQuestion,
+    QuizJob,
 )
 
-# postgresql:// → postgresql+psycopg:// (psycopg3 드라이버)
-_db_url = settings.DATABASE_URL.replace("postgresql://", "postgresql+psycopg://", 1)
-engine = create_engine(_db_url, echo=False)
+_engine: Engine | None = None
+_schema_ready = False
+_init_lock = threading.Lock()
 
 
-@contextmanager
-def get_session() -> Generator[Session, None, None]:
+def get_engine() -> Engine:
+    global _engine
+    if _engine is None:
+        with _init_lock:
+            if _engine is None:
+                # postgresql:// → postgresql+psycopg:// (psycopg3 드라이버)
+                db_url = settings.DATABASE_URL.replace("postgresql://", "postgresql+psycopg://", 1)
+                _engine = create_engine(db_url, echo=False)
+    return _engine
+
+
+def __getattr__(name: str) -> Any:
+    # 기존 `from app.db.connection import engine` 호환 (접근할 때 생성)
+    if name == "engine":
+        return get_engine()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def _ensure_schema(engine: Engine) -> None:
+    global _schema_ready
+    if _schema_ready:
+        return
+    with _init_lock:
+        if not _schema_ready:
+            _create_schema(engine)
+            _schema_ready = True
+
+
+def _create_schema(engine: Engine) -> None:
     # pgvector 확장 없으면 생성 후 테이블 생성 (DB 연결은 여기서 발생)
     with engine.connect() as conn:
         conn.execute(text("CREATE EXTENSION IF NOT EXISTS vector"))
+        conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
         conn.commit()
     SQLModel.metadata.create_all(engine)
     with engine.connect() as conn:
         conn.execute(text("ALTER TABLE lecture_summary_embeddings ADD COLUMN IF NOT EXISTS summary TEXT"))
         conn.execute(text("ALTER TABLE lecture_quiz ADD COLUMN IF NOT EXISTS approved BOOLEAN NOT NULL DEFAULT FALSE"))
         conn.execute(text("ALTER TABLE lecture_quiz ADD COLUMN IF NOT EXISTS approved_at TIMESTAMPTZ"))
+        # 임베딩 저장: 원본 halfvec(재정렬용, 인덱스 없음) + 축소 halfvec HNSW (2단계 검색의 1차 후보용).
+        # 예전 vector(float32) 컬럼은 halfvec으로 바꾸고 ivfflat 인덱스는 없앤다 (기존 DB는 처음 한 번 테이블 재작성)
+        dims = settings.EMBEDDING_DIMENSIONS
+        compact_dims = settings.EMBEDDING_COMPACT_DIMENSIONS
+        conn.execute(text("DROP INDEX IF EXISTS idx_lecture_summary_embeddings"))
+        conn.execute(text("DROP INDEX IF EXISTS idx_lecture_chunk_vectors_embedding"))
+        for table in ("lecture_summary_embeddings", "lecture_chunk_vectors"):
+            if _column_type(conn, table, "embedding") != f"halfvec({dims})":
+                conn.execute(text(f"ALTER TABLE {table} ALTER COLUMN embedding TYPE halfvec({dims}) USING embedding::halfvec({dims})"))
+            conn.execute(text(f"ALTER TABLE {table} ADD COLUMN IF NOT EXISTS embedding_compact halfvec({compact_dims})"))
+            existing = _column_type(conn, table, "embedding_compact")
+            if existing != f"halfvec({compact_dims})":
+                raise RuntimeError(
+                    f"{table}.embedding_compact가 {existing}인데 EMBEDDING_COMPACT_DIMENSIONS={compact_dims}: "
+                    "컬럼을 지우고 다시 만든 뒤 python -m app.backfill_compact_embeddings로 채워야 함"
+                )
+        conn.execute(text("CREATE INDEX IF NOT EXISTS idx_lecture_summary_compact ON lecture_summary_embeddings USING hnsw (embedding_compact halfvec_cosine_ops)"))
+        conn.execute(text("CREATE INDEX IF NOT EXISTS idx_lecture_chunk_vectors_compact ON lecture_chunk_vectors USING hnsw (embedding_compact halfvec_cosine_ops)"))
+        conn.execute(text("CREATE INDEX IF NOT EXISTS idx_lecture_chunks_lecture ON lecture_chunks (course_id, lecture_id, user_id)"))
+        conn.execute(text("CREATE INDEX IF NOT EXISTS idx_lecture_chunk_vectors_chunk_id ON lecture_chunk_vectors (chunk_id)"))
+        conn.execute(text("CREATE INDEX IF NOT EXISTS idx_quiz_jobs_pending ON quiz_jobs (id) WHERE status = 'pending'"))
+        conn.execute(text("ALTER TABLE quiz_jobs ADD COLUMN IF NOT EXISTS target TEXT NOT NULL DEFAULT 'quiz'"))
+        conn.execute(text("CREATE INDEX IF NOT EXISTS idx_quiz_jobs_lecture ON quiz_jobs (course_id, lecture_id, user_id, target, status)"))
+        conn.execute(text("CREATE INDEX IF NOT EXISTS idx_llm_usage_course ON llm_usage (course_id, created_at)"))
+        conn.execute(text("CREATE INDEX IF NOT EXISTS idx_llm_usage_job ON llm_usage (job_type, job_id)"))
+        conn.execute(text("ALTER TABLE quiz_bank_questions ADD COLUMN IF NOT EXISTS source_version TEXT NOT NULL DEFAULT ''"))
+        conn.execute(text("CREATE INDEX IF NOT EXISTS idx_quiz_bank_lecture ON quiz_bank_questions (course_id, lecture_id, user_id, verified, served_count)"))
+        # 하이브리드 검색: 전문 검색(tsvector 'simple') + trigram 인덱스
+        conn.execute(text("CREATE INDEX IF NOT EXISTS idx_lecture_summary_fts ON lecture_summary_embeddings USING gin (to_tsvector('simple', coalesce(summary, '')))"))
+        conn.execute(text("CREATE INDEX IF NOT EXISTS idx_lecture_summary_trgm ON lecture_summary_embeddings USING gin (coalesce(summary, '') gin_trgm_ops)"))
+        conn.execute(text("CREATE INDEX IF NOT EXISTS idx_lecture_chunks_fts ON lecture_chunks USING gin (to_tsvector('simple', coalesce(content->>'text', '')))"))
+        conn.execute(text("CREATE INDEX IF NOT EXISTS idx_lecture_chunks_trgm ON lecture_chunks USING gin (coalesce(content->>'text', '') gin_trgm_ops)"))
         conn.commit()
+
+
+def _column_type(conn: Any, table: str, column: str) -> str | None:
+    """컬럼의 실제 타입 문자열 (예: 'halfvec(256)'). 없으면 None."""
+    return conn.execute(
+        text(
+            "SELECT format_type(atttypid, atttypmod) FROM pg_attribute "
+            "WHERE attrelid = CAST(:table AS regclass) AND attname = :column AND NOT attisdropped"
+        ),
+        {"table": table, "column": column},
+    ).scalar()
+
+
+@contextmanager
+def get_session() -> Generator[Session, None, None]:
+    engine = get_engine()
+    _ensure_schema(engine)
     with Session(engine) as session:
         yield session
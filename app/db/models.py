@@ -7,9 +7,11 @@ from typing import Any
 
 from sqlalchemy import Column, DateTime, Text, UniqueConstraint, func
 from sqlalchemy.dialects.postgresql import JSONB
-from pgvector.sqlalchemy import Vector
+from pgvector.sqlalchemy import HALFVEC
 from sqlmodel import Field, SQLModel
 
+from app.core.config import settings
+
 
 class IngestionJob(SQLModel, table=True):
     """업로드 이벤트 후 큐에 적재되는 ingestion 작업."""
@@ -64,7 +66,13 @@ class LectureChunkVector(SQLModel, table=True):
 
     id: int | None = Field(default=None, primary_key=True)
     chunk_id: int = Field(nullable=False)  # FK to lecture_chunks.id
-    embedding: list[float] = Field(sa_column=Column(Vector(1536), nullable=False))
+    # 원본도 halfvec(float16): 재정렬 전용이라 인덱스 없음 (float32 대비 저장 절반)
+    embedding: list[float] = Field(sa_column=Column(HALFVEC(settings.EMBEDDING_DIMENSIONS), nullable=False))
+    # 축소 차원 halfvec (1차 ANN 후보 검색용, 원본 앞 N차원 + 정규화)
+    embedding_compact: list[float] | None = Field(
+        default=None,
+        sa_column=Column(HALFVEC(settings.EMBEDDING_COMPACT_DIMENSIONS), nullable=True),
+    )
     created_at: datetime | None = Field(
         default=None,
         sa_column=Column(DateTime(timezone=True), server_default=func.now()),
@@ -83,7 +91,11 @@ class LectureSummaryEmbedding(SQLModel, table=True):
     user_id: str = Field(nullable=False)
     content: dict[str, Any] = Field(sa_column=Column(JSONB, nullable=False))
     summary: str | None = Field(default=None, sa_column=Column(Text, nullable=True))
-    embedding: list[float] | None = Field(default=None, sa_column=Column(Vector(1536)))
+    embedding: list[float] | None = Field(default=None, sa_column=Column(HALFVEC(settings.EMBEDDING_DIMENSIONS)))
+    embedding_compact: list[float] | None = Field(
+        default=None,
+        sa_column=Column(HALFVEC(settings.EMBEDDING_COMPACT_DIMENSIONS), nullable=True),
+    )
     metadata_: dict[str, Any] = Field(
         default_factory=dict,
         sa_column=Column("metadata", JSONB, server_default="{}"),
@@ -112,3 +124,84 @@ class LectureQuiz(SQLModel, table=True):
         default=None,
         sa_column=Column(DateTime(timezone=True), nullable=True),
     )
+
+
+class QuizBankQuestion(SQLModel, table=True):
+    """강의별 미리 생성·검증해 둔 문항 풀 (문항 1개 = 1행). /quiz/generate가 여기서 샘플링."""
+
+    __tablename__ = "quiz_bank_questions"
+
+    id: int | None = Field(default=None, primary_key=True)
+    course_id: str = Field(nullable=False)
+    lecture_id: str = Field(nullable=False)
+    user_id: str = Field(nullable=False)
+    question: str = Field(sa_column=Column(Text, nullable=False))
+    options: list[str] = Field(sa_column=Column(JSONB, nullable=False))
+    answer: int = Field(nullable=False)
+    explanation: str = Field(sa_column=Column(Text, nullable=False))
+    verified: bool = Field(default=False, nullable=False)
+    served_count: int = Field(default=0, nullable=False)  # 샘플링으로 내보낸 횟수 (적게 나간 문항 우선)
+    source_version: str = Field(default="", nullable=False)  # 생성 근거(요약·청크) 내용 해시 (강의가 바뀌면 달라짐)
+    created_at: datetime | None = Field(
+        default=None,
+        sa_column=Column(DateTime(timezone=True), server_default=func.now()),
+    )
+
+
+class QuizJob(SQLModel, table=True):
+    """비동기 퀴즈 생성 작업. 워커가 처리 후 결과를 lecture_quiz에 저장하고 quiz_id로 연결."""
+
+    __tablename__ = "quiz_jobs"
+
+    id: int | None = Field(default=None, primary_key=True)
+    course_id: str = Field(nullable=False)
+    lecture_id: str = Field(nullable=False)
+    user_id: str = Field(nullable=False)
+    params: dict[str, Any] = Field(sa_column=Column(JSONB, nullable=False))  # num_questions, validate 등 생성 옵션
+    target: str = Field(default="quiz", nullable=False)  # quiz(lecture_quiz 저장) | bank(문항 은행 채우기)
+    status: str = Field(default="pending", nullable=False)  # pending | processing | done | failed
+    quiz_id: int | None = Field(default=None, nullable=True)  # lecture_quiz.id
+    error_message: str | None = Field(default=None, sa_column=Column(Text, nullable=True))
+    created_at: datetime | None = Field(
+        default=None,
+        sa_column=Column(DateTime(timezone=True), server_default=func.now()),
+    )
+    updated_at: datetime | None = Field(
+        default=None,
+        sa_column=Column(DateTime(timezone=True), onupdate=func.now()),
+    )
+
+
+class LLMRateWindow(SQLModel, table=True):
+    """프로세스 간 공유 OpenAI 호출 한도 카운터 (kind별 1분 창의 요청·토큰 수)."""
+
+    __tablename__ = "llm_rate_windows"
+
+    kind: str = Field(primary_key=True)  # chat | embedding | transcription
+    window_start: int = Field(primary_key=True)  # epoch 초 // 60
+    requests: int = Field(default=0, nullable=False)
+    tokens: int = Field(default=0, nullable=False)
+
+
+class LLMUsage(SQLModel, table=True):
+    """OpenAI 호출 1건의 토큰·지연 기록 (job·요청별 비용 집계용). 비용은 저장하지 않고 리포트 때 단가표로 계산."""
+
+    __tablename__ = "llm_usage"
+
+    id: int | None = Field(default=None, primary_key=True)
+    created_at: datetime | None = Field(
+        default=None,
+        sa_column=Column(DateTime(timezone=True), server_default=func.now()),
+    )
+    job_type: str | None = Field(default=None, nullable=True)  # ingestion | quiz | request (CLI 직접 실행은 None)
+    job_id: str | None = Field(default=None, nullable=True)  # job id 또는 요청 X-Request-Id
+    course_id: str | None = Field(default=None, nullable=True)
+    lecture_id: str | None = Field(default=None, nullable=True)
+    stage: str = Field(nullable=False)  # timed_stage 이름 (단계 밖 호출은 call_site)
+    endpoint: str = Field(nullable=False)  # chat | embedding | transcription
+    call_site: str = Field(nullable=False)
+    model: str = Field(nullable=False)
+    prompt_tokens: int = Field(default=0, nullable=False)
+    completion_tokens: int = Field(default=0, nullable=False)
+    cached_tokens: int = Field(default=0, nullable=False)
+    latency_ms: int = Field(default=0, nullable=False)
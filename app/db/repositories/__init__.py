@@ -5,6 +5,7 @@ from app.db.repositories.lecture_summary_embeddings import (
     LectureSummaryEmbeddingRow,
     lecture_summary_embeddings_repo,
 )
+from app.db.repositories.quiz_job import quiz_job_repo
 
 __all__ = [
     "ingestion_job_repo",
@@ -12,4 +13,5 @@ __all__ = [
     "lecture_quiz_repo",
     "LectureSummaryEmbeddingRow",
     "lecture_summary_embeddings_repo",
+    "quiz_job_repo",
 ]
@@ -2,6 +2,10 @@
 ingestion_jobs 테이블 접근: enqueue, poll, status 업데이트.
 """
 
+from datetime import datetime
+from typing import Callable
+
+from sqlalchemy import func
 from sqlmodel import select
 from sqlmodel import Session
 
@@ -41,6 +45,37 @@ class IngestionJobRepo:
         )
         return session.exec(stmt).first()
 
+    def claim_pending(
+        self,
+        session: Session,
+        *,
+        job_type: str | None = None,
+        limit: int = 100,
+        ids: list[int] | None = None,
+        on_claimed: Callable[[list[int]], None] | None = None,
+    ) -> list[IngestionJob]:
+        """
+        pending job을 최대 limit건 processing으로 바꿔 반환 (FOR UPDATE SKIP LOCKED: 다른 워커와 겹치지 않음).
+        ids를 주면 그 job 중에서만 가져온다. on_claimed(ids)는 커밋 직전에 호출되므로, 호출 측이 가져온 id를
+        먼저 기록해 두면 커밋 뒤 중단되어도 processing으로 남은 job을 찾을 수 있다.
+        """
+        stmt = select(IngestionJob).where(IngestionJob.status == "pending")
+        if job_type is not None:
+            stmt = stmt.where(IngestionJob.job_type == job_type)
+        if ids is not None:
+            stmt = stmt.where(IngestionJob.id.in_(ids))
+        stmt = stmt.order_by(IngestionJob.id.asc()).limit(limit).with_for_update(skip_locked=True)
+        jobs = list(session.exec(stmt).all())
+        for job in jobs:
+            job.status = "processing"
+            session.add(job)
+        if on_claimed is not None and jobs:
+            on_claimed([job.id for job in jobs])
+        session.commit()
+        for job in jobs:
+            session.refresh(job)
+        return jobs
+
     def mark_processing(self, session: Session, job_id: int) -> None:
         job = session.get(IngestionJob, job_id)
         if job:
@@ -66,5 +101,10 @@ class IngestionJobRepo:
     def get_by_id(self, session: Session, job_id: int) -> IngestionJob | None:
         return session.get(IngestionJob, job_id)
 
+    def status_summary(self, session: Session) -> list[tuple[str, int, datetime | None]]:
+        """status별 (status, 건수, 가장 오래된 created_at) — 큐 깊이·대기 시간 메트릭용."""
+        stmt = select(IngestionJob.status, func.count(), func.min(IngestionJob.created_at)).group_by(IngestionJob.status)
+        return [(status, int(count), oldest) for status, count, oldest in session.exec(stmt).all()]
+
 
 ingestion_job_repo = IngestionJobRepo()
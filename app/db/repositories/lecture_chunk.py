@@ -4,10 +4,75 @@ lecture_chunks, lecture_chunk_vectors 테이블 접근 (SQL + Vector Store 분
 
 from typing import Any
 
+from sqlalchemy import text
 from sqlmodel import select
 from sqlmodel import Session
 
+from app.core.config import settings
 from app.db.models import LectureChunk, LectureChunkVector
+from app.db.vector import compact_vector, or_tsquery, set_ef_search, vector_literal
+
+# 검색 결과 컬럼 (_search_hit 순서와 동일, score는 쿼리별로 덧붙임)
+_HIT_COLUMNS = """
+    c.id, c.course_id, c.lecture_id, c.user_id, c.chunk_index,
+    c.content->>'text' AS text,
+    (c.content->>'start')::float AS start_sec,
+    (c.content->>'end')::float AS end_sec,
+    c.concept, c.difficulty
+"""
+# 검색 필터 (None이면 무시, concept은 부분 일치)
+_CHUNK_FILTERS = """
+    (CAST(:course_id AS TEXT) IS NULL OR c.course_id = :course_id)
+    AND (CAST(:lecture_id AS TEXT) IS NULL OR c.lecture_id = :lecture_id)
+    AND (CAST(:user_id AS TEXT) IS NULL OR c.user_id = :user_id)
+    AND (CAST(:difficulty AS TEXT) IS NULL OR c.difficulty = :difficulty)
+    AND (CAST(:concept AS TEXT) IS NULL OR c.concept ILIKE '%' || :concept || '%')
+"""
+
+
+# 1차: 축소 halfvec HNSW로 후보 추출 → 2차: 후보만 원본 벡터로 정확 재정렬
+_TWO_PASS_SEARCH = text(f"""
+    WITH coarse AS (
+        SELECT v.chunk_id, v.embedding
+        FROM lecture_chunk_vectors v
+        JOIN lecture_chunks c ON c.id = v.chunk_id
+        WHERE v.embedding_compact IS NOT NULL AND {_CHUNK_FILTERS}
+        ORDER BY v.embedding_compact <=> CAST(:query_compact AS halfvec)
+        LIMIT :candidates
+    )
+    SELECT {_HIT_COLUMNS},
+           1 - (coarse.embedding <=> CAST(:query_embedding AS halfvec)) AS score
+    FROM coarse
+    JOIN lecture_chunks c ON c.id = coarse.chunk_id
+    ORDER BY coarse.embedding <=> CAST(:query_embedding AS halfvec)
+    LIMIT :limit
+""")
+# 필터 안에서 원본 벡터 정확 검색 (인덱스 없이 필터된 행만 훑음)
+_EXACT_SEARCH = text(f"""
+    SELECT {_HIT_COLUMNS},
+           1 - (v.embedding <=> CAST(:query_embedding AS halfvec)) AS score
+    FROM lecture_chunk_vectors v
+    JOIN lecture_chunks c ON c.id = v.chunk_id
+    WHERE {_CHUNK_FILTERS}
+    ORDER BY v.embedding <=> CAST(:query_embedding AS halfvec)
+    LIMIT :limit
+""")
+
+
+def _search_hit(r: Any) -> dict[str, Any]:
+    return {
+        "chunk_id": r[0],
+        "course_id": r[1],
+        "lecture_id": r[2],
+        "user_id": r[3],
+        "chunk_index": r[4],
+        "text": r[5] or "",
+        "start": r[6],
+        "end": r[7],
+        "concept": r[8],
+        "difficulty": r[9],
+        "score": float(r[10]),
+    }
 
 
 class LectureChunkRepo:
@@ -40,10 +105,145 @@ class LectureChunkRepo:
         return row
 
     def insert_vector(self, session: Session, chunk_id: int, embedding: list[float]) -> None:
-        row = LectureChunkVector(chunk_id=chunk_id, embedding=embedding)
+        row = LectureChunkVector(
+            chunk_id=chunk_id,
+            embedding=embedding,
+            embedding_compact=compact_vector(embedding),
+        )
         session.add(row)
         session.commit()
 
+    def get_by_lecture(
+        self, session: Session, course_id: str, lecture_id: str, user_id: str
+    ) -> list[LectureChunk]:
+        """강의의 청크 목록 (chunk_index 오름차순)."""
+        stmt = (
+            select(LectureChunk)
+            .where(
+                LectureChunk.course_id == course_id,
+                LectureChunk.lecture_id == lecture_id,
+                LectureChunk.user_id == user_id,
+            )
+            .order_by(LectureChunk.chunk_index.asc())
+        )
+        return list(session.exec(stmt).all())
+
+    def get_with_vectors(
+        self, session: Session, course_id: str, lecture_id: str, user_id: str
+    ) -> list[tuple[LectureChunk, Any]]:
+        """강의의 (청크, 임베딩) 목록 (chunk_index 오름차순). 벡터가 없는 청크는 제외."""
+        stmt = (
+            select(LectureChunk, LectureChunkVector.embedding)
+            .join(LectureChunkVector, LectureChunkVector.chunk_id == LectureChunk.id)
+            .where(
+                LectureChunk.course_id == course_id,
+                LectureChunk.lecture_id == lecture_id,
+                LectureChunk.user_id == user_id,
+            )
+            .order_by(LectureChunk.chunk_index.asc())
+        )
+        return [(c, v) for c, v in session.exec(stmt).all()]
+
+    def search(
+        self,
+        session: Session,
+        query_embedding: list[float],
+        *,
+        course_id: str | None = None,
+        lecture_id: str | None = None,
+        user_id: str | None = None,
+        difficulty: str | None = None,
+        concept: str | None = None,
+        limit: int = 10,
+    ) -> list[dict[str, Any]]:
+        """
+        청크 벡터 검색 (lecture_chunk_vectors ⨝ lecture_chunks).
+        필터는 None이면 무시하며, concept은 부분 일치(대소문자 무시).
+        VECTOR_SEARCH_TWO_PASS면 halfvec 축소 벡터 HNSW로 후보(limit × VECTOR_SEARCH_OVERSAMPLE)를 뽑은 뒤
+        원본 벡터로 정확히 재정렬하고, 필터 때문에 limit건이 안 되면 필터 안에서 원본 벡터 정확 검색으로 다시 찾는다.
+
+        Returns:
+            [{chunk_id, course_id, lecture_id, user_id, chunk_index, text, start, end, concept, difficulty, score}]
+            score = 코사인 유사도 (1 - cosine distance), 높은 순.
+        """
+        params = {
+            "query_embedding": vector_literal(query_embedding),
+            "query_compact": vector_literal(compact_vector(query_embedding)),
+            "candidates": limit * settings.VECTOR_SEARCH_OVERSAMPLE,
+            "course_id": course_id,
+            "lecture_id": lecture_id,
+            "user_id": user_id,
+            "difficulty": difficulty,
+            "concept": concept,
+            "limit": limit,
+        }
+        if settings.VECTOR_SEARCH_TWO_PASS:
+            set_ef_search(session, params["candidates"])
+            rows = session.execute(_TWO_PASS_SEARCH, params).fetchall()
+            if len(rows) >= limit:
+                return [_search_hit(r) for r in rows]
+            # 필터에 걸러져(또는 백필 전이라) 후보가 모자라면 필터 안에서 정확 검색
+        rows = session.execute(_EXACT_SEARCH, params).fetchall()
+        return [_search_hit(r) for r in rows]
+
+    def lexical_search(
+        self,
+        session: Session,
+        query: str,
+        *,
+        course_id: str | None = None,
+        lecture_id: str | None = None,
+        user_id: str | None = None,
+        difficulty: str | None = None,
+        concept: str | None = None,
+        limit: int = 20,
+    ) -> list[dict[str, Any]]:
+        """
+        청크 본문 전문 검색: tsvector('simple') OR 매칭 + pg_trgm 단어 유사도. 결과 형식은 search와 같고
+        score는 ts_rank + word_similarity.
+        """
+        tsq = or_tsquery(query)
+        if not tsq:
+            return []
+        sql = text(f"""
+            SELECT {_HIT_COLUMNS},
+                   ts_rank(to_tsvector('simple', coalesce(c.content->>'text', '')), to_tsquery('simple', :tsq))
+                   + word_similarity(:query, coalesce(c.content->>'text', '')) AS score
+            FROM lecture_chunks c
+            WHERE {_CHUNK_FILTERS}
+              AND (to_tsvector('simple', coalesce(c.content->>'text', '')) @@ to_tsquery('simple', :tsq)
+                   OR :query <% coalesce(c.content->>'text', ''))
+            ORDER BY score DESC
+            LIMIT :limit
+        """)
+        rows = session.execute(
+            sql,
+            {
+                "query": query,
+                "tsq": tsq,
+                "course_id": course_id,
+                "lecture_id": lecture_id,
+                "user_id": user_id,
+                "difficulty": difficulty,
+                "concept": concept,
+                "limit": limit,
+            },
+        ).fetchall()
+        return [_search_hit(r) for r in rows]
+
+    def set_summaries(self, session: Session, summaries: dict[int, tuple[str, str]]) -> None:
+        """
+        청크별 요약을 metadata.summary에, 요약한 청크 본문 해시를 metadata.summary_sha256에 저장 (map-reduce 요약 재사용용).
+        {chunk_id: (summary, 본문 sha256)}
+        """
+        for chunk_id, (summary, text_sha256) in summaries.items():
+            row = session.get(LectureChunk, chunk_id)
+            if row:
+                # JSONB 변경 감지를 위해 새 dict 할당
+                row.metadata_ = {**(row.metadata_ or {}), "summary": summary, "summary_sha256": text_sha256}
+                session.add(row)
+        session.commit()
+
     def delete_by_lecture(
         self, session: Session, course_id: str, lecture_id: str, user_id: str
     ) -> None:
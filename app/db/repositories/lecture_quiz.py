@@ -31,5 +31,8 @@ class LectureQuizRepo:
         session.refresh(row)
         return row
 
+    def get_by_id(self, session: Session, quiz_id: int) -> LectureQuiz | None:
+        return session.get(LectureQuiz, quiz_id)
+
 
 lecture_quiz_repo = LectureQuizRepo()
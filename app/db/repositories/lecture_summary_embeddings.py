@@ -11,7 +11,40 @@ from sqlalchemy import text
 from sqlmodel import select
 from sqlmodel import Session
 
+from app.core.config import settings
 from app.db.models import LectureSummaryEmbedding
+from app.db.vector import compact_vector, or_tsquery, set_ef_search, vector_literal
+
+# 1차: 축소 halfvec HNSW로 후보 추출 → 2차: 후보만 원본 벡터로 정확 재정렬
+_SIMILAR_TWO_PASS = text("""
+    WITH coarse AS (
+        SELECT lecture_id, summary, embedding
+        FROM lecture_summary_embeddings
+        WHERE course_id = :course_id
+          AND user_id = :user_id
+          AND embedding_compact IS NOT NULL
+          AND summary IS NOT NULL
+          AND (:exclude = '' OR lecture_id != :exclude)
+        ORDER BY embedding_compact <=> CAST(:query_compact AS halfvec)
+        LIMIT :candidates
+    )
+    SELECT lecture_id, summary
+    FROM coarse
+    ORDER BY embedding <=> CAST(:query_embedding AS halfvec)
+    LIMIT :limit
+""")
+# 강좌 안에서 원본 벡터 정확 검색
+_SIMILAR_EXACT = text("""
+    SELECT lecture_id, summary
+    FROM lecture_summary_embeddings
+    WHERE course_id = :course_id
+      AND user_id = :user_id
+      AND embedding IS NOT NULL
+      AND summary IS NOT NULL
+      AND (:exclude = '' OR lecture_id != :exclude)
+    ORDER BY embedding <=> CAST(:query_embedding AS halfvec)
+    LIMIT :limit
+""")
 
 
 class LectureSummaryEmbeddingRow:
@@ -46,11 +79,34 @@ class LectureSummaryEmbeddingsRepo:
             LectureSummaryEmbedding.lecture_id == row.lecture_id,
             LectureSummaryEmbedding.user_id == row.user_id,
         )
-        existing = session.exec(stmt).first()
+        self._apply(session, row, session.exec(stmt).first())
+        session.commit()
+
+    def upsert_many(self, session: Session, rows: list[LectureSummaryEmbeddingRow]) -> None:
+        """같은 강좌·유저의 여러 강의를 기존 행 1회 조회 + 1회 commit으로 upsert."""
+        if not rows:
+            return
+        course_id, user_id = rows[0].course_id, rows[0].user_id
+        if any(r.course_id != course_id or r.user_id != user_id for r in rows):
+            raise ValueError("upsert_many는 같은 course_id·user_id 행만 받는다")
+        stmt = select(LectureSummaryEmbedding).where(
+            LectureSummaryEmbedding.course_id == course_id,
+            LectureSummaryEmbedding.user_id == user_id,
+            LectureSummaryEmbedding.lecture_id.in_([r.lecture_id for r in rows]),
+        )
+        existing = {e.lecture_id: e for e in session.exec(stmt).all()}
+        for row in rows:
+            self._apply(session, row, existing.get(row.lecture_id))
+        session.commit()
+
+    def _apply(
+        self, session: Session, row: LectureSummaryEmbeddingRow, existing: LectureSummaryEmbedding | None
+    ) -> None:
         if existing:
             existing.content = row.content
             existing.summary = row.summary
             existing.embedding = row.embedding
+            existing.embedding_compact = compact_vector(row.embedding)
             existing.metadata_ = row.metadata
             session.add(existing)
         else:
@@ -62,10 +118,27 @@ class LectureSummaryEmbeddingsRepo:
                     content=row.content,
                     summary=row.summary,
                     embedding=row.embedding,
+                    embedding_compact=compact_vector(row.embedding),
                     metadata_=row.metadata,
                 )
             )
-        session.commit()
+
+    def get_content_hashes(self, session: Session, course_id: str, user_id: str) -> dict[str, str]:
+        """요약이 저장된 강의의 lecture_id → metadata.content_sha256 (해시를 기록한 행만)."""
+        stmt = (
+            select(LectureSummaryEmbedding.lecture_id, LectureSummaryEmbedding.metadata_)
+            .where(
+                LectureSummaryEmbedding.course_id == course_id,
+                LectureSummaryEmbedding.user_id == user_id,
+                LectureSummaryEmbedding.summary.is_not(None),
+            )
+        )
+        out: dict[str, str] = {}
+        for lecture_id, metadata in session.exec(stmt).all():
+            digest = (metadata or {}).get("content_sha256")
+            if digest:
+                out[lecture_id] = digest
+        return out
 
     def get_lecture(
         self, session: Session, course_id: str, lecture_id: str, user_id: str
@@ -145,21 +218,95 @@ class LectureSummaryEmbeddingsRepo:
         같은 강좌·유저 내에서 쿼리 벡터와 코사인 유사도가 높은 순으로 강의 요약 조회.
         검색은 전부 DB(pgvector)에서 수행되며, query_embedding은 이미 EmbeddingService 등으로 만든 벡터.
 
+        VECTOR_SEARCH_TWO_PASS면 halfvec 축소 벡터 HNSW로 후보를 뽑은 뒤 원본 벡터로 정확히 재정렬하고,
+        강좌 필터 때문에 limit건이 안 되면 강좌 안에서 원본 벡터 정확 검색으로 다시 찾는다.
+
         Returns:
             (lecture_id, summary) 리스트. summary가 None이면 제외.
         """
-        # pgvector에 넘길 때 '[0.1,0.2,...]' 형태 문자열
-        vec_str = "[" + ",".join(str(x) for x in query_embedding) + "]"
-        exclude = exclude_lecture_id or ""
+        params = {
+            "course_id": course_id,
+            "user_id": user_id,
+            "query_embedding": vector_literal(query_embedding),
+            "query_compact": vector_literal(compact_vector(query_embedding)),
+            "candidates": limit * settings.VECTOR_SEARCH_OVERSAMPLE,
+            "exclude": exclude_lecture_id or "",
+            "limit": limit,
+        }
+        rows = []
+        if settings.VECTOR_SEARCH_TWO_PASS:
+            set_ef_search(session, params["candidates"])
+            rows = session.execute(_SIMILAR_TWO_PASS, params).fetchall()
+        if len(rows) < limit:
+            # 강좌 필터로 후보가 모자라면(또는 2단계 끔) 강좌 안에서 원본 벡터 정확 검색
+            rows = session.execute(_SIMILAR_EXACT, params).fetchall()
+        return [(r[0], r[1]) for r in rows if r[1] and r[1].strip()]
+
+    def get_course_lectures(
+        self, session: Session, course_id: str, user_id: str
+    ) -> list[LectureSummaryEmbedding]:
+        """같은 강좌·유저의 강의 행 전체 (id 오름차순). 강좌 단위 일괄 퀴즈 생성에서 1회 조회로 쓴다."""
+        stmt = (
+            select(LectureSummaryEmbedding)
+            .where(
+                LectureSummaryEmbedding.course_id == course_id,
+                LectureSummaryEmbedding.user_id == user_id,
+            )
+            .order_by(LectureSummaryEmbedding.id.asc())
+        )
+        return list(session.exec(stmt).all())
+
+    def get_course_embeddings(
+        self, session: Session, course_id: str, user_id: str
+    ) -> list[tuple[str, str, Any]]:
+        """같은 강좌·유저의 (lecture_id, summary, embedding) 전체 (인메모리 벡터 인덱스 로드용, id 오름차순)."""
+        stmt = (
+            select(
+                LectureSummaryEmbedding.lecture_id,
+                LectureSummaryEmbedding.summary,
+                LectureSummaryEmbedding.embedding,
+            )
+            .where(
+                LectureSummaryEmbedding.course_id == course_id,
+                LectureSummaryEmbedding.user_id == user_id,
+                LectureSummaryEmbedding.embedding.is_not(None),
+                LectureSummaryEmbedding.summary.is_not(None),
+            )
+            .order_by(LectureSummaryEmbedding.id.asc())
+        )
+        return [(r[0], r[1], r[2]) for r in session.exec(stmt).all() if r[1] and r[1].strip()]
+
+    def lexical_search(
+        self,
+        session: Session,
+        course_id: str,
+        user_id: str,
+        query: str,
+        limit: int = 20,
+        exclude_lecture_id: str | None = None,
+    ) -> list[tuple[str, str, float]]:
+        """
+        요약문 전문 검색: tsvector('simple', 형태소 분석 없이 공백 단위) OR 매칭 + pg_trgm 단어 유사도.
+        한국어 조사가 붙은 단어("도커를")나 코드 식별자 일부도 trigram으로 잡힌다.
+
+        Returns:
+            (lecture_id, summary, score) 리스트, score 높은 순.
+        """
+        tsq = or_tsquery(query)
+        if not tsq:
+            return []
         sql = text("""
-            SELECT lecture_id, summary
+            SELECT lecture_id, summary,
+                   ts_rank(to_tsvector('simple', coalesce(summary, '')), to_tsquery('simple', :tsq))
+                   + word_similarity(:query, coalesce(summary, '')) AS score
             FROM lecture_summary_embeddings
             WHERE course_id = :course_id
               AND user_id = :user_id
-              AND embedding IS NOT NULL
               AND summary IS NOT NULL
               AND (:exclude = '' OR lecture_id != :exclude)
-            ORDER BY embedding <=> :query_embedding::vector
+              AND (to_tsvector('simple', coalesce(summary, '')) @@ to_tsquery('simple', :tsq)
+                   OR :query <% coalesce(summary, ''))
+            ORDER BY score DESC
             LIMIT :limit
         """)
         rows = session.execute(
@@ -167,12 +314,13 @@ class LectureSummaryEmbeddingsRepo:
             {
                 "course_id": course_id,
                 "user_id": user_id,
-                "query_embedding": vec_str,
-                "exclude": exclude,
+                "query": query,
+                "tsq": tsq,
+                "exclude": exclude_lecture_id or "",
                 "limit": limit,
             },
         ).fetchall()
-        return [(r[0], r[1]) for r in rows if r[1] and r[1].strip()]
+        return [(r[0], r[1], float(r[2])) for r in rows if r[1] and r[1].strip()]
 
 
 lecture_summary_embeddings_repo = LectureSummaryEmbeddingsRepo()
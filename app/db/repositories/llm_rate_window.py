@@ -0,0 +1,39 @@
+"""
+llm_rate_windows 테이블 접근: 1분 창 카운터 원자적 증가, 오래된 창 정리.
+"""
+
+from sqlalchemy import text
+from sqlmodel import Session
+
+
+class LLMRateWindowRepo:
+    def reserve(
+        self, session: Session, kind: str, window_start: int, requests: int, tokens: int
+    ) -> tuple[int, int]:
+        """창 카운터에 (requests, tokens)를 더하고 증가 후 누계 (requests, tokens)를 반환 (INSERT … ON CONFLICT 한 문장)."""
+        row = session.execute(
+            text(
+                """
+                INSERT INTO llm_rate_windows (kind, window_start, requests, tokens)
+                VALUES (:kind, :window_start, :requests, :tokens)
+                ON CONFLICT (kind, window_start) DO UPDATE
+                SET requests = llm_rate_windows.requests + EXCLUDED.requests,
+                    tokens = llm_rate_windows.tokens + EXCLUDED.tokens
+                RETURNING requests, tokens
+                """
+            ),
+            {"kind": kind, "window_start": window_start, "requests": requests, "tokens": tokens},
+        ).one()
+        session.commit()
+        return int(row[0]), int(row[1])
+
+    def prune(self, session: Session, before_window: int) -> int:
+        result = session.execute(
+            text("DELETE FROM llm_rate_windows WHERE window_start < :before"),
+            {"before": before_window},
+        )
+        session.commit()
+        return result.rowcount or 0
+
+
+llm_rate_window_repo = LLMRateWindowRepo()
@@ -0,0 +1,59 @@
+"""
+llm_usage 테이블 접근: 사용량 행 일괄 INSERT, 그룹별 토큰·지연 합계.
+"""
+
+from datetime import datetime
+from typing import Any
+
+from sqlalchemy import func, insert
+from sqlmodel import Session, select
+
+from app.db.models import LLMUsage
+
+GROUP_COLUMNS = ("course_id", "lecture_id", "stage", "model", "endpoint", "call_site", "job_type", "job_id")
+
+
+class LLMUsageRepo:
+    def insert_many(self, session: Session, rows: list[dict[str, Any]]) -> None:
+        if not rows:
+            return
+        session.execute(insert(LLMUsage), rows)
+        session.commit()
+
+    def totals(
+        self,
+        session: Session,
+        group_by: list[str],
+        *,
+        course_id: str | None = None,
+        job_type: str | None = None,
+        job_id: str | None = None,
+        since: datetime | None = None,
+    ) -> list[dict[str, Any]]:
+        """group_by + model별 호출 수·토큰 합·지연 합/최대 (단가가 모델마다 달라 model은 항상 나눠서 반환)."""
+        unknown = [c for c in group_by if c not in GROUP_COLUMNS]
+        if unknown:
+            raise ValueError(f"지원하지 않는 group_by: {unknown} (가능: {', '.join(GROUP_COLUMNS)})")
+        keys = list(dict.fromkeys([*group_by, "model"]))
+        columns = [getattr(LLMUsage, c) for c in keys]
+        stmt = select(
+            *columns,
+            func.count().label("calls"),
+            func.sum(LLMUsage.prompt_tokens).label("prompt_tokens"),
+            func.sum(LLMUsage.completion_tokens).label("completion_tokens"),
+            func.sum(LLMUsage.cached_tokens).label("cached_tokens"),
+            func.sum(LLMUsage.latency_ms).label("latency_ms"),
+            func.max(LLMUsage.latency_ms).label("max_latency_ms"),
+        ).group_by(*columns)
+        if course_id is not None:
+            stmt = stmt.where(LLMUsage.course_id == course_id)
+        if job_type is not None:
+            stmt = stmt.where(LLMUsage.job_type == job_type)
+        if job_id is not None:
+            stmt = stmt.where(LLMUsage.job_id == job_id)
+        if since is not None:
+            stmt = stmt.where(LLMUsage.created_at >= since)
+        return [dict(row._mapping) for row in session.execute(stmt).all()]
+
+
+llm_usage_repo = LLMUsageRepo()
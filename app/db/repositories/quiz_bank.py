@@ -0,0 +1,148 @@
+"""
+quiz_bank_questions 테이블 접근: 문항 적재, 적게 나간 문항 우선 샘플링, 풀 잔량 조회.
+"""
+
+from typing import Any
+
+from sqlalchemy import delete, func, update
+from sqlmodel import Session, select
+
+from app.db.models import QuizBankQuestion
+
+
+class QuizBankRepo:
+    def insert_many(
+        self,
+        session: Session,
+        course_id: str,
+        lecture_id: str,
+        user_id: str,
+        questions: list[dict[str, Any]],
+        *,
+        source_version: str = "",
+    ) -> int:
+        """문항(question, options, answer, explanation, verified) 목록 저장. 이미 있는 질문 문장은 건너뛴다."""
+        existing = set(
+            session.exec(
+                select(QuizBankQuestion.question).where(
+                    QuizBankQuestion.course_id == course_id,
+                    QuizBankQuestion.lecture_id == lecture_id,
+                    QuizBankQuestion.user_id == user_id,
+                )
+            ).all()
+        )
+        added = 0
+        for q in questions:
+            if q["question"] in existing:
+                continue
+            existing.add(q["question"])
+            session.add(
+                QuizBankQuestion(
+                    course_id=course_id,
+                    lecture_id=lecture_id,
+                    user_id=user_id,
+                    question=q["question"],
+                    options=q["options"],
+                    answer=q["answer"],
+                    explanation=q.get("explanation") or "",
+                    verified=bool(q.get("verified")),
+                    source_version=source_version,
+                )
+            )
+            added += 1
+        session.commit()
+        return added
+
+    def sample(
+        self,
+        session: Session,
+        course_id: str,
+        lecture_id: str,
+        user_id: str,
+        n: int,
+        *,
+        verified_only: bool = True,
+    ) -> list[QuizBankQuestion]:
+        """
+        적게 나간 문항부터(같으면 무작위) n개를 골라 served_count를 DB에서 1씩 올리고 반환한다.
+        고르기·증가를 한 UPDATE (FOR UPDATE SKIP LOCKED)로 처리하므로 동시 요청이 같은 값을 덮어쓰지 않는다.
+        풀에 n개가 없으면 아무것도 바꾸지 않고 빈 리스트 반환.
+        """
+        picked = select(QuizBankQuestion.id).where(
+            QuizBankQuestion.course_id == course_id,
+            QuizBankQuestion.lecture_id == lecture_id,
+            QuizBankQuestion.user_id == user_id,
+        )
+        if verified_only:
+            picked = picked.where(QuizBankQuestion.verified.is_(True))
+        picked = (
+            picked.order_by(QuizBankQuestion.served_count.asc(), func.random())
+            .limit(n)
+            .with_for_update(skip_locked=True)
+        )
+        stmt = (
+            update(QuizBankQuestion)
+            .where(QuizBankQuestion.id.in_(picked.scalar_subquery()))
+            .values(served_count=QuizBankQuestion.served_count + 1)
+            .returning(QuizBankQuestion)
+            .execution_options(synchronize_session=False)
+        )
+        rows = list(session.execute(stmt).scalars().all())
+        if len(rows) < n:
+            session.rollback()
+            return []
+        for row in rows:
+            session.expunge(row)  # 커밋 후 재조회 없이 RETURNING 값 그대로 사용
+        session.commit()
+        return rows
+
+    def count_available(
+        self,
+        session: Session,
+        course_id: str,
+        lecture_id: str,
+        user_id: str,
+        *,
+        max_serves: int,
+        verified_only: bool = True,
+    ) -> int:
+        """served_count < max_serves 인(아직 덜 노출된) 문항 수."""
+        stmt = select(func.count()).select_from(QuizBankQuestion).where(
+            QuizBankQuestion.course_id == course_id,
+            QuizBankQuestion.lecture_id == lecture_id,
+            QuizBankQuestion.user_id == user_id,
+            QuizBankQuestion.served_count < max_serves,
+        )
+        if verified_only:
+            stmt = stmt.where(QuizBankQuestion.verified.is_(True))
+        return int(session.exec(stmt).one())
+
+    def delete_by_lecture(
+        self,
+        session: Session,
+        course_id: str,
+        lecture_id: str,
+        user_id: str,
+        *,
+        min_served: int | None = None,
+        keep_version: str | None = None,
+    ) -> int:
+        """
+        강의 문항 삭제. min_served를 주면 그만큼 이상 나간(소진된) 문항만,
+        keep_version을 주면 source_version이 다른(이전 내용으로 만든) 문항만 삭제.
+        """
+        stmt = delete(QuizBankQuestion).where(
+            QuizBankQuestion.course_id == course_id,
+            QuizBankQuestion.lecture_id == lecture_id,
+            QuizBankQuestion.user_id == user_id,
+        )
+        if min_served is not None:
+            stmt = stmt.where(QuizBankQuestion.served_count >= min_served)
+        if keep_version is not None:
+            stmt = stmt.where(QuizBankQuestion.source_version != keep_version)
+        result = session.execute(stmt)
+        session.commit()
+        return result.rowcount or 0
+
+
+quiz_bank_repo = QuizBankRepo()
@@ -0,0 +1,125 @@
+"""
+quiz_jobs 테이블 접근: enqueue, claim(SKIP LOCKED), status 업데이트, 멈춘 processing job 재적재.
+"""
+
+from datetime import datetime, timedelta, timezone
+from typing import Any
+
+from sqlalchemy import func, update
+from sqlmodel import Session, select
+
+from app.db.models import QuizJob
+
+
+class QuizJobRepo:
+    def create(
+        self,
+        session: Session,
+        *,
+        course_id: str,
+        lecture_id: str,
+        user_id: str,
+        params: dict[str, Any],
+        target: str = "quiz",
+    ) -> QuizJob:
+        job = QuizJob(
+            course_id=course_id,
+            lecture_id=lecture_id,
+            user_id=user_id,
+            params=params,
+            target=target,
+            status="pending",
+        )
+        session.add(job)
+        session.commit()
+        session.refresh(job)
+        return job
+
+    def claim_pending(self, session: Session, *, limit: int = 1) -> list[QuizJob]:
+        """pending job을 최대 limit건 processing으로 바꿔 반환 (FOR UPDATE SKIP LOCKED: 다른 워커와 겹치지 않음)."""
+        stmt = (
+            select(QuizJob)
+            .where(QuizJob.status == "pending")
+            .order_by(QuizJob.id.asc())
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        )
+        jobs = list(session.exec(stmt).all())
+        for job in jobs:
+            job.status = "processing"
+            session.add(job)
+        session.commit()
+        for job in jobs:
+            session.refresh(job)
+        return jobs
+
+    def requeue_stale(self, session: Session, *, older_than_sec: float) -> list[int]:
+        """
+        processing인 채 older_than_sec 넘게 갱신되지 않은 job(처리하던 워커가 죽은 경우)을 pending으로 되돌리고 id 목록 반환.
+        정상 처리 중인 job이 이보다 오래 걸리면 중복 처리될 수 있으므로 older_than_sec는 job 최대 소요 시간보다 크게 둔다.
+        """
+        cutoff = datetime.now(timezone.utc) - timedelta(seconds=older_than_sec)
+        stmt = (
+            update(QuizJob)
+            .where(
+                QuizJob.status == "processing",
+                func.coalesce(QuizJob.updated_at, QuizJob.created_at) < cutoff,
+            )
+            .values(status="pending", error_message="processing 시간 초과로 재적재")
+            .returning(QuizJob.id)
+        )
+        ids = [int(job_id) for job_id in session.execute(stmt).scalars().all()]
+        session.commit()
+        return ids
+
+    def has_active(
+        self,
+        session: Session,
+        course_id: str,
+        lecture_id: str,
+        user_id: str,
+        *,
+        target: str,
+        source_version: str | None = None,
+    ) -> bool:
+        """
+        같은 강의·target의 pending/processing job이 있으면 True (중복 적재 방지).
+        source_version을 주면 params.source_version이 같은 job만 센다 (이전 내용으로 돌던 job은 막지 않음).
+        """
+        stmt = select(QuizJob.id).where(
+            QuizJob.course_id == course_id,
+            QuizJob.lecture_id == lecture_id,
+            QuizJob.user_id == user_id,
+            QuizJob.target == target,
+            QuizJob.status.in_(("pending", "processing")),
+        )
+        if source_version is not None:
+            stmt = stmt.where(QuizJob.params["source_version"].astext == source_version)
+        return session.exec(stmt.limit(1)).first() is not None
+
+    def mark_done(self, session: Session, job_id: int, quiz_id: int | None = None) -> None:
+        job = session.get(QuizJob, job_id)
+        if job:
+            job.status = "done"
+            job.quiz_id = quiz_id
+            session.add(job)
+            session.commit()
+
+    def mark_failed(self, session: Session, job_id: int, error_message: str) -> None:
+        job = session.get(QuizJob, job_id)
+        if job:
+            job.status = "failed"
+            job.error_message = error_message
+            session.add(job)
+            session.commit()
+
+    def get_by_id(self, session: Session, job_id: int) -> QuizJob | None:
+        return session.get(QuizJob, job_id)
+
+    def status_summary(self, session: Session) -> list[tuple[str, int, datetime | None]]:
+        """status별 (status, 건수, 가장 오래된 created_at) — 큐 깊이·대기 시간 메트릭용."""
+        stmt = select(QuizJob.status, func.count(), func.min(QuizJob.created_at)).group_by(QuizJob.status)
+        return [(status, int(count), oldest) for status, count, oldest in session.exec(stmt).all()]
+
+
+quiz_job_repo = QuizJobRepo()
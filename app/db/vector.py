@@ -0,0 +1,50 @@
+"""
+pgvector / 전문 검색 쿼리 파라미터 헬퍼.
+"""
+
+import re
+from typing import Any, Iterable
+
+import numpy as np
+from sqlalchemy import text
+
+from app.core.config import settings
+
+_DEFAULT_EF_SEARCH = 40
+_MAX_EF_SEARCH = 1000
+
+
+def vector_literal(values: Iterable[float]) -> str:
+    """pgvector에 넘길 '[0.1,0.2,...]' 형태 문자열. SQL에서는 CAST(:param AS halfvec)처럼 컬럼 타입으로 캐스트."""
+    return "[" + ",".join(str(float(x)) for x in values) + "]"
+
+
+def compact_vector(values: Iterable[float], dims: int | None = None) -> list[float]:
+    """
+    원본 임베딩의 앞 dims 차원만 잘라 L2 정규화한 축소 벡터 (halfvec 저장용).
+    text-embedding-3 계열은 앞쪽 차원만 잘라도 의미가 유지되도록(Matryoshka) 학습되어 있다.
+    """
+    dims = dims or settings.EMBEDDING_COMPACT_DIMENSIONS
+    v = np.asarray(values, dtype=np.float32)[:dims]
+    norm = float(np.linalg.norm(v))
+    if norm > 0:
+        v = v / norm
+    return v.tolist()
+
+
+def set_ef_search(session: Any, candidates: int) -> None:
+    """
+    이번 트랜잭션의 HNSW 탐색 폭(hnsw.ef_search)을 후보 수 이상으로 올린다 (기본 40, 최대 1000).
+    HNSW는 ef_search개를 찾은 뒤 WHERE 필터를 적용하므로, 필터가 좁으면 폭을 넓혀야 후보가 남는다.
+    """
+    ef = min(_MAX_EF_SEARCH, max(_DEFAULT_EF_SEARCH, candidates))
+    session.execute(text("SELECT set_config('hnsw.ef_search', :ef, true)"), {"ef": str(ef)})
+
+
+def or_tsquery(query: str) -> str:
+    """
+    검색어를 단어 단위 OR tsquery 문자열로 만든다 ('도커 | compose | get_session').
+    to_tsquery('simple', ...)에 넘기며, 특수문자는 제거된다. 단어가 없으면 빈 문자열.
+    """
+    words = re.findall(r"\w+", query.lower())
+    return " | ".join(dict.fromkeys(words))
@@ -0,0 +1,75 @@
+"""
+LLM 사용량 리포트 CLI: llm_usage 테이블을 강좌·단계·모델 등으로 묶어 호출 수·토큰·비용(USD)·지연을 집계.
+비용은 기록된 토큰에 단가표(app.services.llm_usage.DEFAULT_PRICES, LLM_PRICES로 덮어쓰기)를 곱해 계산한다.
+
+사용 예:
+  python -m app.llm_usage_report                                  # 강좌·단계·모델별 (기본)
+  python -m app.llm_usage_report --by stage,model --since 2026-10-01 --pretty
+  python -m app.llm_usage_report --by course --course-id c1       # 강좌 하나 합계
+  python -m app.llm_usage_report --by stage --job-type ingestion --job-id 42
+로그는 stderr, JSON 결과는 stdout으로 출력된다.
+"""
+
+import argparse
+import json
+import logging
+import sys
+from datetime import datetime
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s [%(levelname)s] %(name)s: %(message)s",
+    datefmt="%Y-%m-%d %H:%M:%S",
+    stream=sys.stderr,
+)
+logger = logging.getLogger(__name__)
+
+ALIASES = {"course": "course_id", "lecture": "lecture_id", "job": "job_id"}
+
+
+def parse_group_by(value: str) -> list[str]:
+    """'course,stage,model' → ['course_id', 'stage', 'model'] (빈 값이면 전체 합계 한 줄)."""
+    return [ALIASES.get(name.strip(), name.strip()) for name in value.split(",") if name.strip()]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="LLM 호출 토큰·비용·지연을 강좌·단계·모델별로 집계 (llm_usage 테이블)")
+    parser.add_argument("--by", default="course,stage,model", help="묶을 기준, 쉼표 구분 (course·lecture·stage·model·endpoint·call_site·job_type·job). 기본 course,stage,model")
+    parser.add_argument("--course-id", help="이 강좌만")
+    parser.add_argument("--job-type", choices=("ingestion", "quiz", "request"), help="이 종류의 job·요청만")
+    parser.add_argument("--job-id", help="이 job id(또는 요청 X-Request-Id)만")
+    parser.add_argument("--since", type=datetime.fromisoformat, help="이 시각 이후 기록만 (ISO 형식, 예: 2026-10-01)")
+    parser.add_argument("--pretty", action="store_true", help="JSON 예쁘게 출력")
+    args = parser.parse_args()
+    group_by = parse_group_by(args.by)
+    # --help·인자 오류는 DB 모듈을 불러오지 않고 바로 끝나도록 파싱 뒤에 import
+    from app.core.config import settings
+    from app.db.connection import get_session
+    from app.db.repositories.llm_usage import GROUP_COLUMNS, llm_usage_repo
+    from app.services.llm_usage import DEFAULT_PRICES, aggregate
+
+    unknown = [c for c in group_by if c not in GROUP_COLUMNS]
+    if unknown:
+        parser.error(f"지원하지 않는 --by: {', '.join(unknown)}")
+
+    prices = {**DEFAULT_PRICES, **settings.LLM_PRICES}
+    with get_session() as session:
+        rows = llm_usage_repo.totals(
+            session,
+            group_by,
+            course_id=args.course_id,
+            job_type=args.job_type,
+            job_id=args.job_id,
+            since=args.since,
+        )
+    report = {
+        "group_by": group_by,
+        "total": (aggregate(rows, [], prices) or [None])[0],
+        "rows": aggregate(rows, group_by, prices),
+    }
+    logger.info("집계 완료 그룹 %d개", len(report["rows"]))
+    print(json.dumps(report, ensure_ascii=False, indent=2 if args.pretty else None, default=str))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,13 +1,21 @@
 """
 퀴즈 생성 CLI.
+
+배치 모드: --input-dir(디렉터리의 *.json) 또는 --input-jsonl(한 줄에 전사 하나, "-"면 stdin)을
+--concurrency개씩 동시에 생성해 --output-jsonl에 끝난 순서대로 한 줄씩 쓴다.
+다시 실행하면 출력 파일에 성공(ok=true)으로 남은 id는 건너뛴다.
 """
 
 from __future__ import annotations
 
 import argparse
 import json
+import os
 import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
 from pathlib import Path
+from typing import Any, Iterator, TextIO
 
 from pydantic import ValidationError
 
@@ -79,13 +87,157 @@ def build_parser() -> argparse.ArgumentParser:
     parser.add_argument("--language", help="언어 (예: ko)")
     parser.add_argument("--difficulty", choices=["easy", "medium", "hard"], help="난이도")
     parser.add_argument("--pretty", action="store_true", help="예쁘게 출력")
+    parser.add_argument("--input-dir", help="배치: 이 디렉터리의 *.json 전사 파일 전체")
+    parser.add_argument("--input-jsonl", help='배치: 한 줄에 전사 JSON 하나 ("-"면 stdin). "id" 키가 있으면 결과 id로 사용')
+    parser.add_argument("--output-jsonl", help="배치: 결과 JSONL 경로 (끝난 순서대로 추가, 재실행 시 성공한 id는 건너뜀)")
+    parser.add_argument("--concurrency", type=int, default=4, help="배치: 동시 생성 수 (기본 4)")
     return parser
 
 
+def iter_dir_items(directory: Path) -> Iterator[tuple[str, dict | None, str | None]]:
+    """(id, payload, 오류) — id는 파일 경로. 읽기 실패는 payload=None과 오류 메시지."""
+    for path in sorted(directory.glob("*.json")):
+        try:
+            yield str(path), json.loads(path.read_text(encoding="utf-8")), None
+        except (OSError, ValueError) as exc:
+            yield str(path), None, str(exc)
+
+
+def iter_jsonl_items(stream: TextIO) -> Iterator[tuple[str, dict | None, str | None]]:
+    """(id, payload, 오류) — id는 줄의 "id" 값, 없으면 line-<줄 번호>. 빈 줄은 건너뜀."""
+    for lineno, line in enumerate(stream, 1):
+        if not line.strip():
+            continue
+        try:
+            payload = json.loads(line)
+        except ValueError as exc:
+            yield f"line-{lineno}", None, str(exc)
+            continue
+        if not isinstance(payload, dict):
+            yield f"line-{lineno}", None, "JSON 객체가 아닙니다."
+            continue
+        yield str(payload.pop("id", None) or f"line-{lineno}"), payload, None
+
+
+def read_done_ids(path: Path) -> set[str]:
+    """이전 실행 결과 JSONL에서 성공한 id. 중단으로 잘린 마지막 줄은 무시."""
+    done: set[str] = set()
+    if not path.exists():
+        return done
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                continue
+            if entry.get("ok"):
+                done.add(str(entry.get("id")))
+    return done
+
+
+def has_torn_last_line(path: Path) -> bool:
+    """결과 파일이 줄바꿈 없이 끝나는지 (중단으로 잘린 줄). 파일 전체를 읽지 않고 마지막 1바이트만 본다."""
+    if not path.exists() or path.stat().st_size == 0:
+        return False
+    with open(path, "rb") as f:
+        f.seek(-1, os.SEEK_END)
+        return f.read(1) != b"\n"
+
+
+def run_batch(args: argparse.Namespace) -> int:
+    """배치 모드 실행. 실패 건수 반환."""
+    if not args.output_jsonl:
+        raise ValueError("배치 모드에는 --output-jsonl이 필요합니다.")
+    output_path = Path(args.output_jsonl).expanduser()
+    done_ids = read_done_ids(output_path)
+    if args.input_dir:
+        directory = Path(args.input_dir).expanduser()
+        if not directory.is_dir():
+            raise FileNotFoundError(f"디렉터리를 찾을 수 없습니다: {directory}")
+        items = iter_dir_items(directory)
+        source: TextIO | None = None
+    elif args.input_jsonl == "-":
+        source = None
+        items = iter_jsonl_items(sys.stdin)
+    else:
+        source = open(Path(args.input_jsonl).expanduser(), encoding="utf-8")
+        items = iter_jsonl_items(source)
+
+    generator = QuizGenerator()
+    workers = max(1, args.concurrency)
+    counts = {"ok": 0, "failed": 0, "skipped": 0}
+    t0 = time.perf_counter()
+
+    def generate(payload: dict) -> dict[str, Any]:
+        return generator.generate(build_request(payload, args)).model_dump()
+
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    needs_newline = has_torn_last_line(output_path)
+    try:
+        with open(output_path, "a", encoding="utf-8") as out, ThreadPoolExecutor(max_workers=workers) as ex:
+            if needs_newline:
+                out.write("\n")  # 중단으로 잘린 줄 뒤에 이어 쓰지 않도록
+
+            def write(entry: dict[str, Any]) -> None:
+                out.write(json.dumps(entry, ensure_ascii=False) + "\n")
+                out.flush()
+                counts["ok" if entry["ok"] else "failed"] += 1
+                total = counts["ok"] + counts["failed"]
+                if total % 10 == 0:
+                    print(
+                        f"[{total}] 성공 {counts['ok']} 실패 {counts['failed']} 건너뜀 {counts['skipped']} "
+                        f"({time.perf_counter() - t0:.0f}s)",
+                        file=sys.stderr,
+                        flush=True,
+                    )
+
+            def drain(pending: dict[Future, str], block_until: int) -> None:
+                # 진행 중인 작업이 block_until개 이하가 될 때까지 끝난 것부터 기록
+                while len(pending) > block_until:
+                    finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in finished:
+                        item_id = pending.pop(future)
+                        try:
+                            write({"id": item_id, "ok": True, "result": future.result()})
+                        except Exception as exc:
+                            write({"id": item_id, "ok": False, "error": str(exc)})
+
+            # 입력 전체를 메모리에 올리지 않도록 동시 작업 수의 2배까지만 미리 제출
+            pending: dict[Future, str] = {}
+            for item_id, payload, error in items:
+                if item_id in done_ids:
+                    counts["skipped"] += 1
+                    continue
+                if payload is None:
+                    write({"id": item_id, "ok": False, "error": error})
+                    continue
+                pending[ex.submit(generate, payload)] = item_id
+                drain(pending, workers * 2)
+            drain(pending, 0)
+    finally:
+        if source is not None:
+            source.close()
+
+    print(
+        f"배치 완료: 성공 {counts['ok']} 실패 {counts['failed']} 건너뜀 {counts['skipped']} "
+        f"({time.perf_counter() - t0:.1f}s)",
+        file=sys.stderr,
+    )
+    return counts["failed"]
+
+
 def main() -> None:
     parser = build_parser()
     args = parser.parse_args()
 
+    if args.input_dir or args.input_jsonl:
+        try:
+            failed = run_batch(args)
+        except (ValueError, FileNotFoundError) as exc:
+            print(f"입력 처리 실패: {exc}", file=sys.stderr)
+            sys.exit(1)
+        sys.exit(2 if failed else 0)
+
     try:
         input_path = Path(args.input).expanduser() if args.input else None
         payload = load_payload(input_path, args.stdin)
@@ -4,9 +4,7 @@
 
 from __future__ import annotations
 
-from typing import Iterable
-
-from openai import OpenAI
+from typing import TYPE_CHECKING, Iterable
 
 from app.core.config import settings
 from app.schema.models import (
@@ -16,16 +14,12 @@ from app.schema.models import (
     QuizResponse,
     QuizSource,
 )
+from app.services.llm import chat_completion, openai_client
+from app.services.structured_output import complete_items, strict_response_format
+from app.services.timefmt import format_ts
 
-
-def format_ts(seconds: float) -> str:
-    seconds = max(0.0, seconds)
-    hours = int(seconds // 3600)
-    minutes = int((seconds % 3600) // 60)
-    secs = seconds % 60
-    if hours > 0:
-        return f"{hours:02d}:{minutes:02d}:{secs:05.2f}"
-    return f"{minutes:02d}:{secs:05.2f}"
+if TYPE_CHECKING:
+    from openai import OpenAI
 
 
 def format_segments(segments: Iterable, max_chars: int | None) -> tuple[str, bool]:
@@ -90,45 +84,16 @@ JSON 형식:
     return system_prompt, user_prompt
 
 
-def build_repair_prompt(req: QuizRequest, bad_json: str, error: str) -> str:
-    return f"""
-다음 JSON이 스키마 검증에 실패했어. 에러 메시지를 참고해서 JSON만 수정해 줘.
-
-에러:
-{error}
-
-원본 JSON:
-{bad_json}
-
-요청 조건:
-- 질문 수: {req.num_questions}
-- 질문 유형: {", ".join(req.question_types)}
-- 난이도: {req.difficulty}
-- 언어: {req.language}
-- JSON만 출력
-""".strip()
-
-
 class QuizGenerator:
-    def __init__(self) -> None:
-        self.client = OpenAI(
-            api_key=settings.OPENAI_API_KEY,
-            base_url=settings.OPENAI_BASE_URL,
-            timeout=settings.REQUEST_TIMEOUT,
-        )
+    @property
+    def client(self) -> OpenAI:
+        return openai_client()
 
     def generate(self, req: QuizRequest) -> QuizResponse:
         transcript, truncated = format_segments(req.segments, settings.MAX_TRANSCRIPT_CHARS)
         system_prompt, user_prompt = build_prompt(req, transcript)
 
-        content = self._call_llm(system_prompt, user_prompt)
-        try:
-            draft = QuizDraft.model_validate_json(content)
-        except Exception as exc:
-            repair_prompt = build_repair_prompt(req, content, str(exc))
-            content = self._call_llm(system_prompt, repair_prompt)
-            draft = QuizDraft.model_validate_json(content)
-
+        draft = self._generate_draft(req, system_prompt, user_prompt)
         normalized_questions = self._normalize_questions(draft.questions, req)
         source = self._build_source(req, truncated)
 
@@ -139,17 +104,32 @@ class QuizGenerator:
             source=source,
         )
 
+    def _generate_draft(self, req: QuizRequest, system_prompt: str, user_prompt: str) -> QuizDraft:
+        """json_schema strict 모드로 생성 (문항 살리기·모자란 수만 재생성은 complete_items)."""
+        data, questions = complete_items(
+            lambda prompt: self._call_llm(system_prompt, prompt),
+            user_prompt,
+            QuizQuestion,
+            req.num_questions,
+            name="quiz_generator",
+        )
+        return QuizDraft(
+            title=str(data.get("title") or "퀴즈"),
+            language=str(data.get("language") or req.language),
+            questions=questions,
+        )
+
     def _call_llm(self, system_prompt: str, user_prompt: str) -> str:
-        response = self.client.chat.completions.create(
-            model=settings.OPENAI_MODEL,
-            temperature=settings.OPENAI_TEMPERATURE,
-            response_format={"type": "json_object"},
+        return chat_completion(
+            self.client,
+            response_format=strict_response_format(QuizDraft),
             messages=[
                 {"role": "system", "content": system_prompt},
                 {"role": "user", "content": user_prompt},
             ],
-        )
-        return response.choices[0].message.content or "{}"
+            cache=False,
+            name="quiz_generator",
+        ) or "{}"
 
     def _normalize_questions(self, questions: list[QuizQuestion], req: QuizRequest) -> list[QuizQuestion]:
         normalized: list[QuizQuestion] = []
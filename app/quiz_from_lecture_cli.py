@@ -5,6 +5,8 @@
   python -m app.quiz_from_lecture_cli --course-id course1 --lecture-id lecture1 --user-id user1
   python -m app.quiz_from_lecture_cli --course-id c1 --lecture-id l1 --user-id u1 --num-questions 5 --pretty
   python -m app.quiz_from_lecture_cli ... --no-validate  # 검증 단계 생략
+  python -m app.quiz_from_lecture_cli ... -n 20 --fan-out  # 구간별 동시 생성 (4~5문항 생성 시간 수준)
+  python -m app.quiz_from_lecture_cli --course-id c1 --user-id u1 --all-lectures --save  # 강좌 전체 일괄 생성
 로그는 stderr, JSON 결과는 stdout으로 출력된다.
 """
 
@@ -13,8 +15,6 @@ import json
 import logging
 import sys
 
-from app.services.quiz_from_lecture import quiz_from_lecture_service
-
 logging.basicConfig(
     level=logging.INFO,
     format="%(asctime)s [%(levelname)s] %(name)s: %(message)s",
@@ -29,7 +29,7 @@ def main() -> None:
         description="해당 강의 요약 기준 퀴즈 생성 (이전 요약 참고, 이후 강의 미포함). 기본으로 검증 단계 포함."
     )
     parser.add_argument("--course-id", required=True, help="course_id")
-    parser.add_argument("--lecture-id", required=True, help="lecture_id")
+    parser.add_argument("--lecture-id", help="lecture_id (--all-lectures면 생략)")
     parser.add_argument("--user-id", required=True, help="user_id")
     parser.add_argument("--num-questions", "-n", type=int, default=5, help="문항 수 (기본 5)")
     parser.add_argument("--no-validate", action="store_true", help="검증 단계 생략 (verified 없이 반환)")
@@ -37,8 +37,26 @@ def main() -> None:
     parser.add_argument("--semantic-previous", action="store_true", help="이전 강의 맥락을 id 순 대신 벡터 유사도 상위 N건만 사용 (docs/VECTOR_SEARCH.md 참고)")
     parser.add_argument("--semantic-limit", type=int, default=5, help="--semantic-previous 사용 시 참고할 이전 강의 요약 최대 건수 (기본 5)")
     parser.add_argument("--max-context-lectures", type=int, default=None, metavar="N", help="맥락에 쓸 이전 강의를 id 순 처음 N개로 제한 (예: 5 → 1~5번만, 6번 이후 미반영)")
+    parser.add_argument(
+        "--chunk-retrieval",
+        action=argparse.BooleanOptionalAction,
+        default=None,
+        help="전사 앞부분 대신 MMR로 고른 청크를 출제 근거로 사용 (기본: 설정값 QUIZ_CHUNK_RETRIEVAL)",
+    )
+    parser.add_argument("--chunk-top-k", type=int, default=None, metavar="K", help="출제 근거로 쓸 청크 수 (기본: 설정값 QUIZ_CHUNK_TOP_K)")
+    parser.add_argument("--fan-out", action="store_true", default=None, help="강의 구간별로 나눠 동시 생성 후 임베딩 유사도로 중복 제거 (문항이 많을 때 빠름)")
+    parser.add_argument("--all-lectures", action="store_true", help="강좌의 모든 강의 퀴즈를 한 프로세스에서 동시에 생성 (요약 1회 조회, --save면 강의마다 바로 저장)")
+    parser.add_argument("--concurrency", type=int, default=None, metavar="N", help="--all-lectures 시 동시에 처리할 강의 수 (기본: 설정값 QUIZ_COURSE_CONCURRENCY)")
     parser.add_argument("--pretty", action="store_true", help="JSON 예쁘게 출력")
     args = parser.parse_args()
+    # --help·인자 오류는 DB·LLM 모듈을 불러오지 않고 바로 끝나도록 파싱 뒤에 import
+    from app.services.quiz_from_lecture import quiz_from_lecture_service
+
+    if args.all_lectures:
+        _run_all_lectures(args)
+        return
+    if not args.lecture_id:
+        parser.error("--lecture-id 또는 --all-lectures 필요")
 
     logger.info(
         "퀴즈 생성 시작 course_id=%s lecture_id=%s user_id=%s num_questions=%s validate=%s semantic_previous=%s",
@@ -58,6 +76,9 @@ def main() -> None:
             use_semantic_previous=args.semantic_previous,
             semantic_limit=args.semantic_limit,
             max_context_lectures=args.max_context_lectures,
+            use_chunk_retrieval=args.chunk_retrieval,
+            chunk_top_k=args.chunk_top_k,
+            fan_out=args.fan_out,
         )
         if args.no_validate:
             result = quiz_from_lecture_service.generate(**gen_kw)
@@ -81,8 +102,49 @@ def main() -> None:
         print(f"오류: {e}", file=sys.stderr)
         sys.exit(1)
 
-    out = result.model_dump()
-    if args.pretty:
+    _print_json(result.model_dump(), args.pretty)
+
+
+def _run_all_lectures(args: argparse.Namespace) -> None:
+    """강좌 일괄 생성: 진행 상황은 stderr, 강의별 결과와 요약은 JSON으로 stdout."""
+    from app.services.quiz_from_lecture import quiz_from_lecture_service
+
+    try:
+        events = quiz_from_lecture_service.generate_course(
+            args.course_id,
+            args.user_id,
+            args.num_questions,
+            validate=not args.no_validate,
+            save=args.save,
+            concurrency=args.concurrency,
+            use_chunk_retrieval=args.chunk_retrieval,
+            chunk_top_k=args.chunk_top_k,
+        )
+        lectures: list[dict] = []
+        summary: dict = {}
+        for event, data in events:
+            if event == "progress":
+                status = f"{len(data['questions'])}문항" if data["ok"] else f"실패: {data['error']}"
+                print(f"[{data['done']}/{data['total']}] {data['lecture_id']} {status}", file=sys.stderr, flush=True)
+                lectures.append(data)
+            else:
+                summary = data
+    except ValueError as e:
+        logger.exception("오류 발생")
+        print(f"오류: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    for item in lectures:
+        item.pop("done", None)
+        item.pop("total", None)
+        item.setdefault("quiz_id", None)
+    _print_json({"course_id": args.course_id, "lectures": lectures, **summary}, args.pretty)
+    if summary.get("failed"):
+        sys.exit(2)
+
+
+def _print_json(out: dict, pretty: bool) -> None:
+    if pretty:
         print(json.dumps(out, ensure_ascii=False, indent=2))
     else:
         print(json.dumps(out, ensure_ascii=False))
@@ -1,10 +1,32 @@
-from app.services.embedding import embedding_service
-from app.services.lecture_store import lecture_store_service
-from app.services.quiz_from_lecture import quiz_from_lecture_service
-from app.services.quiz_validator import quiz_validator_service
-from app.services.summary import summary_service
+"""
+서비스 싱글톤은 처음 접근할 때 해당 모듈을 import한다 (`from app.services import x_service`도 그 시점에 로드).
+패키지 import만으로 DB·LLM 관련 모듈 전체를 불러오지 않는다.
+"""
+
+import importlib
+from typing import Any
+
+_LAZY = {
+    "chunk_search_service": "app.services.chunk_search",
+    "embedding_service": "app.services.embedding",
+    "lecture_store_service": "app.services.lecture_store",
+    "quiz_from_lecture_service": "app.services.quiz_from_lecture",
+    "quiz_validator_service": "app.services.quiz_validator",
+    "summary_service": "app.services.summary",
+}
+
+
+def __getattr__(name: str) -> Any:
+    module = _LAZY.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module), name)
+    globals()[name] = value
+    return value
+
 
 __all__ = [
+    "chunk_search_service",
     "embedding_service",
     "lecture_store_service",
     "quiz_from_lecture_service",
@@ -0,0 +1,543 @@
+"""
+대량(백필) ingestion: 실시간 run_pipeline 대신 Batch API로 추출·요약·임베딩 요청을 모아 보낸다.
+아무도 기다리지 않는 작업이라 실시간 호출 요금·한도를 쓰지 않고, 결과가 나오면 DB에 한꺼번에 반영한다.
+
+단계 (상태 파일에 저장되어 중단 후 같은 --state로 다시 실행하면 이어서 진행):
+1. new: pending transcript job을 processing으로 가져와 (가져온 id는 커밋 전에 상태 파일에 기록) 청킹 →
+   청크별 concept/metadata/difficulty + 강의 요약(chat), 청크 임베딩(embeddings) 요청 JSONL 작성 후 제출 → extract_submitted.
+   CHUNKING_STRATEGY=semantic이면 세그먼트 임베딩 요청을 먼저 제출 → segments_submitted
+1b. segments_submitted: 배치 완료 시 받은 임베딩으로 semantic 청킹 → 1의 추출 요청 제출 → extract_submitted
+2. extract_submitted: 배치 완료 시 lecture_chunks / lecture_chunk_vectors 저장, job done. 요약 임베딩 요청 제출 → summary_submitted
+3. summary_submitted: 배치 완료 시 lecture_summary_embeddings upsert → done
+"""
+
+import json
+import logging
+import os
+import time
+import uuid
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Callable
+
+from app.core.config import settings
+from app.db.connection import get_session
+from app.db.repositories.ingestion_job import ingestion_job_repo
+from app.db.repositories.lecture_chunk import lecture_chunk_repo
+from app.db.repositories.lecture_summary_embeddings import (
+    LectureSummaryEmbeddingRow,
+    lecture_summary_embeddings_repo,
+)
+from app.services.chunk_search import chunk_search_service
+from app.services.chunking import precomputed_embedder, segment_texts
+from app.services.embedding import EmbeddingService
+from app.services.extractors import (
+    EXTRACTION_TEMPERATURE,
+    concept_messages,
+    difficulty_messages,
+    metadata_messages,
+    parse_difficulty,
+    parse_metadata,
+)
+from app.services.ingestion_pipeline import (
+    chunk_transcript,
+    concept_hint_from_payload,
+    store_chunk,
+    transcript_from_payload,
+)
+from app.services.llm import chat_completion, create_embeddings, openai_client
+from app.services.quiz_bank import quiz_bank_service
+from app.services.summary import summary_messages
+from app.services.vector_index import summary_vector_index
+
+if TYPE_CHECKING:
+    from openai import OpenAI
+
+logger = logging.getLogger(__name__)
+
+CHAT_ENDPOINT = "/v1/chat/completions"
+EMBEDDING_ENDPOINT = "/v1/embeddings"
+# Batch API 한 파일당 최대 요청 수
+MAX_REQUESTS_PER_FILE = 50_000
+# 임베딩 요청 1건에 넣는 입력 수 (API 상한 2048)
+EMBEDDING_INPUTS_PER_REQUEST = 512
+TERMINAL_STATUSES = ("completed", "failed", "expired", "cancelled")
+
+
+def _get_client() -> "OpenAI":
+    return openai_client()
+
+
+def _request(custom_id: str, url: str, body: dict[str, Any]) -> dict[str, Any]:
+    return {"custom_id": custom_id, "method": "POST", "url": url, "body": body}
+
+
+def _chat_body(messages: list[dict[str, str]], temperature: float, json_mode: bool = False) -> dict[str, Any]:
+    body: dict[str, Any] = {"model": settings.OPENAI_MODEL, "temperature": temperature, "messages": messages}
+    if json_mode:
+        body["response_format"] = {"type": "json_object"}
+    return body
+
+
+def _embedding_body(inputs: list[str]) -> dict[str, Any]:
+    return {"model": EmbeddingService.EMBEDDING_MODEL, "input": inputs, "dimensions": EmbeddingService.DIMENSIONS}
+
+
+def extraction_requests(
+    job_id: int,
+    chunks: list[dict[str, Any]],
+    concept_hint: str | None,
+    summary_msgs: list[dict[str, str]] | None,
+) -> dict[str, list[dict[str, Any]]]:
+    """
+    job 1건의 배치 요청 {endpoint: [request]}. 실시간 추출과 같은 프롬프트를 쓴다.
+    custom_id: "{job_id}:{chunk_index}:concept|metadata|difficulty", "{job_id}:summary", "{job_id}:chunks:{part}"
+    """
+    chat: list[dict[str, Any]] = []
+    texts: list[str] = []
+    for idx, ch in enumerate(chunks):
+        text = ch.get("text") or ""
+        if not text.strip():
+            continue
+        texts.append(text)
+        chat.append(_request(f"{job_id}:{idx}:concept", CHAT_ENDPOINT, _chat_body(concept_messages(text, concept_hint), EXTRACTION_TEMPERATURE)))
+        chat.append(_request(f"{job_id}:{idx}:metadata", CHAT_ENDPOINT, _chat_body(metadata_messages(text), EXTRACTION_TEMPERATURE, json_mode=True)))
+        chat.append(_request(f"{job_id}:{idx}:difficulty", CHAT_ENDPOINT, _chat_body(difficulty_messages(text), EXTRACTION_TEMPERATURE)))
+    if summary_msgs is not None:
+        chat.append(_request(f"{job_id}:summary", CHAT_ENDPOINT, _chat_body(summary_msgs, settings.OPENAI_TEMPERATURE)))
+    embeddings = [
+        _request(f"{job_id}:chunks:{part}", EMBEDDING_ENDPOINT, _embedding_body(texts[i : i + EMBEDDING_INPUTS_PER_REQUEST]))
+        for part, i in enumerate(range(0, len(texts), EMBEDDING_INPUTS_PER_REQUEST))
+    ]
+    return {CHAT_ENDPOINT: chat, EMBEDDING_ENDPOINT: embeddings}
+
+
+def chat_content(result: dict[str, Any] | None) -> str | None:
+    """배치 출력 1줄에서 assistant 메시지 본문. 오류·누락이면 None."""
+    if not result or result.get("error"):
+        return None
+    response = result.get("response") or {}
+    if response.get("status_code") != 200:
+        return None
+    try:
+        return response["body"]["choices"][0]["message"]["content"] or ""
+    except (KeyError, IndexError, TypeError):
+        return None
+
+
+def embedding_vectors(result: dict[str, Any] | None) -> list[list[float]] | None:
+    """배치 출력 1줄에서 입력 순서대로 임베딩 목록. 오류·누락이면 None."""
+    if not result or result.get("error"):
+        return None
+    response = result.get("response") or {}
+    if response.get("status_code") != 200:
+        return None
+    data = (response.get("body") or {}).get("data") or []
+    return [d["embedding"] for d in sorted(data, key=lambda d: d.get("index", 0))]
+
+
+def _read_jsonl(text: str) -> list[dict[str, Any]]:
+    return [json.loads(line) for line in text.splitlines() if line.strip()]
+
+
+class OpenAIBatchBackend:
+    """OpenAI Batch API (파일 업로드 → batches.create → 폴링 → 출력 파일 다운로드)."""
+
+    def __init__(self, client: "OpenAI | None" = None) -> None:
+        self._client = client or _get_client()
+
+    def submit(self, path: Path, endpoint: str) -> str:
+        with path.open("rb") as f:
+            uploaded = self._client.files.create(file=f, purpose="batch")
+        batch = self._client.batches.create(
+            input_file_id=uploaded.id, endpoint=endpoint, completion_window="24h"
+        )
+        return batch.id
+
+    def status(self, batch_id: str) -> str:
+        return self._client.batches.retrieve(batch_id).status
+
+    def results(self, batch_id: str) -> list[dict[str, Any]]:
+        batch = self._client.batches.retrieve(batch_id)
+        lines: list[dict[str, Any]] = []
+        # 만료·실패한 배치도 끝난 요청의 출력은 남아 있다
+        for file_id in (batch.output_file_id, batch.error_file_id):
+            if file_id:
+                lines.extend(_read_jsonl(self._client.files.content(file_id).text))
+        return lines
+
+
+def _live_responder(request: dict[str, Any]) -> dict[str, Any]:
+    """로컬 대용 기본 응답기: 요청을 실시간 API로 처리해 Batch API 출력 body 형태로 반환."""
+    body = request["body"]
+    if request["url"] == EMBEDDING_ENDPOINT:
+        resp = create_embeddings(_get_client(), model=body["model"], input=body["input"], dimensions=body["dimensions"])
+        return resp.model_dump()
+    content = chat_completion(
+        _get_client(),
+        model=body["model"],
+        temperature=body.get("temperature"),
+        messages=body["messages"],
+        response_format=body.get("response_format"),
+        name="batch_local",
+    )
+    return {"choices": [{"index": 0, "message": {"role": "assistant", "content": content}}]}
+
+
+class LocalBatchBackend:
+    """
+    Batch API 로컬 대용 (테스트·개발): 입력 JSONL을 work_dir에 복사해 두고, 처음 status 조회 때
+    responder로 전부 처리해 출력 JSONL을 쓴다. responder 기본값은 실시간 API 호출.
+    """
+
+    def __init__(self, work_dir: Path, responder: Callable[[dict[str, Any]], dict[str, Any]] | None = None) -> None:
+        self._dir = Path(work_dir)
+        self._dir.mkdir(parents=True, exist_ok=True)
+        self._responder = responder or _live_responder
+
+    def submit(self, path: Path, endpoint: str) -> str:
+        batch_id = f"local_{uuid.uuid4().hex[:12]}"
+        (self._dir / f"{batch_id}.input.jsonl").write_text(path.read_text(encoding="utf-8"), encoding="utf-8")
+        return batch_id
+
+    def status(self, batch_id: str) -> str:
+        output = self._dir / f"{batch_id}.output.jsonl"
+        if not output.exists():
+            lines = []
+            for req in _read_jsonl((self._dir / f"{batch_id}.input.jsonl").read_text(encoding="utf-8")):
+                try:
+                    response = {"status_code": 200, "body": self._responder(req)}
+                    lines.append({"custom_id": req["custom_id"], "response": response, "error": None})
+                except Exception as e:
+                    lines.append({"custom_id": req["custom_id"], "response": None, "error": {"message": str(e)}})
+            output.write_text("".join(json.dumps(x, ensure_ascii=False) + "\n" for x in lines), encoding="utf-8")
+        return "completed"
+
+    def results(self, batch_id: str) -> list[dict[str, Any]]:
+        return _read_jsonl((self._dir / f"{batch_id}.output.jsonl").read_text(encoding="utf-8"))
+
+
+class BatchIngestion:
+    """상태 파일(JSON) 기반 재개 가능한 대량 ingestion. step()을 반복 호출해 done까지 진행."""
+
+    def __init__(self, state_path: Path, backend: Any, *, limit: int = 500, summaries: bool = True) -> None:
+        self.state_path = Path(state_path)
+        self.backend = backend
+        self.limit = limit
+        self.summaries = summaries
+        self.files_dir = self.state_path.parent / f"{self.state_path.stem}_files"
+        self.state: dict[str, Any] = self._load()
+
+    @property
+    def phase(self) -> str:
+        return self.state["phase"]
+
+    def run(self, poll_interval: float = 60.0) -> dict[str, Any]:
+        """done까지 진행. 단계가 바뀌지 않았을 때(배치 진행 중)만 poll_interval 대기."""
+        while self.phase != "done":
+            before = self.phase
+            if self.step() == before:
+                time.sleep(poll_interval)
+        return self.summary()
+
+    def step(self) -> str:
+        """현재 단계에서 할 수 있는 일을 하고 (배치 미완료면 상태만 갱신) 다음 단계를 반환."""
+        phase = self.phase
+        if phase == "new":
+            self._prepare()
+        elif phase == "segments_submitted" and self._batches_finished("segments"):
+            self._apply_segment_embeddings()
+        elif phase == "extract_submitted" and self._batches_finished("extract"):
+            self._apply_extraction()
+        elif phase == "summary_submitted" and self._batches_finished("summary"):
+            self._apply_summaries()
+        self._save()
+        return self.phase
+
+    def summary(self) -> dict[str, Any]:
+        jobs = self.state["jobs"]
+        return {
+            "phase": self.phase,
+            "jobs": len(jobs),
+            "done": sum(1 for j in jobs.values() if j.get("status") == "done"),
+            "failed": sum(1 for j in jobs.values() if j.get("status") == "failed"),
+            "batches": self.state["batches"],
+        }
+
+    # ----- 단계 -----
+
+    def _prepare(self) -> None:
+        jobs = self._claim()
+        logger.info("배치 ingestion: pending transcript job %d건 가져옴", len(jobs))
+        if not jobs:
+            self.state["phase"] = "done"
+            return
+        if settings.CHUNKING_STRATEGY == "semantic":
+            self._submit_segment_embeddings(jobs)
+        else:
+            self._submit_extraction(jobs)
+        self.state.pop("claimed", None)
+
+    def _claim(self) -> list[tuple[int, str, str, str, dict[str, Any]]]:
+        """
+        pending transcript job을 processing으로 가져온다. 가져온 id는 커밋 전에 상태 파일에 먼저 저장하므로,
+        청킹·제출 중에 중단되어도 다음 실행이 같은 job을 이어받는다 (processing으로 남지 않음).
+        """
+
+        def record(ids: list[int]) -> None:
+            self.state["claimed"] = ids
+            self._save()
+
+        with get_session() as session:
+            ids = self.state.get("claimed")
+            if ids is None:
+                claimed = ingestion_job_repo.claim_pending(
+                    session, job_type="transcript", limit=self.limit, on_claimed=record
+                )
+            else:
+                # 지난 실행이 가져온 job: 커밋된 것(processing)은 그대로, 커밋 전에 멈춘 것(pending)은 다시 가져옴
+                logger.info("배치 ingestion: 지난 실행이 가져온 job %d건 이어받음", len(ids))
+                rows = [ingestion_job_repo.get_by_id(session, i) for i in ids]
+                claimed = [j for j in rows if j is not None and j.status == "processing"]
+                claimed += ingestion_job_repo.claim_pending(session, job_type="transcript", limit=len(ids), ids=ids)
+            return [(j.id, j.course_id, j.lecture_id, j.user_id, dict(j.payload)) for j in claimed]
+
+    def _submit_segment_embeddings(self, jobs: list[tuple[int, str, str, str, dict[str, Any]]]) -> None:
+        """semantic 청킹용 세그먼트 임베딩도 Batch API로 구한다 (실시간 임베딩 호출 없음) → segments_submitted."""
+        requests: list[dict[str, Any]] = []
+        for job_id, course_id, lecture_id, user_id, payload in jobs:
+            try:
+                texts = segment_texts(transcript_from_payload(payload).get("segments") or [])
+            except Exception as e:
+                self._fail(job_id, f"배치 준비 실패: {e}")
+                continue
+            self.state["jobs"][str(job_id)] = {
+                "course_id": course_id,
+                "lecture_id": lecture_id,
+                "user_id": user_id,
+                "status": "processing",
+            }
+            requests.extend(
+                _request(f"{job_id}:segments:{part}", EMBEDDING_ENDPOINT, _embedding_body(texts[i : i + EMBEDDING_INPUTS_PER_REQUEST]))
+                for part, i in enumerate(range(0, len(texts), EMBEDDING_INPUTS_PER_REQUEST))
+            )
+        self._submit("segments", {EMBEDDING_ENDPOINT: requests})
+        self.state["phase"] = "segments_submitted"
+
+    def _apply_segment_embeddings(self) -> None:
+        """세그먼트 임베딩 배치 결과로 semantic 청킹한 뒤 추출 요청 제출 → extract_submitted."""
+        results = self._collect("segments")
+        jobs: list[tuple[int, str, str, str, dict[str, Any]]] = []
+        chunked: dict[int, list[dict[str, Any]]] = {}
+        for key, job in list(self.state["jobs"].items()):
+            if job["status"] != "processing":
+                continue
+            job_id = int(key)
+            with get_session() as session:
+                source = ingestion_job_repo.get_by_id(session, job_id)
+                payload = dict(source.payload) if source else {}
+            try:
+                content_json = transcript_from_payload(payload)
+                n_texts = len(segment_texts(content_json.get("segments") or []))
+                vectors: list[list[float]] = []
+                for part in range((n_texts + EMBEDDING_INPUTS_PER_REQUEST - 1) // EMBEDDING_INPUTS_PER_REQUEST):
+                    part_vectors = embedding_vectors(results.get(f"{job_id}:segments:{part}"))
+                    if part_vectors is None:
+                        raise ValueError(f"배치 결과 누락: 세그먼트 임베딩 part={part}")
+                    vectors.extend(part_vectors)
+                chunked[job_id] = chunk_transcript(content_json, embed_batch=precomputed_embedder(vectors))
+            except Exception as e:
+                logger.exception("세그먼트 임베딩 반영 실패 job_id=%s", job_id)
+                self._fail(job_id, str(e))
+                continue
+            jobs.append((job_id, job["course_id"], job["lecture_id"], job["user_id"], payload))
+        self._submit_extraction(jobs, chunked)
+
+    def _submit_extraction(
+        self,
+        jobs: list[tuple[int, str, str, str, dict[str, Any]]],
+        chunked: dict[int, list[dict[str, Any]]] | None = None,
+    ) -> None:
+        """청크별 추출·강의 요약·청크 임베딩 요청 제출 → extract_submitted. chunked가 없으면 여기서 청킹."""
+        requests: dict[str, list[dict[str, Any]]] = {CHAT_ENDPOINT: [], EMBEDDING_ENDPOINT: []}
+        for job_id, course_id, lecture_id, user_id, payload in jobs:
+            try:
+                content_json = transcript_from_payload(payload)
+                chunks = chunked[job_id] if chunked is not None else chunk_transcript(content_json)
+                concept_hint = concept_hint_from_payload(payload)
+                msgs = None
+                if self.summaries:
+                    msgs = summary_messages(
+                        content_json,
+                        course_title=payload.get("course_title"),
+                        section_title=payload.get("section_title"),
+                        lecture_title=payload.get("lecture_title"),
+                    )
+            except Exception as e:
+                self._fail(job_id, f"배치 준비 실패: {e}")
+                continue
+            self.state["jobs"][str(job_id)] = {
+                "course_id": course_id,
+                "lecture_id": lecture_id,
+                "user_id": user_id,
+                "concept_hint": concept_hint,
+                "chunks": chunks,
+                "status": "processing",
+            }
+            for endpoint, reqs in extraction_requests(job_id, chunks, concept_hint, msgs).items():
+                requests[endpoint].extend(reqs)
+        self._submit("extract", requests)
+        self.state["phase"] = "extract_submitted"
+
+    def _apply_extraction(self) -> None:
+        results = self._collect("extract")
+        embed_requests: list[dict[str, Any]] = []
+        for key, job in self.state["jobs"].items():
+            if job["status"] != "processing":
+                continue
+            job_id = int(key)
+            try:
+                self._store_job_chunks(job_id, job, results)
+            except Exception as e:
+                logger.exception("배치 결과 저장 실패 job_id=%s", job_id)
+                self._fail(job_id, str(e))
+                continue
+            with get_session() as session:
+                ingestion_job_repo.mark_done(session, job_id)
+            job["status"] = "done"
+            summary = chat_content(results.get(f"{job_id}:summary"))
+            if summary and summary.strip():
+                job["summary"] = summary.strip()
+                embed_requests.append(_request(f"{job_id}:summary_embedding", EMBEDDING_ENDPOINT, _embedding_body([job["summary"]])))
+            job.pop("chunks", None)  # 저장 끝난 청크는 상태 파일에서 제거
+        logger.info("배치 추출 결과 반영 완료 (요약 임베딩 요청 %d건)", len(embed_requests))
+        if embed_requests:
+            self._submit("summary", {EMBEDDING_ENDPOINT: embed_requests})
+            self.state["phase"] = "summary_submitted"
+        else:
+            self.state["phase"] = "done"
+
+    def _store_job_chunks(self, job_id: int, job: dict[str, Any], results: dict[str, dict[str, Any]]) -> None:
+        chunks = job["chunks"]
+        texts_idx = [i for i, ch in enumerate(chunks) if (ch.get("text") or "").strip()]
+        embeddings: list[list[float]] = []
+        for part in range((len(texts_idx) + EMBEDDING_INPUTS_PER_REQUEST - 1) // EMBEDDING_INPUTS_PER_REQUEST):
+            vectors = embedding_vectors(results.get(f"{job_id}:chunks:{part}"))
+            if vectors is None:
+                raise ValueError(f"배치 결과 누락: 청크 임베딩 part={part}")
+            embeddings.extend(vectors)
+        extracted = []
+        for idx in texts_idx:
+            concept = chat_content(results.get(f"{job_id}:{idx}:concept"))
+            metadata = chat_content(results.get(f"{job_id}:{idx}:metadata"))
+            difficulty = chat_content(results.get(f"{job_id}:{idx}:difficulty"))
+            if concept is None or metadata is None or difficulty is None:
+                raise ValueError(f"배치 결과 누락: chunk_index={idx}")
+            extracted.append((idx, concept.strip(), parse_metadata(metadata), parse_difficulty(difficulty)))
+        with get_session() as session:
+            lecture_chunk_repo.delete_by_lecture(session, job["course_id"], job["lecture_id"], job["user_id"])
+            for (idx, concept, metadata, difficulty), embedding in zip(extracted, embeddings):
+                store_chunk(
+                    session,
+                    course_id=job["course_id"],
+                    lecture_id=job["lecture_id"],
+                    user_id=job["user_id"],
+                    chunk_index=idx,
+                    chunk=chunks[idx],
+                    concept=concept,
+                    metadata=metadata,
+                    difficulty=difficulty,
+                    embedding=embedding,
+                )
+        chunk_search_service.clear_cache(job["course_id"])
+
+    def _apply_summaries(self) -> None:
+        results = self._collect("summary")
+        stored = 0
+        for key, job in self.state["jobs"].items():
+            if not job.get("summary") or job.get("summary_stored"):
+                continue
+            job_id = int(key)
+            vectors = embedding_vectors(results.get(f"{job_id}:summary_embedding"))
+            if not vectors:
+                logger.warning("요약 임베딩 결과 누락 job_id=%s → lecture_summary_embeddings 미반영", job_id)
+                continue
+            with get_session() as session:
+                source = ingestion_job_repo.get_by_id(session, job_id)
+                payload = dict(source.payload) if source else {}
+                lecture_summary_embeddings_repo.upsert(
+                    session,
+                    LectureSummaryEmbeddingRow(
+                        course_id=job["course_id"],
+                        lecture_id=job["lecture_id"],
+                        user_id=job["user_id"],
+                        content=transcript_from_payload(payload),
+                        summary=job["summary"],
+                        embedding=vectors[0],
+                        metadata=payload.get("metadata") or {},
+                    ),
+                )
+            summary_vector_index.on_upsert(job["course_id"], job["user_id"], job["lecture_id"], job["summary"], vectors[0])
+            quiz_bank_service.on_lecture_updated(job["course_id"], job["lecture_id"], job["user_id"])
+            job["summary_stored"] = True
+            stored += 1
+        logger.info("배치 요약 임베딩 반영 %d건", stored)
+        self.state["phase"] = "done"
+
+    # ----- 배치 제출·수집 -----
+
+    def _submit(self, stage: str, requests: dict[str, list[dict[str, Any]]]) -> None:
+        self.files_dir.mkdir(parents=True, exist_ok=True)
+        batches = self.state["batches"].setdefault(stage, [])
+        for endpoint, reqs in requests.items():
+            for part, i in enumerate(range(0, len(reqs), MAX_REQUESTS_PER_FILE)):
+                name = endpoint.rsplit("/", 1)[-1]
+                path = self.files_dir / f"{stage}_{name}_{part}.jsonl"
+                with path.open("w", encoding="utf-8") as f:
+                    for req in reqs[i : i + MAX_REQUESTS_PER_FILE]:
+                        f.write(json.dumps(req, ensure_ascii=False) + "\n")
+                batch_id = self.backend.submit(path, endpoint)
+                batches.append({"id": batch_id, "endpoint": endpoint, "status": "submitted"})
+                logger.info("배치 제출 stage=%s endpoint=%s 요청 %d건 batch_id=%s", stage, endpoint, len(reqs[i : i + MAX_REQUESTS_PER_FILE]), batch_id)
+                self._save()  # 제출 직후 저장: 중단되어도 같은 배치를 다시 내지 않음
+
+    def _batches_finished(self, stage: str) -> bool:
+        finished = True
+        for batch in self.state["batches"].get(stage, []):
+            if batch["status"] in TERMINAL_STATUSES:
+                continue
+            batch["status"] = self.backend.status(batch["id"])
+            if batch["status"] not in TERMINAL_STATUSES:
+                finished = False
+            elif batch["status"] != "completed":
+                logger.warning("배치 %s 종료 상태=%s (완료된 요청 결과만 반영)", batch["id"], batch["status"])
+        return finished
+
+    def _collect(self, stage: str) -> dict[str, dict[str, Any]]:
+        results: dict[str, dict[str, Any]] = {}
+        for batch in self.state["batches"].get(stage, []):
+            for line in self.backend.results(batch["id"]):
+                results[line["custom_id"]] = line
+        return results
+
+    def _fail(self, job_id: int, message: str) -> None:
+        with get_session() as session:
+            ingestion_job_repo.mark_failed(session, job_id, message)
+        job = self.state["jobs"].setdefault(str(job_id), {})
+        job["status"] = "failed"
+        job["error"] = message
+        job.pop("chunks", None)
+
+    # ----- 상태 파일 -----
+
+    def _load(self) -> dict[str, Any]:
+        if self.state_path.exists():
+            state = json.loads(self.state_path.read_text(encoding="utf-8"))
+            logger.info("배치 상태 재개 phase=%s path=%s", state.get("phase"), self.state_path)
+            return state
+        return {"phase": "new", "jobs": {}, "batches": {}}
+
+    def _save(self) -> None:
+        self.state_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.state_path.with_suffix(self.state_path.suffix + ".tmp")
+        tmp.write_text(json.dumps(self.state, ensure_ascii=False), encoding="utf-8")
+        os.replace(tmp, self.state_path)
@@ -0,0 +1,93 @@
+"""
+백그라운드 배치 쓰기: 호출 경로에서는 큐에 넣기만 하고, 전용 스레드가 묶어서 write 함수에 넘긴다.
+span 내보내기(tracing)와 LLM 사용량 기록(llm_usage)이 같이 쓴다.
+"""
+
+import atexit
+import logging
+import queue
+import threading
+import time
+from typing import Callable, Generic, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class BackgroundBatcher(Generic[T]):
+    """
+    put()한 항목을 최대 batch개씩(또는 flush_sec마다) write에 넘긴다. 스레드는 첫 put 때 시작하고 종료 시 남은 것을 flush.
+    큐가 max_queue를 넘으면 호출 경로를 막지 않고 버린다(dropped). write 예외는 로그만 남기고 그 배치를 버린다.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        write: Callable[[list[T]], None],
+        batch: int = 256,
+        flush_sec: float = 2.0,
+        max_queue: int = 10_000,
+    ) -> None:
+        self.name = name
+        self._write = write
+        self.batch = batch
+        self.flush_sec = flush_sec
+        self._queue: queue.Queue[T] = queue.Queue(maxsize=max_queue)
+        self._pending: list[T] = []  # 스레드가 모으는 중인 배치 (flush가 가로챌 수 있게 공유)
+        self._pending_lock = threading.Lock()
+        self._thread: threading.Thread | None = None
+        self._lock = threading.Lock()
+        self.dropped = 0
+
+    def put(self, item: T) -> None:
+        self._ensure_thread()
+        try:
+            self._queue.put_nowait(item)
+        except queue.Full:
+            self.dropped += 1
+
+    def flush(self) -> None:
+        """모으는 중인 배치와 큐에 남은 항목을 지금 쓴다 (종료 시·테스트용)."""
+        with self._pending_lock:
+            items, self._pending = self._pending, []
+            while True:
+                try:
+                    items.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+        if items:
+            self._write_safely(items)
+
+    def _ensure_thread(self) -> None:
+        if self._thread is not None:
+            return
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+                self._thread.start()
+                atexit.register(self.flush)
+
+    def _run(self) -> None:
+        while True:
+            first = self._queue.get()
+            with self._pending_lock:
+                self._pending.append(first)
+            deadline = time.monotonic() + self.flush_sec
+            while len(self._pending) < self.batch:
+                try:
+                    item = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+                except queue.Empty:
+                    break
+                with self._pending_lock:
+                    self._pending.append(item)
+            with self._pending_lock:
+                items, self._pending = self._pending, []
+            if items:
+                self._write_safely(items)
+
+    def _write_safely(self, items: list[T]) -> None:
+        try:
+            self._write(items)
+        except Exception as e:
+            logger.warning("%s 배치 쓰기 실패 (%d개 버림): %s", self.name, len(items), e)
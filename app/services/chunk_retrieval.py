@@ -0,0 +1,114 @@
+"""
+퀴즈 출제용 청크 검색: lecture_chunk_vectors에서 강의 청크를 MMR로 k개 골라
+개념·시간 구간을 고르게 덮는 근거 텍스트를 만든다. (전사 앞부분만 쓰던 방식 대체)
+"""
+
+import logging
+from typing import Any
+
+import numpy as np
+from sqlmodel import Session
+
+from app.db.models import LectureChunk
+from app.db.repositories.lecture_chunk import lecture_chunk_repo
+from app.services.timefmt import format_ts
+from app.services.tokens import truncate_to_tokens
+
+logger = logging.getLogger(__name__)
+
+
+def select_chunks_mmr(
+    vectors: np.ndarray,
+    k: int,
+    *,
+    query: np.ndarray | None = None,
+    concepts: list[str | None] | None = None,
+    lambda_: float = 0.5,
+    coverage_penalty: float = 0.2,
+) -> list[int]:
+    """
+    MMR(Maximal Marginal Relevance)로 k개 청크 인덱스를 고른다 (반환은 원래 순서 = 시간순).
+    - 관련도: query와의 코사인 유사도 (query가 없으면 청크 평균 벡터 = 강의 전체 대표).
+    - 중복도: 이미 고른 청크와의 최대 코사인 유사도.
+    - 이미 고른 청크와 같은 concept이거나 같은 시간 구간(전체를 k등분)이면 coverage_penalty만큼 감점.
+    """
+    n = vectors.shape[0]
+    if n == 0 or k <= 0:
+        return []
+    if n <= k:
+        return list(range(n))
+    emb = vectors.astype(np.float32, copy=True)
+    emb /= np.maximum(np.linalg.norm(emb, axis=1, keepdims=True), 1e-12)
+    q = emb.mean(axis=0) if query is None else np.asarray(query, dtype=np.float32)
+    q /= max(float(np.linalg.norm(q)), 1e-12)
+    relevance = emb @ q
+    sims = emb @ emb.T
+    buckets = (np.arange(n) * k) // n
+    concept_keys = [(c or "").strip().lower() for c in (concepts or [None] * n)]
+
+    selected: list[int] = []
+    max_sim = np.full(n, -np.inf, dtype=np.float32)
+    covered_buckets: set[int] = set()
+    covered_concepts: set[str] = set()
+    available = np.ones(n, dtype=bool)
+    for _ in range(k):
+        redundancy = np.where(np.isfinite(max_sim), max_sim, 0.0)
+        score = lambda_ * relevance - (1 - lambda_) * redundancy
+        penalty = np.array(
+            [
+                (buckets[i] in covered_buckets) + (bool(concept_keys[i]) and concept_keys[i] in covered_concepts)
+                for i in range(n)
+            ],
+            dtype=np.float32,
+        )
+        score = np.where(available, score - coverage_penalty * penalty, -np.inf)
+        best = int(np.argmax(score))
+        selected.append(best)
+        available[best] = False
+        max_sim = np.maximum(max_sim, sims[best])
+        covered_buckets.add(int(buckets[best]))
+        if concept_keys[best]:
+            covered_concepts.add(concept_keys[best])
+    return sorted(selected)
+
+
+def retrieve_lecture_chunks(
+    session: Session,
+    course_id: str,
+    lecture_id: str,
+    user_id: str,
+    k: int,
+    *,
+    query_embedding: Any | None = None,
+    lambda_: float = 0.5,
+) -> list[LectureChunk]:
+    """강의의 청크+벡터를 읽어 MMR로 k개 선택 (시간순). 청크가 없으면 빈 리스트."""
+    rows = lecture_chunk_repo.get_with_vectors(session, course_id, lecture_id, user_id)
+    if not rows:
+        return []
+    vectors = np.asarray([np.asarray(v, dtype=np.float32) for _, v in rows])
+    picked = select_chunks_mmr(
+        vectors,
+        k,
+        query=None if query_embedding is None else np.asarray(query_embedding, dtype=np.float32),
+        concepts=[c.concept for c, _ in rows],
+        lambda_=lambda_,
+    )
+    logger.info("청크 검색: 전체 %d개 중 %d개 선택 (MMR λ=%.2f)", len(rows), len(picked), lambda_)
+    return [rows[i][0] for i in picked]
+
+
+def format_chunks_for_prompt(chunks: list[LectureChunk], max_tokens: int) -> str:
+    """선택된 청크를 '[시작-끝] (개념) 본문' 형태로 만든다. 청크마다 토큰을 균등 배분해 총량을 고정."""
+    if not chunks:
+        return ""
+    per_chunk = max(1, max_tokens // len(chunks))
+    parts: list[str] = []
+    for c in chunks:
+        content = c.content or {}
+        start = float(content.get("start") or 0.0)
+        end = float(content.get("end") or start)
+        concept = f" ({c.concept})" if c.concept else ""
+        text = truncate_to_tokens((content.get("text") or "").strip(), per_chunk)
+        parts.append(f"[{format_ts(start)}-{format_ts(end)}]{concept}\n{text}")
+    return "\n\n".join(parts)
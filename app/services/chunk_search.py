@@ -0,0 +1,131 @@
+"""
+청크 단위 시맨틱 검색: 쿼리(텍스트 또는 벡터) → lecture_chunk_vectors ANN + 필터.
+같은 쿼리·필터 반복 시 프로세스 내 LRU 캐시(TTL)로 임베딩 호출과 DB 조회를 생략한다.
+청크를 (재)적재한 경로는 clear_cache(course_id)로 해당 강좌 결과를 비우고, 다른 프로세스의 캐시는 TTL 안에 갱신된다.
+"""
+
+import hashlib
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable
+
+from app.core.config import settings
+from app.db.connection import get_session
+from app.db.repositories.lecture_chunk import lecture_chunk_repo
+from app.services.embedding import embedding_service
+
+logger = logging.getLogger(__name__)
+
+
+class _TTLCache:
+    """스레드 안전 LRU + TTL 캐시."""
+
+    def __init__(self, max_entries: int, ttl_sec: float) -> None:
+        self._data: OrderedDict[Any, tuple[float, Any]] = OrderedDict()
+        self._max_entries = max_entries
+        self._ttl_sec = ttl_sec
+        self._lock = threading.Lock()
+
+    def get(self, key: Any) -> Any | None:
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            expires_at, value = item
+            if expires_at < time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def put(self, key: Any, value: Any) -> None:
+        with self._lock:
+            self._data[key] = (time.monotonic() + self._ttl_sec, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self._max_entries:
+                self._data.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def discard_if(self, predicate: Callable[[Any], bool]) -> None:
+        """predicate(key)가 참인 항목 제거."""
+        with self._lock:
+            for key in [k for k in self._data if predicate(k)]:
+                del self._data[key]
+
+
+class ChunkSearchService:
+    """텍스트/벡터 쿼리로 청크 검색 (결과·쿼리 임베딩 캐시)."""
+
+    def __init__(self) -> None:
+        self._results = _TTLCache(settings.CHUNK_SEARCH_CACHE_SIZE, settings.CHUNK_SEARCH_CACHE_TTL_SEC)
+        self._embeddings = _TTLCache(settings.CHUNK_SEARCH_CACHE_SIZE, settings.CHUNK_SEARCH_CACHE_TTL_SEC)
+
+    def search(
+        self,
+        *,
+        query: str | None = None,
+        query_embedding: list[float] | None = None,
+        course_id: str | None = None,
+        lecture_id: str | None = None,
+        user_id: str | None = None,
+        difficulty: str | None = None,
+        concept: str | None = None,
+        limit: int = 10,
+    ) -> tuple[list[dict[str, Any]], bool]:
+        """
+        query(텍스트) 또는 query_embedding(벡터) 중 하나로 검색. 텍스트면 임베딩 1회 호출(캐시됨).
+        반환: (결과 리스트, 캐시 적중 여부)
+        """
+        if query_embedding is None:
+            if not query or not query.strip():
+                raise ValueError("query 또는 query_embedding 중 하나는 필요합니다")
+            query_key: Any = ("text", query.strip())
+        else:
+            digest = hashlib.sha1(",".join(f"{x:.6f}" for x in query_embedding).encode()).hexdigest()
+            query_key = ("vector", digest)
+
+        key = (query_key, course_id, lecture_id, user_id, difficulty, concept, limit)
+        cached = self._results.get(key)
+        if cached is not None:
+            logger.info("청크 검색 캐시 적중 %s", query_key[0])
+            return cached, True
+
+        if query_embedding is None:
+            query_embedding = self._embeddings.get(query_key)
+            if query_embedding is None:
+                query_embedding = embedding_service.embed(query.strip())
+                self._embeddings.put(query_key, query_embedding)
+
+        with get_session() as session:
+            results = lecture_chunk_repo.search(
+                session,
+                query_embedding,
+                course_id=course_id,
+                lecture_id=lecture_id,
+                user_id=user_id,
+                difficulty=difficulty,
+                concept=concept,
+                limit=limit,
+            )
+        self._results.put(key, results)
+        logger.info("청크 검색 완료 결과 %d건", len(results))
+        return results, False
+
+    def clear_cache(self, course_id: str | None = None) -> None:
+        """
+        검색 결과 캐시 비우기. course_id를 주면 그 강좌와 강좌 필터 없는 검색만 비운다 (청크 (재)적재 후 호출).
+        쿼리 임베딩 캐시는 데이터와 무관하므로 전체 비우기(course_id 없음)에서만 비운다.
+        """
+        if course_id is None:
+            self._results.clear()
+            self._embeddings.clear()
+            return
+        self._results.discard_if(lambda key: key[1] is None or key[1] == course_id)
+
+
+chunk_search_service = ChunkSearchService()
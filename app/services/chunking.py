@@ -1,8 +1,12 @@
 """
 Span Chunking: 전사 segments를 구간 단위 청크로 나눔.
+- chunk_by_max_chars: 글자 수 기준으로만 자름.
+- chunk_by_semantic_breakpoints: 세그먼트 임베딩의 인접 구간 코사인 거리 피크에서 자름 (주제 전환 기준).
 """
 
-from typing import Any
+from typing import Any, Callable
+
+import numpy as np
 
 
 def chunk_by_max_chars(
@@ -58,3 +62,97 @@ def chunk_by_max_chars(
             "segment_indices": current_indices,
         })
     return chunks
+
+
+def _window_distances(emb: np.ndarray, window: int) -> np.ndarray:
+    """
+    인접 윈도우 간 코사인 거리. 결과[j] = (j 이전 window개 평균) vs (j+1 이후 window개 평균) 거리.
+    emb: 행 정규화된 (n, d) 행렬. 반환 길이 n-1.
+    """
+    n = emb.shape[0]
+    cs = np.vstack([np.zeros((1, emb.shape[1]), dtype=emb.dtype), np.cumsum(emb, axis=0)])
+    j = np.arange(n - 1)
+    left_lo = np.maximum(0, j - window + 1)
+    right_hi = np.minimum(n, j + 1 + window)
+    left = cs[j + 1] - cs[left_lo]
+    right = cs[right_hi] - cs[j + 1]
+    left /= np.maximum(np.linalg.norm(left, axis=1, keepdims=True), 1e-12)
+    right /= np.maximum(np.linalg.norm(right, axis=1, keepdims=True), 1e-12)
+    return 1.0 - np.einsum("ij,ij->i", left, right)
+
+
+def segment_texts(segments: list[dict[str, Any]]) -> list[str]:
+    """chunk_by_semantic_breakpoints가 임베딩하는 세그먼트 본문 (빈 세그먼트 제외, 같은 순서)."""
+    return [(seg.get("text") or "").strip() for seg in segments if (seg.get("text") or "").strip()]
+
+
+def precomputed_embedder(vectors: list[list[float]]) -> Callable[[list[str]], list[list[float]]]:
+    """
+    미리 받아 둔 임베딩(segment_texts 순서)을 호출 순서대로 돌려주는 embed_batch.
+    Batch API로 구한 세그먼트 임베딩으로 semantic 청킹할 때 쓴다.
+    """
+    it = iter(vectors)
+    return lambda texts: [next(it) for _ in texts]
+
+
+def chunk_by_semantic_breakpoints(
+    segments: list[dict[str, Any]],
+    embed_batch: Callable[[list[str]], list[list[float]]],
+    max_chars: int = 1500,
+    min_chars: int = 300,
+    window: int = 2,
+    breakpoint_percentile: float = 90.0,
+    batch_size: int = 128,
+) -> list[dict[str, Any]]:
+    """
+    세그먼트를 batch_size개씩 묶어 임베딩한 뒤, 인접 윈도우 코사인 거리의 피크(상위 percentile 이상인
+    국소 최대)에서 청크를 나눈다. 청크는 max_chars를 넘지 않으며(단일 세그먼트가 더 긴 경우 제외),
+    min_chars 미만이면 피크여도 자르지 않는다. 청크 형식은 chunk_by_max_chars와 동일.
+    """
+    items = [
+        (i, (seg.get("text") or "").strip(), float(seg.get("start", 0)), float(seg.get("end", 0)))
+        for i, seg in enumerate(segments)
+        if (seg.get("text") or "").strip()
+    ]
+    if len(items) < 3:
+        return chunk_by_max_chars(segments, max_chars=max_chars)
+
+    texts = [t for _, t, _, _ in items]
+    vectors: list[list[float]] = []
+    for b in range(0, len(texts), batch_size):
+        vectors.extend(embed_batch(texts[b : b + batch_size]))
+    emb = np.asarray(vectors, dtype=np.float32)
+    emb /= np.maximum(np.linalg.norm(emb, axis=1, keepdims=True), 1e-12)
+
+    distances = _window_distances(emb, max(1, window))
+    threshold = np.percentile(distances, breakpoint_percentile)
+    prev_d = np.concatenate(([-np.inf], distances[:-1]))
+    next_d = np.concatenate((distances[1:], [-np.inf]))
+    is_break = (distances >= threshold) & (distances >= prev_d) & (distances >= next_d)
+
+    chunks: list[dict[str, Any]] = []
+    cur: list[tuple[int, str, float, float]] = []
+    total_len = 0
+
+    def flush() -> None:
+        chunks.append({
+            "text": "\n".join(t for _, t, _, _ in cur),
+            "start": cur[0][2],
+            "end": cur[-1][3],
+            "segment_indices": [i for i, _, _, _ in cur],
+        })
+
+    for pos, item in enumerate(items):
+        seg_len = len(item[1]) + (1 if cur else 0)
+        if cur and total_len + seg_len > max_chars:
+            flush()
+            cur, total_len = [], 0
+            seg_len = len(item[1])
+        cur.append(item)
+        total_len += seg_len
+        if pos < len(items) - 1 and is_break[pos] and total_len >= min_chars:
+            flush()
+            cur, total_len = [], 0
+    if cur:
+        flush()
+    return chunks
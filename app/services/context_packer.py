@@ -0,0 +1,95 @@
+"""
+퀴즈 프롬프트 맥락을 토큰 예산 안에서 우선순위대로 채운다.
+우선순위: 현재 강의 요약 → 현재 강의 전사 → 이전 강의 요약(호출자가 최근순/유사도순으로 정렬해 전달).
+"""
+
+import logging
+
+from app.core.config import settings
+from app.services.tokens import count_tokens, truncate_to_tokens
+
+logger = logging.getLogger(__name__)
+
+SEPARATOR = "\n\n---\n\n"
+
+
+class PackedQuizContext:
+    """예산 안에 채운 맥락 + 섹션별 사용 토큰."""
+
+    def __init__(
+        self,
+        *,
+        current_summary: str,
+        transcript: str,
+        previous_summaries: list[str],
+        tokens: dict[str, int],
+        dropped_previous: int,
+    ):
+        self.current_summary = current_summary
+        self.transcript = transcript
+        self.previous_summaries = previous_summaries
+        self.tokens = tokens
+        self.dropped_previous = dropped_previous
+
+    @property
+    def total_tokens(self) -> int:
+        return sum(self.tokens.values())
+
+
+def pack_quiz_context(
+    current_summary: str,
+    transcript: str,
+    previous_summaries: list[str],
+    *,
+    budget: int | None = None,
+    transcript_max_tokens: int | None = None,
+    model: str | None = None,
+) -> PackedQuizContext:
+    """
+    budget(토큰) 안에서 현재 요약 → 전사(최대 transcript_max_tokens) → 이전 요약 순으로 채운다.
+    previous_summaries는 우선순위 순서(앞이 중요)로 전달하며, 들어가지 않는 요약은 통째로 제외한다.
+    반환되는 previous_summaries는 입력 순서를 유지한다.
+    """
+    budget = budget or settings.QUIZ_CONTEXT_TOKEN_BUDGET
+    transcript_cap = transcript_max_tokens or settings.QUIZ_TRANSCRIPT_MAX_TOKENS
+
+    summary = truncate_to_tokens(current_summary, budget, model)
+    summary_tokens = count_tokens(summary, model)
+    remaining = budget - summary_tokens
+
+    transcript = truncate_to_tokens(transcript, min(remaining, transcript_cap), model)
+    transcript_tokens = count_tokens(transcript, model)
+    remaining -= transcript_tokens
+
+    sep_tokens = count_tokens(SEPARATOR, model)
+    selected: list[str] = []
+    previous_tokens = 0
+    for s in previous_summaries:
+        cost = count_tokens(s, model) + (sep_tokens if selected else 0)
+        if cost <= remaining:
+            selected.append(s)
+            previous_tokens += cost
+            remaining -= cost
+
+    packed = PackedQuizContext(
+        current_summary=summary,
+        transcript=transcript,
+        previous_summaries=selected,
+        tokens={
+            "current_summary": summary_tokens,
+            "transcript": transcript_tokens,
+            "previous_summaries": previous_tokens,
+        },
+        dropped_previous=len(previous_summaries) - len(selected),
+    )
+    logger.info(
+        "맥락 토큰 사용 (예산=%d): 현재 요약=%d, 전사=%d, 이전 요약=%d(%d건, 제외 %d건), 합계=%d",
+        budget,
+        summary_tokens,
+        transcript_tokens,
+        previous_tokens,
+        len(selected),
+        packed.dropped_previous,
+        packed.total_tokens,
+    )
+    return packed
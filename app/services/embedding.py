@@ -2,29 +2,48 @@
 OpenAI Embeddings API로 텍스트 임베딩.
 """
 
-from openai import OpenAI
+from typing import TYPE_CHECKING
 
 from app.core.config import settings
+from app.services.llm import create_embeddings, openai_client
+from app.services.metrics import timed_stage
+
+if TYPE_CHECKING:
+    from openai import OpenAI
 
 
 class EmbeddingService:
     EMBEDDING_MODEL = "text-embedding-3-small"
-    DIMENSIONS = 1536
+    DIMENSIONS = settings.EMBEDDING_DIMENSIONS
 
-    def __init__(self) -> None:
-        self._client = OpenAI(
-            api_key=settings.OPENAI_API_KEY,
-            base_url=settings.OPENAI_BASE_URL,
-            timeout=settings.REQUEST_TIMEOUT,
-        )
+    @property
+    def _client(self) -> "OpenAI":
+        return openai_client()
 
+    @timed_stage("embedding")
     def embed(self, text: str) -> list[float]:
-        resp = self._client.embeddings.create(
+        # 단건 쿼리 임베딩은 요청 경로의 지연에 바로 보이므로 헤지 허용
+        resp = create_embeddings(
+            self._client,
             model=self.EMBEDDING_MODEL,
             input=text,
             dimensions=self.DIMENSIONS,
+            hedge=True,
         )
         return resp.data[0].embedding
 
+    @timed_stage("embedding")
+    def embed_batch(self, texts: list[str]) -> list[list[float]]:
+        """여러 텍스트를 한 번의 API 호출로 임베딩. 입력 순서대로 반환."""
+        if not texts:
+            return []
+        resp = create_embeddings(
+            self._client,
+            model=self.EMBEDDING_MODEL,
+            input=texts,
+            dimensions=self.DIMENSIONS,
+        )
+        return [d.embedding for d in sorted(resp.data, key=lambda d: d.index)]
+
 
 embedding_service = EmbeddingService()
@@ -6,45 +6,34 @@ Concept: 강사가 준 제목(concept_hint)이 있으면 검증 후, 검증이 
 import json
 import logging
 from concurrent.futures import ThreadPoolExecutor
-from typing import Any
-
-from openai import OpenAI
+from typing import TYPE_CHECKING, Any
 
 from app.core.config import settings
+from app.services.llm import chat_completion, openai_client
+from app.services.metrics import timed_stage
+from app.services.tracing import wrap
+
+if TYPE_CHECKING:
+    from openai import OpenAI
 
 logger = logging.getLogger(__name__)
 
+# False면 추출 결과를 LLM 응답 캐시에 두지 않음
+USE_CACHE = True
 
-def _get_client() -> OpenAI:
-    return OpenAI(
-        api_key=settings.OPENAI_API_KEY,
-        base_url=settings.OPENAI_BASE_URL,
-        timeout=settings.REQUEST_TIMEOUT,
-    )
 
+def _get_client() -> "OpenAI":
+    return openai_client()
 
-def _extract_concept(text: str) -> str:
-    """청크 내용만으로 LLM이 핵심 개념 한 문장 추출."""
-    r = _get_client().chat.completions.create(
-        model=settings.OPENAI_MODEL,
-        temperature=0.1,
-        messages=[
-            {"role": "system", "content": "주어진 강의 청크에서 핵심 개념(concept)을 한 문장으로 추출해 줘. 개념 이름만 짧게."},
-            {"role": "user", "content": text[:3000]},
-        ],
-    )
-    return (r.choices[0].message.content or "").strip()
 
+# 추출 호출 공통 temperature (배치 모드 요청 본문에도 같은 값 사용)
+EXTRACTION_TEMPERATURE = 0.1
 
-def _validate_or_concept(text: str, concept_hint: str) -> str:
-    """
-    강사가 준 제목(concept_hint)을 검증. 내용과 잘 맞으면 그대로 반환하고,
-    맞지 않으면 내용에 맞는 개념을 한 문장으로 만들어 반환. (제목을 중심으로 보완해도 됨)
-    """
-    r = _get_client().chat.completions.create(
-        model=settings.OPENAI_MODEL,
-        temperature=0.1,
-        messages=[
+
+def concept_messages(text: str, concept_hint: str | None = None) -> list[dict[str, str]]:
+    """개념 추출(또는 강사 제목 검증) 프롬프트. 실시간 추출과 배치 모드가 같은 메시지를 쓴다."""
+    if concept_hint:
+        return [
             {
                 "role": "system",
                 "content": (
@@ -58,43 +47,95 @@ def _validate_or_concept(text: str, concept_hint: str) -> str:
                 "role": "user",
                 "content": f"강사 제목: {concept_hint}\n\n청크 내용:\n{text[:3000]}",
             },
-        ],
-    )
-    return (r.choices[0].message.content or "").strip()
+        ]
+    return [
+        {"role": "system", "content": "주어진 강의 청크에서 핵심 개념(concept)을 한 문장으로 추출해 줘. 개념 이름만 짧게."},
+        {"role": "user", "content": text[:3000]},
+    ]
 
 
-def _extract_metadata(text: str) -> dict[str, Any]:
-    r = _get_client().chat.completions.create(
-        model=settings.OPENAI_MODEL,
-        temperature=0.1,
-        response_format={"type": "json_object"},
-        messages=[
-            {"role": "system", "content": "주어진 강의 청크에서 메타데이터를 추출해 JSON으로 줘. 키: topics(배열), keywords(배열)."},
-            {"role": "user", "content": text[:3000]},
-        ],
-    )
-    raw = (r.choices[0].message.content or "{}").strip()
+def metadata_messages(text: str) -> list[dict[str, str]]:
+    return [
+        {"role": "system", "content": "주어진 강의 청크에서 메타데이터를 추출해 JSON으로 줘. 키: topics(배열), keywords(배열)."},
+        {"role": "user", "content": text[:3000]},
+    ]
+
+
+def difficulty_messages(text: str) -> list[dict[str, str]]:
+    return [
+        {"role": "system", "content": "주어진 강의 청크의 난이도를 하나만 골라 줘: easy | medium | hard. 한 단어만 출력."},
+        {"role": "user", "content": text[:3000]},
+    ]
+
+
+def parse_metadata(raw: str | None) -> dict[str, Any]:
     try:
-        return json.loads(raw)
+        return json.loads((raw or "{}").strip())
     except Exception:
         return {"topics": [], "keywords": []}
 
 
-def _extract_difficulty(text: str) -> str:
-    r = _get_client().chat.completions.create(
-        model=settings.OPENAI_MODEL,
-        temperature=0.1,
-        messages=[
-            {"role": "system", "content": "주어진 강의 청크의 난이도를 하나만 골라 줘: easy | medium | hard. 한 단어만 출력."},
-            {"role": "user", "content": text[:3000]},
-        ],
-    )
-    out = (r.choices[0].message.content or "").strip().lower()
+def parse_difficulty(raw: str | None) -> str:
+    out = (raw or "").strip().lower()
     if out not in ("easy", "medium", "hard"):
         return "medium"
     return out
 
 
+@timed_stage("extract_concept")
+def _extract_concept(text: str) -> str:
+    """청크 내용만으로 LLM이 핵심 개념 한 문장 추출."""
+    content = chat_completion(
+        _get_client(),
+        temperature=EXTRACTION_TEMPERATURE,
+        messages=concept_messages(text),
+        cache=USE_CACHE,
+        name="extract_concept",
+    )
+    return content.strip()
+
+
+@timed_stage("extract_concept")
+def _validate_or_concept(text: str, concept_hint: str) -> str:
+    """
+    강사가 준 제목(concept_hint)을 검증. 내용과 잘 맞으면 그대로 반환하고,
+    맞지 않으면 내용에 맞는 개념을 한 문장으로 만들어 반환. (제목을 중심으로 보완해도 됨)
+    """
+    content = chat_completion(
+        _get_client(),
+        temperature=EXTRACTION_TEMPERATURE,
+        messages=concept_messages(text, concept_hint),
+        cache=USE_CACHE,
+        name="validate_concept",
+    )
+    return content.strip()
+
+
+@timed_stage("extract_metadata")
+def _extract_metadata(text: str) -> dict[str, Any]:
+    content = chat_completion(
+        _get_client(),
+        temperature=EXTRACTION_TEMPERATURE,
+        response_format={"type": "json_object"},
+        messages=metadata_messages(text),
+        cache=USE_CACHE,
+        name="extract_metadata",
+    )
+    return parse_metadata(content)
+
+
+@timed_stage("extract_difficulty")
+def _extract_difficulty(text: str) -> str:
+    content = chat_completion(
+        _get_client(),
+        temperature=EXTRACTION_TEMPERATURE,
+        messages=difficulty_messages(text),
+        cache=USE_CACHE,
+        name="extract_difficulty",
+    )
+    return parse_difficulty(content)
+
+
 def extract_parallel(
     chunk_text: str,
     concept_hint: str | None = None,
@@ -110,9 +151,10 @@ def extract_parallel(
         concept_fn = lambda: _extract_concept(chunk_text)
 
     with ThreadPoolExecutor(max_workers=3) as ex:
-        f_concept = ex.submit(concept_fn)
-        f_metadata = ex.submit(_extract_metadata, chunk_text)
-        f_difficulty = ex.submit(_extract_difficulty, chunk_text)
+        # 추출 span이 호출한 쪽(청크 span) 아래로 이어지도록 trace context를 붙여 제출
+        f_concept = ex.submit(wrap(concept_fn))
+        f_metadata = ex.submit(wrap(_extract_metadata), chunk_text)
+        f_difficulty = ex.submit(wrap(_extract_difficulty), chunk_text)
         concept = f_concept.result()
         metadata = f_metadata.result()
         difficulty = f_difficulty.result()
@@ -0,0 +1,140 @@
+"""
+하이브리드 검색: pgvector(의미) + Postgres 전문 검색/trigram(정확한 용어·코드 식별자)을
+Reciprocal Rank Fusion(RRF)으로 합친다. 요약(lecture_summary_embeddings)·청크(lecture_chunks) 공통 API.
+"""
+
+import logging
+from typing import Any, Hashable
+
+from app.core.config import settings
+from app.db.connection import get_session
+from app.db.repositories.lecture_chunk import lecture_chunk_repo
+from app.db.repositories.lecture_summary_embeddings import lecture_summary_embeddings_repo
+from app.services.embedding import embedding_service
+
+logger = logging.getLogger(__name__)
+
+SEARCH_MODES = ("hybrid", "vector", "lexical")
+
+
+def reciprocal_rank_fusion(
+    rankings: list[list[Hashable]],
+    k: int = 60,
+) -> list[tuple[Hashable, float]]:
+    """
+    RRF: 각 순위 목록에서 rank r(1부터)인 항목에 1/(k + r)을 더해 합산 점수 내림차순 반환.
+    점수 스케일이 다른 검색 결과(코사인 유사도 vs ts_rank)를 순위만으로 합칠 수 있다.
+    """
+    scores: dict[Hashable, float] = {}
+    for ranking in rankings:
+        for rank, key in enumerate(ranking, 1):
+            scores[key] = scores.get(key, 0.0) + 1.0 / (k + rank)
+    return sorted(scores.items(), key=lambda kv: kv[1], reverse=True)
+
+
+class HybridSearchService:
+    """target="summaries" | "chunks"에 대해 mode="hybrid" | "vector" | "lexical" 검색."""
+
+    def search(
+        self,
+        target: str,
+        query: str,
+        *,
+        mode: str = "hybrid",
+        query_embedding: list[float] | None = None,
+        course_id: str | None = None,
+        lecture_id: str | None = None,
+        user_id: str | None = None,
+        difficulty: str | None = None,
+        concept: str | None = None,
+        exclude_lecture_id: str | None = None,
+        limit: int = 10,
+        candidates: int | None = None,
+    ) -> list[dict[str, Any]]:
+        """
+        각 검색기에서 candidates건(기본 HYBRID_SEARCH_CANDIDATES)씩 가져와 RRF로 합친 상위 limit건.
+        결과: {"key", "lecture_id", "text", "score", "vector_rank", "lexical_rank", ...청크 필드}
+        query_embedding을 주면 임베딩 호출을 생략한다 (벤치마크 등에서 재사용).
+        """
+        if mode not in SEARCH_MODES:
+            raise ValueError(f"mode는 {SEARCH_MODES} 중 하나여야 합니다: {mode}")
+        if target not in ("summaries", "chunks"):
+            raise ValueError(f"target은 summaries | chunks 여야 합니다: {target}")
+        if not query or not query.strip():
+            raise ValueError("query가 필요합니다")
+        if target == "summaries" and (not course_id or not user_id):
+            raise ValueError("summaries 검색에는 course_id, user_id가 필요합니다")
+        n = candidates or max(limit, settings.HYBRID_SEARCH_CANDIDATES)
+
+        if mode != "lexical" and query_embedding is None:
+            query_embedding = embedding_service.embed(query)
+
+        vector_hits: list[dict[str, Any]] = []
+        lexical_hits: list[dict[str, Any]] = []
+        with get_session() as session:
+            if target == "summaries":
+                if mode != "lexical":
+                    vector_hits = [
+                        {"key": lid, "lecture_id": lid, "text": s}
+                        for lid, s in lecture_summary_embeddings_repo.get_similar_summaries(
+                            session, course_id, user_id, query_embedding, limit=n,
+                            exclude_lecture_id=exclude_lecture_id,
+                        )
+                    ]
+                if mode != "vector":
+                    lexical_hits = [
+                        {"key": lid, "lecture_id": lid, "text": s}
+                        for lid, s, _ in lecture_summary_embeddings_repo.lexical_search(
+                            session, course_id, user_id, query, limit=n,
+                            exclude_lecture_id=exclude_lecture_id,
+                        )
+                    ]
+            else:
+                filters = dict(
+                    course_id=course_id,
+                    lecture_id=lecture_id,
+                    user_id=user_id,
+                    difficulty=difficulty,
+                    concept=concept,
+                    limit=n,
+                )
+                if mode != "lexical":
+                    vector_hits = [
+                        {**h, "key": h["chunk_id"]}
+                        for h in lecture_chunk_repo.search(session, query_embedding, **filters)
+                    ]
+                if mode != "vector":
+                    lexical_hits = [
+                        {**h, "key": h["chunk_id"]}
+                        for h in lecture_chunk_repo.lexical_search(session, query, **filters)
+                    ]
+
+        by_key: dict[Hashable, dict[str, Any]] = {}
+        for h in lexical_hits + vector_hits:
+            by_key.setdefault(h["key"], h)
+        vector_rank = {h["key"]: i for i, h in enumerate(vector_hits, 1)}
+        lexical_rank = {h["key"]: i for i, h in enumerate(lexical_hits, 1)}
+        fused = reciprocal_rank_fusion(
+            [[h["key"] for h in vector_hits], [h["key"] for h in lexical_hits]],
+            k=settings.HYBRID_RRF_K,
+        )
+        results = []
+        for key, score in fused[:limit]:
+            results.append({
+                **by_key[key],
+                "score": score,
+                "vector_rank": vector_rank.get(key),
+                "lexical_rank": lexical_rank.get(key),
+            })
+        logger.info(
+            "하이브리드 검색 target=%s mode=%s vector=%d lexical=%d → %d건",
+            target,
+            mode,
+            len(vector_hits),
+            len(lexical_hits),
+            len(results),
+        )
+        return results
+
+
+hybrid_search_service = HybridSearchService()
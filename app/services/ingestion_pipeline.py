@@ -3,20 +3,93 @@ Ingestion 파이프라인: STT(선택) → Span Chunking → 병렬 Concept/Meta
 """
 
 import logging
+import time
 from pathlib import Path
-from typing import Any
+from typing import Any, Callable
 
+from sqlmodel import Session
+
+from app.core.config import settings
 from app.db.connection import get_session
 from app.db.repositories.ingestion_job import ingestion_job_repo
 from app.db.repositories.lecture_chunk import lecture_chunk_repo
-from app.services.chunking import chunk_by_max_chars
+from app.services.chunk_search import chunk_search_service
+from app.services.chunking import chunk_by_max_chars, chunk_by_semantic_breakpoints
 from app.services.embedding import embedding_service
 from app.services.extractors import extract_parallel
+from app.services.llm_usage import usage_context
+from app.services.metrics import JOBS, STAGE_SECONDS, timed_stage
+from app.services import profiling
+from app.services.quiz_bank import quiz_bank_service
 from app.services.stt import transcribe
+from app.services.tracing import continue_from, record_span, span
 
 logger = logging.getLogger(__name__)
 
 
+def transcript_from_payload(payload: dict[str, Any]) -> dict[str, Any]:
+    """transcript job payload에서 전사 JSON(segments 포함)을 꺼낸다."""
+    content_json = payload.get("transcript") or payload.get("content") or payload
+    if not isinstance(content_json, dict) or "segments" not in content_json:
+        raise ValueError("transcript job requires payload.transcript with segments")
+    return content_json
+
+
+def concept_hint_from_payload(payload: dict[str, Any]) -> str | None:
+    return (payload.get("concept_hint") or payload.get("lecture_title") or payload.get("concept") or "").strip() or None
+
+
+def chunk_transcript(
+    content_json: dict[str, Any],
+    embed_batch: Callable[[list[str]], list[list[float]]] | None = None,
+) -> list[dict[str, Any]]:
+    """
+    설정된 CHUNKING_STRATEGY로 전사를 청크로 나눈다.
+    semantic의 세그먼트 임베딩은 embed_batch(기본: 실시간 임베딩 API)로 구한다.
+    """
+    segments = content_json.get("segments") or []
+    if settings.CHUNKING_STRATEGY == "semantic":
+        chunks = chunk_by_semantic_breakpoints(
+            segments,
+            embed_batch or embedding_service.embed_batch,
+            max_chars=settings.CHUNK_MAX_CHARS,
+            breakpoint_percentile=settings.SEMANTIC_CHUNK_PERCENTILE,
+        )
+    else:
+        chunks = chunk_by_max_chars(segments, max_chars=settings.CHUNK_MAX_CHARS)
+    logger.info("Span chunking 완료 strategy=%s 청크 수=%d", settings.CHUNKING_STRATEGY, len(chunks))
+    return chunks
+
+
+def store_chunk(
+    session: Session,
+    *,
+    course_id: str,
+    lecture_id: str,
+    user_id: str,
+    chunk_index: int,
+    chunk: dict[str, Any],
+    concept: str | None,
+    metadata: dict[str, Any],
+    difficulty: str,
+    embedding: list[float],
+) -> None:
+    """청크 1개를 lecture_chunks(SQL) + lecture_chunk_vectors(Vector)에 저장."""
+    row = lecture_chunk_repo.insert(
+        session,
+        course_id=course_id,
+        lecture_id=lecture_id,
+        user_id=user_id,
+        chunk_index=chunk_index,
+        content={"text": chunk.get("text") or "", "start": chunk.get("start"), "end": chunk.get("end"), "segment_indices": chunk.get("segment_indices", [])},
+        concept=concept or None,
+        metadata_=metadata,
+        difficulty=difficulty,
+    )
+    if row.id is not None:
+        lecture_chunk_repo.insert_vector(session, row.id, embedding)
+
+
 def run_pipeline(job_id: int) -> None:
     """
     단일 ingestion job 실행: payload에 따라 STT 후 청킹 → 병렬 추출 → SQL + Vector 저장.
@@ -31,7 +104,25 @@ def run_pipeline(job_id: int) -> None:
         lecture_id = job.lecture_id
         user_id = job.user_id
         job_type = job.job_type
+        created_at = job.created_at
 
+    # 적재 때 payload에 넣은 trace를 이어받아, 큐 대기 구간과 job 처리 전체를 span으로 남긴다
+    # LLM 사용량(llm_usage)은 이 job에 귀속
+    with continue_from(payload), usage_context(job_type="ingestion", job_id=job_id, course_id=course_id, lecture_id=lecture_id):
+        if created_at is not None:
+            record_span("queue_wait", int(created_at.timestamp() * 1e9), time.time_ns(), job_id=job_id)
+        with span("ingestion.job", job_id=job_id, course_id=course_id, lecture_id=lecture_id, job_type=job_type):
+            if profiling.job_selected(job_id, payload):
+                with profiling.profile("ingestion-job", job_id, course_id=course_id, lecture_id=lecture_id, job_type=job_type):
+                    _process_job(job_id, payload, course_id, lecture_id, user_id, job_type)
+            else:
+                _process_job(job_id, payload, course_id, lecture_id, user_id, job_type)
+
+
+def _process_job(
+    job_id: int, payload: dict[str, Any], course_id: str, lecture_id: str, user_id: str, job_type: str
+) -> None:
+    t_job = time.perf_counter()
     try:
 
         if job_type == "audio":
@@ -42,20 +133,18 @@ def run_pipeline(job_id: int) -> None:
             if not path.exists():
                 raise FileNotFoundError(f"Audio file not found: {path}")
             logger.info("STT 실행 중 path=%s", path)
-            content_json = transcribe(path)
+            with timed_stage("stt"):
+                content_json = transcribe(path)
         else:
-            content_json = payload.get("transcript") or payload.get("content") or payload
-            if not isinstance(content_json, dict) or "segments" not in content_json:
-                raise ValueError("transcript job requires payload.transcript with segments")
+            content_json = transcript_from_payload(payload)
 
-        segments = content_json.get("segments") or []
-        chunks = chunk_by_max_chars(segments, max_chars=1500)
-        logger.info("Span chunking 완료 청크 수=%d", len(chunks))
+        with timed_stage("chunking"):
+            chunks = chunk_transcript(content_json)
 
-        with get_session() as session:
+        with timed_stage("db_write"), get_session() as session:
             lecture_chunk_repo.delete_by_lecture(session, course_id, lecture_id, user_id)
 
-        concept_hint = (payload.get("concept_hint") or payload.get("lecture_title") or payload.get("concept") or "").strip() or None
+        concept_hint = concept_hint_from_payload(payload)
         if concept_hint:
             logger.info("강사 제목(concept_hint) 사용·검증: %s", concept_hint[:50])
 
@@ -63,28 +152,36 @@ def run_pipeline(job_id: int) -> None:
             text = ch.get("text") or ""
             if not text.strip():
                 continue
-            concept, metadata, difficulty = extract_parallel(text, concept_hint=concept_hint)
-            embedding = embedding_service.embed(text)
-            with get_session() as session:
-                row = lecture_chunk_repo.insert(
-                    session,
-                    course_id=course_id,
-                    lecture_id=lecture_id,
-                    user_id=user_id,
-                    chunk_index=idx,
-                    content={"text": text, "start": ch.get("start"), "end": ch.get("end"), "segment_indices": ch.get("segment_indices", [])},
-                    concept=concept or None,
-                    metadata_=metadata,
-                    difficulty=difficulty,
-                )
-                if row.id is not None:
-                    lecture_chunk_repo.insert_vector(session, row.id, embedding)
+            # 어느 청크가 느렸는지 보이도록 청크마다 span
+            with span("chunk", chunk_index=idx, chars=len(text)):
+                concept, metadata, difficulty = extract_parallel(text, concept_hint=concept_hint)
+                embedding = embedding_service.embed(text)
+                with timed_stage("db_write"), get_session() as session:
+                    store_chunk(
+                        session,
+                        course_id=course_id,
+                        lecture_id=lecture_id,
+                        user_id=user_id,
+                        chunk_index=idx,
+                        chunk=ch,
+                        concept=concept,
+                        metadata=metadata,
+                        difficulty=difficulty,
+                        embedding=embedding,
+                    )
 
+        # 이 강좌의 캐시된 청크 검색 결과는 이제 낡음 (다른 프로세스 캐시는 TTL로 갱신)
+        chunk_search_service.clear_cache(course_id)
         with get_session() as session:
             ingestion_job_repo.mark_done(session, job_id)
         logger.info("Ingestion 완료 job_id=%s", job_id)
+        JOBS.inc(queue="ingestion", status="done")
+        STAGE_SECONDS.observe(time.perf_counter() - t_job, stage="ingestion_job")
+        # 출제 근거(청크)가 바뀌었으므로 문항 은행을 다시 채운다
+        quiz_bank_service.on_lecture_updated(course_id, lecture_id, user_id)
     except Exception as e:
         logger.exception("Ingestion 실패 job_id=%s", job_id)
         with get_session() as session:
             ingestion_job_repo.mark_failed(session, job_id, str(e))
+        JOBS.inc(queue="ingestion", status="failed")
         raise
@@ -0,0 +1,95 @@
+"""
+스트리밍 JSON 증분 파서: {"questions": [ {...}, {...} ]} 형태 응답이 토큰 단위로 들어올 때
+배열 원소(객체)가 닫히는 즉시 하나씩 꺼낸다. 전체 응답이 끝날 때까지 기다리지 않는다.
+"""
+
+import json
+import re
+from typing import Any
+
+_ARRAY_START = re.compile(r'"(?P<key>[^"\\]+)"\s*:\s*\[')
+
+
+class JsonArrayStreamParser:
+    """
+    feed(text)로 조각을 넣으면, key 배열 안에서 완성된 객체를 dict로 반환한다.
+    문자열 안의 괄호·이스케이프는 무시한다. 파싱에 실패한 원소는 errors에 원문을 남기고 건너뛴다.
+    """
+
+    def __init__(self, key: str = "questions") -> None:
+        self.key = key
+        self.errors: list[str] = []
+        self._buf = ""
+        self._pos = 0  # _buf에서 다음에 볼 위치
+        self._in_array = False
+        self._done = False
+        self._depth = 0  # 배열 안 객체 중첩 깊이 (0이면 원소 사이)
+        self._in_string = False
+        self._escape = False
+        self._item_start = -1
+
+    @property
+    def done(self) -> bool:
+        """배열이 닫혔으면 True."""
+        return self._done
+
+    def feed(self, text: str) -> list[dict[str, Any]]:
+        if self._done or not text:
+            return []
+        self._buf += text
+        if not self._in_array:
+            self._find_array()
+            if not self._in_array:
+                return []
+        items: list[dict[str, Any]] = []
+        buf = self._buf
+        i = self._pos
+        while i < len(buf):
+            c = buf[i]
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif c == "\\":
+                    self._escape = True
+                elif c == '"':
+                    self._in_string = False
+            elif c == '"':
+                self._in_string = True
+            elif c in "{[":
+                if self._depth == 0:
+                    self._item_start = i
+                self._depth += 1
+            elif c in "}]":
+                if self._depth == 0 and c == "]":
+                    self._done = True
+                    i += 1
+                    break
+                self._depth -= 1
+                if self._depth == 0:
+                    raw = buf[self._item_start : i + 1]
+                    try:
+                        item = json.loads(raw)
+                    except ValueError:
+                        self.errors.append(raw)
+                    else:
+                        if isinstance(item, dict):
+                            items.append(item)
+                        else:
+                            self.errors.append(raw)
+                    self._item_start = -1
+            i += 1
+        # 처리 끝난 앞부분은 버려 버퍼가 응답 길이만큼 커지지 않게 한다
+        keep_from = self._item_start if self._item_start >= 0 else i
+        self._buf = buf[keep_from:]
+        self._pos = i - keep_from
+        if self._item_start >= 0:
+            self._item_start = 0
+        return items
+
+    def _find_array(self) -> None:
+        for m in _ARRAY_START.finditer(self._buf):
+            if m.group("key") == self.key:
+                self._in_array = True
+                self._buf = self._buf[m.end() :]
+                self._pos = 0
+                return
@@ -2,23 +2,53 @@
 전사 JSON + 요약문 임베딩을 DB에 저장하는 오케스트레이션.
 """
 
+import hashlib
+import json
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from typing import Any
 
+from app.core.config import settings
 from app.db.connection import get_session
 
 logger = logging.getLogger(__name__)
+from app.db.repositories.lecture_chunk import lecture_chunk_repo
 from app.db.repositories.lecture_summary_embeddings import (
     LectureSummaryEmbeddingRow,
     lecture_summary_embeddings_repo,
 )
 from app.services.embedding import embedding_service
+from app.services.llm_usage import usage_scope
+from app.services.quiz_bank import quiz_bank_service
 from app.services.summary import summary_service
+from app.services.tracing import wrap
+from app.services.vector_index import summary_vector_index
+
+
+def content_sha256(content_json: dict[str, Any]) -> str:
+    """전사 JSON 내용 해시 (키 순서 무관). metadata.content_sha256으로 저장해 같은 전사 재처리를 건너뛴다."""
+    raw = json.dumps(content_json, ensure_ascii=False, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def text_sha256(text: str) -> str:
+    """청크 본문 해시. 저장된 청크 요약은 이 값이 같을 때만 재사용한다."""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def _same_transcript(chunk_texts: list[str], content_json: dict[str, Any]) -> bool:
+    """저장된 청크들이 이 전사에서 나온 것인지 (공백을 빼고 본문을 이어 붙여 비교)."""
+    segments = content_json.get("segments") or []
+    transcript = "".join(
+        "".join(str(seg.get("text") or "").split()) for seg in segments if isinstance(seg, dict)
+    )
+    return transcript == "".join("".join(t.split()) for t in chunk_texts)
 
 
 class LectureStoreService:
     """강의 전사(content) + 요약 임베딩을 lecture_summary_embeddings에 저장."""
 
+    @usage_scope
     def store(
         self,
         course_id: str,
@@ -31,17 +61,20 @@ class LectureStoreService:
         course_title: str | None = None,
         section_title: str | None = None,
         lecture_title: str | None = None,
+        summary_mode: str | None = None,
     ) -> str:
-        """저장 후 사용된 요약문을 반환한다."""
+        """저장 후 사용된 요약문을 반환한다. summary_mode: "truncate" | "map_reduce" (None이면 설정값)."""
         if summary is None or not summary.strip():
-            logger.info("요약 없음 → LLM 요약 생성 중")
-            summary = summary_service.summarize(
+            summary = self.summarize(
+                course_id,
+                lecture_id,
+                user_id,
                 content_json,
                 course_title=course_title,
                 section_title=section_title,
                 lecture_title=lecture_title,
+                summary_mode=summary_mode,
             )
-            logger.info("요약 생성 완료 (길이=%d)", len(summary))
         summary = summary or ""
         logger.info("임베딩 생성 중")
         embedding = embedding_service.embed(summary)
@@ -53,10 +86,156 @@ class LectureStoreService:
             content=content_json,
             summary=summary,
             embedding=embedding,
-            metadata=metadata or {},
+            metadata={**(metadata or {}), "content_sha256": content_sha256(content_json)},
         )
         with get_session() as session:
             lecture_summary_embeddings_repo.upsert(session, row)
+        summary_vector_index.on_upsert(course_id, user_id, lecture_id, summary, embedding)
+        quiz_bank_service.on_lecture_updated(course_id, lecture_id, user_id)
+        return summary
+
+    @usage_scope
+    def summarize(
+        self,
+        course_id: str,
+        lecture_id: str,
+        user_id: str,
+        content_json: dict[str, Any],
+        *,
+        course_title: str | None = None,
+        section_title: str | None = None,
+        lecture_title: str | None = None,
+        summary_mode: str | None = None,
+    ) -> str:
+        """전사에서 요약 생성 (summary_mode: "truncate" | "map_reduce", None이면 설정값)."""
+        mode = summary_mode or settings.SUMMARY_MODE
+        logger.info("요약 없음 → LLM 요약 생성 중 (mode=%s)", mode)
+        if mode == "map_reduce":
+            summary = self._summarize_map_reduce(
+                course_id,
+                lecture_id,
+                user_id,
+                content_json,
+                course_title=course_title,
+                section_title=section_title,
+                lecture_title=lecture_title,
+            )
+        else:
+            summary = summary_service.summarize(
+                content_json,
+                course_title=course_title,
+                section_title=section_title,
+                lecture_title=lecture_title,
+                mode=mode,
+            )
+        logger.info("요약 생성 완료 (길이=%d)", len(summary))
+        return summary
+
+    def store_many(
+        self,
+        course_id: str,
+        user_id: str,
+        lectures: list[tuple[str, dict[str, Any]]],
+        *,
+        course_title: str | None = None,
+        section_title: str | None = None,
+        summary_mode: str | None = None,
+        concurrency: int | None = None,
+    ) -> tuple[dict[str, str], dict[str, Exception]]:
+        """
+        여러 강의 (lecture_id, 전사 JSON)를 한 번에 저장: 요약은 concurrency개 동시 생성, 임베딩은 1회 배치 호출,
+        upsert는 1회 commit. (lecture_id → 저장한 요약문, lecture_id → 요약 실패 예외) 반환. 실패 강의는 저장하지 않는다.
+        """
+        workers = max(1, min(len(lectures), concurrency or settings.STORE_BULK_CONCURRENCY))
+        with ThreadPoolExecutor(max_workers=workers) as ex:
+            futures = [
+                (
+                    lecture_id,
+                    content_json,
+                    ex.submit(
+                        wrap(self.summarize),
+                        course_id,
+                        lecture_id,
+                        user_id,
+                        content_json,
+                        course_title=course_title,
+                        section_title=section_title,
+                        summary_mode=summary_mode,
+                    ),
+                )
+                for lecture_id, content_json in lectures
+            ]
+        summaries: dict[str, str] = {}
+        failed: dict[str, Exception] = {}
+        ok: list[tuple[str, dict[str, Any]]] = []
+        for lecture_id, content_json, future in futures:
+            try:
+                summaries[lecture_id] = future.result() or ""
+                ok.append((lecture_id, content_json))
+            except Exception as e:
+                logger.warning("요약 실패 lecture_id=%s: %s", lecture_id, e)
+                failed[lecture_id] = e
+        if not ok:
+            return summaries, failed
+        embeddings = embedding_service.embed_batch([summaries[lid] for lid, _ in ok])
+        rows = [
+            LectureSummaryEmbeddingRow(
+                course_id=course_id,
+                lecture_id=lid,
+                user_id=user_id,
+                content=content,
+                summary=summaries[lid],
+                embedding=embedding,
+                metadata={"content_sha256": content_sha256(content)},
+            )
+            for (lid, content), embedding in zip(ok, embeddings)
+        ]
+        with get_session() as session:
+            lecture_summary_embeddings_repo.upsert_many(session, rows)
+        for row in rows:
+            summary_vector_index.on_upsert(course_id, user_id, row.lecture_id, row.summary or "", row.embedding)
+            quiz_bank_service.on_lecture_updated(course_id, row.lecture_id, user_id)
+        logger.info("일괄 저장 완료 %d건 (요약 실패 %d건)", len(rows), len(failed))
+        return summaries, failed
+
+    def _summarize_map_reduce(
+        self,
+        course_id: str,
+        lecture_id: str,
+        user_id: str,
+        content_json: dict[str, Any],
+        **titles: str | None,
+    ) -> str:
+        """
+        ingestion으로 저장된 lecture_chunks가 이 전사에서 나온 것이면 그 청크 경계를 쓰고, 저장된 청크 요약
+        (metadata.summary)은 요약할 때의 본문 해시(metadata.summary_sha256)가 지금 본문과 같을 때만 재사용한다.
+        새로 만든 청크 요약은 본문 해시와 함께 저장해 다음 재요약 때 재사용한다.
+        """
+        with get_session() as session:
+            rows = lecture_chunk_repo.get_by_lecture(session, course_id, lecture_id, user_id)
+            stored = []
+            for r in rows:
+                text = (r.content or {}).get("text") or ""
+                meta = r.metadata_ or {}
+                fresh = meta.get("summary_sha256") == text_sha256(text)
+                stored.append({"id": r.id, "text": text, "summary": meta.get("summary") if fresh else None})
+        if stored and not _same_transcript([ch["text"] for ch in stored], content_json):
+            logger.info("저장된 청크가 이 전사와 달라 (재업로드 등) 전사를 새로 나눠 요약")
+            stored = []
+        if not stored:
+            summary, _ = summary_service.summarize_map_reduce(content_json, **titles)
+            return summary
+
+        logger.info("저장된 청크 %d개 기준 map-reduce 요약", len(stored))
+        summary, partials = summary_service.summarize_map_reduce(content_json, chunks=stored, **titles)
+        new_summaries = {
+            ch["id"]: (part, text_sha256(ch["text"]))
+            for ch, part in zip(stored, partials)
+            if ch["id"] is not None and part and not ch["summary"]
+        }
+        if new_summaries:
+            with get_session() as session:
+                lecture_chunk_repo.set_summaries(session, new_summaries)
         return summary
 
 
@@ -0,0 +1,184 @@
+"""
+OpenAI 호출 공통 진입점.
+- chat: 응답 캐시(llm_cache)를 거쳐 본문 텍스트만 반환
+- chat·embedding·transcription 모두 rate_limiter 한도(RPM/TPM, 동시성) 안에서 호출
+- 일시적 오류는 resilient_caller가 재시도(지수 백오프)·서킷 브레이커로 처리 (SDK 자체 재시도는 끄고 여기로 모음)
+- 실제 API 호출(캐시 적중 제외)의 지연과 usage 토큰은 metrics와 llm_usage 테이블(job·요청별 회계)에 기록하고,
+  트레이싱이 켜져 있으면 span으로도 남김
+"""
+
+import logging
+import time
+from functools import lru_cache
+from typing import TYPE_CHECKING, Any, Iterator
+
+from app.core.config import settings
+from app.services.llm_cache import llm_cache, make_cache_key
+from app.services.llm_usage import llm_usage_recorder
+from app.services.metrics import record_llm_usage
+from app.services.rate_limiter import estimate_chat_tokens, estimate_embedding_tokens, rate_limiter
+from app.services.resilience import resilient_caller
+from app.services.tracing import record_span, span, usage_attributes
+
+if TYPE_CHECKING:
+    from openai import OpenAI
+
+logger = logging.getLogger(__name__)
+
+
+@lru_cache(maxsize=1)
+def openai_client() -> "OpenAI":
+    """
+    프로세스 공용 OpenAI 클라이언트 (연결 풀 공유). 첫 호출 때 SDK를 import하고 만든다
+    — import나 CLI --help만으로는 SDK 로드 비용도, OPENAI_API_KEY도 필요 없다.
+    """
+    if not settings.OPENAI_API_KEY:
+        raise RuntimeError("OPENAI_API_KEY가 설정되지 않았습니다.")
+    from openai import OpenAI
+
+    return OpenAI(
+        api_key=settings.OPENAI_API_KEY,
+        base_url=settings.OPENAI_BASE_URL,
+        timeout=settings.REQUEST_TIMEOUT,
+        max_retries=0,
+    )
+
+
+def chat_completion(
+    client: "OpenAI",
+    *,
+    messages: list[dict[str, Any]],
+    model: str | None = None,
+    temperature: float | None = None,
+    response_format: dict[str, Any] | None = None,
+    max_tokens: int | None = None,
+    cache: bool = True,
+    name: str = "default",
+    hedge: bool = False,
+) -> str:
+    """
+    chat.completions.create 호출 후 message.content 반환 (None이면 빈 문자열).
+    cache=False면 캐시를 읽지도 쓰지도 않는다 (호출 지점별 opt-out, 예: 다양성이 필요한 퀴즈 생성).
+    name: 캐시 통계를 나눠 볼 호출 지점 이름.
+    hedge=True면 LLM_HEDGE_AFTER_SEC 안에 응답이 없을 때 같은 요청을 한 번 더 보낸다 (짧은 멱등 호출용).
+    max_tokens를 주면 API에 그대로 넘기고, TPM 한도 추정에도 출력 추정치 대신 쓴다.
+    """
+    model = model or settings.OPENAI_MODEL
+    if temperature is None:
+        temperature = settings.OPENAI_TEMPERATURE
+    use_cache = cache and settings.LLM_CACHE_ENABLED
+    key = make_cache_key(model, temperature, messages, response_format, max_tokens) if use_cache else None
+    if key is not None:
+        cached = llm_cache.get(key, name=name)
+        if cached is not None:
+            logger.debug("LLM 캐시 적중 name=%s", name)
+            return cached
+
+    kwargs: dict[str, Any] = {"model": model, "temperature": temperature, "messages": messages}
+    if response_format is not None:
+        kwargs["response_format"] = response_format
+    if max_tokens is not None:
+        kwargs["max_tokens"] = max_tokens
+    tokens = estimate_chat_tokens(messages, model, max_tokens)
+
+    def call() -> Any:
+        with rate_limiter.slot("chat", tokens):
+            return client.chat.completions.create(**kwargs)
+
+    t0 = time.perf_counter()
+    with span("llm.chat", **{"llm.model": model, "llm.call_site": name}) as sp:
+        response = resilient_caller.call("chat", call, hedge_after=_hedge_after(hedge))
+        sp.set(**usage_attributes(response))
+    elapsed = time.perf_counter() - t0
+    record_llm_usage("chat", name, model, response, elapsed)
+    llm_usage_recorder.record("chat", name, model, response, elapsed)
+    content = response.choices[0].message.content or ""
+    if key is not None and content:
+        llm_cache.set(key, content, name=name)
+    return content
+
+
+def chat_completion_stream(
+    client: "OpenAI",
+    *,
+    messages: list[dict[str, Any]],
+    model: str | None = None,
+    temperature: float | None = None,
+    response_format: dict[str, Any] | None = None,
+    max_tokens: int | None = None,
+) -> Iterator[str]:
+    """
+    stream=True로 호출해 content 조각을 도착 순서대로 yield (캐시 없음).
+    stream_options.include_usage로 마지막 이벤트(choices 없음)에 토큰 사용량을 받아 기록한다.
+    재시도는 스트림을 여는 단계까지만 (조각을 내보낸 뒤에는 다시 보내면 중복되므로 오류를 그대로 전파).
+    한도 슬롯은 스트림이 끝날 때까지 잡고 있는다.
+    """
+    kwargs: dict[str, Any] = {
+        "model": model or settings.OPENAI_MODEL,
+        "temperature": settings.OPENAI_TEMPERATURE if temperature is None else temperature,
+        "messages": messages,
+        "stream": True,
+        "stream_options": {"include_usage": True},
+    }
+    if response_format is not None:
+        kwargs["response_format"] = response_format
+    if max_tokens is not None:
+        kwargs["max_tokens"] = max_tokens
+    t0 = time.perf_counter()
+    start_ns = time.time_ns()
+    last_event: Any = None
+    with rate_limiter.slot("chat", estimate_chat_tokens(messages, kwargs["model"], max_tokens)):
+        stream = resilient_caller.call("chat", lambda: client.chat.completions.create(**kwargs))
+        for event in stream:
+            last_event = event
+            if event.choices and event.choices[0].delta.content:
+                yield event.choices[0].delta.content
+    # usage는 마지막 이벤트에 온다 (include_usage를 지원하지 않는 호환 서버면 없음 → 지연만 기록).
+    # 제너레이터는 yield 사이에 다른 context에서 재개될 수 있어 span은 끝난 뒤 구간으로 남긴다
+    elapsed = time.perf_counter() - t0
+    record_llm_usage("chat", "stream", kwargs["model"], last_event, elapsed)
+    llm_usage_recorder.record("chat", "stream", kwargs["model"], last_event, elapsed)
+    record_span("llm.chat_stream", start_ns, time.time_ns(), **{"llm.model": kwargs["model"]}, **usage_attributes(last_event))
+
+
+def create_embeddings(
+    client: "OpenAI", *, model: str, input: str | list[str], dimensions: int, hedge: bool = False
+) -> Any:
+    """embeddings.create 응답 그대로 반환 (입력 토큰 수만큼 TPM 차감)."""
+    tokens = estimate_embedding_tokens(input)
+
+    def call() -> Any:
+        with rate_limiter.slot("embedding", tokens):
+            return client.embeddings.create(model=model, input=input, dimensions=dimensions)
+
+    t0 = time.perf_counter()
+    with span("llm.embedding", **{"llm.model": model, "llm.inputs": 1 if isinstance(input, str) else len(input)}) as sp:
+        response = resilient_caller.call("embedding", call, hedge_after=_hedge_after(hedge))
+        sp.set(**usage_attributes(response))
+    elapsed = time.perf_counter() - t0
+    record_llm_usage("embedding", "embedding", model, response, elapsed)
+    llm_usage_recorder.record("embedding", "embedding", model, response, elapsed)
+    return response
+
+
+def create_transcription(client: "OpenAI", **kwargs: Any) -> Any:
+    """audio.transcriptions.create 응답 그대로 반환 (RPM만 적용, 헤지 없음)."""
+    audio = kwargs.get("file")
+
+    def call() -> Any:
+        if hasattr(audio, "seek"):
+            audio.seek(0)  # 재시도 시 파일을 처음부터 다시 보낸다
+        with rate_limiter.slot("transcription"):
+            return client.audio.transcriptions.create(**kwargs)
+
+    t0 = time.perf_counter()
+    with span("llm.transcription", **{"llm.model": kwargs.get("model")}):
+        response = resilient_caller.call("transcription", call)
+    elapsed = time.perf_counter() - t0
+    record_llm_usage("transcription", "stt", str(kwargs.get("model") or ""), response, elapsed)
+    llm_usage_recorder.record("transcription", "stt", str(kwargs.get("model") or ""), response, elapsed)
+    return response
+
+
+def _hedge_after(hedge: bool) -> float | None:
+    return settings.LLM_HEDGE_AFTER_SEC if hedge and settings.LLM_HEDGE_AFTER_SEC > 0 else None
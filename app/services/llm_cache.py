@@ -0,0 +1,174 @@
+"""
+LLM 응답 캐시: (model, temperature, messages, response_format) 해시 → 응답 텍스트.
+- 1단계: 프로세스 내 LRU (LLM_CACHE_MEMORY_SIZE)
+- 2단계: 로컬 SQLite (LLM_CACHE_PATH). TTL 지난 항목은 무시·정리, LLM_CACHE_MAX_ENTRIES 초과 시 오래 안 쓴 것부터 삭제.
+재수집·재시도·테스트에서 같은 입력으로 요약·추출·검증을 다시 돌릴 때 API 호출을 건너뛴다.
+"""
+
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# 저장 N회마다 TTL·크기 정리
+_EVICT_EVERY = 100
+
+
+def make_cache_key(
+    model: str,
+    temperature: float | None,
+    messages: list[dict[str, Any]],
+    response_format: dict[str, Any] | None = None,
+    max_tokens: int | None = None,
+) -> str:
+    request: dict[str, Any] = {
+        "model": model,
+        "temperature": temperature,
+        "messages": messages,
+        "response_format": response_format,
+    }
+    if max_tokens is not None:  # 지정한 경우만 넣어 기존 키 유지
+        request["max_tokens"] = max_tokens
+    payload = json.dumps(request, ensure_ascii=False, sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class LLMResponseCache:
+    """메모리 LRU + SQLite 2단계 캐시. 스레드 안전."""
+
+    def __init__(
+        self,
+        path: str | None = None,
+        memory_size: int | None = None,
+        ttl_sec: float | None = None,
+        max_entries: int | None = None,
+    ) -> None:
+        self._path = path if path is not None else settings.LLM_CACHE_PATH
+        self._memory_size = memory_size if memory_size is not None else settings.LLM_CACHE_MEMORY_SIZE
+        self._ttl_sec = ttl_sec if ttl_sec is not None else settings.LLM_CACHE_TTL_SEC
+        self._max_entries = max_entries if max_entries is not None else settings.LLM_CACHE_MAX_ENTRIES
+        self._memory: OrderedDict[str, tuple[float, str]] = OrderedDict()
+        self._lock = threading.Lock()
+        self._conn: sqlite3.Connection | None = None
+        self._sets = 0
+        self._stats: dict[str, dict[str, int]] = {}
+
+    def get(self, key: str, name: str = "default") -> str | None:
+        now = time.time()
+        with self._lock:
+            item = self._memory.get(key)
+            if item is not None and now - item[0] < self._ttl_sec:
+                self._memory.move_to_end(key)
+                self._count(name, "memory_hits")
+                return item[1]
+            conn = self._connect()
+            if conn is not None:
+                row = conn.execute(
+                    "SELECT value, created_at FROM llm_cache WHERE key = ? AND created_at > ?",
+                    (key, now - self._ttl_sec),
+                ).fetchone()
+                if row is not None:
+                    conn.execute("UPDATE llm_cache SET accessed_at = ? WHERE key = ?", (now, key))
+                    conn.commit()
+                    self._remember(key, row[1], row[0])
+                    self._count(name, "disk_hits")
+                    return row[0]
+            self._count(name, "misses")
+            return None
+
+    def set(self, key: str, value: str, name: str = "default") -> None:
+        now = time.time()
+        with self._lock:
+            self._remember(key, now, value)
+            self._count(name, "stores")
+            conn = self._connect()
+            if conn is None:
+                return
+            conn.execute(
+                "INSERT OR REPLACE INTO llm_cache (key, value, created_at, accessed_at) VALUES (?, ?, ?, ?)",
+                (key, value, now, now),
+            )
+            conn.commit()
+            self._sets += 1
+            if self._sets % _EVICT_EVERY == 0:
+                self._evict(now)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._memory.clear()
+            conn = self._connect()
+            if conn is not None:
+                conn.execute("DELETE FROM llm_cache")
+                conn.commit()
+
+    def stats(self) -> dict[str, Any]:
+        """호출 지점(name)별 memory_hits / disk_hits / misses / stores 와 합계."""
+        with self._lock:
+            by_name = {k: dict(v) for k, v in self._stats.items()}
+            memory_entries = len(self._memory)
+        total: dict[str, int] = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "stores": 0}
+        for counts in by_name.values():
+            for k, v in counts.items():
+                total[k] = total.get(k, 0) + v
+        lookups = total["memory_hits"] + total["disk_hits"] + total["misses"]
+        hits = total["memory_hits"] + total["disk_hits"]
+        return {
+            "enabled": settings.LLM_CACHE_ENABLED,
+            "memory_entries": memory_entries,
+            "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+            "total": total,
+            "by_call_site": by_name,
+        }
+
+    def _count(self, name: str, field: str) -> None:
+        counts = self._stats.setdefault(name, {"memory_hits": 0, "disk_hits": 0, "misses": 0, "stores": 0})
+        counts[field] += 1
+
+    def _remember(self, key: str, created_at: float, value: str) -> None:
+        if self._memory_size <= 0:
+            return
+        self._memory[key] = (created_at, value)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self._memory_size:
+            self._memory.popitem(last=False)
+
+    def _connect(self) -> sqlite3.Connection | None:
+        if not self._path:
+            return None
+        if self._conn is None:
+            Path(self._path).parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(self._path, check_same_thread=False)
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS llm_cache ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, created_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_llm_cache_accessed ON llm_cache (accessed_at)")
+            self._conn.commit()
+        return self._conn
+
+    def _evict(self, now: float) -> None:
+        conn = self._conn
+        if conn is None:
+            return
+        expired = conn.execute("DELETE FROM llm_cache WHERE created_at <= ?", (now - self._ttl_sec,)).rowcount
+        overflow = conn.execute("SELECT COUNT(*) FROM llm_cache").fetchone()[0] - self._max_entries
+        if overflow > 0:
+            conn.execute(
+                "DELETE FROM llm_cache WHERE key IN (SELECT key FROM llm_cache ORDER BY accessed_at ASC LIMIT ?)",
+                (overflow,),
+            )
+        conn.commit()
+        if expired or overflow > 0:
+            logger.info("LLM 캐시 정리: 만료 %d건, 용량 초과 %d건 삭제", expired, max(overflow, 0))
+
+
+llm_cache = LLMResponseCache()
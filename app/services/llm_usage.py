@@ -0,0 +1,179 @@
+"""
+LLM 사용량 회계: 모든 OpenAI 호출(chat·embedding·transcription)의 토큰·지연·모델을 job/요청 id와 함께 llm_usage 테이블에 기록.
+- 누구의 호출인지는 contextvar로 전달: run_pipeline·run_quiz_job(job), API 미들웨어(요청 id), 서비스 진입점(course·lecture),
+  timed_stage(단계). 스레드 풀에는 tracing.wrap으로 같이 넘어간다.
+- 쓰기는 BackgroundBatcher가 묶어서 한 번에 INSERT (호출 경로는 큐에 넣기만). LLM_USAGE_ENABLED=false면 기록 안 함.
+- 비용은 저장하지 않고 리포트(python -m app.llm_usage_report) 때 단가표(DEFAULT_PRICES + LLM_PRICES)로 계산.
+"""
+
+import contextvars
+import functools
+import inspect
+from collections import defaultdict
+from contextlib import contextmanager
+from typing import Any, Callable, Generator, Iterator, TypeVar
+
+from app.core.config import settings
+from app.services.batcher import BackgroundBatcher
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+# 모델별 USD / 1M 토큰 (입력, 캐시 입력, 출력). 접두사가 가장 긴 항목을 쓰므로 날짜 붙은 스냅샷 이름도 맞는다.
+# 전사 모델은 오디오 입력 단가, whisper-1은 분 단위 과금이라 토큰이 없어 0으로 잡힌다.
+DEFAULT_PRICES: dict[str, tuple[float, float, float]] = {
+    "gpt-4o-mini": (0.15, 0.075, 0.60),
+    "gpt-4o": (2.50, 1.25, 10.00),
+    "gpt-4.1-nano": (0.10, 0.025, 0.40),
+    "gpt-4.1-mini": (0.40, 0.10, 1.60),
+    "gpt-4.1": (2.00, 0.50, 8.00),
+    "gpt-4o-mini-transcribe": (3.00, 3.00, 5.00),
+    "gpt-4o-transcribe": (6.00, 6.00, 10.00),
+    "text-embedding-3-small": (0.02, 0.02, 0.0),
+    "text-embedding-3-large": (0.13, 0.13, 0.0),
+}
+
+_context: contextvars.ContextVar[dict[str, Any]] = contextvars.ContextVar("llm_usage_context", default={})
+
+
+@contextmanager
+def usage_context(**fields: Any) -> Iterator[None]:
+    """블록 안의 LLM 호출에 job_type·job_id·course_id·lecture_id·stage를 붙인다 (None은 무시, 안쪽 값이 우선)."""
+    token = _context.set({**_context.get(), **{k: v for k, v in fields.items() if v is not None}})
+    try:
+        yield
+    finally:
+        _context.reset(token)
+
+
+def _scoped_iteration(gen: Generator[Any, Any, Any], fields: dict[str, Any]) -> Iterator[Any]:
+    """
+    지연 제너레이터의 한 단계(next·close)마다 usage_context를 다시 건다.
+    yield를 사이에 두고 컨텍스트를 열어 두지 않으므로, SSE처럼 next마다 다른 스레드·컨텍스트에서 돌려도 된다.
+    """
+    try:
+        while True:
+            with usage_context(**fields):
+                try:
+                    item = next(gen)
+                except StopIteration:
+                    return
+            yield item
+    finally:
+        with usage_context(**fields):
+            gen.close()
+
+
+def usage_scope(fn: F) -> F:
+    """
+    course_id·lecture_id 인자를 받는 서비스 진입점용: 그 값을 usage_context로 건다 (API 요청의 강좌 귀속).
+    제너레이터를 반환하면(generate_stream·generate_course) 반환 뒤 이터레이션 중의 호출에도 같은 값을 붙인다.
+    """
+    signature = inspect.signature(fn)
+
+    @functools.wraps(fn)
+    def wrapper(*args: Any, **kwargs: Any) -> Any:
+        bound = signature.bind_partial(*args, **kwargs).arguments
+        fields = {"course_id": bound.get("course_id"), "lecture_id": bound.get("lecture_id")}
+        with usage_context(**fields):
+            result = fn(*args, **kwargs)
+        if inspect.isgenerator(result):
+            return _scoped_iteration(result, fields)
+        return result
+
+    return wrapper  # type: ignore[return-value]
+
+
+def usage_tokens(response: Any) -> tuple[int, int, int]:
+    """응답 usage → (prompt, completion, cached). 전사 응답의 input_tokens/output_tokens도 읽는다."""
+    usage = getattr(response, "usage", None)
+    if usage is None:
+        return 0, 0, 0
+    prompt = getattr(usage, "prompt_tokens", None) or getattr(usage, "input_tokens", None) or 0
+    completion = getattr(usage, "completion_tokens", None) or getattr(usage, "output_tokens", None) or 0
+    cached = getattr(getattr(usage, "prompt_tokens_details", None), "cached_tokens", None) or 0
+    return int(prompt), int(completion), int(cached)
+
+
+def price_for(model: str, prices: dict[str, Any]) -> tuple[float, float, float]:
+    match = max((name for name in prices if model.startswith(name)), key=len, default=None)
+    if match is None:
+        return 0.0, 0.0, 0.0
+    return tuple(float(p) for p in prices[match])  # type: ignore[return-value]
+
+
+def cost_usd(model: str, prompt: int, completion: int, cached: int, prices: dict[str, Any]) -> float:
+    """prompt_tokens에는 cached가 포함되어 있으므로 캐시분만 캐시 단가로."""
+    input_price, cached_price, output_price = price_for(model, prices)
+    return ((prompt - cached) * input_price + cached * cached_price + completion * output_price) / 1_000_000
+
+
+def aggregate(rows: list[dict[str, Any]], group_by: list[str], prices: dict[str, Any]) -> list[dict[str, Any]]:
+    """repo.totals() 행(group_by + model별)을 group_by로 다시 묶고 비용·평균 지연을 붙인다. 비용 내림차순."""
+    groups: dict[tuple, dict[str, Any]] = defaultdict(
+        lambda: {"calls": 0, "prompt_tokens": 0, "completion_tokens": 0, "cached_tokens": 0, "cost_usd": 0.0, "latency_ms": 0, "max_latency_ms": 0}
+    )
+    for row in rows:
+        key = tuple(row.get(c) for c in group_by)
+        g = groups[key]
+        prompt, completion, cached = int(row["prompt_tokens"] or 0), int(row["completion_tokens"] or 0), int(row["cached_tokens"] or 0)
+        g["calls"] += int(row["calls"])
+        g["prompt_tokens"] += prompt
+        g["completion_tokens"] += completion
+        g["cached_tokens"] += cached
+        g["cost_usd"] += cost_usd(row["model"], prompt, completion, cached, prices)
+        g["latency_ms"] += int(row["latency_ms"] or 0)
+        g["max_latency_ms"] = max(g["max_latency_ms"], int(row["max_latency_ms"] or 0))
+    out = []
+    for key, g in groups.items():
+        total_ms = g.pop("latency_ms")
+        out.append(
+            {
+                **dict(zip(group_by, key)),
+                **g,
+                "cost_usd": round(g["cost_usd"], 6),
+                "avg_latency_ms": round(total_ms / g["calls"], 1) if g["calls"] else 0.0,
+            }
+        )
+    out.sort(key=lambda r: r["cost_usd"], reverse=True)
+    return out
+
+
+def _write_rows(rows: list[dict[str, Any]]) -> None:
+    from app.db.connection import get_session
+    from app.db.repositories.llm_usage import llm_usage_repo
+
+    with get_session() as session:
+        llm_usage_repo.insert_many(session, rows)
+
+
+class LLMUsageRecorder:
+    def __init__(self) -> None:
+        self._batcher: BackgroundBatcher[dict[str, Any]] = BackgroundBatcher("llm-usage-writer", _write_rows, batch=200)
+
+    def record(self, endpoint: str, call_site: str, model: str, response: Any, seconds: float) -> None:
+        if not settings.LLM_USAGE_ENABLED:
+            return
+        ctx = _context.get()
+        prompt, completion, cached = usage_tokens(response)
+        self._batcher.put(
+            {
+                "job_type": ctx.get("job_type"),
+                "job_id": None if ctx.get("job_id") is None else str(ctx["job_id"]),
+                "course_id": ctx.get("course_id"),
+                "lecture_id": ctx.get("lecture_id"),
+                "stage": ctx.get("stage") or call_site,
+                "endpoint": endpoint,
+                "call_site": call_site,
+                "model": model,
+                "prompt_tokens": prompt,
+                "completion_tokens": completion,
+                "cached_tokens": cached,
+                "latency_ms": int(seconds * 1000),
+            }
+        )
+
+    def flush(self) -> None:
+        self._batcher.flush()
+
+
+llm_usage_recorder = LLMUsageRecorder()
@@ -0,0 +1,279 @@
+"""
+Prometheus 메트릭: 단계별 지연 히스토그램, LLM 토큰·호출 지연, 작업 결과 카운터를 프로세스 안에 모으고
+스크레이프 시점에 기존 통계(llm_cache / rate_limiter / resilient_caller / structured_output_stats)와
+큐 상태(ingestion_jobs, quiz_jobs)를 같이 텍스트 형식(0.0.4)으로 내보낸다.
+API는 GET /metrics, 워커는 WORKER_METRICS_PORT의 /metrics. 외부 의존성 없음.
+"""
+
+import logging
+import math
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Iterable, Iterator
+
+from app.services.llm_cache import llm_cache
+from app.services.llm_usage import usage_context, usage_tokens
+from app.services.rate_limiter import rate_limiter
+from app.services.resilience import resilient_caller
+from app.services.structured_output import structured_output_stats
+from app.services.tracing import span
+
+logger = logging.getLogger(__name__)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+PREFIX = "quizgen_"
+# LLM 호출(수 초~수십 초)과 DB 쓰기(수 ms)를 같은 버킷으로 본다
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+
+# (이름, 타입, 설명, [(라벨, 값)]) — 스크레이프 때 collector가 돌려주는 형태
+Family = tuple[str, str, str, list[tuple[dict[str, str], float]]]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(labels: dict[str, str], extra: dict[str, str] | None = None) -> str:
+    items = {**labels, **(extra or {})}
+    if not items:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(str(v))}"' for k, v in items.items()) + "}"
+
+
+def _number(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+def render_family(name: str, kind: str, help_text: str, samples: Iterable[tuple[dict[str, str], float]], suffix: str = "") -> list[str]:
+    lines = [f"# HELP {name} {help_text}", f"# TYPE {name} {kind}"]
+    lines.extend(f"{name}{suffix}{_labels(labels)} {_number(value)}" for labels, value in samples)
+    return lines
+
+
+class Counter:
+    def __init__(self, name: str, help_text: str, label_names: tuple[str, ...] = ()) -> None:
+        self.name = name
+        self.help = help_text
+        self.label_names = label_names
+        self._values: dict[tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1, **labels: Any) -> None:
+        key = tuple(str(labels.get(n, "")) for n in self.label_names)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def render(self) -> list[str]:
+        with self._lock:
+            samples = [(dict(zip(self.label_names, k)), v) for k, v in self._values.items()]
+        return render_family(self.name, "counter", self.help, samples)
+
+
+class Histogram:
+    def __init__(
+        self, name: str, help_text: str, label_names: tuple[str, ...] = (), buckets: tuple[float, ...] = DEFAULT_BUCKETS
+    ) -> None:
+        self.name = name
+        self.help = help_text
+        self.label_names = label_names
+        self.buckets = tuple(sorted(buckets))
+        # 라벨 조합 → (버킷별 개수(누적 아님), 합계, 개수)
+        self._values: dict[tuple[str, ...], list[Any]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels: Any) -> None:
+        key = tuple(str(labels.get(n, "")) for n in self.label_names)
+        with self._lock:
+            entry = self._values.setdefault(key, [[0] * len(self.buckets), 0.0, 0])
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    entry[0][i] += 1
+                    break
+            entry[1] += value
+            entry[2] += 1
+
+    def render(self) -> list[str]:
+        with self._lock:
+            snapshot = [(k, list(v[0]), v[1], v[2]) for k, v in self._values.items()]
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        for key, counts, total, count in snapshot:
+            labels = dict(zip(self.label_names, key))
+            cumulative = 0
+            for bound, n in zip(self.buckets, counts):
+                cumulative += n
+                lines.append(f"{self.name}_bucket{_labels(labels, {'le': _number(bound)})} {cumulative}")
+            lines.append(f"{self.name}_bucket{_labels(labels, {'le': '+Inf'})} {count}")
+            lines.append(f"{self.name}_sum{_labels(labels)} {_number(total)}")
+            lines.append(f"{self.name}_count{_labels(labels)} {count}")
+        return lines
+
+
+class MetricsRegistry:
+    """직접 기록하는 Counter/Histogram + 스크레이프 때 값을 읽어 오는 collector."""
+
+    def __init__(self) -> None:
+        self._metrics: list[Counter | Histogram] = []
+        self._collectors: list[Callable[[], Iterable[Family]]] = []
+
+    def counter(self, name: str, help_text: str, label_names: tuple[str, ...] = ()) -> Counter:
+        metric = Counter(PREFIX + name, help_text, label_names)
+        self._metrics.append(metric)
+        return metric
+
+    def histogram(self, name: str, help_text: str, label_names: tuple[str, ...] = (), buckets: tuple[float, ...] = DEFAULT_BUCKETS) -> Histogram:
+        metric = Histogram(PREFIX + name, help_text, label_names, buckets)
+        self._metrics.append(metric)
+        return metric
+
+    def collector(self, fn: Callable[[], Iterable[Family]]) -> Callable[[], Iterable[Family]]:
+        self._collectors.append(fn)
+        return fn
+
+    def render(self) -> str:
+        lines: list[str] = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        for fn in self._collectors:
+            try:
+                families = list(fn())
+            except Exception as e:
+                # 한 collector 실패(DB 연결 등)로 나머지 메트릭까지 못 보지 않도록 건너뛴다
+                logger.warning("메트릭 collector 실패 %s: %s", getattr(fn, "__name__", fn), e)
+                continue
+            for name, kind, help_text, samples in families:
+                lines.extend(render_family(PREFIX + name, kind, help_text, samples))
+        return "\n".join(lines) + "\n"
+
+
+metrics = MetricsRegistry()
+
+STAGE_SECONDS = metrics.histogram("stage_duration_seconds", "파이프라인 단계별 소요 시간", ("stage",))
+STAGE_ERRORS = metrics.counter("stage_errors_total", "단계별 예외 수", ("stage",))
+LLM_SECONDS = metrics.histogram("llm_request_duration_seconds", "OpenAI 호출 지연 (재시도·한도 대기 포함, 캐시 적중 제외)", ("endpoint", "call_site"))
+LLM_TOKENS = metrics.counter("llm_tokens_total", "OpenAI 응답 usage 토큰 수", ("endpoint", "call_site", "model", "type"))
+JOBS = metrics.counter("jobs_total", "처리를 끝낸 작업 수", ("queue", "status"))
+
+
+@contextmanager
+def timed_stage(stage: str) -> Iterator[None]:
+    """
+    with 블록 소요 시간을 stage 히스토그램에 기록. 예외는 stage_errors_total에도 센 뒤 그대로 전파.
+    트레이싱이 켜져 있으면 같은 구간을 span으로도 남긴다.
+    """
+    t0 = time.perf_counter()
+    try:
+        with span(stage), usage_context(stage=stage):
+            yield
+    except Exception:
+        STAGE_ERRORS.inc(stage=stage)
+        raise
+    finally:
+        STAGE_SECONDS.observe(time.perf_counter() - t0, stage=stage)
+
+
+def record_llm_usage(endpoint: str, call_site: str, model: str, response: Any, seconds: float) -> None:
+    """응답 객체의 usage(prompt/completion/cached 토큰)와 호출 지연을 기록. usage가 없으면 지연만."""
+    LLM_SECONDS.observe(seconds, endpoint=endpoint, call_site=call_site)
+    for kind, value in zip(("prompt", "completion", "cached"), usage_tokens(response)):
+        if value:
+            LLM_TOKENS.inc(value, endpoint=endpoint, call_site=call_site, model=model, type=kind)
+
+
+@metrics.collector
+def _llm_cache_families() -> Iterable[Family]:
+    samples = []
+    for call_site, counts in llm_cache.stats()["by_call_site"].items():
+        for field, result in (("memory_hits", "memory_hit"), ("disk_hits", "disk_hit"), ("misses", "miss")):
+            samples.append(({"call_site": call_site, "result": result}, counts.get(field, 0)))
+    yield ("llm_cache_lookups_total", "counter", "LLM 응답 캐시 조회 결과", samples)
+
+
+@metrics.collector
+def _resilience_families() -> Iterable[Family]:
+    stats = resilient_caller.stats()
+    for field, help_text in (
+        ("calls", "OpenAI 호출 시도 수 (재시도 포함)"),
+        ("retries", "재시도 수"),
+        ("failures", "재시도 후에도 실패한 호출 수"),
+        ("breaker_rejected", "서킷 열림으로 거절된 호출 수"),
+        ("hedges", "헤지(중복) 요청 수"),
+    ):
+        samples = [({"endpoint": ep}, s.get(field, 0)) for ep, s in stats.items()]
+        yield (f"llm_{field}_total", "counter", help_text, samples)
+    samples = [({"endpoint": ep}, 1.0 if s.get("breaker_state") == "open" else 0.0) for ep, s in stats.items()]
+    yield ("llm_breaker_open", "gauge", "서킷 브레이커 열림 여부 (1=open)", samples)
+
+
+@metrics.collector
+def _rate_limit_families() -> Iterable[Family]:
+    stats = rate_limiter.stats()
+    yield ("rate_limited_total", "counter", "429 응답 수", [({"kind": k}, s["rate_limited"]) for k, s in stats.items()])
+    yield ("rate_limit_wait_seconds_total", "counter", "한도 대기 누적 시간", [({"kind": k}, s["wait_sec"]) for k, s in stats.items()])
+    yield ("rate_limit_in_flight", "gauge", "진행 중 호출 수", [({"kind": k}, s["in_flight"]) for k, s in stats.items()])
+    yield ("rate_limit_concurrency_limit", "gauge", "현재 AIMD 동시성 한도", [({"kind": k}, s["concurrency_limit"]) for k, s in stats.items()])
+
+
+@metrics.collector
+def _structured_output_families() -> Iterable[Family]:
+    stats = structured_output_stats.stats()
+    yield ("structured_output_repairs_total", "counter", "모자란 문항 재생성 횟수", [({"call_site": k}, s["repaired"]) for k, s in stats.items()])
+    yield ("structured_output_dropped_items_total", "counter", "스키마 위반으로 버린 문항 수", [({"call_site": k}, s["dropped_items"]) for k, s in stats.items()])
+
+
+def queue_families(summaries: dict[str, list[tuple[str, int, datetime | None]]], now: datetime | None = None) -> Iterable[Family]:
+    """큐별 (status, 건수, 가장 오래된 created_at) → 건수 gauge, 대기/처리 중 작업의 가장 오래된 나이 gauge."""
+    now = now or datetime.now(timezone.utc)
+    depth: list[tuple[dict[str, str], float]] = []
+    age: list[tuple[dict[str, str], float]] = []
+    for queue, rows in summaries.items():
+        for status, count, oldest in rows:
+            depth.append(({"queue": queue, "status": status}, count))
+            # done/failed의 나이는 보관 기간일 뿐이라 대기·처리 중만 내보낸다
+            if status in ("pending", "processing") and oldest is not None:
+                age.append(({"queue": queue, "status": status}, max(0.0, (now - oldest).total_seconds())))
+    yield ("queue_jobs", "gauge", "큐 상태별 작업 수", depth)
+    yield ("queue_oldest_age_seconds", "gauge", "상태별 가장 오래된 작업의 나이 (pending·processing)", age)
+
+
+@metrics.collector
+def _queue_families() -> Iterable[Family]:
+    # 메트릭을 import하는 것만으로 DB 모듈을 불러오지 않도록 스크레이프 때 import
+    from app.db.connection import get_session
+    from app.db.repositories.ingestion_job import ingestion_job_repo
+    from app.db.repositories.quiz_job import quiz_job_repo
+
+    with get_session() as session:
+        summaries = {
+            "ingestion": ingestion_job_repo.status_summary(session),
+            "quiz": quiz_job_repo.status_summary(session),
+        }
+    return list(queue_families(summaries))
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self) -> None:  # noqa: N802 - http.server 규약
+        if self.path.split("?", 1)[0] != "/metrics":
+            self.send_error(404)
+            return
+        body = metrics.render().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", CONTENT_TYPE)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args: Any) -> None:
+        logger.debug("metrics %s", format % args)
+
+
+def start_metrics_server(port: int, host: str = "0.0.0.0") -> ThreadingHTTPServer:
+    """GET /metrics만 응답하는 HTTP 서버를 데몬 스레드로 띄운다 (워커 프로세스용)."""
+    server = ThreadingHTTPServer((host, port), _MetricsHandler)
+    threading.Thread(target=server.serve_forever, name="metrics-http", daemon=True).start()
+    logger.info("메트릭 서버 시작 http://%s:%d/metrics", host, port)
+    return server
@@ -0,0 +1,265 @@
+"""
+선택 프로파일링: 골라낸 API 요청·ingestion job만 샘플링 프로파일을 떠서 PROFILE_DIR에 저장.
+- PROFILING_ENABLED=true일 때만 동작. 요청은 `X-Profile: 1` 헤더나 `?profile=1`, job은 적재 시 `?profile=1`
+  (payload["profile"]) 또는 PROFILE_JOB_IDS로 고르고, PROFILE_SAMPLE_RATE로 무작위 샘플도 가능.
+- 샘플러는 PROFILE_INTERVAL_MS마다 sys._current_frames()에서 이 요청·job에 붙은 스레드의 스택만 읽는다.
+  profile()을 연 스레드, tracing.wrap으로 넘긴 스레드 풀 작업(추출 병렬·fan-out), 동기 엔드포인트 스레드
+  (attach_endpoint)가 붙으므로 cProfile과 달리 풀에서 도는 코드도 잡히고, 다른 요청의 스레드는 섞이지 않는다.
+- API 미들웨어는 profile_async를 써서 샘플러 종료(join)·파일 저장을 이벤트 루프 밖 스레드에서 한다.
+- 결과: `<kind>-<id>-<시각>.folded`(스레드;프레임;… 샘플 수, flamegraph.pl·speedscope 입력)와
+  같은 이름의 .json(self/total 샘플 상위 프레임 요약).
+"""
+
+import asyncio
+import functools
+import json
+import logging
+import random
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+from datetime import datetime
+from pathlib import Path
+from typing import Any, AsyncIterator, Callable, Iterator
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+_APP_DIR = str(Path(__file__).resolve().parent.parent)
+_TRUTHY = ("1", "true", "yes", "on")
+# 동시에 하나만 프로파일 (여러 샘플러가 겹치면 오버헤드가 커지고 결과도 서로 섞임)
+_active = threading.Lock()
+
+
+def _frame_label(frame: Any) -> str:
+    code = frame.f_code
+    filename = code.co_filename
+    if filename.startswith(_APP_DIR):
+        filename = "app" + filename[len(_APP_DIR):]
+    else:
+        filename = Path(filename).name
+    return f"{code.co_qualname} ({filename}:{code.co_firstlineno})"
+
+
+class SamplingProfiler:
+    """백그라운드 스레드가 interval마다 붙은(attach) 스레드들의 스택을 세는 샘플링 프로파일러."""
+
+    def __init__(self, interval_sec: float) -> None:
+        self.interval_sec = interval_sec
+        self.stacks: Counter[tuple[str, ...]] = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+        # 대상 스레드 ident → 붙은 횟수 (같은 스레드가 겹쳐 붙을 수 있음)
+        self._threads: Counter[int] = Counter()
+        self._threads_lock = threading.Lock()
+        self.started = 0.0
+        self.duration_sec = 0.0
+
+    def add_thread(self, ident: int) -> None:
+        with self._threads_lock:
+            self._threads[ident] += 1
+
+    def remove_thread(self, ident: int) -> None:
+        with self._threads_lock:
+            self._threads[ident] -= 1
+            if self._threads[ident] <= 0:
+                del self._threads[ident]
+
+    def start(self) -> None:
+        self.started = time.perf_counter()
+        self._thread = threading.Thread(target=self._run, name="profiler-sampler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        self.duration_sec = time.perf_counter() - self.started
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval_sec):
+            self.sample()
+
+    def sample(self) -> None:
+        with self._threads_lock:
+            targets = set(self._threads)
+        names = {t.ident: t.name for t in threading.enumerate()}
+        for ident, frame in sys._current_frames().items():
+            if ident not in targets:
+                continue
+            stack: list[str] = []
+            in_app = False
+            while frame is not None:
+                in_app = in_app or frame.f_code.co_filename.startswith(_APP_DIR)
+                stack.append(_frame_label(frame))
+                frame = frame.f_back
+            # app 코드가 없는 스택(이벤트 루프 대기 등)은 버린다
+            if in_app:
+                stack.append(f"thread:{names.get(ident, ident)}")
+                self.stacks[tuple(reversed(stack))] += 1
+        self.samples += 1
+
+    def folded(self) -> str:
+        return "".join(f"{';'.join(stack)} {count}\n" for stack, count in self.stacks.most_common())
+
+    def summary(self, top: int = 30) -> list[dict[str, Any]]:
+        """프레임별 self(스택 맨 위)·total(스택 어딘가) 샘플 수, total 내림차순."""
+        self_counts: Counter[str] = Counter()
+        total_counts: Counter[str] = Counter()
+        for stack, count in self.stacks.items():
+            self_counts[stack[-1]] += count
+            for label in set(stack[1:]):
+                total_counts[label] += count
+        return [
+            {"frame": label, "self": self_counts[label], "total": total}
+            for label, total in total_counts.most_common(top)
+        ]
+
+
+# 현재 요청·job의 프로파일러 (tracing.wrap으로 스레드 풀 작업에도 전달됨)
+_current: ContextVar[SamplingProfiler | None] = ContextVar("profiler", default=None)
+
+
+@contextmanager
+def attach_thread() -> Iterator[None]:
+    """현재 context에 프로파일러가 있으면 블록 동안 이 스레드도 샘플링 대상에 넣는다."""
+    profiler = _current.get()
+    if profiler is None:
+        yield
+        return
+    ident = threading.get_ident()
+    profiler.add_thread(ident)
+    try:
+        yield
+    finally:
+        profiler.remove_thread(ident)
+
+
+def attach_endpoint(fn: Callable[..., Any]) -> Callable[..., Any]:
+    """동기 엔드포인트를 스레드 풀에서 실행할 때 그 스레드를 요청 프로파일에 붙인다 (async 함수는 그대로)."""
+    if asyncio.iscoroutinefunction(fn):
+        return fn
+
+    @functools.wraps(fn)
+    def run(*args: Any, **kwargs: Any) -> Any:
+        with attach_thread():
+            return fn(*args, **kwargs)
+
+    return run
+
+
+def request_selected(header: str | None, query: str | None) -> bool:
+    if not settings.PROFILING_ENABLED:
+        return False
+    if (header or "").lower() in _TRUTHY or (query or "").lower() in _TRUTHY:
+        return True
+    return random.random() < settings.PROFILE_SAMPLE_RATE
+
+
+def job_selected(job_id: int, payload: dict[str, Any]) -> bool:
+    if not settings.PROFILING_ENABLED:
+        return False
+    if payload.get("profile"):
+        return True
+    ids = {s.strip() for s in settings.PROFILE_JOB_IDS.split(",") if s.strip()}
+    if str(job_id) in ids:
+        return True
+    return random.random() < settings.PROFILE_SAMPLE_RATE
+
+
+def _safe_id(value: Any) -> str:
+    return re.sub(r"[^A-Za-z0-9_-]", "_", str(value))[:64]
+
+
+class ProfileResult:
+    """profile() 블록이 끝나면 path(저장된 .folded 경로)가 채워진다. 건너뛰었으면 None."""
+
+    def __init__(self) -> None:
+        self.path: Path | None = None
+
+
+def _begin(kind: str, target_id: Any) -> SamplingProfiler | None:
+    """동시에 하나만: 다른 프로파일이 진행 중이면 None."""
+    if not _active.acquire(blocking=False):
+        logger.info("다른 프로파일 진행 중이라 건너뜀 kind=%s id=%s", kind, target_id)
+        return None
+    profiler = SamplingProfiler(settings.PROFILE_INTERVAL_MS / 1000)
+    profiler.add_thread(threading.get_ident())
+    profiler.start()
+    return profiler
+
+
+def _finish(
+    profiler: SamplingProfiler, kind: str, target_id: Any, started_at: datetime, meta: dict[str, Any]
+) -> Path | None:
+    """샘플러 종료(join) 후 저장하고 잠금 해제."""
+    try:
+        profiler.stop()
+        return _save(profiler, kind, target_id, started_at, meta)
+    finally:
+        _active.release()
+
+
+@contextmanager
+def profile(kind: str, target_id: Any, **meta: Any) -> Iterator[ProfileResult]:
+    """블록 동안 샘플링 프로파일을 떠서 저장. 다른 프로파일이 진행 중이면 그냥 실행만 한다."""
+    result = ProfileResult()
+    started_at = datetime.now()
+    profiler = _begin(kind, target_id)
+    if profiler is None:
+        yield result
+        return
+    token = _current.set(profiler)
+    try:
+        yield result
+    finally:
+        _current.reset(token)
+        result.path = _finish(profiler, kind, target_id, started_at, meta)
+
+
+@asynccontextmanager
+async def profile_async(kind: str, target_id: Any, **meta: Any) -> AsyncIterator[ProfileResult]:
+    """profile의 async 버전: 종료·저장은 스레드에서 해 이벤트 루프를 막지 않는다."""
+    result = ProfileResult()
+    started_at = datetime.now()
+    profiler = _begin(kind, target_id)
+    if profiler is None:
+        yield result
+        return
+    token = _current.set(profiler)
+    try:
+        yield result
+    finally:
+        _current.reset(token)
+        result.path = await asyncio.to_thread(_finish, profiler, kind, target_id, started_at, meta)
+
+
+def _save(profiler: SamplingProfiler, kind: str, target_id: Any, started_at: datetime, meta: dict[str, Any]) -> Path | None:
+    try:
+        directory = Path(settings.PROFILE_DIR)
+        directory.mkdir(parents=True, exist_ok=True)
+        stem = f"{kind}-{_safe_id(target_id)}-{started_at:%Y%m%dT%H%M%S}"
+        folded = directory / f"{stem}.folded"
+        folded.write_text(profiler.folded(), encoding="utf-8")
+        report = {
+            "kind": kind,
+            "id": str(target_id),
+            "started_at": started_at.isoformat(timespec="seconds"),
+            "duration_sec": round(profiler.duration_sec, 3),
+            "interval_ms": settings.PROFILE_INTERVAL_MS,
+            "samples": profiler.samples,
+            **meta,
+            "top": profiler.summary(),
+        }
+        (directory / f"{stem}.json").write_text(json.dumps(report, ensure_ascii=False, indent=2), encoding="utf-8")
+        logger.info("프로파일 저장 %s (%.2fs, 샘플 %d)", folded, profiler.duration_sec, profiler.samples)
+        return folded
+    except Exception as e:
+        logger.warning("프로파일 저장 실패 kind=%s id=%s: %s", kind, target_id, e)
+        return None
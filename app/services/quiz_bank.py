@@ -0,0 +1,177 @@
+"""
+문항 은행: 강의별로 미리 생성·검증한 문항 풀에서 /quiz/generate 요청을 바로 샘플링한다.
+- 강의 요약 저장·ingestion 완료 시 풀을 비우고 quiz_jobs(target=bank)로 다시 채운다
+- 덜 노출된 문항이 QUIZ_BANK_MIN_AVAILABLE 아래로 떨어지면 비동기로 보충 (요청은 기다리지 않음)
+- 풀과 보충 job은 근거 내용(요약·청크) 해시 source_version으로 묶는다. 강의가 바뀐 뒤 끝난 이전 버전 보충은 버린다
+"""
+
+import hashlib
+import logging
+from typing import Any
+
+from app.core.config import settings
+from app.db.connection import get_session
+from app.db.repositories.lecture_chunk import lecture_chunk_repo
+from app.db.repositories.lecture_summary_embeddings import lecture_summary_embeddings_repo
+from app.db.repositories.quiz_bank import quiz_bank_repo
+from app.db.repositories.quiz_job import quiz_job_repo
+from app.schema.quiz_lecture import (
+    QuizFromLectureResponse,
+    ValidatedQuizFromLectureResponse,
+    ValidatedQuizQuestionItem,
+)
+
+logger = logging.getLogger(__name__)
+
+
+def content_version(summary: str | None, chunk_texts: list[str]) -> str:
+    """문항 생성 근거(요약 + 청크 본문) 내용 해시. 같은 내용이면 같은 값."""
+    h = hashlib.sha256((summary or "").encode("utf-8"))
+    for t in chunk_texts:
+        h.update(b"\x00")
+        h.update(t.encode("utf-8"))
+    return h.hexdigest()[:16]
+
+
+def _current_version(session: Any, course_id: str, lecture_id: str, user_id: str) -> str | None:
+    """강의의 현재 source_version. 요약 행이 없으면(아직 요약 전) None."""
+    row = lecture_summary_embeddings_repo.get_lecture(session, course_id, lecture_id, user_id)
+    if row is None:
+        return None
+    chunks = lecture_chunk_repo.get_by_lecture(session, course_id, lecture_id, user_id)
+    return content_version(row.summary, [(c.content or {}).get("text") or "" for c in chunks])
+
+
+class QuizBankService:
+    """강의별 문항 풀 샘플링·보충."""
+
+    def sample(
+        self, course_id: str, lecture_id: str, user_id: str, num_questions: int
+    ) -> ValidatedQuizFromLectureResponse | None:
+        """풀에서 num_questions개를 꺼낸다. 모자라면 None (호출자가 직접 생성) 후 보충 job 적재."""
+        verified_only = settings.QUIZ_BANK_VERIFIED_ONLY
+        with get_session() as session:
+            rows = quiz_bank_repo.sample(
+                session, course_id, lecture_id, user_id, num_questions, verified_only=verified_only
+            )
+            questions = [
+                ValidatedQuizQuestionItem(
+                    question=r.question,
+                    options=r.options,
+                    answer=r.answer,
+                    explanation=r.explanation,
+                    verified=r.verified,
+                )
+                for r in rows
+            ]
+            available = quiz_bank_repo.count_available(
+                session,
+                course_id,
+                lecture_id,
+                user_id,
+                max_serves=settings.QUIZ_BANK_MAX_SERVES,
+                verified_only=verified_only,
+            )
+        if available < settings.QUIZ_BANK_MIN_AVAILABLE:
+            self.enqueue_refill(course_id, lecture_id, user_id)
+        if not questions:
+            logger.info("문항 은행 부족 course_id=%s lecture_id=%s → 직접 생성", course_id, lecture_id)
+            return None
+        logger.info("문항 은행에서 %d문항 샘플링 (남은 미노출 %d)", len(questions), available)
+        return ValidatedQuizFromLectureResponse(questions=questions)
+
+    def enqueue_refill(self, course_id: str, lecture_id: str, user_id: str) -> int | None:
+        """
+        현재 내용 버전의 보충 job 적재 (같은 버전 job이 이미 대기·처리 중이면 생략). 적재한 job_id 반환.
+        이전 버전으로 돌고 있는 job은 막지 않는다 (그 결과는 store에서 버려짐).
+        """
+        with get_session() as session:
+            version = _current_version(session, course_id, lecture_id, user_id)
+            if version is None:
+                return None
+            if quiz_job_repo.has_active(
+                session, course_id, lecture_id, user_id, target="bank", source_version=version
+            ):
+                return None
+            job = quiz_job_repo.create(
+                session,
+                course_id=course_id,
+                lecture_id=lecture_id,
+                user_id=user_id,
+                params={
+                    "num_questions": settings.QUIZ_BANK_REFILL_SIZE,
+                    "validate": True,
+                    "fan_out": True,
+                    "source_version": version,
+                },
+                target="bank",
+            )
+        logger.info(
+            "문항 은행 보충 job 적재 job_id=%s course_id=%s lecture_id=%s version=%s", job.id, course_id, lecture_id, version
+        )
+        return job.id
+
+    def is_current(self, course_id: str, lecture_id: str, user_id: str, source_version: str | None) -> bool:
+        """보충 job의 source_version이 강의의 현재 내용과 같은지 (버전 없는 이전 job은 현재로 취급)."""
+        if not source_version:
+            return True
+        with get_session() as session:
+            return _current_version(session, course_id, lecture_id, user_id) == source_version
+
+    def store(
+        self,
+        course_id: str,
+        lecture_id: str,
+        user_id: str,
+        result: QuizFromLectureResponse | ValidatedQuizFromLectureResponse,
+        source_version: str | None = None,
+    ) -> int:
+        """
+        생성 결과를 풀에 넣고, 많이 나간(QUIZ_BANK_MAX_SERVES 이상) 문항은 정리. 추가된 문항 수 반환.
+        source_version이 강의의 현재 내용과 다르면(생성 중에 강의가 바뀜) 넣지 않고 0을 반환한다.
+        넣은 직후 강의가 바뀐 경우도 다시 확인해 방금 넣은 문항을 지운다 (on_lecture_updated와 엇갈려도 낡은 문항이 남지 않음).
+        """
+        if not self.is_current(course_id, lecture_id, user_id, source_version):
+            logger.info("문항 은행 보충 결과 폐기 (강의 내용 변경) course_id=%s lecture_id=%s", course_id, lecture_id)
+            return 0
+        with get_session() as session:
+            added = quiz_bank_repo.insert_many(
+                session,
+                course_id,
+                lecture_id,
+                user_id,
+                [q.model_dump() for q in result.questions],
+                source_version=source_version or "",
+            )
+            removed = quiz_bank_repo.delete_by_lecture(
+                session, course_id, lecture_id, user_id, min_served=settings.QUIZ_BANK_MAX_SERVES
+            )
+            if source_version:
+                current = _current_version(session, course_id, lecture_id, user_id)
+                if current is not None and current != source_version:
+                    quiz_bank_repo.delete_by_lecture(session, course_id, lecture_id, user_id, keep_version=current)
+                    logger.info("문항 은행 보충 결과 폐기 (적재 중 강의 내용 변경) course_id=%s lecture_id=%s", course_id, lecture_id)
+                    return 0
+        logger.info("문항 은행 적재 course_id=%s lecture_id=%s 추가=%d 소진 정리=%d", course_id, lecture_id, added, removed)
+        return added
+
+    def on_lecture_updated(self, course_id: str, lecture_id: str, user_id: str) -> None:
+        """
+        강의 요약·청크가 바뀌면 이전 내용 버전으로 만든 문항은 낡았으므로 비우고 새 버전으로 다시 채운다.
+        이전 버전 보충 job이 처리 중이어도 새 job을 적재하며, 이전 job 결과는 store에서 버려진다.
+        저장 흐름을 막지 않도록 실패는 로그만 남긴다. 요약 행이 아직 없는 강의(ingestion만 끝남)는 건너뛴다.
+        """
+        if not settings.QUIZ_BANK_ENABLED:
+            return
+        try:
+            with get_session() as session:
+                version = _current_version(session, course_id, lecture_id, user_id)
+                if version is None:
+                    return
+                quiz_bank_repo.delete_by_lecture(session, course_id, lecture_id, user_id, keep_version=version)
+            self.enqueue_refill(course_id, lecture_id, user_id)
+        except Exception:
+            logger.exception("문항 은행 갱신 적재 실패 course_id=%s lecture_id=%s", course_id, lecture_id)
+
+
+quiz_bank_service = QuizBankService()
@@ -4,45 +4,130 @@
 """
 
 import logging
-from typing import Any
+import math
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
+from typing import TYPE_CHECKING, Any, Iterator
 
-from openai import OpenAI
+import numpy as np
+from pydantic import ValidationError
+
+if TYPE_CHECKING:
+    from openai import OpenAI
 
 logger = logging.getLogger(__name__)
 
 from app.core.config import settings
 from app.db.connection import get_session
+from app.db.models import LectureChunk
 from app.db.repositories.lecture_quiz import lecture_quiz_repo
 from app.db.repositories.lecture_summary_embeddings import lecture_summary_embeddings_repo
-from app.schema.quiz_lecture import QuizFromLectureResponse, ValidatedQuizFromLectureResponse
+from app.schema.quiz_lecture import (
+    QuizFromLectureResponse,
+    QuizQuestionItem,
+    ValidatedQuizFromLectureResponse,
+    ValidatedQuizQuestionItem,
+)
+from app.services.chunk_retrieval import format_chunks_for_prompt, retrieve_lecture_chunks
+from app.services.chunking import chunk_by_max_chars
+from app.services.context_packer import pack_quiz_context
 from app.services.embedding import embedding_service
+from app.services.json_stream import JsonArrayStreamParser
+from app.services.llm import chat_completion, chat_completion_stream, openai_client
+from app.services.llm_usage import usage_context, usage_scope
+from app.services.metrics import timed_stage
+from app.services.tracing import wrap
 from app.services.quiz_validator import quiz_validator_service
+from app.services.structured_output import complete_items, strict_response_format
 from app.services.summary import summary_service
+from app.services.vector_index import summary_vector_index
 
 
-def _transcript_from_content(content_json: dict[str, Any], max_chars: int = 8000) -> str:
-    """전사 JSON의 segments를 한 덩어리 텍스트로 만든다."""
+def _transcript_from_content(content_json: dict[str, Any], max_chars: int | None = 8000) -> str:
+    """전사 JSON의 segments를 한 덩어리 텍스트로 만든다. max_chars=None이면 자르지 않음."""
     segments = content_json.get("segments") or []
     lines: list[str] = []
     for seg in segments:
         if isinstance(seg, dict) and seg.get("text"):
             lines.append(seg["text"].strip())
     transcript = "\n".join(lines)
-    if len(transcript) > max_chars:
+    if max_chars and len(transcript) > max_chars:
         transcript = transcript[:max_chars]
     return transcript
 
 
+def dedupe_similar(vectors: np.ndarray, threshold: float) -> list[int]:
+    """
+    앞에서부터 훑으며, 이미 고른 항목과 코사인 유사도가 threshold 이상인 항목을 버린다.
+    남길 인덱스(입력 순서 유지)를 반환. vectors: (N, D).
+    """
+    if len(vectors) == 0:
+        return []
+    mat = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(mat, axis=1, keepdims=True)
+    mat = mat / np.where(norms == 0, 1.0, norms)
+    kept: list[int] = []
+    for i in range(len(mat)):
+        if kept and float(np.max(mat[kept] @ mat[i])) >= threshold:
+            continue
+        kept.append(i)
+    return kept
+
+
+def split_evenly(items: list[Any], groups: int) -> list[list[Any]]:
+    """순서를 유지한 채 items를 groups개 연속 구간으로 나눈다 (앞 그룹이 1개씩 더 많을 수 있음)."""
+    groups = max(1, min(groups, len(items)))
+    base, extra = divmod(len(items), groups)
+    out: list[list[Any]] = []
+    start = 0
+    for g in range(groups):
+        size = base + (1 if g < extra else 0)
+        out.append(items[start : start + size])
+        start += size
+    return out
+
+
+def _question_text(item: QuizQuestionItem) -> str:
+    """중복 판정용 텍스트: 질문 + 정답 선택지."""
+    answer = item.options[item.answer - 1] if 1 <= item.answer <= len(item.options) else ""
+    return f"{item.question}\n{answer}"
+
+
+class _QuizContext:
+    """_load_context 결과. DB 세션 밖에서 여러 번 프롬프트를 만들 수 있도록 값만 담는다."""
+
+    def __init__(
+        self,
+        current_summary: str,
+        previous_summaries: list[str],
+        by_recency: bool,
+        chunks: list[LectureChunk],
+        content: dict[str, Any],
+    ) -> None:
+        self.current_summary = current_summary
+        self.previous_summaries = previous_summaries  # 우선순위 순 (예산 초과 시 뒤부터 버림)
+        self.by_recency = by_recency
+        self.chunks = chunks
+        self.content = content
+
+
+def _validated_event(index: int, future: Future[ValidatedQuizQuestionItem]) -> dict[str, Any]:
+    try:
+        return {"index": index, "verified": future.result().verified}
+    except Exception as e:
+        logger.warning("스트림 문항 검증 실패 index=%d: %s", index, e)
+        return {"index": index, "verified": None, "error": str(e)}
+
+
 class QuizFromLectureService:
     """해당 강의 요약 + 이전 요약 참고로 퀴즈 생성 (이후 강의 내용 미포함)."""
 
-    def __init__(self) -> None:
-        self._client = OpenAI(
-            api_key=settings.OPENAI_API_KEY,
-            base_url=settings.OPENAI_BASE_URL,
-            timeout=settings.REQUEST_TIMEOUT,
-        )
+    @property
+    def _client(self) -> "OpenAI":
+        return openai_client()
 
+    @timed_stage("quiz_generation")
+    @usage_scope
     def generate(
         self,
         course_id: str,
@@ -52,14 +137,295 @@ class QuizFromLectureService:
         use_semantic_previous: bool = False,
         semantic_limit: int = 5,
         max_context_lectures: int | None = None,
+        use_chunk_retrieval: bool | None = None,
+        chunk_top_k: int | None = None,
+        fan_out: bool | None = None,
     ) -> QuizFromLectureResponse:
         """
         DB에서 해당 강의 + 이전 강의 요약을 꺼내어, 현재 강의 기준으로만 퀴즈 생성.
+        (맥락 구성은 _build_prompt 참고)
+        fan_out=True(기본: QUIZ_FANOUT_ENABLED)이고 문항 수가 QUIZ_FANOUT_PER_CALL보다 많으면
+        generate_fanout으로 구간별 동시 생성.
+        """
+        if fan_out is None:
+            fan_out = settings.QUIZ_FANOUT_ENABLED
+        if fan_out and num_questions > settings.QUIZ_FANOUT_PER_CALL:
+            return self.generate_fanout(
+                course_id,
+                lecture_id,
+                user_id,
+                num_questions,
+                use_semantic_previous=use_semantic_previous,
+                semantic_limit=semantic_limit,
+                max_context_lectures=max_context_lectures,
+                use_chunk_retrieval=use_chunk_retrieval,
+                chunk_top_k=chunk_top_k,
+            )
+        system_prompt, user_prompt = self._build_prompt(
+            course_id,
+            lecture_id,
+            user_id,
+            num_questions,
+            use_semantic_previous=use_semantic_previous,
+            semantic_limit=semantic_limit,
+            max_context_lectures=max_context_lectures,
+            use_chunk_retrieval=use_chunk_retrieval,
+            chunk_top_k=chunk_top_k,
+        )
+        logger.info("LLM 퀴즈 생성 호출 중 (문항 수=%d)", num_questions)
+        result = self._complete(system_prompt, user_prompt, num_questions)
+        logger.info("퀴즈 생성 완료 수신 문항 수=%d", len(result.questions))
+        return result
+
+    def _complete(self, system_prompt: str, user_prompt: str, num_questions: int) -> QuizFromLectureResponse:
+        """json_schema strict 모드로 생성 (문항 살리기·모자란 수만 재생성은 complete_items)."""
+        _, questions = complete_items(
+            lambda prompt: self._chat(system_prompt, prompt),
+            user_prompt,
+            QuizQuestionItem,
+            num_questions,
+            name="quiz_from_lecture",
+        )
+        return QuizFromLectureResponse(questions=questions)
+
+    def _chat(self, system_prompt: str, user_prompt: str) -> str:
+        # 재생성 요청마다 다른 문항이 나와야 하므로 응답 캐시를 쓰지 않는다
+        return chat_completion(
+            self._client,
+            response_format=strict_response_format(QuizFromLectureResponse),
+            messages=[
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": user_prompt},
+            ],
+            cache=False,
+            name="quiz_from_lecture",
+        )
+
+    def generate_fanout(
+        self,
+        course_id: str,
+        lecture_id: str,
+        user_id: str,
+        num_questions: int,
+        *,
+        per_call: int | None = None,
+        dedupe_threshold: float | None = None,
+        use_semantic_previous: bool = False,
+        semantic_limit: int = 5,
+        max_context_lectures: int | None = None,
+        use_chunk_retrieval: bool | None = None,
+        chunk_top_k: int | None = None,
+    ) -> QuizFromLectureResponse:
+        """
+        문항을 강의 구간별로 나눠 동시에 생성한 뒤 합친다. 한 번에 num_questions를 받는 것보다
+        출력 토큰 대기 시간이 per_call 문항 수준으로 줄고, 한 그룹 응답이 깨져도 나머지는 살린다.
+        - 청크 검색 결과(없으면 전사를 chunk_by_max_chars로 나눈 구간)를 시간순 연속 그룹으로 분할
+        - 그룹마다 배정 문항 + QUIZ_FANOUT_OVERSAMPLE개를 요청 (중복 제거로 빠질 몫)
+        - 그룹을 번갈아 합친 뒤 (질문+정답) 임베딩 코사인 유사도 ≥ dedupe_threshold 인 문항 제거, num_questions로 자름
+        """
+        per_call = per_call or settings.QUIZ_FANOUT_PER_CALL
+        threshold = settings.QUIZ_FANOUT_DEDUPE_THRESHOLD if dedupe_threshold is None else dedupe_threshold
+        n_groups = math.ceil(num_questions / per_call)
+        context = self._load_context(
+            course_id,
+            lecture_id,
+            user_id,
+            use_semantic_previous=use_semantic_previous,
+            semantic_limit=semantic_limit,
+            max_context_lectures=max_context_lectures,
+            use_chunk_retrieval=use_chunk_retrieval,
+            chunk_top_k=chunk_top_k or n_groups * settings.QUIZ_FANOUT_CHUNKS_PER_CALL,
+        )
+        sources = sorted(context.chunks, key=lambda c: float((c.content or {}).get("start") or 0.0))
+        if not sources:
+            # 청크가 없으면 전사 segments를 구간으로 나눠 같은 방식으로 쓴다
+            pieces = chunk_by_max_chars(
+                context.content.get("segments") or [], max_chars=settings.QUIZ_TRANSCRIPT_MAX_TOKENS * 2
+            )
+            sources = [
+                LectureChunk(course_id=course_id, lecture_id=lecture_id, user_id=user_id, chunk_index=i, content=p)
+                for i, p in enumerate(pieces)
+            ]
+        groups = split_evenly(sources, n_groups) if sources else [[]]
+        counts = [len(q) for q in split_evenly(list(range(num_questions)), len(groups))]
+        logger.info(
+            "fan-out 퀴즈 생성: 문항=%d 그룹=%d 그룹별=%s 근거 구간=%d",
+            num_questions,
+            len(groups),
+            counts,
+            len(sources),
+        )
+
+        def run(group: list[LectureChunk], count: int) -> list[QuizQuestionItem]:
+            system_prompt, user_prompt = self._render_prompt(
+                context, count + settings.QUIZ_FANOUT_OVERSAMPLE, chunks=group or None
+            )
+            # 여유분(oversample)이 모자란 것은 재생성하지 않는다
+            return self._complete(system_prompt, user_prompt, count).questions
+
+        t0 = time.perf_counter()
+        results: list[list[QuizQuestionItem]] = [[] for _ in groups]
+        with ThreadPoolExecutor(max_workers=max(1, min(len(groups), settings.QUIZ_FANOUT_WORKERS))) as ex:
+            futures = {ex.submit(wrap(run), g, c): i for i, (g, c) in enumerate(zip(groups, counts))}
+            for future in as_completed(futures):
+                i = futures[future]
+                try:
+                    results[i] = future.result()
+                except Exception as e:
+                    # 한 그룹이 실패(형식 오류 등)해도 나머지 그룹 문항은 살린다
+                    logger.warning("fan-out 그룹 %d 생성 실패 → 건너뜀: %s", i, e)
+        if not any(results):
+            raise RuntimeError("fan-out 퀴즈 생성: 모든 그룹이 실패했습니다.")
+
+        # 그룹을 번갈아 합쳐, 잘릴 때도 구간이 고르게 남게 한다
+        merged: list[QuizQuestionItem] = []
+        for rank in range(max(len(r) for r in results)):
+            merged.extend(r[rank] for r in results if rank < len(r))
+        if len(merged) > 1 and threshold < 1.0:
+            vectors = np.asarray(embedding_service.embed_batch([_question_text(q) for q in merged]))
+            kept = dedupe_similar(vectors, threshold)
+            if len(kept) < len(merged):
+                logger.info("fan-out 중복 문항 %d개 제거 (유사도 ≥ %.2f)", len(merged) - len(kept), threshold)
+            merged = [merged[i] for i in kept]
+        logger.info(
+            "fan-out 퀴즈 생성 완료 문항=%d/%d %.2fs",
+            min(len(merged), num_questions),
+            num_questions,
+            time.perf_counter() - t0,
+        )
+        return QuizFromLectureResponse(questions=merged[:num_questions])
+
+    @usage_scope
+    def generate_stream(
+        self,
+        course_id: str,
+        lecture_id: str,
+        user_id: str,
+        num_questions: int = 5,
+        *,
+        validate: bool = True,
+        use_semantic_previous: bool = False,
+        semantic_limit: int = 5,
+        max_context_lectures: int | None = None,
+        use_chunk_retrieval: bool | None = None,
+        chunk_top_k: int | None = None,
+    ) -> Iterator[tuple[str, dict[str, Any]]]:
+        """
+        generate의 스트리밍 버전. 응답을 스트림으로 받아 questions 배열 원소가 닫히는 즉시
+        ("question", {index, question, options, answer, explanation})를 내보내고, validate=True면 그 문항 검증을
+        바로 백그라운드로 시작해 끝나는 대로 ("validated", {index, verified})를 내보낸다. 마지막은 ("done", {...}).
+        강의 조회·맥락 구성은 호출 시점에 바로 수행하므로 ValueError(강의 없음 등)는 이터레이터를 돌기 전에 발생한다.
+        """
+        system_prompt, user_prompt = self._build_prompt(
+            course_id,
+            lecture_id,
+            user_id,
+            num_questions,
+            use_semantic_previous=use_semantic_previous,
+            semantic_limit=semantic_limit,
+            max_context_lectures=max_context_lectures,
+            use_chunk_retrieval=use_chunk_retrieval,
+            chunk_top_k=chunk_top_k,
+        )
+        return self._stream_questions(system_prompt, user_prompt, num_questions, validate)
+
+    def _stream_questions(
+        self, system_prompt: str, user_prompt: str, num_questions: int, validate: bool
+    ) -> Iterator[tuple[str, dict[str, Any]]]:
+        parser = JsonArrayStreamParser("questions")
+        pending: dict[Future[ValidatedQuizQuestionItem], int] = {}
+        count = 0
+        invalid = 0
+        t0 = time.perf_counter()
+        first_at: float | None = None
+        with ThreadPoolExecutor(max_workers=max(1, min(num_questions, 8))) as ex:
+            stream = chat_completion_stream(
+                self._client,
+                response_format=strict_response_format(QuizFromLectureResponse),
+                messages=[
+                    {"role": "system", "content": system_prompt},
+                    {"role": "user", "content": user_prompt},
+                ],
+            )
+            for piece in stream:
+                for raw in parser.feed(piece):
+                    if count >= num_questions:
+                        continue
+                    try:
+                        item = QuizQuestionItem.model_validate(raw)
+                    except ValidationError as e:
+                        invalid += 1
+                        logger.warning("스트림 문항 형식 오류 → 건너뜀: %s", e.errors()[:1])
+                        continue
+                    if first_at is None:
+                        first_at = time.perf_counter() - t0
+                    yield "question", {"index": count, **item.model_dump()}
+                    if validate:
+                        pending[ex.submit(wrap(quiz_validator_service.validate_one), item)] = count
+                    count += 1
+                # 생성이 이어지는 동안 끝난 검증부터 내보낸다
+                for future in [f for f in pending if f.done()]:
+                    yield "validated", _validated_event(pending.pop(future), future)
+            for future in as_completed(list(pending)):
+                yield "validated", _validated_event(pending.pop(future), future)
+        logger.info(
+            "스트리밍 퀴즈 생성 완료 문항=%d 첫 문항 %.2fs 전체 %.2fs",
+            count,
+            first_at or 0.0,
+            time.perf_counter() - t0,
+        )
+        yield "done", {"count": count, "invalid": invalid + len(parser.errors)}
+
+    def _build_prompt(
+        self,
+        course_id: str,
+        lecture_id: str,
+        user_id: str,
+        num_questions: int,
+        *,
+        use_semantic_previous: bool = False,
+        semantic_limit: int = 5,
+        max_context_lectures: int | None = None,
+        use_chunk_retrieval: bool | None = None,
+        chunk_top_k: int | None = None,
+    ) -> tuple[str, str]:
+        """퀴즈 프롬프트 (system, user). 맥락 구성은 _load_context 참고."""
+        context = self._load_context(
+            course_id,
+            lecture_id,
+            user_id,
+            use_semantic_previous=use_semantic_previous,
+            semantic_limit=semantic_limit,
+            max_context_lectures=max_context_lectures,
+            use_chunk_retrieval=use_chunk_retrieval,
+            chunk_top_k=chunk_top_k,
+        )
+        return self._render_prompt(context, num_questions)
+
+    def _load_context(
+        self,
+        course_id: str,
+        lecture_id: str,
+        user_id: str,
+        *,
+        use_semantic_previous: bool = False,
+        semantic_limit: int = 5,
+        max_context_lectures: int | None = None,
+        use_chunk_retrieval: bool | None = None,
+        chunk_top_k: int | None = None,
+    ) -> "_QuizContext":
+        """
+        DB에서 현재 강의 요약·출제 근거와 이전 강의 요약을 모은다.
 
         use_semantic_previous=True 이면 id 순 이전 전부 대신, 현재 요약과 유사도 높은
         이전 강의 요약만 semantic_limit 건만 맥락으로 사용(벡터 검색, docs/VECTOR_SEARCH.md 참고).
         max_context_lectures=N 이면 id 순 처음 N개 강의의 요약만 맥락에 사용(예: 5면 1~5번만, 6번 이후 미반영).
+        use_chunk_retrieval=True(None이면 설정값 QUIZ_CHUNK_RETRIEVAL, 기본 꺼짐)면 전사 앞부분 대신 lecture_chunk_vectors에서 MMR로 고른
+        chunk_top_k개 청크(개념·시간 구간을 고르게 포함)를 출제 근거로 쓴다. 청크가 없으면 전사 앞부분 사용.
         """
+        if use_chunk_retrieval is None:
+            use_chunk_retrieval = settings.QUIZ_CHUNK_RETRIEVAL
+        by_recency = False
         with get_session() as session:
             logger.info("DB에서 강의 조회 중 course_id=%s lecture_id=%s user_id=%s", course_id, lecture_id, user_id)
             current = lecture_summary_embeddings_repo.get_lecture(
@@ -74,22 +440,29 @@ class QuizFromLectureService:
                 logger.info("DB에 요약 없음 → 전사에서 요약 생성 후 퀴즈 생성")
                 current_summary = summary_service.summarize(current.content)
 
-            if use_semantic_previous and current.embedding:
-                query_embedding = current.embedding
-                similar = lecture_summary_embeddings_repo.get_similar_summaries(
-                    session, course_id, user_id, query_embedding, limit=semantic_limit, exclude_lecture_id=lecture_id
-                )
+            if use_semantic_previous:
+                if current.embedding is not None:
+                    query_embedding = current.embedding
+                else:
+                    query_embedding = embedding_service.embed(current_summary)
+                    logger.info("저장된 임베딩 없음 → 쿼리 임베딩 1회 호출")
+                if settings.VECTOR_INDEX_ENABLED:
+                    similar = summary_vector_index.get_similar_summaries(
+                        course_id, user_id, query_embedding, limit=semantic_limit, exclude_lecture_id=lecture_id
+                    )
+                else:
+                    similar = lecture_summary_embeddings_repo.get_similar_summaries(
+                        session, course_id, user_id, query_embedding, limit=semantic_limit, exclude_lecture_id=lecture_id
+                    )
                 previous_summaries = [s for _, s in similar]
-                logger.info("벡터 검색으로 유사 이전 강의 요약 %d건 참고", len(previous_summaries))
-            elif use_semantic_previous:
-                query_embedding = embedding_service.embed(current_summary)
-                similar = lecture_summary_embeddings_repo.get_similar_summaries(
-                    session, course_id, user_id, query_embedding, limit=semantic_limit, exclude_lecture_id=lecture_id
+                logger.info(
+                    "벡터 검색으로 유사 이전 강의 요약 %d건 참고 (%s)",
+                    len(previous_summaries),
+                    "인메모리 인덱스" if settings.VECTOR_INDEX_ENABLED else "DB",
                 )
-                previous_summaries = [s for _, s in similar]
-                logger.info("벡터 검색으로 유사 이전 강의 요약 %d건 참고 (쿼리 임베딩 1회 호출)", len(previous_summaries))
             else:
                 previous_summaries = []
+                by_recency = True
                 if current.id is not None:
                     if max_context_lectures is not None and max_context_lectures > 0:
                         previous_summaries = lecture_summary_embeddings_repo.get_summaries_from_first_n_lectures(
@@ -106,8 +479,56 @@ class QuizFromLectureService:
                         )
                         logger.info("이전 강의 요약 %d건 참고 (메타데이터/id 순)", len(previous_summaries))
 
-            current_transcript = _transcript_from_content(current.content)
-            previous_context = "\n\n---\n\n".join(previous_summaries) if previous_summaries else "(없음)"
+            chunks = []
+            if use_chunk_retrieval:
+                chunks = retrieve_lecture_chunks(
+                    session,
+                    course_id,
+                    lecture_id,
+                    user_id,
+                    chunk_top_k or settings.QUIZ_CHUNK_TOP_K,
+                    query_embedding=current.embedding,
+                    lambda_=settings.QUIZ_CHUNK_MMR_LAMBDA,
+                )
+            content = current.content or {}
+
+        # 이전 요약 우선순위: 벡터 검색이면 유사도순(그대로), 아니면 최근 강의 우선
+        ranked_previous = list(reversed(previous_summaries)) if by_recency else previous_summaries
+        return _QuizContext(current_summary, ranked_previous, by_recency, chunks, content)
+
+    def _render_prompt(
+        self,
+        context: "_QuizContext",
+        num_questions: int,
+        *,
+        chunks: list[LectureChunk] | None = None,
+    ) -> tuple[str, str]:
+        """
+        맥락을 QUIZ_CONTEXT_TOKEN_BUDGET 토큰 안에서 현재 요약 → 출제 근거 → 이전 요약 순으로 채워 (system, user) 반환.
+        chunks를 주면 context.chunks 대신 그 청크들만 출제 근거로 쓴다 (fan-out 그룹별 프롬프트).
+        """
+        partial = chunks is not None
+        chunks = context.chunks if chunks is None else chunks
+        if chunks:
+            if partial:
+                transcript_label = "현재 강의 일부 구간 (시간순) - 이 구간 내용으로만 출제"
+            else:
+                transcript_label = "현재 강의 핵심 구간 (시간순) - 퀴즈 출제 기준"
+            current_transcript = format_chunks_for_prompt(chunks, settings.QUIZ_TRANSCRIPT_MAX_TOKENS)
+        else:
+            transcript_label = "현재 강의 전사 일부 - 퀴즈 출제 기준"
+            # 토큰 단위로 자르기 전에 넉넉한 글자 수까지만 만든다 (1토큰 ≥ 1글자)
+            current_transcript = _transcript_from_content(
+                context.content, max_chars=settings.QUIZ_TRANSCRIPT_MAX_TOKENS * 4
+            )
+
+        packed = pack_quiz_context(context.current_summary, current_transcript, context.previous_summaries)
+        current_summary = packed.current_summary
+        current_transcript = packed.transcript
+        kept_previous = packed.previous_summaries
+        if context.by_recency:
+            kept_previous = list(reversed(kept_previous))  # 프롬프트에는 강의 순서대로
+        previous_context = "\n\n---\n\n".join(kept_previous) if kept_previous else "(없음)"
 
         system_prompt = """너는 강의 요약과 전사를 보고 학습용 퀴즈를 만드는 전문가다.
 - 퀴즈는 **현재 강의**의 요약/전사 내용만 기준으로 만든다.
@@ -122,7 +543,7 @@ class QuizFromLectureService:
 [현재 강의 요약]
 {current_summary}
 
-[현재 강의 전사 일부 - 퀴즈 출제 기준]
+[{transcript_label}]
 {current_transcript}
 
 위 **현재 강의** 내용만 바탕으로 객관식 퀴즈 {num_questions}문항을 만들어 줘.
@@ -132,22 +553,9 @@ JSON만 출력해.
 형식:
 {{"questions": [{{"question": "...", "options": ["1번 선택지", "2번", "3번", "4번", "5번"], "answer": 1, "explanation": "..."}}, ...]}}
 """.strip()
+        return system_prompt, user_prompt
 
-        logger.info("LLM 퀴즈 생성 호출 중 (문항 수=%d)", num_questions)
-        response = self._client.chat.completions.create(
-            model=settings.OPENAI_MODEL,
-            temperature=settings.OPENAI_TEMPERATURE,
-            response_format={"type": "json_object"},
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": user_prompt},
-            ],
-        )
-        raw = response.choices[0].message.content or "{}"
-        result = QuizFromLectureResponse.model_validate_json(raw)
-        logger.info("퀴즈 생성 완료 수신 문항 수=%d", len(result.questions))
-        return result
-
+    @usage_scope
     def generate_validated(
         self,
         course_id: str,
@@ -157,6 +565,9 @@ JSON만 출력해.
         use_semantic_previous: bool = False,
         semantic_limit: int = 5,
         max_context_lectures: int | None = None,
+        use_chunk_retrieval: bool | None = None,
+        chunk_top_k: int | None = None,
+        fan_out: bool | None = None,
     ) -> ValidatedQuizFromLectureResponse:
         """
         퀴즈 생성 후 검증 파이프라인: 각 문항에 대해 질문+보기만 주고 LLM이 정답을 고르게 한 뒤,
@@ -167,31 +578,166 @@ JSON만 출력해.
             use_semantic_previous=use_semantic_previous,
             semantic_limit=semantic_limit,
             max_context_lectures=max_context_lectures,
+            use_chunk_retrieval=use_chunk_retrieval,
+            chunk_top_k=chunk_top_k,
+            fan_out=fan_out,
         )
         logger.info("검증 단계 시작")
         return quiz_validator_service.validate_all(raw)
 
+    @usage_scope
+    def generate_course(
+        self,
+        course_id: str,
+        user_id: str,
+        num_questions: int = 5,
+        *,
+        validate: bool = True,
+        save: bool = False,
+        lecture_ids: list[str] | None = None,
+        concurrency: int | None = None,
+        use_chunk_retrieval: bool | None = None,
+        chunk_top_k: int | None = None,
+    ) -> Iterator[tuple[str, dict[str, Any]]]:
+        """
+        강좌 전체(또는 lecture_ids) 강의의 퀴즈를 한 프로세스에서 일괄 생성.
+        강의 요약은 1회 조회로 모두 가져오고, 각 강의의 이전 맥락은 그 결과에서 id 순으로 만든다 (강의별 재조회 없음).
+        강의 단위로 최대 concurrency(기본 QUIZ_COURSE_CONCURRENCY)개를 동시에 생성·검증하며,
+        강의가 끝날 때마다 ("progress", {...}), 마지막에 ("done", {...})를 내보낸다.
+        save=True면 각 강의를 생성한 스레드에서 바로 저장한다 (SSE 연결이 끊겨도 끝난 강의 결과는 남음).
+        강의 조회는 호출 시점에 바로 수행하므로 ValueError(강의 없음 등)는 이터레이터를 돌기 전에 발생한다.
+        """
+        if use_chunk_retrieval is None:
+            use_chunk_retrieval = settings.QUIZ_CHUNK_RETRIEVAL
+        with get_session() as session:
+            rows = lecture_summary_embeddings_repo.get_course_lectures(session, course_id, user_id)
+        if not rows:
+            raise ValueError(f"강좌에 저장된 강의가 없음: course_id={course_id}, user_id={user_id}")
+        wanted = set(lecture_ids) if lecture_ids else None
+        if wanted is not None:
+            missing = wanted - {r.lecture_id for r in rows}
+            if missing:
+                raise ValueError(f"강의를 찾을 수 없음: {sorted(missing)}")
+
+        targets: list[tuple[Any, list[str]]] = []
+        previous: list[str] = []
+        for row in rows:
+            if wanted is None or row.lecture_id in wanted:
+                targets.append((row, list(previous)))
+            if row.summary and row.summary.strip():
+                previous.append(row.summary.strip())
+
+        def run(row: Any, previous_summaries: list[str]) -> QuizFromLectureResponse | ValidatedQuizFromLectureResponse:
+            summary = (row.summary or "").strip() or summary_service.summarize(row.content)
+            chunks: list[LectureChunk] = []
+            if use_chunk_retrieval:
+                with get_session() as session:
+                    chunks = retrieve_lecture_chunks(
+                        session,
+                        course_id,
+                        row.lecture_id,
+                        user_id,
+                        chunk_top_k or settings.QUIZ_CHUNK_TOP_K,
+                        query_embedding=row.embedding,
+                        lambda_=settings.QUIZ_CHUNK_MMR_LAMBDA,
+                    )
+            # 최근 강의 우선으로 예산에 넣는다 (_load_context의 id 순 경로와 같음)
+            context = _QuizContext(summary, list(reversed(previous_summaries)), True, chunks, row.content or {})
+            system_prompt, user_prompt = self._render_prompt(context, num_questions)
+            result = self._complete(system_prompt, user_prompt, num_questions)
+            result = QuizFromLectureResponse(questions=result.questions[:num_questions])
+            return quiz_validator_service.validate_all(result) if validate else result
+
+        workers = max(1, min(len(targets), concurrency or settings.QUIZ_COURSE_CONCURRENCY))
+        logger.info("강좌 일괄 퀴즈 생성 course_id=%s 강의=%d 동시=%d", course_id, len(targets), workers)
+        return self._run_course(course_id, targets, run, workers, save)
+
+    def _run_course(
+        self,
+        course_id: str,
+        targets: list[tuple[Any, list[str]]],
+        run: Any,
+        workers: int,
+        save: bool,
+    ) -> Iterator[tuple[str, dict[str, Any]]]:
+        """
+        강의별 run을 workers개 스레드에서 돌리며 진행 이벤트를 내보낸다.
+        이터레이터가 중간에 닫히면(클라이언트 연결 끊김 → GeneratorExit) 시작 전인 강의는 취소하고
+        실행 중인 강의는 기다리지 않는다. 저장은 작업 스레드에서 하므로 실행 중이던 강의도 끝나면 저장된다.
+        """
+
+        def run_and_save(row: Any, previous_summaries: list[str]) -> tuple[Any, int | None]:
+            # 강좌 일괄 생성에서도 강의별 비용이 잡히도록 강의 단위로 귀속
+            with usage_context(course_id=course_id, lecture_id=row.lecture_id):
+                result = run(row, previous_summaries)
+            quiz_id = self.save_result(course_id, row.lecture_id, result) if save else None
+            return result, quiz_id
+
+        t0 = time.perf_counter()
+        results: dict[str, QuizFromLectureResponse | ValidatedQuizFromLectureResponse] = {}
+        quiz_ids: dict[str, int] = {}
+        failed: dict[str, str] = {}
+        ex = ThreadPoolExecutor(max_workers=workers)
+        try:
+            futures = {ex.submit(wrap(run_and_save), row, prev): row.lecture_id for row, prev in targets}
+            for done, future in enumerate(as_completed(futures), 1):
+                lecture_id = futures[future]
+                event: dict[str, Any] = {"done": done, "total": len(targets), "lecture_id": lecture_id}
+                try:
+                    result, quiz_id = future.result()
+                except Exception as e:
+                    logger.warning("강의 퀴즈 생성 실패 lecture_id=%s: %s", lecture_id, e)
+                    failed[lecture_id] = str(e)
+                    event.update(ok=False, error=str(e))
+                else:
+                    results[lecture_id] = result
+                    if quiz_id is not None:
+                        quiz_ids[lecture_id] = quiz_id
+                    event.update(ok=True, quiz_id=quiz_id, questions=[q.model_dump() for q in result.questions])
+                logger.info("강좌 퀴즈 진행 %d/%d lecture_id=%s ok=%s", done, len(targets), lecture_id, event["ok"])
+                yield "progress", event
+        finally:
+            # 정상 종료면 모두 끝난 뒤라 즉시 반환, 중단이면 대기 중인 강의만 취소
+            ex.shutdown(wait=False, cancel_futures=True)
+
+        elapsed = time.perf_counter() - t0
+        logger.info(
+            "강좌 일괄 퀴즈 생성 완료 성공=%d 실패=%d 저장=%d %.1fs", len(results), len(failed), len(quiz_ids), elapsed
+        )
+        yield "done", {
+            "total": len(targets),
+            "succeeded": len(results),
+            "failed": failed,
+            "saved": bool(quiz_ids),
+            "quiz_ids": quiz_ids,
+            "elapsed_sec": round(elapsed, 2),
+        }
+
+    @timed_stage("db_write")
     def save_result(
         self,
         course_id: str,
         lecture_id: str,
         result: QuizFromLectureResponse | ValidatedQuizFromLectureResponse,
-    ) -> None:
-        """퀴즈 생성(또는 검증) 결과를 DB에 저장. JSON 그대로 저장(question, options, answer, explanation 등)."""
+    ) -> int:
+        """퀴즈 생성(또는 검증) 결과를 DB에 저장하고 lecture_quiz.id 반환. JSON 그대로 저장(question, options, answer, explanation 등)."""
         questions_data = [q.model_dump() for q in result.questions]
         with get_session() as session:
-            lecture_quiz_repo.insert(
+            row = lecture_quiz_repo.insert(
                 session,
                 course_id=course_id,
                 lecture_id=lecture_id,
                 questions=questions_data,
             )
+            quiz_id = row.id or 0
         logger.info(
-            "퀴즈 결과 저장 완료 course_id=%s lecture_id=%s 문항 수=%d",
+            "퀴즈 결과 저장 완료 course_id=%s lecture_id=%s quiz_id=%s 문항 수=%d",
             course_id,
             lecture_id,
+            quiz_id,
             len(questions_data),
         )
+        return quiz_id
 
 
 quiz_from_lecture_service = QuizFromLectureService()
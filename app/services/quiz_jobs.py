@@ -0,0 +1,151 @@
+"""
+비동기 퀴즈 생성 작업 처리: quiz_jobs 큐에서 pending 작업을 SKIP LOCKED로 가져와 스레드 풀에서 생성·검증 후
+lecture_quiz에 저장. API는 적재(POST /quiz/jobs)와 조회만 하므로 요청 스레드가 LLM 호출을 기다리지 않는다.
+target=bank인 job은 결과를 문항 은행(quiz_bank_questions)에 넣는다.
+"""
+
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any
+
+from app.core.config import settings
+from app.db.connection import get_session
+from app.db.repositories.quiz_job import quiz_job_repo
+from app.services.llm_usage import usage_context
+from app.services.metrics import JOBS
+from app.services.quiz_bank import quiz_bank_service
+from app.services.quiz_from_lecture import quiz_from_lecture_service
+
+logger = logging.getLogger(__name__)
+
+# job.params에서 생성 함수로 넘기는 옵션 (나머지 키는 무시)
+GENERATE_PARAM_KEYS = (
+    "num_questions",
+    "use_semantic_previous",
+    "semantic_limit",
+    "max_context_lectures",
+    "use_chunk_retrieval",
+    "chunk_top_k",
+    "fan_out",
+)
+# 멈춘 processing job 재적재 검사 주기 (초)
+REAP_INTERVAL_SEC = 60
+
+
+def run_quiz_job(
+    job_id: int, course_id: str, lecture_id: str, user_id: str, params: dict[str, Any], target: str = "quiz"
+) -> None:
+    """claim된 퀴즈 job 하나 실행: 생성(validate면 검증 포함) → lecture_quiz(또는 문항 은행) 저장 → done."""
+    with usage_context(job_type="quiz", job_id=job_id, course_id=course_id, lecture_id=lecture_id):
+        _run_quiz_job(job_id, course_id, lecture_id, user_id, params, target)
+
+
+def _run_quiz_job(
+    job_id: int, course_id: str, lecture_id: str, user_id: str, params: dict[str, Any], target: str
+) -> None:
+    try:
+        if target == "bank" and not quiz_bank_service.is_current(
+            course_id, lecture_id, user_id, params.get("source_version")
+        ):
+            # 적재 후 강의가 바뀜: 새 버전 보충 job이 따로 있으므로 생성하지 않고 끝냄
+            with get_session() as session:
+                quiz_job_repo.mark_done(session, job_id, None)
+            JOBS.inc(queue="quiz", status="done")
+            logger.info("퀴즈 job 건너뜀 (강의 내용 변경) job_id=%s", job_id)
+            return
+        kwargs = {k: params[k] for k in GENERATE_PARAM_KEYS if k in params}
+        if params.get("validate", True):
+            result = quiz_from_lecture_service.generate_validated(course_id, lecture_id, user_id, **kwargs)
+        else:
+            result = quiz_from_lecture_service.generate(course_id, lecture_id, user_id, **kwargs)
+        if target == "bank":
+            quiz_bank_service.store(course_id, lecture_id, user_id, result, params.get("source_version"))
+            quiz_id = None
+        else:
+            quiz_id = quiz_from_lecture_service.save_result(course_id, lecture_id, result)
+        with get_session() as session:
+            quiz_job_repo.mark_done(session, job_id, quiz_id)
+        JOBS.inc(queue="quiz", status="done")
+        logger.info("퀴즈 job 완료 job_id=%s quiz_id=%s 문항=%d", job_id, quiz_id, len(result.questions))
+    except Exception as e:
+        logger.exception("퀴즈 job 실패 job_id=%s", job_id)
+        with get_session() as session:
+            quiz_job_repo.mark_failed(session, job_id, str(e))
+        JOBS.inc(queue="quiz", status="failed")
+
+
+class QuizJobRunner:
+    """
+    빈 슬롯 수만큼만 job을 가져와 workers개 스레드에서 동시에 처리한다.
+    여러 워커 프로세스가 같은 큐를 폴링해도 SKIP LOCKED로 한 job은 한 곳에서만 처리된다.
+    REAP_INTERVAL_SEC마다 QUIZ_JOB_STALE_SEC 넘게 processing인 job(죽은 워커가 잡고 있던 것)을 pending으로 되돌린다.
+    """
+
+    def __init__(self, workers: int | None = None, poll_interval: float | None = None) -> None:
+        self.workers = max(1, workers or settings.QUIZ_JOB_WORKERS)
+        self.poll_interval = settings.QUIZ_JOB_POLL_INTERVAL_SEC if poll_interval is None else poll_interval
+        self._slots = threading.Semaphore(self.workers)
+        self._stop = threading.Event()
+        self._next_reap = 0.0
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def run_forever(self) -> None:
+        logger.info("퀴즈 job 러너 시작 (workers=%d, poll_interval=%ss)", self.workers, self.poll_interval)
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="quiz-job") as pool:
+            while not self._stop.is_set():
+                self._reap_stale()
+                try:
+                    claimed = self._claim_and_submit(pool)
+                except Exception:
+                    logger.exception("퀴즈 job 폴링 오류")
+                    claimed = 0
+                if not claimed:
+                    self._stop.wait(self.poll_interval)
+
+    def _reap_stale(self) -> None:
+        if time.monotonic() < self._next_reap:
+            return
+        self._next_reap = time.monotonic() + REAP_INTERVAL_SEC
+        try:
+            with get_session() as session:
+                job_ids = quiz_job_repo.requeue_stale(session, older_than_sec=settings.QUIZ_JOB_STALE_SEC)
+        except Exception:
+            logger.exception("멈춘 퀴즈 job 재적재 오류")
+            return
+        if job_ids:
+            logger.warning("processing에 멈춘 퀴즈 job %d건 재적재 job_ids=%s", len(job_ids), job_ids)
+
+    def _claim_and_submit(self, pool: ThreadPoolExecutor) -> int:
+        # 빈 슬롯이 생길 때까지 기다렸다가, 비어 있는 만큼만 가져온다
+        if not self._slots.acquire(timeout=self.poll_interval):
+            return 0
+        free = 1
+        while free < self.workers and self._slots.acquire(blocking=False):
+            free += 1
+        submitted = 0
+        try:
+            with get_session() as session:
+                jobs = [
+                    (job.id, job.course_id, job.lecture_id, job.user_id, dict(job.params), job.target)
+                    for job in quiz_job_repo.claim_pending(session, limit=free)
+                    if job.id is not None
+                ]
+            for args in jobs:
+                logger.info("퀴즈 job 처리 시작 job_id=%s", args[0])
+                pool.submit(self._run, *args)
+                submitted += 1  # 제출된 job의 슬롯은 _run이 반납
+        finally:
+            # claim 실패·빈 큐·제출 실패 어느 경우든 쓰지 않은 슬롯은 돌려준다
+            for _ in range(free - submitted):
+                self._slots.release()
+        return submitted
+
+    def _run(self, *args: Any) -> None:
+        try:
+            run_quiz_job(*args)
+        finally:
+            self._slots.release()
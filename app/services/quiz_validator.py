@@ -5,12 +5,16 @@
 
 import logging
 import re
+from typing import TYPE_CHECKING
 
-from openai import OpenAI
+if TYPE_CHECKING:
+    from openai import OpenAI
 
 logger = logging.getLogger(__name__)
 
 from app.core.config import settings
+from app.services.llm import chat_completion, openai_client
+from app.services.metrics import timed_stage
 from app.schema.quiz_lecture import (
     QuizFromLectureResponse,
     QuizQuestionItem,
@@ -22,12 +26,12 @@ from app.schema.quiz_lecture import (
 class QuizValidatorService:
     """질문과 보기만 주고 정답을 골라서, 원 정답과 일치 여부로 검증."""
 
-    def __init__(self) -> None:
-        self._client = OpenAI(
-            api_key=settings.OPENAI_API_KEY,
-            base_url=settings.OPENAI_BASE_URL,
-            timeout=settings.REQUEST_TIMEOUT,
-        )
+    # False면 LLM 응답 캐시를 쓰지 않음
+    use_cache: bool = True
+
+    @property
+    def _client(self) -> "OpenAI":
+        return openai_client()
 
     def pick_answer(self, question: str, options: list[str]) -> int | None:
         """
@@ -41,15 +45,17 @@ class QuizValidatorService:
         )
         user_prompt = f"질문: {question}\n\n보기:\n{opts_text}\n\n정답 번호(1~5):"
 
-        response = self._client.chat.completions.create(
-            model=settings.OPENAI_MODEL,
+        raw = chat_completion(
+            self._client,
             temperature=0.0,
             messages=[
                 {"role": "system", "content": system_prompt},
                 {"role": "user", "content": user_prompt},
             ],
-        )
-        raw = (response.choices[0].message.content or "").strip()
+            cache=self.use_cache,
+            name="quiz_validator",
+            hedge=True,
+        ).strip()
         match = re.search(r"[1-5]", raw)
         if match:
             return int(match.group())
@@ -80,6 +86,7 @@ class QuizValidatorService:
             verified=verified,
         )
 
+    @timed_stage("validation")
     def validate_all(self, response: QuizFromLectureResponse) -> ValidatedQuizFromLectureResponse:
         """전체 퀴즈 응답을 받아 문항별로 검증한 뒤 ValidatedQuizFromLectureResponse 반환."""
         validated = []
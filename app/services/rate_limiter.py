@@ -0,0 +1,234 @@
+"""
+OpenAI 호출 한도 스케줄러: chat / embedding / transcription 호출을 한곳에서 조절해 429 폭주를 막는다.
+- 요청 수(RPM)·토큰 수(TPM) 토큰 버킷: 요청 전 토큰 수를 추정해 차감, 부족하면 채워질 때까지 대기.
+- 동시 호출 수 AIMD: 429나 타임아웃이면 절반으로, 정상 응답마다 조금씩 증가.
+  (응답 시간은 출력 길이에 비례해 호출 지점마다 크게 달라 혼잡 신호로 쓰지 않는다)
+- RATE_LIMIT_SHARED=true면 RPM/TPM을 프로세스별 버킷 대신 Postgres llm_rate_windows(1분 창 카운터)로 API·워커가 공유.
+"""
+
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Any, Iterator
+
+from app.core.config import settings
+from app.services.tokens import count_tokens
+
+logger = logging.getLogger(__name__)
+
+KINDS = ("chat", "embedding", "transcription")
+
+# max_tokens 없는 chat 요청의 출력 토큰 추정치 (TPM은 입력+출력 기준)
+_CHAT_OUTPUT_TOKENS = 512
+# 타임아웃 예외 타입 이름 (openai SDK·httpx)
+_TIMEOUT_NAMES = {"APITimeoutError", "TimeoutException", "ReadTimeout", "WriteTimeout", "ConnectTimeout", "PoolTimeout"}
+# 메시지당 포맷 오버헤드 토큰
+_MESSAGE_OVERHEAD_TOKENS = 4
+
+
+def estimate_chat_tokens(
+    messages: list[dict[str, Any]], model: str | None = None, max_tokens: int | None = None
+) -> int:
+    """chat 요청 토큰 추정: 메시지 본문 + 메시지당 오버헤드 + 출력(요청의 max_tokens, 없으면 추정치)."""
+    total = max_tokens or _CHAT_OUTPUT_TOKENS
+    for m in messages:
+        content = m.get("content")
+        total += _MESSAGE_OVERHEAD_TOKENS + (count_tokens(content, model) if isinstance(content, str) else 0)
+    return total
+
+
+def estimate_embedding_tokens(inputs: str | list[str]) -> int:
+    texts = [inputs] if isinstance(inputs, str) else inputs
+    return sum(count_tokens(t) for t in texts)
+
+
+def is_rate_limit_error(exc: BaseException) -> bool:
+    """429 (openai.RateLimitError 또는 status_code 429)."""
+    if getattr(exc, "status_code", None) == 429:
+        return True
+    return type(exc).__name__ == "RateLimitError"
+
+
+def is_timeout_error(exc: BaseException) -> bool:
+    """요청 타임아웃 (openai.APITimeoutError, httpx 타임아웃, TimeoutError)."""
+    return type(exc).__name__ in _TIMEOUT_NAMES or isinstance(exc, TimeoutError)
+
+
+class TokenBucket:
+    """초당 rate만큼 채워지는 용량 capacity의 버킷. acquire는 충분해질 때까지 블로킹."""
+
+    def __init__(self, rate_per_sec: float, capacity: float) -> None:
+        self.rate = rate_per_sec
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def try_acquire(self, amount: float) -> float:
+        """차감에 성공하면 0, 아니면 더 기다려야 할 초를 반환 (차감하지 않음)."""
+        amount = min(amount, self.capacity)  # 용량보다 큰 요청이 영원히 대기하지 않도록
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            if self._tokens >= amount:
+                self._tokens -= amount
+                return 0.0
+            return (amount - self._tokens) / self.rate
+
+    def acquire(self, amount: float) -> float:
+        """차감될 때까지 대기. 반환: 총 대기 초."""
+        waited = 0.0
+        while True:
+            wait = self.try_acquire(amount)
+            if wait <= 0:
+                return waited
+            time.sleep(wait)
+            waited += wait
+
+
+class AIMDLimiter:
+    """동시 실행 수 한도를 AIMD로 조절하는 세마포어."""
+
+    def __init__(self, max_limit: int, min_limit: int = 1, decrease: float = 0.5) -> None:
+        self.max_limit = max(1, max_limit)
+        self.min_limit = max(1, min(min_limit, self.max_limit))
+        self.decrease = decrease
+        self._limit = float(self.max_limit)
+        self._in_flight = 0
+        self._cond = threading.Condition()
+
+    @property
+    def limit(self) -> int:
+        return int(self._limit)
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    def acquire(self) -> None:
+        with self._cond:
+            while self._in_flight >= int(self._limit):
+                self._cond.wait()
+            self._in_flight += 1
+
+    def release(self, *, congested: bool = False) -> None:
+        with self._cond:
+            self._in_flight -= 1
+            if congested:
+                self._limit = max(float(self.min_limit), self._limit * self.decrease)
+            else:
+                # 한도 1 증가에 한도만큼의 정상 응답이 필요 (TCP 혼잡 회피와 같은 가산 증가)
+                self._limit = min(float(self.max_limit), self._limit + 1.0 / self._limit)
+            self._cond.notify_all()
+
+
+@dataclass
+class KindLimits:
+    rpm: int
+    tpm: int  # 0이면 토큰 한도 없음 (transcription)
+
+
+def _default_limits() -> dict[str, KindLimits]:
+    return {
+        "chat": KindLimits(settings.RATE_LIMIT_CHAT_RPM, settings.RATE_LIMIT_CHAT_TPM),
+        "embedding": KindLimits(settings.RATE_LIMIT_EMBEDDING_RPM, settings.RATE_LIMIT_EMBEDDING_TPM),
+        "transcription": KindLimits(settings.RATE_LIMIT_TRANSCRIPTION_RPM, 0),
+    }
+
+
+class _SharedWindow:
+    """Postgres 1분 창 카운터로 여러 프로세스가 RPM/TPM을 나눠 쓴다."""
+
+    def __init__(self) -> None:
+        self._last_prune = 0
+
+    def acquire(self, kind: str, tokens: int, limits: KindLimits) -> float:
+        from app.db.connection import get_session
+        from app.db.repositories.llm_rate_window import llm_rate_window_repo
+
+        if limits.tpm:
+            tokens = min(tokens, limits.tpm)  # TPM보다 큰 요청이 영원히 대기하며 창마다 예산을 잡아먹지 않도록
+        waited = 0.0
+        while True:
+            window = int(time.time() // 60)
+            with get_session() as session:
+                if window != self._last_prune:
+                    llm_rate_window_repo.prune(session, window - 60)
+                    self._last_prune = window
+                requests, used = llm_rate_window_repo.reserve(session, kind, window, 1, tokens)
+            if requests <= limits.rpm and (not limits.tpm or used <= limits.tpm):
+                return waited
+            # 이번 창 한도 초과 → 다음 창까지 대기 후 다시 예약 (초과분은 이미 찬 창에만 남음)
+            wait = (window + 1) * 60 - time.time() + 0.05
+            logger.info("공유 한도 초과 kind=%s requests=%d tokens=%d → %.1fs 대기", kind, requests, used, wait)
+            time.sleep(max(wait, 0.05))
+            waited += max(wait, 0.05)
+
+
+class RateLimitScheduler:
+    """kind별 RPM/TPM 버킷 + AIMD 동시성. slot()으로 감싼 호출만 한도를 따른다."""
+
+    def __init__(
+        self,
+        limits: dict[str, KindLimits] | None = None,
+        max_concurrency: int | None = None,
+        shared: bool | None = None,
+    ) -> None:
+        self._limits = limits or _default_limits()
+        concurrency = max_concurrency or settings.RATE_LIMIT_MAX_CONCURRENCY
+        self._shared = _SharedWindow() if (settings.RATE_LIMIT_SHARED if shared is None else shared) else None
+        self._requests = {k: TokenBucket(v.rpm / 60.0, max(1, v.rpm)) for k, v in self._limits.items()}
+        self._tokens = {k: TokenBucket(v.tpm / 60.0, v.tpm) for k, v in self._limits.items() if v.tpm}
+        self._concurrency = {k: AIMDLimiter(concurrency) for k in self._limits}
+        self._stats_lock = threading.Lock()
+        self._stats = {k: {"calls": 0, "rate_limited": 0, "timeouts": 0, "wait_sec": 0.0} for k in self._limits}
+
+    @contextmanager
+    def slot(self, kind: str, tokens: int = 0) -> Iterator[None]:
+        """한도 안에서 호출 1회. 예외가 429·타임아웃이면 동시성 한도를 줄인 뒤 그대로 전파."""
+        if not settings.RATE_LIMIT_ENABLED or kind not in self._limits:
+            yield
+            return
+        t_wait = time.perf_counter()
+        if self._shared is not None:
+            self._shared.acquire(kind, tokens, self._limits[kind])
+        else:
+            self._requests[kind].acquire(1)
+            if kind in self._tokens and tokens:
+                self._tokens[kind].acquire(tokens)
+        limiter = self._concurrency[kind]
+        limiter.acquire()
+        waited = time.perf_counter() - t_wait
+        rate_limited = timed_out = False
+        try:
+            yield
+        except Exception as e:
+            rate_limited = is_rate_limit_error(e)
+            timed_out = is_timeout_error(e)
+            raise
+        finally:
+            limiter.release(congested=rate_limited or timed_out)
+            if rate_limited or timed_out:
+                reason = "429" if rate_limited else "타임아웃"
+                logger.warning("%s kind=%s → 동시성 한도 %d로 축소", reason, kind, limiter.limit)
+            with self._stats_lock:
+                s = self._stats[kind]
+                s["calls"] += 1
+                s["rate_limited"] += int(rate_limited)
+                s["timeouts"] += int(timed_out)
+                s["wait_sec"] += waited
+
+    def stats(self) -> dict[str, dict[str, Any]]:
+        with self._stats_lock:
+            out = {k: dict(v) for k, v in self._stats.items()}
+        for k, s in out.items():
+            s["wait_sec"] = round(s["wait_sec"], 3)
+            s["concurrency_limit"] = self._concurrency[k].limit
+            s["in_flight"] = self._concurrency[k].in_flight
+        return out
+
+
+rate_limiter = RateLimitScheduler()
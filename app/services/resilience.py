@@ -0,0 +1,207 @@
+"""
+OpenAI 호출 복원력: 재시도(지수 백오프 + full jitter), 재시도 가능 오류 분류, 엔드포인트별 서킷 브레이커, 헤지 요청.
+일시적 오류 한 번으로 ingestion job 전체가 실패(mark_failed)해 처음부터 다시 도는 일을 막는다.
+"""
+
+import logging
+import random
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Any, Callable, TypeVar
+
+from app.core.config import settings
+from app.services.tracing import wrap
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# 재시도해도 되는 HTTP 상태 (요청 시간 초과, 충돌, 한도, 서버 오류)
+_RETRYABLE_STATUS = {408, 409, 429, 500, 502, 503, 504}
+# 상태 코드 없이 전송 단계에서 실패하는 예외 (openai SDK 및 httpx)
+_RETRYABLE_NAMES = {"APIConnectionError", "APITimeoutError", "ConnectError", "ReadTimeout", "RemoteProtocolError"}
+
+
+class CircuitOpenError(RuntimeError):
+    """서킷이 열려 있어 호출하지 않고 바로 실패."""
+
+
+def is_retryable(exc: BaseException) -> bool:
+    """일시적 오류면 True. 400/401/403/404/422 같은 요청 자체의 오류는 재시도하지 않는다."""
+    status = getattr(exc, "status_code", None)
+    if status is not None:
+        return status in _RETRYABLE_STATUS or status >= 500
+    return type(exc).__name__ in _RETRYABLE_NAMES or isinstance(exc, (ConnectionError, TimeoutError))
+
+
+def _retry_after(exc: BaseException) -> float | None:
+    """429/503 응답의 Retry-After 헤더(초)."""
+    response = getattr(exc, "response", None)
+    headers = getattr(response, "headers", None)
+    if not headers:
+        return None
+    try:
+        return float(headers.get("retry-after"))
+    except (TypeError, ValueError):
+        return None
+
+
+def backoff_delay(attempt: int, base: float, cap: float, rng: random.Random | None = None) -> float:
+    """full jitter: [0, min(cap, base * 2^attempt)] 균등 분포 (attempt는 0부터)."""
+    return (rng or random).uniform(0, min(cap, base * (2**attempt)))
+
+
+class CircuitBreaker:
+    """연속 실패 failure_threshold회면 열림 → reset_sec 후 반열림(시험 호출 1건) → 성공 시 닫힘."""
+
+    def __init__(self, failure_threshold: int, reset_sec: float) -> None:
+        self.failure_threshold = max(1, failure_threshold)
+        self.reset_sec = reset_sec
+        self.state = "closed"
+        self._failures = 0
+        self._opened_at = 0.0
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self.state == "closed":
+                return True
+            if self.state == "open" and time.monotonic() - self._opened_at >= self.reset_sec:
+                self.state = "half_open"
+                self._trial_in_flight = False
+            if self.state == "half_open" and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return True
+            return False
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.state = "closed"
+            self._failures = 0
+            self._trial_in_flight = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            if self.state == "half_open" or self._failures >= self.failure_threshold:
+                if self.state != "open":
+                    logger.warning("서킷 열림 (연속 실패 %d회)", self._failures)
+                self.state = "open"
+                self._opened_at = time.monotonic()
+                self._trial_in_flight = False
+
+
+class ResilientCaller:
+    """엔드포인트(chat/embedding/transcription)별 브레이커와 재시도·헤지 통계를 가진 호출 래퍼."""
+
+    def __init__(
+        self,
+        max_attempts: int | None = None,
+        base_delay: float | None = None,
+        max_delay: float | None = None,
+        sleep: Callable[[float], None] = time.sleep,
+    ) -> None:
+        self.max_attempts = max(1, max_attempts or settings.LLM_RETRY_MAX_ATTEMPTS)
+        self.base_delay = base_delay if base_delay is not None else settings.LLM_RETRY_BASE_DELAY_SEC
+        self.max_delay = max_delay if max_delay is not None else settings.LLM_RETRY_MAX_DELAY_SEC
+        self._sleep = sleep
+        self._breakers: dict[str, CircuitBreaker] = {}
+        self._stats: dict[str, dict[str, int]] = {}
+        self._lock = threading.Lock()
+        self._hedge_pool: ThreadPoolExecutor | None = None
+
+    def breaker(self, endpoint: str) -> CircuitBreaker:
+        with self._lock:
+            if endpoint not in self._breakers:
+                self._breakers[endpoint] = CircuitBreaker(
+                    settings.LLM_BREAKER_FAILURE_THRESHOLD, settings.LLM_BREAKER_RESET_SEC
+                )
+            return self._breakers[endpoint]
+
+    def call(self, endpoint: str, fn: Callable[[], T], *, hedge_after: float | None = None) -> T:
+        """
+        fn()을 재시도 가능 오류에 한해 최대 max_attempts회 시도. Retry-After 헤더가 있으면 그만큼은 기다린다.
+        hedge_after(초)가 주어지면 그 시간 안에 응답이 없을 때 같은 요청을 하나 더 보내 먼저 성공한 쪽을 쓴다
+        (멱등·저비용 호출에만: 느린 쪽은 취소되지 않고 끝까지 실행됨).
+        """
+        breaker = self.breaker(endpoint)
+        attempt = 0
+        while True:
+            if not breaker.allow():
+                self._count(endpoint, "breaker_rejected")
+                raise CircuitOpenError(f"{endpoint} 서킷 열림: {breaker.reset_sec}s 후 재시도")
+            self._count(endpoint, "calls")
+            try:
+                result = self._hedged(endpoint, fn, hedge_after) if hedge_after else fn()
+            except Exception as e:
+                retryable = is_retryable(e)
+                if retryable:
+                    breaker.record_failure()
+                else:
+                    # 요청 자체의 오류는 엔드포인트 상태와 무관 (반열림 시험 호출이었다면 닫는다)
+                    breaker.record_success()
+                attempt += 1
+                if not retryable or attempt >= self.max_attempts:
+                    self._count(endpoint, "failures")
+                    raise
+                delay = max(backoff_delay(attempt - 1, self.base_delay, self.max_delay), _retry_after(e) or 0.0)
+                self._count(endpoint, "retries")
+                logger.warning(
+                    "%s 호출 실패 (%s) → %d/%d회째 재시도, %.2fs 후",
+                    endpoint,
+                    type(e).__name__,
+                    attempt,
+                    self.max_attempts - 1,
+                    delay,
+                )
+                self._sleep(delay)
+                continue
+            breaker.record_success()
+            return result
+
+    def _hedged(self, endpoint: str, fn: Callable[[], T], hedge_after: float) -> T:
+        pool = self._pool()
+        first = pool.submit(wrap(fn))
+        done, _ = wait([first], timeout=hedge_after)
+        if done:
+            return first.result()
+        self._count(endpoint, "hedges")
+        second = pool.submit(wrap(fn))
+        pending: set[Future[T]] = {first, second}
+        error: BaseException | None = None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for f in done:
+                if f.exception() is None:
+                    if f is second:
+                        self._count(endpoint, "hedge_wins")
+                    return f.result()
+                error = error or f.exception()
+        assert error is not None
+        raise error
+
+    def _pool(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._hedge_pool is None:
+                self._hedge_pool = ThreadPoolExecutor(max_workers=16, thread_name_prefix="llm-hedge")
+            return self._hedge_pool
+
+    def _count(self, endpoint: str, field: str) -> None:
+        with self._lock:
+            counts = self._stats.setdefault(
+                endpoint,
+                {"calls": 0, "retries": 0, "failures": 0, "breaker_rejected": 0, "hedges": 0, "hedge_wins": 0},
+            )
+            counts[field] += 1
+
+    def stats(self) -> dict[str, dict[str, Any]]:
+        with self._lock:
+            out: dict[str, dict[str, Any]] = {k: dict(v) for k, v in self._stats.items()}
+            for endpoint, breaker in self._breakers.items():
+                out.setdefault(endpoint, {})["breaker_state"] = breaker.state
+        return out
+
+
+resilient_caller = ResilientCaller()
@@ -0,0 +1,166 @@
+"""
+구조화 출력: Pydantic 모델 → OpenAI json_schema strict 응답 형식, 부분적으로 깨진 응답에서 유효 문항만 살리기,
+복구(모자란 문항만 재생성) 비율·추가 지연 통계.
+스키마 위반 시 JSON 전체를 되돌려 보내 고치게 하던 repair 왕복(지연·토큰 2배)을 대신한다.
+"""
+
+import json
+import logging
+import threading
+import time
+from typing import Any, Callable, TypeVar
+
+from pydantic import BaseModel, ValidationError
+
+from app.core.config import settings
+from app.services.json_stream import JsonArrayStreamParser
+
+logger = logging.getLogger(__name__)
+
+M = TypeVar("M", bound=BaseModel)
+
+# strict 모드가 받지 않는 키워드 (값 검증은 응답을 받은 뒤 Pydantic이 그대로 한다)
+_UNSUPPORTED_KEYWORDS = {"default", "minLength", "maxLength", "uniqueItems", "minProperties", "maxProperties"}
+
+
+def _strictify(node: Any) -> Any:
+    if isinstance(node, list):
+        return [_strictify(n) for n in node]
+    if not isinstance(node, dict):
+        return node
+    out = {k: _strictify(v) for k, v in node.items() if k not in _UNSUPPORTED_KEYWORDS}
+    if out.get("type") == "object" and "properties" in out:
+        # strict 모드: 모든 필드 required, 추가 필드 금지 (선택 필드는 anyOf null로 이미 표현됨)
+        out["required"] = list(out["properties"])
+        out["additionalProperties"] = False
+    return out
+
+
+def strict_response_format(model: type[BaseModel], name: str | None = None) -> dict[str, Any]:
+    """
+    chat.completions response_format 값. LLM_STRICT_SCHEMA=False면 기존 json_object 모드
+    (json_schema를 지원하지 않는 OPENAI_BASE_URL 호환 서버용).
+    """
+    if not settings.LLM_STRICT_SCHEMA:
+        return {"type": "json_object"}
+    return {
+        "type": "json_schema",
+        "json_schema": {
+            "name": name or model.__name__,
+            "strict": True,
+            "schema": _strictify(model.model_json_schema()),
+        },
+    }
+
+
+def salvage_items(
+    raw: str, item_model: type[M], key: str = "questions"
+) -> tuple[dict[str, Any], list[M], int]:
+    """
+    응답 JSON에서 key 배열 원소를 하나씩 검증해 (최상위 나머지 필드, 유효 원소, 버린 원소 수) 반환.
+    JSON 자체가 깨졌으면(잘린 응답 등) 닫힌 원소까지만 증분 파서로 건진다.
+    """
+    try:
+        data = json.loads(raw or "{}")
+    except ValueError:
+        parser = JsonArrayStreamParser(key)
+        data = {key: parser.feed(raw or "")}
+        dropped = len(parser.errors)
+    else:
+        dropped = 0
+    if not isinstance(data, dict):
+        return {}, [], dropped + 1
+    raw_items = data.pop(key, None)
+    if not isinstance(raw_items, list):
+        raw_items = []
+    items: list[M] = []
+    for raw_item in raw_items:
+        try:
+            items.append(item_model.model_validate(raw_item))
+        except ValidationError as e:
+            dropped += 1
+            logger.debug("문항 스키마 위반 → 버림: %s", e.errors()[:1])
+    return data, items, dropped
+
+
+def topup_instruction(existing: list[str], missing: int) -> str:
+    """모자란 문항만 다시 만들 때 원래 user 프롬프트 뒤에 붙이는 지시."""
+    listed = "\n".join(f"- {q}" for q in existing) or "(없음)"
+    return f"""
+
+[이미 만든 문항 - 겹치지 말 것]
+{listed}
+
+위 요청의 문항 수는 무시하고, 이미 만든 문항과 겹치지 않는 새 문항 {missing}개만 같은 JSON 형식으로 출력해."""
+
+
+class StructuredOutputStats:
+    """호출 지점별 응답 수, 그대로 통과한 응답, 복구(재생성) 횟수·버린 문항·추가 지연."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._counts: dict[str, dict[str, float]] = {}
+
+    def record(self, name: str, *, dropped: int, missing: int, topup_sec: float | None = None) -> None:
+        with self._lock:
+            c = self._counts.setdefault(
+                name,
+                {"responses": 0, "clean": 0, "repaired": 0, "dropped_items": 0, "missing_items": 0, "repair_sec": 0.0},
+            )
+            c["responses"] += 1
+            c["dropped_items"] += dropped
+            c["missing_items"] += missing
+            if dropped == 0 and missing == 0:
+                c["clean"] += 1
+            if topup_sec is not None:
+                c["repaired"] += 1
+                c["repair_sec"] += topup_sec
+
+    def stats(self) -> dict[str, dict[str, Any]]:
+        with self._lock:
+            out: dict[str, dict[str, Any]] = {}
+            for name, c in self._counts.items():
+                repaired = int(c["repaired"])
+                out[name] = {
+                    "responses": int(c["responses"]),
+                    "clean": int(c["clean"]),
+                    "repaired": repaired,
+                    "repair_rate": round(repaired / c["responses"], 4) if c["responses"] else 0.0,
+                    "dropped_items": int(c["dropped_items"]),
+                    "missing_items": int(c["missing_items"]),
+                    "avg_repair_sec": round(c["repair_sec"] / repaired, 3) if repaired else 0.0,
+                }
+            return out
+
+
+structured_output_stats = StructuredOutputStats()
+
+
+def complete_items(
+    call: Callable[[str], str],
+    user_prompt: str,
+    item_model: type[M],
+    count: int,
+    *,
+    name: str,
+    key: str = "questions",
+) -> tuple[dict[str, Any], list[M]]:
+    """
+    call(user_prompt) 응답에서 스키마에 맞는 원소만 살리고, count보다 모자라면 모자란 수만큼만 한 번 더 요청한다
+    (깨진 JSON 전체를 되돌려 고치게 하지 않음). 재생성 지시에는 이미 만든 원소의 question을 넣어 겹치지 않게 한다.
+    결과는 name으로 structured_output_stats에 기록. 반환: (최상위 나머지 필드, 원소). 원소가 없으면 ValueError.
+    """
+    data, items, dropped = salvage_items(call(user_prompt), item_model, key)
+    missing = count - len(items)
+    topup_sec = None
+    if missing > 0:
+        t0 = time.perf_counter()
+        logger.info("퀴즈 문항 부족(유효 %d/%d, 버림 %d) → %d문항만 재생성", len(items), count, dropped, missing)
+        extra_prompt = user_prompt + topup_instruction([getattr(item, "question", "") for item in items], missing)
+        _, extra, _ = salvage_items(call(extra_prompt), item_model, key)
+        items.extend(extra[:missing])
+        topup_sec = time.perf_counter() - t0
+    structured_output_stats.record(name, dropped=dropped, missing=max(0, missing), topup_sec=topup_sec)
+    if not items:
+        raise ValueError("퀴즈 생성 실패: 스키마에 맞는 문항이 없습니다.")
+    return data, items
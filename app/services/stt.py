@@ -5,22 +5,16 @@
 from pathlib import Path
 from typing import Any
 
-from openai import OpenAI
-
-from app.core.config import settings
+from app.services.llm import create_transcription, openai_client
 
 
 def transcribe(audio_path: Path) -> dict[str, Any]:
     """
     음성 파일을 OpenAI 전사 API로 변환해 segments 포함 JSON 반환.
     """
-    client = OpenAI(
-        api_key=settings.OPENAI_API_KEY,
-        base_url=settings.OPENAI_BASE_URL,
-        timeout=settings.REQUEST_TIMEOUT,
-    )
     with audio_path.open("rb") as f:
-        transcript = client.audio.transcriptions.create(
+        transcript = create_transcription(
+            openai_client(),
             model="gpt-4o-transcribe-diarize",
             file=f,
             response_format="diarized_json",
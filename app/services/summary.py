@@ -1,12 +1,36 @@
 """
 전사 JSON을 LLM으로 요약하는 서비스.
+- truncate: 전사를 MAX_TRANSCRIPT_CHARS에서 잘라 1회 요약.
+- map_reduce: 청크별 요약을 병렬로 만든 뒤(map) 요약들을 묶어 최종 요약(reduce). 긴 강의 전체를 반영.
 """
 
-from typing import Any
-
-from openai import OpenAI
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING, Any
 
 from app.core.config import settings
+from app.services.chunking import chunk_by_max_chars
+from app.services.llm import chat_completion, openai_client
+from app.services.metrics import timed_stage
+from app.services.tracing import wrap
+
+if TYPE_CHECKING:
+    from openai import OpenAI
+
+logger = logging.getLogger(__name__)
+
+SUMMARY_SYSTEM_PROMPT = (
+    "너는 강의 또는 발표 전사 내용을 읽고 짧은 요약문을 만드는 전문가다. "
+    "2~4문장 정도로 핵심만 간결하게 요약한다. 요약만 출력하고 다른 설명은 하지 마라."
+)
+MAP_SYSTEM_PROMPT = (
+    "너는 긴 강의 전사의 한 구간을 요약하는 전문가다. "
+    "이 구간에서 다룬 개념·용어·예시를 빠짐없이 3~5문장으로 요약한다. 요약만 출력하고 다른 설명은 하지 마라."
+)
+REDUCE_SYSTEM_PROMPT = (
+    "너는 한 강의의 구간별 요약들을 하나로 합치는 전문가다. "
+    "중복을 없애고 강의 흐름 순서대로 핵심만 정리한다. 요약만 출력하고 다른 설명은 하지 마라."
+)
 
 
 def _transcript_from_content(content_json: dict[str, Any], max_chars: int | None = None) -> str:
@@ -24,16 +48,54 @@ def _transcript_from_content(content_json: dict[str, Any], max_chars: int | None
     return transcript
 
 
+def _title_context(
+    course_title: str | None, section_title: str | None, lecture_title: str | None
+) -> str:
+    """강좌/섹션/강의 제목을 user 프롬프트 앞에 붙일 맥락 문자열로 만든다."""
+    title_lines: list[str] = []
+    if course_title and course_title.strip():
+        title_lines.append(f"강좌(대주제): {course_title.strip()}")
+    if section_title and section_title.strip():
+        title_lines.append(f"섹션: {section_title.strip()}")
+    if lecture_title and lecture_title.strip():
+        title_lines.append(f"강의: {lecture_title.strip()}")
+    if title_lines:
+        return "\n".join(title_lines) + "\n\n"
+    return ""
+
+
+def summary_messages(
+    content_json: dict[str, Any],
+    max_transcript_chars: int | None = None,
+    *,
+    course_title: str | None = None,
+    section_title: str | None = None,
+    lecture_title: str | None = None,
+) -> list[dict[str, str]] | None:
+    """truncate 요약 프롬프트 [system, user]. 전사가 비어 있으면 None. (배치 모드 요청 본문도 이 메시지 사용)"""
+    limit = max_transcript_chars or settings.MAX_TRANSCRIPT_CHARS
+    transcript = _transcript_from_content(content_json, max_chars=limit)
+    if not transcript.strip():
+        return None
+    # 맥락(강좌/섹션/강의 제목)은 이번 입력의 데이터이므로 user 메시지에 포함
+    context = _title_context(course_title, section_title, lecture_title)
+    return [
+        {"role": "system", "content": SUMMARY_SYSTEM_PROMPT},
+        {"role": "user", "content": f"{context}아래 전사 내용을 요약해 줘.\n\n전사:\n{transcript}"},
+    ]
+
+
 class SummaryService:
     """강의 전사 텍스트를 요약문으로 만든다."""
 
-    def __init__(self) -> None:
-        self._client = OpenAI(
-            api_key=settings.OPENAI_API_KEY,
-            base_url=settings.OPENAI_BASE_URL,
-            timeout=settings.REQUEST_TIMEOUT,
-        )
+    # False면 LLM 응답 캐시를 쓰지 않음 (같은 전사라도 매번 새로 요약)
+    use_cache: bool = True
+
+    @property
+    def _client(self) -> "OpenAI":
+        return openai_client()
 
+    @timed_stage("summary")
     def summarize(
         self,
         content_json: dict[str, Any],
@@ -42,45 +104,130 @@ class SummaryService:
         course_title: str | None = None,
         section_title: str | None = None,
         lecture_title: str | None = None,
+        mode: str | None = None,
     ) -> str:
         """
         전사 JSON에서 텍스트를 뽑아 LLM으로 요약한 문자열을 반환한다.
         max_transcript_chars: 요약에 넣을 전사 최대 글자 수 (None이면 설정값 또는 제한 없음)
         course_title/section_title/lecture_title: 강좌 대주제·소주제로 프롬프트(user)에 포함.
+        mode: "truncate" | "map_reduce" (None이면 settings.SUMMARY_MODE)
         """
-        limit = max_transcript_chars or settings.MAX_TRANSCRIPT_CHARS
-        transcript = _transcript_from_content(content_json, max_chars=limit)
-        if not transcript.strip():
+        if (mode or settings.SUMMARY_MODE) == "map_reduce":
+            summary, _ = self.summarize_map_reduce(
+                content_json,
+                course_title=course_title,
+                section_title=section_title,
+                lecture_title=lecture_title,
+            )
+            return summary
+
+        messages = summary_messages(
+            content_json,
+            max_transcript_chars,
+            course_title=course_title,
+            section_title=section_title,
+            lecture_title=lecture_title,
+        )
+        if messages is None:
             return ""
+        return self._chat(messages[0]["content"], messages[1]["content"])
 
-        system_prompt = (
-            "너는 강의 또는 발표 전사 내용을 읽고 짧은 요약문을 만드는 전문가다. "
-            "2~4문장 정도로 핵심만 간결하게 요약한다. 요약만 출력하고 다른 설명은 하지 마라."
+    def summarize_map_reduce(
+        self,
+        content_json: dict[str, Any],
+        *,
+        chunks: list[dict[str, Any]] | None = None,
+        fan_out: int | None = None,
+        course_title: str | None = None,
+        section_title: str | None = None,
+        lecture_title: str | None = None,
+    ) -> tuple[str, list[str]]:
+        """
+        청크별 요약(map)을 최대 fan_out개씩 동시에 만든 뒤, 요약들을 SUMMARY_REDUCE_GROUP_SIZE개씩
+        트리 형태로 합쳐(reduce) 최종 요약을 만든다. 벽시계 시간은 강의 길이가 아니라 트리 깊이에 비례.
+
+        chunks: [{"text": ..., "summary": 저장된 청크 요약 또는 None}] (예: lecture_chunks).
+            summary가 있는 청크는 LLM을 다시 호출하지 않는다. None이면 전사를 SUMMARY_MAP_CHUNK_CHARS로 나눔.
+        반환: (최종 요약, 청크별 요약 리스트 — chunks와 같은 순서)
+        """
+        if chunks is None:
+            segments = content_json.get("segments") or []
+            transcript = _transcript_from_content(content_json)
+            if not transcript.strip():
+                return "", []
+            if len(transcript) <= settings.MAX_TRANSCRIPT_CHARS:
+                # 한 번에 들어가는 길이면 map 단계 없이 1회 요약
+                summary = self.summarize(
+                    content_json,
+                    course_title=course_title,
+                    section_title=section_title,
+                    lecture_title=lecture_title,
+                    mode="truncate",
+                )
+                return summary, []
+            chunks = chunk_by_max_chars(segments, max_chars=settings.SUMMARY_MAP_CHUNK_CHARS)
+        if not chunks:
+            return "", []
+
+        workers = max(1, fan_out or settings.SUMMARY_FAN_OUT)
+        partials: list[str] = [(ch.get("summary") or "").strip() for ch in chunks]
+        pending = [i for i, p in enumerate(partials) if not p and (chunks[i].get("text") or "").strip()]
+        logger.info(
+            "Map 단계: 청크 %d개 중 %d개 요약 생성 (저장된 요약 재사용 %d개, fan_out=%d)",
+            len(chunks),
+            len(pending),
+            len(chunks) - len(pending),
+            workers,
         )
-        # 맥락(강좌/섹션/강의 제목)은 이번 입력의 데이터이므로 user 메시지에 포함
-        title_lines: list[str] = []
-        if course_title and course_title.strip():
-            title_lines.append(f"강좌(대주제): {course_title.strip()}")
-        if section_title and section_title.strip():
-            title_lines.append(f"섹션: {section_title.strip()}")
-        if lecture_title and lecture_title.strip():
-            title_lines.append(f"강의: {lecture_title.strip()}")
-        if title_lines:
-            context = "\n".join(title_lines) + "\n\n"
-        else:
-            context = ""
-        user_prompt = f"{context}아래 전사 내용을 요약해 줘.\n\n전사:\n{transcript}"
-
-        response = self._client.chat.completions.create(
-            model=settings.OPENAI_MODEL,
-            temperature=settings.OPENAI_TEMPERATURE,
+        with ThreadPoolExecutor(max_workers=workers) as ex:
+            texts = [chunks[i]["text"] for i in pending]
+            # 제출마다 wrap: trace·사용량·프로파일 context를 풀 스레드로 넘긴다
+            futures = [ex.submit(wrap(self._summarize_part), t) for t in texts]
+            for i, future in zip(pending, futures):
+                partials[i] = future.result()
+
+        context = _title_context(course_title, section_title, lecture_title)
+        level = [p for p in partials if p]
+        group_size = max(2, settings.SUMMARY_REDUCE_GROUP_SIZE)
+        depth = 0
+        while len(level) > group_size:
+            groups = [level[i : i + group_size] for i in range(0, len(level), group_size)]
+            with ThreadPoolExecutor(max_workers=workers) as ex:
+                futures = [ex.submit(wrap(self._reduce), g, context) for g in groups]
+                level = [f.result() for f in futures]
+            depth += 1
+        summary = self._reduce_final(level, context) if level else ""
+        logger.info("Reduce 단계 완료 (중간 단계 %d회)", depth)
+        return summary, partials
+
+    def _summarize_part(self, text: str) -> str:
+        return self._chat(MAP_SYSTEM_PROMPT, f"아래 전사 구간을 요약해 줘.\n\n전사 구간:\n{text}")
+
+    def _reduce(self, summaries: list[str], context: str) -> str:
+        joined = "\n\n".join(f"({i}) {s}" for i, s in enumerate(summaries, 1))
+        return self._chat(
+            REDUCE_SYSTEM_PROMPT,
+            f"{context}아래 구간 요약들을 순서를 유지해 하나의 요약으로 합쳐 줘.\n\n구간 요약:\n{joined}",
+        )
+
+    def _reduce_final(self, summaries: list[str], context: str) -> str:
+        joined = "\n\n".join(f"({i}) {s}" for i, s in enumerate(summaries, 1))
+        return self._chat(
+            SUMMARY_SYSTEM_PROMPT,
+            f"{context}아래는 강의 전체를 순서대로 나눈 구간 요약이다. 강의 전체 요약을 만들어 줘.\n\n구간 요약:\n{joined}",
+        )
+
+    def _chat(self, system_prompt: str, user_prompt: str) -> str:
+        content = chat_completion(
+            self._client,
             messages=[
                 {"role": "system", "content": system_prompt},
                 {"role": "user", "content": user_prompt},
             ],
+            cache=self.use_cache,
+            name="summary",
         )
-        summary = (response.choices[0].message.content or "").strip()
-        return summary
+        return content.strip()
 
 
 summary_service = SummaryService()
@@ -0,0 +1,14 @@
+"""
+강의 시간 표기 헬퍼 (전사 세그먼트·청크 구간을 프롬프트에 넣을 때 공용).
+"""
+
+
+def format_ts(seconds: float) -> str:
+    """초 → 'MM:SS.ss' (1시간 이상이면 'HH:MM:SS.ss')."""
+    seconds = max(0.0, seconds)
+    hours = int(seconds // 3600)
+    minutes = int((seconds % 3600) // 60)
+    secs = seconds % 60
+    if hours > 0:
+        return f"{hours:02d}:{minutes:02d}:{secs:05.2f}"
+    return f"{minutes:02d}:{secs:05.2f}"
@@ -0,0 +1,64 @@
+"""
+로컬 토큰 수 계산 (tiktoken).
+인코딩 파일을 불러올 수 없는 환경(오프라인 등)에서는 글자 수 기반 근사치를 쓴다.
+"""
+
+import logging
+import math
+from functools import lru_cache
+from typing import Any
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+@lru_cache(maxsize=8)
+def _encoding(model: str) -> Any | None:
+    try:
+        import tiktoken
+
+        try:
+            return tiktoken.encoding_for_model(model)
+        except KeyError:
+            return tiktoken.get_encoding("o200k_base")
+    except Exception as e:
+        logger.warning("tiktoken 인코딩 로드 실패 → 글자 수 근사치 사용 (%s)", e)
+        return None
+
+
+def _estimate(text: str) -> int:
+    """ASCII는 약 4자당 1토큰, 한글 등 비ASCII는 약 1.2자당 1토큰으로 근사 (예산 초과를 피하도록 보수적으로)."""
+    ascii_chars = sum(1 for c in text if ord(c) < 128)
+    other_chars = len(text) - ascii_chars
+    return math.ceil(ascii_chars / 4 + other_chars / 1.2)
+
+
+def count_tokens(text: str, model: str | None = None) -> int:
+    if not text:
+        return 0
+    enc = _encoding(model or settings.OPENAI_MODEL)
+    if enc is None:
+        return _estimate(text)
+    return len(enc.encode(text, disallowed_special=()))
+
+
+def truncate_to_tokens(text: str, max_tokens: int, model: str | None = None) -> str:
+    """text를 max_tokens 토큰 이하로 앞에서부터 자른다."""
+    if max_tokens <= 0 or not text:
+        return ""
+    enc = _encoding(model or settings.OPENAI_MODEL)
+    if enc is not None:
+        ids = enc.encode(text, disallowed_special=())
+        return text if len(ids) <= max_tokens else enc.decode(ids[:max_tokens])
+    if _estimate(text) <= max_tokens:
+        return text
+    # 근사치: 글자 수 이분 탐색
+    lo, hi = 0, len(text)
+    while lo < hi:
+        mid = (lo + hi + 1) // 2
+        if _estimate(text[:mid]) <= max_tokens:
+            lo = mid
+        else:
+            hi = mid - 1
+    return text[:lo]
@@ -0,0 +1,229 @@
+"""
+파이프라인 트레이싱: API 적재 → 큐 대기 → 워커 단계 → LLM 호출을 하나의 trace로 잇는 span.
+- 적재할 때 W3C traceparent를 ingestion_jobs.payload["trace"]에 넣고, run_pipeline이 그 context를 이어받는다.
+- 단계(metrics.timed_stage)와 LLM 호출(app.services.llm)은 자동으로 span이 되고, LLM span에는 모델·토큰 수가 붙는다.
+- 내보내기: TRACING_EXPORTER=jsonl(TRACING_FILE에 한 줄에 span 하나, 오프라인) | otlp(OTLP/HTTP JSON) | none(기본, 비용 없음).
+  내보내기는 백그라운드 스레드(app.services.batcher)가 묶어서 하므로 호출 경로에는 큐에 넣는 비용만 든다.
+"""
+
+import contextvars
+import json
+import logging
+import os
+import re
+import secrets
+import threading
+import time
+import urllib.request
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Iterator, TypeVar
+
+from app.core.config import settings
+from app.services.batcher import BackgroundBatcher
+from app.services.profiling import attach_thread
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+_TRACEPARENT = re.compile(r"^00-([0-9a-f]{32})-([0-9a-f]{16})-[0-9a-f]{2}$")
+
+
+class Span:
+    __slots__ = ("trace_id", "span_id", "parent_id", "name", "start_ns", "end_ns", "attributes", "error")
+
+    def __init__(self, name: str, trace_id: str, parent_id: str | None, attributes: dict[str, Any]) -> None:
+        self.trace_id = trace_id
+        self.span_id = secrets.token_hex(8)
+        self.parent_id = parent_id
+        self.name = name
+        self.start_ns = time.time_ns()
+        self.end_ns = 0
+        self.attributes = attributes
+        self.error: str | None = None
+
+    def set(self, **attributes: Any) -> None:
+        self.attributes.update({k: v for k, v in attributes.items() if v is not None})
+
+    @property
+    def traceparent(self) -> str:
+        return f"00-{self.trace_id}-{self.span_id}-01"
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "start_ns": self.start_ns,
+            "end_ns": self.end_ns,
+            "duration_ms": round((self.end_ns - self.start_ns) / 1e6, 3),
+            "attributes": self.attributes,
+            "error": self.error,
+        }
+
+
+class _NoopSpan:
+    """TRACING_EXPORTER=none일 때 span() 대신 돌려주는 객체 (set만 받고 버림)."""
+
+    traceparent = None
+
+    def set(self, **attributes: Any) -> None:
+        pass
+
+
+_NOOP = _NoopSpan()
+# 현재 span 또는 이어받은 원격 부모 (trace_id, span_id)
+_current: contextvars.ContextVar[Span | tuple[str, str] | None] = contextvars.ContextVar("trace_span", default=None)
+
+
+def enabled() -> bool:
+    return settings.TRACING_EXPORTER in ("jsonl", "otlp")
+
+
+def _parent_ids() -> tuple[str | None, str | None]:
+    parent = _current.get()
+    if parent is None:
+        return None, None
+    if isinstance(parent, Span):
+        return parent.trace_id, parent.span_id
+    return parent
+
+
+@contextmanager
+def span(name: str, **attributes: Any) -> Iterator[Span | _NoopSpan]:
+    """현재 span의 자식 span (없으면 새 trace 시작). 예외는 error로 기록 후 그대로 전파."""
+    if not enabled():
+        yield _NOOP
+        return
+    trace_id, parent_id = _parent_ids()
+    current = Span(name, trace_id or secrets.token_hex(16), parent_id, {k: v for k, v in attributes.items() if v is not None})
+    token = _current.set(current)
+    try:
+        yield current
+    except BaseException as e:
+        current.error = f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        _current.reset(token)
+        current.end_ns = time.time_ns()
+        exporter.put(current)
+
+
+def record_span(name: str, start_ns: int, end_ns: int, **attributes: Any) -> None:
+    """이미 지나간 구간(예: 큐 대기)을 현재 span의 자식으로 기록."""
+    if not enabled():
+        return
+    trace_id, parent_id = _parent_ids()
+    past = Span(name, trace_id or secrets.token_hex(16), parent_id, {k: v for k, v in attributes.items() if v is not None})
+    past.start_ns, past.end_ns = start_ns, max(start_ns, end_ns)
+    exporter.put(past)
+
+
+def inject(payload: dict[str, Any]) -> dict[str, Any]:
+    """job payload에 현재 trace context(traceparent)를 넣는다. 트레이싱이 꺼져 있으면 그대로."""
+    current = _current.get()
+    if isinstance(current, Span):
+        payload["trace"] = {"traceparent": current.traceparent}
+    return payload
+
+
+@contextmanager
+def continue_from(payload: dict[str, Any] | None) -> Iterator[None]:
+    """payload["trace"]의 traceparent를 부모로 삼는다 (없거나 형식이 틀리면 새 trace)."""
+    match = _TRACEPARENT.match(str(((payload or {}).get("trace") or {}).get("traceparent") or ""))
+    if not enabled() or not match:
+        yield
+        return
+    token = _current.set((match.group(1), match.group(2)))
+    try:
+        yield
+    finally:
+        _current.reset(token)
+
+
+def wrap(fn: Callable[..., T]) -> Callable[..., T]:
+    """
+    스레드 풀에 넘길 함수에 현재 context(trace·사용량·프로파일)를 붙인다 (제출마다 새로 감싸야 함).
+    프로파일 중이면 실행하는 동안 그 풀 스레드도 샘플링 대상이 된다.
+    """
+    ctx = contextvars.copy_context()
+
+    def attached(*args: Any, **kwargs: Any) -> T:
+        with attach_thread():
+            return fn(*args, **kwargs)
+
+    return lambda *args, **kwargs: ctx.run(attached, *args, **kwargs)
+
+
+def usage_attributes(response: Any) -> dict[str, Any]:
+    """LLM 응답 usage → span 속성 (없으면 빈 dict)."""
+    usage = getattr(response, "usage", None)
+    if usage is None:
+        return {}
+    return {
+        "llm.prompt_tokens": getattr(usage, "prompt_tokens", None),
+        "llm.completion_tokens": getattr(usage, "completion_tokens", None),
+        "llm.cached_tokens": getattr(getattr(usage, "prompt_tokens_details", None), "cached_tokens", None),
+    }
+
+
+def _otlp_value(value: Any) -> dict[str, Any]:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+def otlp_payload(spans: list[Span], service_name: str) -> dict[str, Any]:
+    """OTLP/HTTP JSON(ExportTraceServiceRequest) 본문."""
+    return {
+        "resourceSpans": [
+            {
+                "resource": {"attributes": [{"key": "service.name", "value": {"stringValue": service_name}}]},
+                "scopeSpans": [
+                    {
+                        "scope": {"name": "app.services.tracing"},
+                        "spans": [
+                            {
+                                "traceId": s.trace_id,
+                                "spanId": s.span_id,
+                                **({"parentSpanId": s.parent_id} if s.parent_id else {}),
+                                "name": s.name,
+                                "kind": 1,
+                                "startTimeUnixNano": str(s.start_ns),
+                                "endTimeUnixNano": str(s.end_ns),
+                                "attributes": [{"key": k, "value": _otlp_value(v)} for k, v in s.attributes.items()],
+                                "status": {"code": 2, "message": s.error} if s.error else {"code": 0},
+                            }
+                            for s in spans
+                        ],
+                    }
+                ],
+            }
+        ]
+    }
+
+
+_file_lock = threading.Lock()
+
+
+def _write_spans(batch: list[Span]) -> None:
+    if settings.TRACING_EXPORTER == "otlp":
+        body = json.dumps(otlp_payload(batch, settings.TRACING_SERVICE_NAME)).encode("utf-8")
+        req = urllib.request.Request(settings.TRACING_OTLP_ENDPOINT, data=body, headers={"Content-Type": "application/json"})
+        urllib.request.urlopen(req, timeout=10).close()
+        return
+    path = Path(settings.TRACING_FILE)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    lines = "".join(json.dumps({**s.to_dict(), "pid": os.getpid()}, ensure_ascii=False) + "\n" for s in batch)
+    with _file_lock, open(path, "a", encoding="utf-8") as f:
+        f.write(lines)
+
+
+# 끝난 span을 큐에 쌓고 백그라운드 스레드가 묶어서 내보낸다 (밀리면 버림)
+exporter: BackgroundBatcher[Span] = BackgroundBatcher("span-exporter", _write_spans)
@@ -0,0 +1,193 @@
+"""
+강좌별 인메모리 벡터 인덱스: (course_id, user_id)마다 요약 임베딩을 정규화된 연속 float32 행렬로 올려
+get_similar_summaries를 DB 왕복 없이 내적 top-k로 처리한다.
+- 첫 조회 시 지연 로드, 업서트 시 로드된 인덱스만 증분 갱신, 전체 메모리는 LRU로 max_bytes 이하 유지.
+- 다른 프로세스(워커 등)의 업서트는 ttl_sec 후 재로드로 반영.
+"""
+
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, NamedTuple
+
+import numpy as np
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# (lecture_id, summary, embedding) 목록을 반환하는 로더
+Loader = Callable[[str, str], list[tuple[str, str, Any]]]
+
+
+def _normalize(v: Any) -> np.ndarray:
+    arr = np.asarray(v, dtype=np.float32)
+    norm = float(np.linalg.norm(arr))
+    return arr / norm if norm > 0 else arr
+
+
+class _Snapshot(NamedTuple):
+    """인덱스 내용 한 벌. 바꾸지 않고 통째로 교체하므로 읽는 쪽은 락 없이 한 번 읽어 쓰면 된다."""
+
+    matrix: np.ndarray
+    lecture_ids: list[str]
+    summaries: list[str]
+    pos: dict[str, int]
+
+
+class CourseVectorIndex:
+    """한 강좌·유저의 요약 벡터 (행 정규화된 연속 float32 행렬)."""
+
+    def __init__(self, rows: list[tuple[str, str, Any]]):
+        lecture_ids = [r[0] for r in rows]
+        if rows:
+            matrix = np.ascontiguousarray(np.stack([_normalize(r[2]) for r in rows]))
+        else:
+            matrix = np.zeros((0, settings.EMBEDDING_DIMENSIONS), dtype=np.float32)
+        pos = {lid: i for i, lid in enumerate(lecture_ids)}
+        self._snapshot = _Snapshot(matrix, lecture_ids, [r[1] for r in rows], pos)
+        self._write_lock = threading.Lock()
+        self.loaded_at = time.monotonic()
+
+    @property
+    def matrix(self) -> np.ndarray:
+        return self._snapshot.matrix
+
+    @property
+    def lecture_ids(self) -> list[str]:
+        return self._snapshot.lecture_ids
+
+    @property
+    def summaries(self) -> list[str]:
+        return self._snapshot.summaries
+
+    @property
+    def nbytes(self) -> int:
+        snap = self._snapshot
+        return int(snap.matrix.nbytes) + sum(len(s) for s in snap.summaries) * 2
+
+    def search(
+        self, query_embedding: Any, limit: int = 5, exclude_lecture_id: str | None = None
+    ) -> list[tuple[str, str]]:
+        """코사인 유사도 상위 limit건 (lecture_id, summary). get_similar_summaries와 같은 형식."""
+        snap = self._snapshot  # 검색 중 upsert가 와도 행렬·id·요약이 어긋나지 않게 한 벌만 사용
+        if not snap.lecture_ids or limit <= 0:
+            return []
+        scores = snap.matrix @ _normalize(query_embedding)
+        if exclude_lecture_id is not None and exclude_lecture_id in snap.pos:
+            scores[snap.pos[exclude_lecture_id]] = -np.inf
+        k = min(limit, len(scores))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [(snap.lecture_ids[i], snap.summaries[i]) for i in top if np.isfinite(scores[i])]
+
+    def upsert(self, lecture_id: str, summary: str, embedding: Any) -> None:
+        """행 교체 또는 추가. 새 행렬·목록을 만든 뒤 스냅샷을 한 번에 바꿔 끼운다 (진행 중인 검색은 이전 스냅샷 사용)."""
+        vec = _normalize(embedding)
+        with self._write_lock:
+            snap = self._snapshot
+            i = snap.pos.get(lecture_id)
+            if i is not None:
+                matrix = snap.matrix.copy()
+                matrix[i] = vec
+                summaries = list(snap.summaries)
+                summaries[i] = summary
+                self._snapshot = snap._replace(matrix=matrix, summaries=summaries)
+                return
+            self._snapshot = _Snapshot(
+                np.ascontiguousarray(np.vstack([snap.matrix, vec[None, :]])),
+                [*snap.lecture_ids, lecture_id],
+                [*snap.summaries, summary],
+                {**snap.pos, lecture_id: len(snap.lecture_ids)},
+            )
+
+
+def _load_from_db(course_id: str, user_id: str) -> list[tuple[str, str, Any]]:
+    from app.db.connection import get_session
+    from app.db.repositories.lecture_summary_embeddings import lecture_summary_embeddings_repo
+
+    with get_session() as session:
+        return lecture_summary_embeddings_repo.get_course_embeddings(session, course_id, user_id)
+
+
+class SummaryVectorIndexCache:
+    """(course_id, user_id) → CourseVectorIndex LRU (메모리 예산 max_bytes)."""
+
+    def __init__(
+        self,
+        max_bytes: int | None = None,
+        ttl_sec: float | None = None,
+        loader: Loader | None = None,
+    ) -> None:
+        self._max_bytes = max_bytes if max_bytes is not None else settings.VECTOR_INDEX_MAX_BYTES
+        self._ttl_sec = ttl_sec if ttl_sec is not None else settings.VECTOR_INDEX_TTL_SEC
+        self._loader = loader or _load_from_db
+        self._indexes: OrderedDict[tuple[str, str], CourseVectorIndex] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_similar_summaries(
+        self,
+        course_id: str,
+        user_id: str,
+        query_embedding: Any,
+        limit: int = 5,
+        exclude_lecture_id: str | None = None,
+    ) -> list[tuple[str, str]]:
+        return self._get(course_id, user_id).search(query_embedding, limit, exclude_lecture_id)
+
+    def on_upsert(self, course_id: str, user_id: str, lecture_id: str, summary: str, embedding: Any) -> None:
+        """DB 업서트 후 호출: 이미 로드된 인덱스만 증분 갱신 (로드 안 됐으면 다음 조회 때 로드)."""
+        if not summary or not summary.strip() or embedding is None:
+            return
+        with self._lock:
+            index = self._indexes.get((course_id, user_id))
+            if index is not None:
+                index.upsert(lecture_id, summary, embedding)
+                self._evict()
+
+    def invalidate(self, course_id: str | None = None, user_id: str | None = None) -> None:
+        with self._lock:
+            if course_id is None:
+                self._indexes.clear()
+            else:
+                self._indexes.pop((course_id, user_id or ""), None)
+
+    @property
+    def nbytes(self) -> int:
+        with self._lock:
+            return sum(ix.nbytes for ix in self._indexes.values())
+
+    def _get(self, course_id: str, user_id: str) -> CourseVectorIndex:
+        key = (course_id, user_id)
+        with self._lock:
+            index = self._indexes.get(key)
+            if index is not None and time.monotonic() - index.loaded_at < self._ttl_sec:
+                self._indexes.move_to_end(key)
+                return index
+        # 로드는 락 밖에서 (DB I/O)
+        t0 = time.perf_counter()
+        index = CourseVectorIndex(self._loader(course_id, user_id))
+        logger.info(
+            "벡터 인덱스 로드 course_id=%s user_id=%s 강의 %d건 %.1fKB (%.1fms)",
+            course_id,
+            user_id,
+            len(index.lecture_ids),
+            index.nbytes / 1024,
+            (time.perf_counter() - t0) * 1000,
+        )
+        with self._lock:
+            self._indexes[key] = index
+            self._indexes.move_to_end(key)
+            self._evict()
+        return index
+
+    def _evict(self) -> None:
+        total = sum(ix.nbytes for ix in self._indexes.values())
+        while total > self._max_bytes and len(self._indexes) > 1:
+            key, ix = self._indexes.popitem(last=False)
+            total -= ix.nbytes
+            logger.info("벡터 인덱스 LRU 제거 course_id=%s user_id=%s", *key)
+
+
+summary_vector_index = SummaryVectorIndexCache()
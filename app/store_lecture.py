@@ -1,15 +1,21 @@
 """
 전사 JSON 파일을 DB(lecture_summary_embeddings)에 저장하는 CLI.
 로그는 stderr로 출력된다.
+
+여러 파일 일괄 저장 (lecture_id = 파일 이름의 첫 '.' 앞, 예: 3.aac.raw.json → 3):
+  python -m app.store_lecture --dir transcripts/ --course-id c1 --user-id u1
+  python -m app.store_lecture --glob 'transcripts/**/*.raw.json' --course-id c1 --user-id u1
+같은 내용(해시)이 이미 저장된 파일은 건너뛰고, 진행 기록(JSONL)을 남겨 중단 후 다시 실행하면 이어서 처리한다.
 """
 
 import argparse
+import glob
 import json
 import logging
 import sys
+import time
 from pathlib import Path
-
-from app.services.lecture_store import lecture_store_service
+from typing import Any, Iterator
 
 logging.basicConfig(
     level=logging.INFO,
@@ -24,15 +30,35 @@ def main() -> None:
     parser = argparse.ArgumentParser(
         description="전사 JSON을 lecture_summary_embeddings에 저장 (content=원문 JSON, embedding=요약문 임베딩)"
     )
-    parser.add_argument("--input", "-i", type=Path, required=True, help="전사 JSON 파일 경로 (1.aac.raw.json 형태)")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--input", "-i", type=Path, help="전사 JSON 파일 경로 (1.aac.raw.json 형태)")
+    source.add_argument("--dir", type=Path, help="이 디렉터리의 *.json 전사 파일을 일괄 저장")
+    source.add_argument("--glob", help="이 패턴(** 지원)에 맞는 전사 파일을 일괄 저장")
     parser.add_argument("--course-id", required=True, help="course_id")
-    parser.add_argument("--lecture-id", required=True, help="lecture_id")
+    parser.add_argument("--lecture-id", help="lecture_id (--input일 때 필수)")
     parser.add_argument("--user-id", required=True, help="user_id")
     parser.add_argument("--summary", "-s", default=None, help="요약문 (비우면 전사에서 LLM으로 자동 생성)")
     parser.add_argument("--course-title", default=None, help="강좌 제목 (대주제, 요약 프롬프트에 포함)")
     parser.add_argument("--section-title", default=None, help="섹션 제목 (소주제)")
     parser.add_argument("--lecture-title", default=None, help="강의 제목 (소주제)")
+    parser.add_argument(
+        "--summary-mode",
+        choices=["truncate", "map_reduce"],
+        default=None,
+        help="요약 방식 (기본: 설정값 SUMMARY_MODE). map_reduce는 긴 전사 전체를 청크별 요약 후 병합",
+    )
+    parser.add_argument("--progress-log", type=Path, default=None, help="일괄 저장 진행 기록 JSONL (기본: .cache/store_lecture.<course_id>.jsonl)")
+    parser.add_argument("--concurrency", type=int, default=None, help="일괄 저장 시 동시 요약 수 (기본: 설정값 STORE_BULK_CONCURRENCY)")
+    parser.add_argument("--batch-size", type=int, default=None, help="임베딩·upsert를 묶는 파일 수 (기본: 설정값 STORE_BULK_BATCH_SIZE)")
     args = parser.parse_args()
+    # --help·인자 오류는 DB·LLM 모듈을 불러오지 않고 바로 끝나도록 파싱 뒤에 import
+    from app.services.lecture_store import lecture_store_service
+
+    if args.dir or args.glob:
+        _store_bulk(args)
+        return
+    if not args.lecture_id:
+        parser.error("--input에는 --lecture-id가 필요합니다")
 
     path = args.input
     if not path.exists():
@@ -52,10 +78,127 @@ def main() -> None:
         course_title=args.course_title,
         section_title=args.section_title,
         lecture_title=args.lecture_title,
+        summary_mode=args.summary_mode,
     )
     logger.info("저장 완료 course_id=%s lecture_id=%s user_id=%s", args.course_id, args.lecture_id, args.user_id)
     print(f"저장 완료: course_id={args.course_id}, lecture_id={args.lecture_id}, user_id={args.user_id}")
 
 
+def lecture_id_from_path(path: Path) -> str:
+    """파일 이름의 첫 '.' 앞부분 (3.aac.raw.json → 3)."""
+    return path.name.split(".", 1)[0]
+
+
+def read_progress_log(path: Path) -> dict[str, str]:
+    """진행 기록에서 끝난(stored/skipped) 파일 경로 → 그때의 내용 해시. 깨진 줄(중단 시 마지막 줄)은 무시."""
+    done: dict[str, str] = {}
+    if not path.exists():
+        return done
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                continue
+            if entry.get("status") in ("stored", "skipped") and entry.get("sha256"):
+                done[entry["path"]] = entry["sha256"]
+    return done
+
+
+def _iter_files(args: argparse.Namespace) -> list[Path]:
+    if args.dir:
+        return sorted(p for p in args.dir.glob("*.json") if p.is_file())
+    return sorted(Path(p) for p in glob.glob(args.glob, recursive=True) if Path(p).is_file())
+
+
+def _batches(items: list[Path], size: int) -> Iterator[list[Path]]:
+    for i in range(0, len(items), size):
+        yield items[i : i + size]
+
+
+def _store_bulk(args: argparse.Namespace) -> None:
+    from app.core.config import settings
+    from app.db.connection import get_session
+    from app.db.repositories.lecture_summary_embeddings import lecture_summary_embeddings_repo
+    from app.services.lecture_store import content_sha256, lecture_store_service
+
+    files = _iter_files(args)
+    if not files:
+        print("저장할 전사 파일 없음", file=sys.stderr)
+        sys.exit(1)
+    log_path = args.progress_log or Path(".cache") / f"store_lecture.{args.course_id}.jsonl"
+    log_path.parent.mkdir(parents=True, exist_ok=True)
+    logged = read_progress_log(log_path)
+    with get_session() as session:
+        stored_hashes = lecture_summary_embeddings_repo.get_content_hashes(session, args.course_id, args.user_id)
+    batch_size = max(1, args.batch_size or settings.STORE_BULK_BATCH_SIZE)
+    logger.info("일괄 저장 시작 파일=%d 진행 기록=%s (기록된 완료 %d건)", len(files), log_path, len(logged))
+
+    counts = {"stored": 0, "skipped": 0, "failed": 0}
+    processed = 0
+    with open(log_path, "a", encoding="utf-8") as log:
+
+        def record(path: Path, lecture_id: str, status: str, sha: str | None = None, error: str | None = None) -> None:
+            entry: dict[str, Any] = {"path": str(path), "lecture_id": lecture_id, "status": status, "sha256": sha, "ts": time.time()}
+            if error:
+                entry["error"] = error
+            log.write(json.dumps(entry, ensure_ascii=False) + "\n")
+            log.flush()
+            counts[status] += 1
+
+        for batch in _batches(files, batch_size):
+            pending: list[tuple[str, dict[str, Any]]] = []
+            meta: dict[str, tuple[Path, str]] = {}
+            for path in batch:
+                lecture_id = lecture_id_from_path(path)
+                try:
+                    with open(path, encoding="utf-8") as f:
+                        content_json = json.load(f)
+                except (OSError, ValueError) as e:
+                    record(path, lecture_id, "failed", error=str(e))
+                    continue
+                sha = content_sha256(content_json)
+                if logged.get(str(path)) == sha:
+                    counts["skipped"] += 1  # 이전 실행에서 끝남 (기록은 이미 있음)
+                    continue
+                if stored_hashes.get(lecture_id) == sha:
+                    record(path, lecture_id, "skipped", sha)
+                    continue
+                if lecture_id in meta:
+                    record(path, lecture_id, "failed", sha, error=f"lecture_id 중복: {meta[lecture_id][0]}")
+                    continue
+                pending.append((lecture_id, content_json))
+                meta[lecture_id] = (path, sha)
+            if pending:
+                summaries, failed = lecture_store_service.store_many(
+                    args.course_id,
+                    args.user_id,
+                    pending,
+                    course_title=args.course_title,
+                    section_title=args.section_title,
+                    summary_mode=args.summary_mode,
+                    concurrency=args.concurrency,
+                )
+                for lecture_id, _ in pending:
+                    path, sha = meta[lecture_id]
+                    if lecture_id in summaries:
+                        record(path, lecture_id, "stored", sha)
+                    else:
+                        record(path, lecture_id, "failed", sha, error=str(failed.get(lecture_id)))
+            processed += len(batch)
+            print(
+                f"[{processed}/{len(files)}] 저장 {counts['stored']} 건너뜀 {counts['skipped']} 실패 {counts['failed']}",
+                file=sys.stderr,
+                flush=True,
+            )
+
+    print(
+        f"일괄 저장 완료: course_id={args.course_id}, user_id={args.user_id}, "
+        f"stored={counts['stored']}, skipped={counts['skipped']}, failed={counts['failed']}"
+    )
+    if counts["failed"]:
+        sys.exit(2)
+
+
 if __name__ == "__main__":
     main()
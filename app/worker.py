@@ -1,15 +1,21 @@
 """
 Async Worker: ingestion_jobs 큐를 폴링해 pending 작업을 처리.
+quiz_jobs 큐는 별도 스레드(QuizJobRunner)가 QUIZ_JOB_WORKERS개까지 동시에 처리.
+WORKER_METRICS_PORT(기본 9108)에서 Prometheus /metrics 노출 (포트를 이미 다른 워커가 쓰면 메트릭 없이 계속).
 실행: python -m app.worker
 """
 
 import logging
 import sys
+import threading
 import time
 
+from app.core.config import settings
 from app.db.connection import get_session
 from app.db.repositories.ingestion_job import ingestion_job_repo
 from app.services.ingestion_pipeline import run_pipeline
+from app.services.metrics import start_metrics_server
+from app.services.quiz_jobs import QuizJobRunner
 
 logging.basicConfig(
     level=logging.INFO,
@@ -22,8 +28,29 @@ logger = logging.getLogger(__name__)
 POLL_INTERVAL_SEC = 5
 
 
+def start_worker_metrics(port: int) -> bool:
+    """메트릭 서버 시작. 한 호스트에 워커를 여러 개 띄워 포트가 겹치면(EADDRINUSE) 경고만 남기고 False."""
+    if port <= 0:
+        return False
+    try:
+        start_metrics_server(port)
+    except OSError as e:
+        logger.warning(
+            "메트릭 서버 포트 %d 사용 불가 (%s) → 이 워커는 /metrics 없이 실행. WORKER_METRICS_PORT를 워커마다 다르게 지정",
+            port,
+            e,
+        )
+        return False
+    return True
+
+
 def main() -> None:
     logger.info("Ingestion worker 시작 (poll_interval=%ss)", POLL_INTERVAL_SEC)
+    start_worker_metrics(settings.WORKER_METRICS_PORT)
+    quiz_runner = None
+    if settings.QUIZ_JOB_WORKERS > 0:
+        quiz_runner = QuizJobRunner()
+        threading.Thread(target=quiz_runner.run_forever, name="quiz-job-runner", daemon=True).start()
     while True:
         try:
             with get_session() as session:
@@ -35,6 +62,8 @@ def main() -> None:
                 time.sleep(POLL_INTERVAL_SEC)
         except KeyboardInterrupt:
             logger.info("Worker 종료")
+            if quiz_runner is not None:
+                quiz_runner.stop()
             break
         except Exception:
             logger.exception("Worker 루프 오류")
@@ -1,5 +1,19 @@
+-- 임베딩 차원은 앱 설정(EMBEDDING_DIMENSIONS, EMBEDDING_COMPACT_DIMENSIONS)과 같아야 하므로 psql 변수로 받는다.
+--   psql -v embedding_dims=1536 -v compact_dims=256 ... < db/init-vector.sql  (생략하면 기본값 1536 / 256)
+-- 앱은 첫 세션 연결 때 실제 컬럼 차원을 설정과 비교해, 다르면 시작하지 않는다.
+\if :{?embedding_dims}
+\else
+\set embedding_dims 1536
+\endif
+\if :{?compact_dims}
+\else
+\set compact_dims 256
+\endif
+
 -- pgvector 확장 활성화
 CREATE EXTENSION IF NOT EXISTS vector;
+-- 하이브리드 검색용 trigram 확장
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
 
 -- 임베딩 저장용 테이블 (전사 청크, 퀴즈 등 벡터 검색용)
 -- 나중에 앱에서 이 테이블에 넣고 유사도 검색 가능
@@ -9,18 +23,12 @@ CREATE TABLE IF NOT EXISTS lecture_summary_embeddings (
     lecture_id TEXT NOT NULL,
     user_id    TEXT NOT NULL,
     content    JSONB NOT NULL,          -- 원문 (JSON: 전사 segments 등)
-    embedding  vector(1536),            -- OpenAI text-embedding-3-small 기본 차원
+    embedding  halfvec(:embedding_dims), -- 원본 임베딩 (float16, 2단계 검색의 재정렬용이라 인덱스 없음)
     metadata   JSONB DEFAULT '{}',
     created_at TIMESTAMPTZ DEFAULT NOW(),
     UNIQUE (course_id, lecture_id, user_id)
 );
 
--- 유사도 검색용 인덱스 (cosine distance)
-CREATE INDEX IF NOT EXISTS idx_lecture_summary_embeddings
-ON lecture_summary_embeddings
-USING ivfflat (embedding vector_cosine_ops)
-WITH (lists = 100);
-
 COMMENT ON TABLE lecture_summary_embeddings IS '강의 요약 벡터 검색용 문서/전사 청크 임베딩';
 
 -- 퀴즈 저장 (문항 목록 JSON: question, options(배열), answer, explanation 등 그대로)
@@ -52,6 +60,40 @@ CREATE TABLE IF NOT EXISTS ingestion_jobs (
     updated_at  TIMESTAMPTZ
 );
 
+-- 비동기 퀴즈 생성 작업 (워커가 처리 → lecture_quiz 저장, quiz_id로 연결)
+CREATE TABLE IF NOT EXISTS quiz_jobs (
+    id            BIGSERIAL PRIMARY KEY,
+    course_id     TEXT NOT NULL,
+    lecture_id    TEXT NOT NULL,
+    user_id       TEXT NOT NULL,
+    params        JSONB NOT NULL,
+    target        TEXT NOT NULL DEFAULT 'quiz',
+    status        TEXT NOT NULL DEFAULT 'pending',
+    quiz_id       BIGINT,
+    error_message TEXT,
+    created_at    TIMESTAMPTZ DEFAULT NOW(),
+    updated_at    TIMESTAMPTZ
+);
+CREATE INDEX IF NOT EXISTS idx_quiz_jobs_pending ON quiz_jobs (id) WHERE status = 'pending';
+CREATE INDEX IF NOT EXISTS idx_quiz_jobs_lecture ON quiz_jobs (course_id, lecture_id, user_id, target, status);
+
+-- 문항 은행: 강의별 미리 생성·검증한 문항 (1행 = 1문항, /quiz/generate가 샘플링)
+CREATE TABLE IF NOT EXISTS quiz_bank_questions (
+    id            BIGSERIAL PRIMARY KEY,
+    course_id     TEXT NOT NULL,
+    lecture_id    TEXT NOT NULL,
+    user_id       TEXT NOT NULL,
+    question      TEXT NOT NULL,
+    options       JSONB NOT NULL,
+    answer        INTEGER NOT NULL,
+    explanation   TEXT NOT NULL,
+    verified      BOOLEAN NOT NULL DEFAULT FALSE,
+    served_count  INTEGER NOT NULL DEFAULT 0,
+    source_version TEXT NOT NULL DEFAULT '',
+    created_at    TIMESTAMPTZ DEFAULT NOW()
+);
+CREATE INDEX IF NOT EXISTS idx_quiz_bank_lecture ON quiz_bank_questions (course_id, lecture_id, user_id, verified, served_count);
+
 -- SQL/Doc DB: chunks (concept, metadata, difficulty)
 CREATE TABLE IF NOT EXISTS lecture_chunks (
     id          BIGSERIAL PRIMARY KEY,
@@ -70,8 +112,36 @@ CREATE TABLE IF NOT EXISTS lecture_chunks (
 CREATE TABLE IF NOT EXISTS lecture_chunk_vectors (
     id          BIGSERIAL PRIMARY KEY,
     chunk_id    BIGINT NOT NULL,
-    embedding   vector(1536) NOT NULL,
+    embedding   halfvec(:embedding_dims) NOT NULL,
     created_at  TIMESTAMPTZ DEFAULT NOW()
 );
-CREATE INDEX IF NOT EXISTS idx_lecture_chunk_vectors_embedding
-ON lecture_chunk_vectors USING ivfflat (embedding vector_cosine_ops) WITH (lists = 100);
+CREATE INDEX IF NOT EXISTS idx_lecture_chunk_vectors_chunk_id ON lecture_chunk_vectors (chunk_id);
+CREATE INDEX IF NOT EXISTS idx_lecture_chunks_lecture ON lecture_chunks (course_id, lecture_id, user_id);
+
+-- 하이브리드 검색 (lexical): 'simple' 설정 tsvector(형태소 분석 없음) + trigram (한국어 조사·코드 식별자 부분 일치)
+CREATE INDEX IF NOT EXISTS idx_lecture_summary_fts
+ON lecture_summary_embeddings USING gin (to_tsvector('simple', coalesce(summary, '')));
+CREATE INDEX IF NOT EXISTS idx_lecture_summary_trgm
+ON lecture_summary_embeddings USING gin (coalesce(summary, '') gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS idx_lecture_chunks_fts
+ON lecture_chunks USING gin (to_tsvector('simple', coalesce(content->>'text', '')));
+CREATE INDEX IF NOT EXISTS idx_lecture_chunks_trgm
+ON lecture_chunks USING gin (coalesce(content->>'text', '') gin_trgm_ops);
+
+-- 축소 차원 halfvec (원본 앞 compact_dims차원 + 정규화): 유사도 검색 인덱스는 이것(HNSW) 하나
+-- 2단계 검색: 축소 halfvec HNSW로 후보 추출 → 원본 halfvec으로 정확 재정렬. 백필: python -m app.backfill_compact_embeddings
+ALTER TABLE lecture_summary_embeddings ADD COLUMN IF NOT EXISTS embedding_compact halfvec(:compact_dims);
+ALTER TABLE lecture_chunk_vectors ADD COLUMN IF NOT EXISTS embedding_compact halfvec(:compact_dims);
+CREATE INDEX IF NOT EXISTS idx_lecture_summary_compact
+ON lecture_summary_embeddings USING hnsw (embedding_compact halfvec_cosine_ops);
+CREATE INDEX IF NOT EXISTS idx_lecture_chunk_vectors_compact
+ON lecture_chunk_vectors USING hnsw (embedding_compact halfvec_cosine_ops);
+
+-- 프로세스 간 공유 OpenAI 호출 한도 (RATE_LIMIT_SHARED=true): kind별 1분 창 요청·토큰 누계
+CREATE TABLE IF NOT EXISTS llm_rate_windows (
+    kind          TEXT NOT NULL,
+    window_start  BIGINT NOT NULL,
+    requests      INTEGER NOT NULL DEFAULT 0,
+    tokens        INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (kind, window_start)
+);
@@ -0,0 +1,140 @@
+"""
+배치 ingestion 요청 생성·결과 파싱·로컬 대용 백엔드·단계 진행(중단 후 재개, semantic 청킹) 테스트 (DB·OpenAI 불필요).
+"""
+
+import json
+from contextlib import contextmanager
+from types import SimpleNamespace
+
+import pytest
+
+from app.core.config import settings
+from app.services import batch_ingestion, ingestion_pipeline
+from app.services.batch_ingestion import (
+    CHAT_ENDPOINT,
+    EMBEDDING_ENDPOINT,
+    BatchIngestion,
+    LocalBatchBackend,
+    chat_content,
+    embedding_vectors,
+    extraction_requests,
+)
+
+CHUNKS = [{"text": "첫 번째 청크"}, {"text": "   "}, {"text": "세 번째 청크"}]
+
+
+def test_extraction_requests_cover_chunks_and_summary():
+    summary_msgs = [{"role": "system", "content": "요약"}, {"role": "user", "content": "전사"}]
+    reqs = extraction_requests(7, CHUNKS, "강사 제목", summary_msgs)
+    chat_ids = [r["custom_id"] for r in reqs[CHAT_ENDPOINT]]
+    assert chat_ids == [
+        "7:0:concept", "7:0:metadata", "7:0:difficulty",
+        "7:2:concept", "7:2:metadata", "7:2:difficulty",
+        "7:summary",
+    ]
+    assert reqs[CHAT_ENDPOINT][1]["body"]["response_format"] == {"type": "json_object"}
+    assert "강사 제목" in reqs[CHAT_ENDPOINT][0]["body"]["messages"][1]["content"]
+    (embed,) = reqs[EMBEDDING_ENDPOINT]
+    assert embed["custom_id"] == "7:chunks:0" and embed["body"]["input"] == ["첫 번째 청크", "세 번째 청크"]
+
+
+def test_local_backend_round_trip(tmp_path):
+    def responder(req):
+        if req["url"] == EMBEDDING_ENDPOINT:
+            return {"data": [{"index": i, "embedding": [float(i)]} for i in reversed(range(len(req["body"]["input"])))]}
+        if "fail" in req["custom_id"]:
+            raise RuntimeError("boom")
+        return {"choices": [{"message": {"content": "medium"}}]}
+
+    reqs = extraction_requests(1, CHUNKS, None, None)
+    path = tmp_path / "in.jsonl"
+    lines = reqs[CHAT_ENDPOINT] + reqs[EMBEDDING_ENDPOINT] + [dict(reqs[CHAT_ENDPOINT][0], custom_id="1:fail")]
+    path.write_text("".join(json.dumps(r) + "\n" for r in lines), encoding="utf-8")
+
+    backend = LocalBatchBackend(tmp_path / "work", responder=responder)
+    batch_id = backend.submit(path, CHAT_ENDPOINT)
+    assert backend.status(batch_id) == "completed"
+    results = {r["custom_id"]: r for r in backend.results(batch_id)}
+    assert chat_content(results["1:0:difficulty"]) == "medium"
+    assert embedding_vectors(results["1:chunks:0"]) == [[0.0], [1.0]]
+    assert chat_content(results["1:fail"]) is None
+    assert chat_content(None) is None
+
+
+# ----- BatchIngestion 단계 진행 (DB는 가짜 repo) -----
+
+SEGMENTS = [{"text": f"문장 {i}", "start": float(i), "end": float(i + 1)} for i in range(6)]
+
+
+@contextmanager
+def _no_session():
+    yield None
+
+
+def _responder(req):
+    if req["url"] == EMBEDDING_ENDPOINT:
+        return {"data": [{"index": i, "embedding": [1.0, float(i)]} for i in range(len(req["body"]["input"]))]}
+    return {"choices": [{"message": {"content": "{}" if "metadata" in req["custom_id"] else "medium"}}]}
+
+
+@pytest.fixture
+def fake_db(monkeypatch):
+    jobs = {1: SimpleNamespace(id=1, course_id="c", lecture_id="l", user_id="u", status="pending",
+                               payload={"transcript": {"segments": SEGMENTS}})}
+    stored: list[tuple[int, dict]] = []
+
+    def claim_pending(session, *, job_type=None, limit=100, ids=None, on_claimed=None):
+        claimed = [j for j in jobs.values() if j.status == "pending" and (ids is None or j.id in ids)][:limit]
+        for j in claimed:
+            j.status = "processing"
+        if on_claimed and claimed:
+            on_claimed([j.id for j in claimed])
+        return claimed
+
+    def mark(status):
+        return lambda session, job_id, *args: setattr(jobs[job_id], "status", status)
+
+    repo = batch_ingestion.ingestion_job_repo
+    monkeypatch.setattr(batch_ingestion, "get_session", _no_session)
+    monkeypatch.setattr(repo, "claim_pending", claim_pending)
+    monkeypatch.setattr(repo, "get_by_id", lambda session, job_id: jobs.get(job_id))
+    monkeypatch.setattr(repo, "mark_done", mark("done"))
+    monkeypatch.setattr(repo, "mark_failed", mark("failed"))
+    monkeypatch.setattr(batch_ingestion.lecture_chunk_repo, "delete_by_lecture", lambda *a: None)
+    monkeypatch.setattr(batch_ingestion, "store_chunk", lambda session, **kw: stored.append((kw["chunk_index"], kw["chunk"])))
+    return SimpleNamespace(jobs=jobs, stored=stored)
+
+
+def test_claimed_ids_saved_before_crash_are_resumed(tmp_path, fake_db, monkeypatch):
+    monkeypatch.setattr(settings, "CHUNKING_STRATEGY", "max_chars")
+    state = tmp_path / "state.json"
+
+    class CrashingBackend(LocalBatchBackend):
+        def submit(self, path, endpoint):
+            raise RuntimeError("제출 중 중단")
+
+    with pytest.raises(RuntimeError):
+        BatchIngestion(state, CrashingBackend(tmp_path / "work", responder=_responder), summaries=False).step()
+    assert json.loads(state.read_text(encoding="utf-8"))["claimed"] == [1]
+    assert fake_db.jobs[1].status == "processing"
+
+    resumed = BatchIngestion(state, LocalBatchBackend(tmp_path / "work", responder=_responder), summaries=False)
+    resumed.run(poll_interval=0)
+    assert fake_db.jobs[1].status == "done"
+    assert "claimed" not in resumed.state
+
+
+def test_semantic_chunking_embeds_segments_via_batch(tmp_path, fake_db, monkeypatch):
+    monkeypatch.setattr(settings, "CHUNKING_STRATEGY", "semantic")
+
+    def live_embed(texts):
+        raise AssertionError("배치 경로에서 실시간 임베딩 호출")
+
+    monkeypatch.setattr(ingestion_pipeline.embedding_service, "embed_batch", live_embed)
+    run = BatchIngestion(tmp_path / "state.json", LocalBatchBackend(tmp_path / "work", responder=_responder), summaries=False)
+    assert run.step() == "segments_submitted"
+    assert [b["endpoint"] for b in run.state["batches"]["segments"]] == [EMBEDDING_ENDPOINT]
+    assert run.step() == "extract_submitted"
+    assert run.step() == "done"
+    assert fake_db.jobs[1].status == "done"
+    assert [i for _, ch in fake_db.stored for i in ch["segment_indices"]] == list(range(6))
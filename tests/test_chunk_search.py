@@ -0,0 +1,51 @@
+"""
+청크 검색 결과 캐시 테스트: 적중 시 DB 조회 생략, 재적재 후 강좌별 clear_cache (DB·OpenAI 불필요).
+"""
+
+from contextlib import contextmanager
+
+import pytest
+
+from app.services import chunk_search
+from app.services.chunk_search import ChunkSearchService
+
+
+@contextmanager
+def _no_session():
+    yield None
+
+
+@pytest.fixture
+def fake_repo(monkeypatch):
+    state = {"searches": 0}
+
+    def search(session, query_embedding, **kwargs):
+        state["searches"] += 1
+        return [{"chunk_id": state["searches"], "course_id": kwargs["course_id"]}]
+
+    monkeypatch.setattr(chunk_search, "get_session", _no_session)
+    monkeypatch.setattr(chunk_search.lecture_chunk_repo, "search", search)
+    return state
+
+
+def test_cache_hit_skips_db(fake_repo):
+    svc = ChunkSearchService()
+    first, cached = svc.search(query_embedding=[0.1, 0.2], course_id="c1")
+    assert not cached
+    again, cached = svc.search(query_embedding=[0.1, 0.2], course_id="c1")
+    assert cached and again == first
+    assert fake_repo["searches"] == 1
+
+
+def test_clear_cache_per_course(fake_repo):
+    svc = ChunkSearchService()
+    svc.search(query_embedding=[0.1], course_id="c1")
+    svc.search(query_embedding=[0.1], course_id="c2")
+    svc.search(query_embedding=[0.1], course_id=None)
+    assert fake_repo["searches"] == 3
+
+    svc.clear_cache("c1")
+    assert svc.search(query_embedding=[0.1], course_id="c2")[1]
+    assert not svc.search(query_embedding=[0.1], course_id="c1")[1]
+    # 강좌 필터 없는 검색은 모든 강좌 청크를 보므로 함께 비워짐
+    assert not svc.search(query_embedding=[0.1], course_id=None)[1]
@@ -0,0 +1,72 @@
+"""
+Span Chunking 단위 테스트 (DB·OpenAI 불필요).
+"""
+
+from app.services.chunking import chunk_by_max_chars, chunk_by_semantic_breakpoints
+
+
+def _segments(topics: list[str], per_topic: int = 4) -> list[dict]:
+    segs = []
+    t = 0.0
+    for topic in topics:
+        for k in range(per_topic):
+            segs.append({"text": f"{topic} 설명 문장 {k} " + "가" * 40, "start": t, "end": t + 2.0})
+            t += 2.0
+    return segs
+
+
+def _fake_embed_batch(calls: list[int]):
+    axes = {"도커": 0, "쿠버네티스": 1, "네트워크": 2}
+
+    def embed(texts: list[str]) -> list[list[float]]:
+        calls.append(len(texts))
+        out = []
+        for text in texts:
+            vec = [0.01, 0.01, 0.01]
+            vec[axes[text.split()[0]]] = 1.0
+            out.append(vec)
+        return out
+
+    return embed
+
+
+def test_max_chars_respects_cap():
+    chunks = chunk_by_max_chars(_segments(["도커"], per_topic=10), max_chars=200)
+    assert len(chunks) > 1
+    assert all(len(c["text"]) <= 200 for c in chunks)
+
+
+def test_semantic_cuts_at_topic_boundaries():
+    calls: list[int] = []
+    segs = _segments(["도커", "쿠버네티스", "네트워크"])
+    chunks = chunk_by_semantic_breakpoints(
+        segs, _fake_embed_batch(calls), max_chars=5000, min_chars=50, batch_size=5, breakpoint_percentile=80
+    )
+    assert [c["segment_indices"] for c in chunks] == [[0, 1, 2, 3], [4, 5, 6, 7], [8, 9, 10, 11]]
+    assert chunks[1]["start"] == 8.0 and chunks[1]["end"] == 16.0
+    assert calls == [5, 5, 2]
+
+
+def test_semantic_respects_size_cap():
+    segs = _segments(["도커", "쿠버네티스"], per_topic=8)
+    chunks = chunk_by_semantic_breakpoints(segs, _fake_embed_batch([]), max_chars=200, min_chars=50)
+    assert all(len(c["text"]) <= 200 for c in chunks)
+    covered = [i for c in chunks for i in c["segment_indices"]]
+    assert covered == list(range(len(segs)))
+
+
+def test_mmr_covers_topics_and_time_spans():
+    import numpy as np
+
+    from app.services.chunk_retrieval import select_chunks_mmr
+
+    # 앞 6개 청크는 같은 주제(거의 동일 벡터), 뒤 2개는 서로 다른 주제
+    vectors = np.array(
+        [[1.0, 0.0, 0.0]] * 6 + [[0.0, 1.0, 0.0], [0.0, 0.0, 1.0]],
+        dtype=np.float32,
+    )
+    concepts = ["도커"] * 6 + ["쿠버네티스", "네트워크"]
+    picked = select_chunks_mmr(vectors, 3, concepts=concepts)
+    assert picked == sorted(picked)
+    assert {6, 7} <= set(picked)
+    assert len([i for i in picked if i < 6]) == 1
@@ -0,0 +1,41 @@
+"""
+퀴즈 맥락 토큰 예산 패킹 단위 테스트 (DB·OpenAI 불필요).
+"""
+
+import pytest
+
+from app.services import tokens
+from app.services.context_packer import pack_quiz_context
+
+
+@pytest.fixture(autouse=True)
+def _offline_tokenizer(monkeypatch):
+    # 네트워크 없이도 결정적으로 동작하도록 근사치 토큰 수 사용
+    monkeypatch.setattr(tokens, "_encoding", lambda model: None)
+
+
+def test_truncate_to_tokens_fits_budget():
+    text = "도커 컨테이너 " * 200
+    cut = tokens.truncate_to_tokens(text, 50)
+    assert tokens.count_tokens(cut) <= 50
+    assert text.startswith(cut)
+
+
+def test_priority_summary_then_transcript_then_previous():
+    summary = "요약" * 10
+    transcript = "전사" * 1000
+    previous = ["최근 강의 요약", "그 전 강의 요약" * 50, "오래된 강의 요약"]
+    packed = pack_quiz_context(summary, transcript, previous, budget=300, transcript_max_tokens=200)
+    assert packed.current_summary == summary
+    assert packed.tokens["transcript"] <= 200
+    assert packed.total_tokens <= 300
+    # 중간 요약은 남은 예산에 들어가지 않아 통째로 제외, 순서는 유지
+    assert packed.previous_summaries == ["최근 강의 요약", "오래된 강의 요약"]
+    assert packed.dropped_previous == 1
+
+
+def test_budget_smaller_than_summary_truncates_summary_only():
+    packed = pack_quiz_context("요약" * 500, "전사", ["이전"], budget=40)
+    assert packed.tokens["current_summary"] <= 40
+    assert packed.transcript == ""
+    assert packed.previous_summaries == []
@@ -0,0 +1,20 @@
+"""
+하이브리드 검색 순위 합산(RRF)·tsquery 생성 단위 테스트 (DB·OpenAI 불필요).
+"""
+
+from app.db.vector import or_tsquery
+from app.services.hybrid_search import reciprocal_rank_fusion
+
+
+def test_rrf_prefers_items_ranked_by_both():
+    vector = ["a", "b", "c"]
+    lexical = ["c", "d", "a"]
+    fused = [key for key, _ in reciprocal_rank_fusion([vector, lexical], k=60)]
+    assert fused[:2] == ["a", "c"]
+    assert set(fused) == {"a", "b", "c", "d"}
+
+
+def test_or_tsquery_strips_operators_and_dedupes():
+    assert or_tsquery("docker-compose up & Docker!") == "docker | compose | up"
+    assert or_tsquery("get_session 도커를") == "get_session | 도커를"
+    assert or_tsquery("!!! ") == ""
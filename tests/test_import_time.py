@@ -0,0 +1,48 @@
+"""
+import 비용 회귀 테스트: `python -X importtime` 출력으로 실제 로드된 모듈을 확인한다.
+OpenAI SDK·psycopg 드라이버는 첫 호출(클라이언트·세션) 때만 로드되어야 하고, CLI --help는 DB 모듈 없이 끝나야 한다.
+"""
+
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def _importtime(*args: str) -> tuple[dict[str, int], subprocess.CompletedProcess]:
+    """(모듈 → 누적 import 시간 µs, 프로세스 결과). OPENAI_API_KEY 없이 실행."""
+    env = {k: v for k, v in os.environ.items() if k != "OPENAI_API_KEY"}
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-W", "ignore", *args],
+        cwd=ROOT,
+        env=env,
+        capture_output=True,
+        text=True,
+        timeout=60,
+    )
+    modules: dict[str, int] = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|")
+        if cumulative.strip().isdigit():
+            modules[name.strip()] = int(cumulative)
+    return modules, proc
+
+
+def test_service_and_api_imports_skip_sdk_and_driver():
+    modules, proc = _importtime("-c", "import app.services, app.api.main, app.worker")
+    assert proc.returncode == 0, proc.stderr[-2000:]
+    loaded = {name.split(".")[0] for name in modules}
+    assert "openai" not in loaded
+    assert "psycopg" not in loaded
+
+
+def test_cli_help_skips_db_modules():
+    for cli in ("app.store_lecture", "app.quiz_from_lecture_cli", "app.batch_ingest", "app.llm_usage_report"):
+        modules, proc = _importtime("-m", cli, "--help")
+        assert proc.returncode == 0, (cli, proc.stderr[-2000:])
+        loaded = {name.split(".")[0] for name in modules}
+        assert not loaded & {"openai", "sqlalchemy", "sqlmodel", "psycopg"}, cli
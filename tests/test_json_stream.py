@@ -0,0 +1,43 @@
+"""
+스트리밍 JSON 증분 파서 단위 테스트.
+"""
+
+import json
+
+from app.services.json_stream import JsonArrayStreamParser
+
+QUESTIONS = [
+    {"question": "중괄호 } 와 \"따옴표\"가 든 질문?", "options": ["[1]", "2", "3", "4", "5"], "answer": 1, "explanation": "a\\b"},
+    {"question": "두 번째", "options": ["1", "2", "3", "4", "5"], "answer": 3, "explanation": "{}"},
+]
+
+
+def _feed_all(text: str, size: int) -> tuple[list[dict], JsonArrayStreamParser]:
+    parser = JsonArrayStreamParser("questions")
+    out: list[dict] = []
+    for i in range(0, len(text), size):
+        out.extend(parser.feed(text[i : i + size]))
+    return out, parser
+
+
+def test_emits_each_item_as_soon_as_it_closes():
+    text = json.dumps({"title": "x", "questions": QUESTIONS}, ensure_ascii=False)
+    first_end = text.index('"두 번째"')
+    parser = JsonArrayStreamParser()
+    assert parser.feed(text[:first_end]) == [QUESTIONS[0]]
+    assert parser.feed(text[first_end:]) == [QUESTIONS[1]]
+    assert parser.done
+
+
+def test_any_chunking_gives_same_items():
+    text = json.dumps({"questions": QUESTIONS}, ensure_ascii=False, indent=2)
+    for size in (1, 2, 3, 7, 64):
+        items, parser = _feed_all(text, size)
+        assert items == QUESTIONS and parser.done and not parser.errors
+
+
+def test_malformed_item_is_skipped():
+    text = '{"questions": [{"question": "ok", "answer": 1}, {"question": oops}, {"question": "ok2"}]}'
+    items, parser = _feed_all(text, 5)
+    assert [q["question"] for q in items] == ["ok", "ok2"]
+    assert parser.errors == ['{"question": oops}']
@@ -0,0 +1,30 @@
+import io
+
+from app.main import has_torn_last_line, iter_jsonl_items, read_done_ids
+
+
+def test_iter_jsonl_items_ids_and_errors():
+    stream = io.StringIO('{"id": "a", "segments": []}\n\n{"segments": []}\nnot json\n[1]\n')
+    items = list(iter_jsonl_items(stream))
+    assert [i[0] for i in items] == ["a", "line-3", "line-4", "line-5"]
+    assert items[0][1] == {"segments": []}
+    assert items[2][1] is None and items[2][2]
+    assert items[3][1] is None
+
+
+def test_read_done_ids_skips_failed_and_torn_lines(tmp_path):
+    path = tmp_path / "out.jsonl"
+    assert read_done_ids(path) == set()
+    path.write_text('{"id": "a", "ok": true}\n{"id": "b", "ok": false, "error": "x"}\n{"id": "c", "ok": tr', encoding="utf-8")
+    assert read_done_ids(path) == {"a"}
+
+
+def test_has_torn_last_line(tmp_path):
+    path = tmp_path / "out.jsonl"
+    assert not has_torn_last_line(path)
+    path.write_bytes(b"")
+    assert not has_torn_last_line(path)
+    path.write_bytes(b'{"id": "a", "ok": true}\n')
+    assert not has_torn_last_line(path)
+    path.write_bytes(b'{"id": "a", "ok": true}\n{"id": "b", "o')
+    assert has_torn_last_line(path)
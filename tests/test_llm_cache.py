@@ -0,0 +1,41 @@
+"""
+LLM 응답 캐시 단위 테스트 (SQLite 임시 파일, OpenAI 불필요).
+"""
+
+from app.services.llm_cache import LLMResponseCache, make_cache_key
+
+MESSAGES = [{"role": "system", "content": "요약"}, {"role": "user", "content": "전사"}]
+
+
+def test_cache_key_depends_on_all_inputs():
+    base = make_cache_key("gpt-4o-mini", 0.1, MESSAGES)
+    assert base == make_cache_key("gpt-4o-mini", 0.1, [dict(m) for m in MESSAGES])
+    assert base != make_cache_key("gpt-4o-mini", 0.2, MESSAGES)
+    assert base != make_cache_key("gpt-4o", 0.1, MESSAGES)
+    assert base != make_cache_key("gpt-4o-mini", 0.1, MESSAGES, {"type": "json_object"})
+
+
+def test_memory_then_disk_hits_and_stats(tmp_path):
+    path = str(tmp_path / "cache.sqlite3")
+    cache = LLMResponseCache(path=path, memory_size=10, ttl_sec=60, max_entries=100)
+    assert cache.get("k", name="summary") is None
+    cache.set("k", "요약 결과", name="summary")
+    assert cache.get("k", name="summary") == "요약 결과"
+
+    # 새 프로세스 가정: 메모리는 비어 있고 SQLite에서 읽힘
+    fresh = LLMResponseCache(path=path, memory_size=10, ttl_sec=60, max_entries=100)
+    assert fresh.get("k", name="summary") == "요약 결과"
+    assert fresh.stats()["by_call_site"]["summary"]["disk_hits"] == 1
+    assert cache.stats()["total"] == {"memory_hits": 1, "disk_hits": 0, "misses": 1, "stores": 1}
+
+
+def test_ttl_expiry_and_size_eviction(tmp_path):
+    expired = LLMResponseCache(path=str(tmp_path / "a.sqlite3"), memory_size=0, ttl_sec=0, max_entries=100)
+    expired.set("k", "v")
+    assert expired.get("k") is None
+
+    cache = LLMResponseCache(path=str(tmp_path / "b.sqlite3"), memory_size=0, ttl_sec=60, max_entries=10)
+    for i in range(100):  # 100번째 저장에서 정리 실행
+        cache.set(f"k{i}", str(i))
+    assert cache.get("k0") is None
+    assert cache.get("k99") == "99"
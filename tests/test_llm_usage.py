@@ -0,0 +1,105 @@
+import threading
+from types import SimpleNamespace as NS
+
+import pytest
+
+from app.core.config import settings
+from app.services import llm_usage
+from app.services.batcher import BackgroundBatcher
+from app.services.metrics import timed_stage
+from app.services.tracing import wrap
+
+
+def test_usage_tokens_reads_chat_and_transcription_shapes():
+    chat = NS(usage=NS(prompt_tokens=100, completion_tokens=20, prompt_tokens_details=NS(cached_tokens=60)))
+    stt = NS(usage=NS(type="tokens", input_tokens=300, output_tokens=40))
+    assert llm_usage.usage_tokens(chat) == (100, 20, 60)
+    assert llm_usage.usage_tokens(stt) == (300, 40, 0)
+    assert llm_usage.usage_tokens(NS()) == (0, 0, 0)
+
+
+def test_price_uses_longest_prefix_and_cached_rate():
+    prices = llm_usage.DEFAULT_PRICES
+    assert llm_usage.price_for("gpt-4o-mini-2024-07-18", prices) == prices["gpt-4o-mini"]
+    assert llm_usage.price_for("unknown-model", prices) == (0.0, 0.0, 0.0)
+    cost = llm_usage.cost_usd("m", 1_000_000, 1_000_000, 500_000, {"m": (2.0, 1.0, 4.0)})
+    assert cost == pytest.approx(0.5 * 2.0 + 0.5 * 1.0 + 4.0)
+
+
+def test_aggregate_merges_models_within_group():
+    rows = [
+        {"stage": "summary", "model": "a", "calls": 2, "prompt_tokens": 1_000_000, "completion_tokens": 0, "cached_tokens": 0, "latency_ms": 300, "max_latency_ms": 200},
+        {"stage": "summary", "model": "b", "calls": 1, "prompt_tokens": 0, "completion_tokens": 1_000_000, "cached_tokens": 0, "latency_ms": 600, "max_latency_ms": 600},
+        {"stage": "embedding", "model": "a", "calls": 1, "prompt_tokens": 10, "completion_tokens": 0, "cached_tokens": 0, "latency_ms": 5, "max_latency_ms": 5},
+    ]
+    prices = {"a": (1.0, 1.0, 0.0), "b": (0.0, 0.0, 3.0)}
+    out = llm_usage.aggregate(rows, ["stage"], prices)
+    assert [r["stage"] for r in out] == ["summary", "embedding"]
+    assert out[0]["calls"] == 3 and out[0]["cost_usd"] == pytest.approx(4.0)
+    assert out[0]["avg_latency_ms"] == 300.0 and out[0]["max_latency_ms"] == 600
+    (total,) = llm_usage.aggregate(rows, [], prices)
+    assert total["calls"] == 4
+
+
+def test_recorder_attributes_calls_to_job_and_stage(monkeypatch):
+    written: list[dict] = []
+    recorder = llm_usage.LLMUsageRecorder()
+    recorder._batcher = BackgroundBatcher("test-usage", written.extend)
+    monkeypatch.setattr(settings, "LLM_USAGE_ENABLED", True)
+    response = NS(usage=NS(prompt_tokens=10, completion_tokens=2, prompt_tokens_details=None))
+
+    with llm_usage.usage_context(job_type="ingestion", job_id=7, course_id="c1"):
+        with timed_stage("summary"):
+            t = threading.Thread(target=wrap(recorder.record), args=("chat", "summary", "gpt-4o-mini", response, 0.25))
+            t.start()
+            t.join()
+        recorder.record("embedding", "embedding", "text-embedding-3-small", NS(), 0.01)
+    recorder.record("chat", "legacy", "gpt-4o-mini", response, 0.1)
+    recorder.flush()
+
+    first, second, third = written
+    assert first == {
+        "job_type": "ingestion", "job_id": "7", "course_id": "c1", "lecture_id": None, "stage": "summary",
+        "endpoint": "chat", "call_site": "summary", "model": "gpt-4o-mini",
+        "prompt_tokens": 10, "completion_tokens": 2, "cached_tokens": 0, "latency_ms": 250,
+    }
+    assert second["stage"] == "embedding" and second["job_id"] == "7"
+    assert third["job_type"] is None and third["stage"] == "legacy"
+
+
+def test_recorder_disabled(monkeypatch):
+    written: list[dict] = []
+    recorder = llm_usage.LLMUsageRecorder()
+    recorder._batcher = BackgroundBatcher("test-usage", written.extend)
+    monkeypatch.setattr(settings, "LLM_USAGE_ENABLED", False)
+    recorder.record("chat", "x", "m", NS(), 0.1)
+    recorder.flush()
+    assert written == []
+
+
+def test_usage_scope_binds_course_and_lecture():
+    @llm_usage.usage_scope
+    def generate(course_id, lecture_id, user_id):
+        return dict(llm_usage._context.get())
+
+    assert generate("c1", lecture_id="l2", user_id="u") == {"course_id": "c1", "lecture_id": "l2"}
+
+
+def test_usage_scope_covers_lazy_generator():
+    seen = []
+
+    def lazy():
+        seen.append(dict(llm_usage._context.get()))
+        yield 1
+        seen.append(dict(llm_usage._context.get()))
+        yield 2
+
+    @llm_usage.usage_scope
+    def generate_stream(course_id, lecture_id, user_id):
+        return lazy()
+
+    stream = generate_stream("c1", "l2", "u")
+    assert llm_usage._context.get() == {}
+    assert list(stream) == [1, 2]
+    assert seen == [{"course_id": "c1", "lecture_id": "l2"}] * 2
+    assert llm_usage._context.get() == {}
@@ -0,0 +1,89 @@
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+import pytest
+
+from app.services.metrics import Counter, Histogram, queue_families, record_llm_usage, LLM_TOKENS, STAGE_ERRORS, timed_stage
+
+
+def test_histogram_renders_cumulative_buckets():
+    h = Histogram("t_seconds", "help", ("stage",), buckets=(0.1, 1))
+    for v in (0.05, 0.5, 0.7, 3):
+        h.observe(v, stage="a")
+    lines = h.render()
+    assert 't_seconds_bucket{stage="a",le="0.1"} 1' in lines
+    assert 't_seconds_bucket{stage="a",le="1"} 3' in lines
+    assert 't_seconds_bucket{stage="a",le="+Inf"} 4' in lines
+    assert 't_seconds_count{stage="a"} 4' in lines
+    assert 't_seconds_sum{stage="a"} 4.25' in lines
+
+
+def test_counter_escapes_label_values():
+    c = Counter("t_total", "help", ("site",))
+    c.inc(site='a"b\\c')
+    c.inc(2, site='a"b\\c')
+    assert 't_total{site="a\\"b\\\\c"} 3' in c.render()
+
+
+def test_timed_stage_counts_errors():
+    before = STAGE_ERRORS._values.get(("unit_test",), 0)
+    with pytest.raises(RuntimeError):
+        with timed_stage("unit_test"):
+            raise RuntimeError("x")
+    assert STAGE_ERRORS._values[("unit_test",)] == before + 1
+
+
+def test_record_llm_usage_reads_cached_tokens():
+    usage = SimpleNamespace(prompt_tokens=100, completion_tokens=20, prompt_tokens_details=SimpleNamespace(cached_tokens=64))
+    record_llm_usage("chat", "unit_site", "m", SimpleNamespace(usage=usage), 0.2)
+    assert LLM_TOKENS._values[("chat", "unit_site", "m", "prompt")] == 100
+    assert LLM_TOKENS._values[("chat", "unit_site", "m", "cached")] == 64
+    record_llm_usage("chat", "unit_site", "m", None, 0.1)  # usage 없음 → 지연만
+
+
+def test_queue_families_ages_only_waiting_jobs():
+    now = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    families = dict(
+        (name, samples)
+        for name, _, _, samples in queue_families(
+            {"quiz": [("pending", 3, now - timedelta(seconds=30)), ("done", 10, now - timedelta(days=3))]}, now=now
+        )
+    )
+    assert ({"queue": "quiz", "status": "done"}, 10) in families["queue_jobs"]
+    assert families["queue_oldest_age_seconds"] == [({"queue": "quiz", "status": "pending"}, 30.0)]
+
+
+def test_worker_metrics_port_in_use_is_not_fatal():
+    import socket
+
+    from app.worker import start_worker_metrics
+
+    with socket.socket() as taken:
+        taken.bind(("0.0.0.0", 0))
+        taken.listen()
+        assert start_worker_metrics(taken.getsockname()[1]) is False
+    assert start_worker_metrics(0) is False
+
+
+def test_chat_stream_requests_usage_and_records_it(monkeypatch):
+    from app.core.config import settings
+    from app.services import llm
+
+    monkeypatch.setattr(settings, "LLM_USAGE_ENABLED", False)
+    calls: list[dict] = []
+    usage = SimpleNamespace(prompt_tokens=7, completion_tokens=3, prompt_tokens_details=None)
+    events = [
+        SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content="안녕"))], usage=None),
+        SimpleNamespace(choices=[], usage=usage),
+    ]
+
+    def create(**kwargs):
+        calls.append(kwargs)
+        return iter(events)
+
+    client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+    before = LLM_TOKENS._values.get(("chat", "stream", "unit-stream-model", "completion"), 0)
+    chunks = llm.chat_completion_stream(client, messages=[{"role": "user", "content": "hi"}], model="unit-stream-model")
+    assert list(chunks) == ["안녕"]
+    assert calls[0]["stream_options"] == {"include_usage": True}
+    assert LLM_TOKENS._values.get(("chat", "stream", "unit-stream-model", "completion"), 0) - before == 3
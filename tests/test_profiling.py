@@ -0,0 +1,98 @@
+import asyncio
+import json
+import threading
+
+import pytest
+
+from app.core.config import settings
+from app.services import profiling
+from app.services.chunking import chunk_by_max_chars
+from app.services.tracing import wrap
+
+SEGMENTS = [{"start": i, "end": i + 1, "text": "강의 문장 " * 5} for i in range(2000)]
+
+
+def _busy(stop: threading.Event) -> None:
+    while not stop.is_set():
+        chunk_by_max_chars(SEGMENTS, max_chars=200)
+
+
+@pytest.fixture
+def enabled(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "PROFILING_ENABLED", True)
+    monkeypatch.setattr(settings, "PROFILE_DIR", str(tmp_path))
+    monkeypatch.setattr(settings, "PROFILE_INTERVAL_MS", 1.0)
+    monkeypatch.setattr(settings, "PROFILE_SAMPLE_RATE", 0.0)
+    monkeypatch.setattr(settings, "PROFILE_JOB_IDS", "7, 9")
+    return tmp_path
+
+
+def test_selection(enabled, monkeypatch):
+    assert profiling.request_selected("1", None)
+    assert profiling.request_selected(None, "true")
+    assert not profiling.request_selected(None, None)
+    assert profiling.job_selected(9, {})
+    assert profiling.job_selected(1, {"profile": True})
+    assert not profiling.job_selected(1, {})
+    monkeypatch.setattr(settings, "PROFILING_ENABLED", False)
+    assert not profiling.request_selected("1", "1")
+    assert not profiling.job_selected(9, {"profile": True})
+
+
+def test_profile_captures_attached_threads_only(enabled):
+    stop = threading.Event()
+    other = threading.Thread(target=_busy, args=(stop,), name="other-request")
+    other.start()  # 프로파일 대상이 아닌 스레드 (다른 요청)
+    with profiling.profile("ingestion-job", "42/x", course_id="c1") as result:
+        worker = threading.Thread(target=wrap(_busy), args=(stop,), name="busy-worker")
+        worker.start()
+        while not stop.wait(0.1):
+            stop.set()
+        worker.join()
+    other.join()
+    assert result.path is not None and result.path.name.startswith("ingestion-job-42_x-")
+    folded = result.path.read_text(encoding="utf-8")
+    assert any(line.startswith("thread:busy-worker;") and "chunk_by_max_chars" in line for line in folded.splitlines())
+    assert "thread:other-request" not in folded
+    report = json.loads(result.path.with_suffix(".json").read_text(encoding="utf-8"))
+    assert report["course_id"] == "c1" and report["samples"] > 0
+    assert any("chunk_by_max_chars" in row["frame"] for row in report["top"])
+
+
+def test_nested_profile_is_skipped(enabled):
+    with profiling.profile("request", "a") as outer:
+        with profiling.profile("request", "b") as inner:
+            pass
+        assert inner.path is None
+    assert outer.path is not None
+
+
+def test_sync_endpoint_thread_is_attached(enabled):
+    seen: list[bool] = []
+    endpoint = profiling.attach_endpoint(lambda: seen.append(threading.get_ident() in profiler._threads))
+    with profiling.profile("request", "sync") as result:
+        profiler = profiling._current.get()
+        t = threading.Thread(target=wrap(endpoint))
+        t.start()
+        t.join()
+    assert seen == [True] and result.path is not None
+
+
+def test_async_profile_saves_off_event_loop(enabled, monkeypatch):
+    save_threads: list[int] = []
+    original = profiling._save
+
+    def save(*args):
+        save_threads.append(threading.get_ident())
+        return original(*args)
+
+    monkeypatch.setattr(profiling, "_save", save)
+
+    async def main():
+        async with profiling.profile_async("request", "r1", path="/x") as result:
+            await asyncio.sleep(0.02)
+        return threading.get_ident(), result
+
+    loop_thread, result = asyncio.run(main())
+    assert result.path is not None and save_threads and save_threads[0] != loop_thread
+    assert not profiling._active.locked()
@@ -0,0 +1,114 @@
+"""
+문항 은행 단위 테스트: served_count 원자적 증가(SQLite로 실제 UPDATE 실행)와 내용 버전별 보충 결과 폐기.
+"""
+
+from contextlib import contextmanager
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.ext.compiler import compiles
+from sqlmodel import Session, select
+
+from app.db.models import QuizBankQuestion
+from app.db.repositories.quiz_bank import quiz_bank_repo
+from app.schema.quiz_lecture import QuizFromLectureResponse
+from app.services import quiz_bank
+from app.services.quiz_bank import content_version, quiz_bank_service
+
+
+@compiles(JSONB, "sqlite")
+def _jsonb_as_json(type_, compiler, **kw):
+    return "JSON"
+
+
+@pytest.fixture
+def session():
+    engine = create_engine("sqlite://")
+    QuizBankQuestion.__table__.create(engine)
+    with Session(engine) as s:
+        yield s
+
+
+def _questions(n: int) -> list[dict]:
+    return [
+        {"question": f"Q{i}", "options": ["a", "b", "c", "d", "e"], "answer": 1, "explanation": "", "verified": True}
+        for i in range(n)
+    ]
+
+
+def test_sample_increments_in_database(session):
+    quiz_bank_repo.insert_many(session, "c1", "l1", "u1", _questions(4), source_version="v1")
+    first = quiz_bank_repo.sample(session, "c1", "l1", "u1", 2)
+    assert [r.served_count for r in first] == [1, 1]
+    second = quiz_bank_repo.sample(session, "c1", "l1", "u1", 2)
+    assert {r.question for r in first}.isdisjoint({r.question for r in second})  # 적게 나간 문항 우선
+    third = quiz_bank_repo.sample(session, "c1", "l1", "u1", 4)
+    assert sorted(r.served_count for r in third) == [2, 2, 2, 2]
+
+
+def test_sample_short_pool_changes_nothing(session):
+    quiz_bank_repo.insert_many(session, "c1", "l1", "u1", _questions(2))
+    assert quiz_bank_repo.sample(session, "c1", "l1", "u1", 3) == []
+    session.expire_all()
+    assert all(r.served_count == 0 for r in session.exec(select(QuizBankQuestion)).all())
+
+
+def test_delete_keeps_current_version(session):
+    quiz_bank_repo.insert_many(session, "c1", "l1", "u1", _questions(2), source_version="old")
+    renamed = [{**q, "question": "N" + q["question"]} for q in _questions(2)]
+    quiz_bank_repo.insert_many(session, "c1", "l1", "u1", renamed, source_version="new")
+    assert quiz_bank_repo.delete_by_lecture(session, "c1", "l1", "u1", keep_version="new") == 2
+    assert {r.source_version for r in session.exec(select(QuizBankQuestion)).all()} == {"new"}
+
+
+def test_content_version_tracks_summary_and_chunks():
+    v = content_version("요약", ["a", "b"])
+    assert v == content_version("요약", ["a", "b"])
+    assert v != content_version("요약2", ["a", "b"])
+    assert v != content_version("요약", ["ab"])
+
+
+@pytest.fixture
+def bank(monkeypatch):
+    @contextmanager
+    def fake_session():
+        yield None
+
+    state = SimpleNamespace(version="v2", inserted=[], deleted=[])
+    monkeypatch.setattr(quiz_bank, "get_session", fake_session)
+    monkeypatch.setattr(quiz_bank, "_current_version", lambda session, c, l, u: state.version)
+
+    def insert_many(session, c, l, u, questions, *, source_version=""):
+        state.inserted.append(source_version)
+        return len(questions)
+
+    def delete_by_lecture(session, c, l, u, *, min_served=None, keep_version=None):
+        state.deleted.append(keep_version)
+        return 0
+
+    monkeypatch.setattr(quiz_bank.quiz_bank_repo, "insert_many", insert_many)
+    monkeypatch.setattr(quiz_bank.quiz_bank_repo, "delete_by_lecture", delete_by_lecture)
+    return state
+
+
+def _result() -> QuizFromLectureResponse:
+    return QuizFromLectureResponse.model_validate({"questions": _questions(1)})
+
+
+def test_stale_refill_is_discarded(bank):
+    assert quiz_bank_service.store("c1", "l1", "u1", _result(), "v1") == 0
+    assert bank.inserted == []
+
+
+def test_refill_superseded_during_store_is_removed(bank, monkeypatch):
+    versions = iter(["v1", "v2"])  # 확인 때는 v1, 적재 직후 강의가 바뀌어 v2
+    monkeypatch.setattr(quiz_bank, "_current_version", lambda session, c, l, u: next(versions))
+    assert quiz_bank_service.store("c1", "l1", "u1", _result(), "v1") == 0
+    assert bank.inserted == ["v1"] and bank.deleted[-1] == "v2"
+
+
+def test_current_refill_is_stored(bank):
+    assert quiz_bank_service.store("c1", "l1", "u1", _result(), "v2") == 1
+    assert bank.inserted == ["v2"]
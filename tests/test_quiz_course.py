@@ -0,0 +1,96 @@
+"""
+강좌 일괄 퀴즈 생성(_run_course) 단위 테스트: 강의별 즉시 저장·사용량 귀속, 중간에 닫히면 대기 강의 취소 (DB·OpenAI 불필요).
+"""
+
+import threading
+from types import SimpleNamespace
+
+import pytest
+
+from app.schema.quiz_lecture import QuizFromLectureResponse
+from app.services import llm_usage
+from app.services.quiz_from_lecture import QuizFromLectureService
+
+
+def _result() -> QuizFromLectureResponse:
+    q = {"question": "Q", "options": ["a", "b", "c", "d", "e"], "answer": 1, "explanation": ""}
+    return QuizFromLectureResponse.model_validate({"questions": [q]})
+
+
+def _targets(*lecture_ids: str):
+    return [(SimpleNamespace(lecture_id=lid), []) for lid in lecture_ids]
+
+
+@pytest.fixture
+def service(monkeypatch):
+    svc = QuizFromLectureService()
+    svc.saved = []
+
+    def save_result(course_id, lecture_id, result):
+        svc.saved.append(lecture_id)
+        return len(svc.saved)
+
+    monkeypatch.setattr(svc, "save_result", save_result)
+    return svc
+
+
+def test_saves_each_lecture_as_it_finishes(service):
+    def run(row, prev):
+        if row.lecture_id == "l2":
+            raise RuntimeError("LLM 오류")
+        return _result()
+
+    events = list(service._run_course("c1", _targets("l1", "l2", "l3"), run, 2, True))
+    progress = {data["lecture_id"]: data for name, data in events if name == "progress"}
+    assert sorted(service.saved) == ["l1", "l3"]
+    assert progress["l1"]["quiz_id"] is not None and progress["l2"]["ok"] is False
+    name, done = events[-1]
+    assert name == "done" and set(done["quiz_ids"]) == {"l1", "l3"} and done["failed"] == {"l2": "LLM 오류"}
+
+
+def test_course_batch_attributes_usage_per_lecture(service):
+    seen = {}
+
+    def run(row, prev):
+        seen[row.lecture_id] = dict(llm_usage._context.get())
+        return _result()
+
+    list(service._run_course("c1", _targets("l1", "l2"), run, 2, False))
+    assert seen == {"l1": {"course_id": "c1", "lecture_id": "l1"}, "l2": {"course_id": "c1", "lecture_id": "l2"}}
+
+
+def test_no_save_when_disabled(service):
+    events = list(service._run_course("c1", _targets("l1"), lambda row, prev: _result(), 1, False))
+    assert service.saved == [] and events[-1][1]["saved"] is False
+
+
+def test_close_cancels_pending_and_keeps_running_result(service):
+    release = threading.Event()
+    started: list[str] = []
+    l2_started = threading.Event()
+    l2_saved = threading.Event()
+
+    def run(row, prev):
+        started.append(row.lecture_id)
+        if row.lecture_id == "l2":
+            l2_started.set()
+            release.wait(5)
+        return _result()
+
+    original_save = service.save_result
+
+    def save_result(course_id, lecture_id, result):
+        quiz_id = original_save(course_id, lecture_id, result)
+        if lecture_id == "l2":
+            l2_saved.set()
+        return quiz_id
+
+    service.save_result = save_result
+    events = service._run_course("c1", _targets("l1", "l2", "l3"), run, 1, True)
+    name, data = next(events)
+    assert name == "progress" and data["lecture_id"] == "l1"
+    assert l2_started.wait(5)
+    events.close()  # SSE 연결 끊김: l2는 실행 중, l3는 대기 중
+    release.set()
+    assert l2_saved.wait(5)
+    assert "l3" not in started and service.saved == ["l1", "l2"]
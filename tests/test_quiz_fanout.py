@@ -0,0 +1,19 @@
+"""
+퀴즈 fan-out 보조 함수 단위 테스트 (구간 분할, 임베딩 유사도 중복 제거).
+"""
+
+import numpy as np
+
+from app.services.quiz_from_lecture import dedupe_similar, split_evenly
+
+
+def test_split_evenly_keeps_order_and_balances():
+    assert split_evenly(list(range(7)), 3) == [[0, 1, 2], [3, 4], [5, 6]]
+    assert split_evenly([1, 2], 5) == [[1], [2]]
+
+
+def test_dedupe_similar_drops_near_duplicates_in_order():
+    vectors = np.array([[1.0, 0.0], [0.0, 1.0], [0.99, 0.05], [0.0, 2.0], [0.7, 0.7]])
+    assert dedupe_similar(vectors, threshold=0.95) == [0, 1, 4]
+    assert dedupe_similar(vectors, threshold=1.01) == [0, 1, 2, 3, 4]
+    assert dedupe_similar(np.zeros((0, 2)), threshold=0.9) == []
@@ -0,0 +1,90 @@
+"""
+QuizJobRunner 슬롯 회계 단위 테스트: claim 실패·빈 큐·일부만 claim돼도 슬롯이 새지 않는지 (DB 불필요).
+"""
+
+from contextlib import contextmanager
+from types import SimpleNamespace
+
+import pytest
+
+from app.services import quiz_jobs
+from app.services.quiz_jobs import QuizJobRunner
+
+
+class InlinePool:
+    """submit을 바로 실행하는 가짜 스레드 풀."""
+
+    def submit(self, fn, *args):
+        fn(*args)
+
+
+@pytest.fixture
+def runner(monkeypatch):
+    @contextmanager
+    def fake_session():
+        yield None
+
+    ran: list[int] = []
+    monkeypatch.setattr(quiz_jobs, "get_session", fake_session)
+    monkeypatch.setattr(quiz_jobs, "run_quiz_job", lambda job_id, *args: ran.append(job_id))
+    r = QuizJobRunner(workers=3, poll_interval=0.01)
+    r.ran = ran
+    return r
+
+
+def _free_slots(runner: QuizJobRunner) -> int:
+    n = 0
+    while runner._slots.acquire(blocking=False):
+        n += 1
+    return n
+
+
+def _job(i: int):
+    return SimpleNamespace(id=i, course_id="c1", lecture_id=f"l{i}", user_id="u1", params={}, target="quiz")
+
+
+def test_claim_error_releases_all_slots(runner, monkeypatch):
+    def boom(session, limit):
+        raise RuntimeError("db down")
+
+    monkeypatch.setattr(quiz_jobs.quiz_job_repo, "claim_pending", boom)
+    with pytest.raises(RuntimeError):
+        runner._claim_and_submit(InlinePool())
+    assert _free_slots(runner) == 3
+
+
+def test_partial_claim_releases_unused_and_finished_slots(runner, monkeypatch):
+    limits: list[int] = []
+
+    def claim(session, limit):
+        limits.append(limit)
+        return [_job(1)]
+
+    monkeypatch.setattr(quiz_jobs.quiz_job_repo, "claim_pending", claim)
+    assert runner._claim_and_submit(InlinePool()) == 1
+    assert limits == [3] and runner.ran == [1]
+    assert _free_slots(runner) == 3
+
+
+def test_submit_failure_releases_remaining_slots(runner, monkeypatch):
+    class ClosedPool:
+        def submit(self, fn, *args):
+            raise RuntimeError("cannot schedule new futures after shutdown")
+
+    monkeypatch.setattr(quiz_jobs.quiz_job_repo, "claim_pending", lambda session, limit: [_job(1), _job(2)])
+    with pytest.raises(RuntimeError):
+        runner._claim_and_submit(ClosedPool())
+    assert _free_slots(runner) == 3
+
+
+def test_reaper_runs_once_per_interval(runner, monkeypatch):
+    calls: list[float] = []
+
+    def requeue(session, older_than_sec):
+        calls.append(older_than_sec)
+        return [7]
+
+    monkeypatch.setattr(quiz_jobs.quiz_job_repo, "requeue_stale", requeue)
+    runner._reap_stale()
+    runner._reap_stale()
+    assert calls == [quiz_jobs.settings.QUIZ_JOB_STALE_SEC]
@@ -0,0 +1,103 @@
+"""
+호출 한도 스케줄러 단위 테스트 (OpenAI·DB 불필요).
+"""
+
+import time
+from contextlib import contextmanager
+
+import pytest
+
+from app.services.rate_limiter import (
+    AIMDLimiter,
+    KindLimits,
+    RateLimitScheduler,
+    TokenBucket,
+    _SharedWindow,
+    estimate_chat_tokens,
+)
+
+
+class _RateLimitError(Exception):
+    status_code = 429
+
+
+def test_token_bucket_reports_wait_without_consuming():
+    bucket = TokenBucket(rate_per_sec=10, capacity=5)
+    assert bucket.try_acquire(5) == 0.0
+    wait = bucket.try_acquire(3)
+    assert 0.25 < wait <= 0.3
+    assert bucket.try_acquire(50) > 0  # 용량보다 큰 요청도 capacity까지만 요구
+
+
+def test_aimd_halves_on_congestion_and_grows_additively():
+    limiter = AIMDLimiter(max_limit=8)
+    limiter.acquire()
+    limiter.release(congested=True)
+    assert limiter.limit == 4
+    for _ in range(5):  # 4 → 4.25 → … → 5.1 (한도 1 증가에 약 한도만큼의 정상 응답)
+        limiter.acquire()
+        limiter.release()
+    assert limiter.limit == 5
+
+
+def test_slot_shrinks_concurrency_on_429_and_counts():
+    scheduler = RateLimitScheduler(
+        limits={"chat": KindLimits(rpm=6000, tpm=1_000_000)}, max_concurrency=4, shared=False
+    )
+    with scheduler.slot("chat", tokens=100):
+        pass
+    with pytest.raises(_RateLimitError):
+        with scheduler.slot("chat", tokens=100):
+            raise _RateLimitError()
+    stats = scheduler.stats()["chat"]
+    assert stats["calls"] == 2 and stats["rate_limited"] == 1
+    assert stats["concurrency_limit"] == 2 and stats["in_flight"] == 0
+
+
+def test_estimate_chat_tokens_includes_output_budget():
+    short = estimate_chat_tokens([{"role": "user", "content": "a"}])
+    long = estimate_chat_tokens([{"role": "user", "content": "a" * 4000}])
+    assert short > 1 and long - short >= 900
+
+
+def test_estimate_chat_tokens_uses_request_max_tokens():
+    messages = [{"role": "user", "content": "a"}]
+    assert estimate_chat_tokens(messages, max_tokens=4000) - estimate_chat_tokens(messages, max_tokens=100) == 3900
+
+
+def test_slow_success_keeps_concurrency_but_timeout_shrinks(monkeypatch):
+    scheduler = RateLimitScheduler(
+        limits={"chat": KindLimits(rpm=6000, tpm=1_000_000)}, max_concurrency=4, shared=False
+    )
+    clock = iter([0.0, 0.0, 120.0, 120.0])  # 대기 측정 전후, 호출 2분 소요
+    monkeypatch.setattr(time, "perf_counter", lambda: next(clock, 120.0))
+    with scheduler.slot("chat", tokens=100):
+        pass
+    assert scheduler.stats()["chat"]["concurrency_limit"] == 4
+    with pytest.raises(TimeoutError):
+        with scheduler.slot("chat", tokens=100):
+            raise TimeoutError()
+    stats = scheduler.stats()["chat"]
+    assert stats["concurrency_limit"] == 2 and stats["timeouts"] == 1 and stats["rate_limited"] == 0
+
+
+def test_shared_window_clamps_oversized_request_to_tpm(monkeypatch):
+    from app.db import connection
+    from app.db.repositories.llm_rate_window import llm_rate_window_repo
+
+    reserved: list[int] = []
+
+    @contextmanager
+    def no_session():
+        yield None
+
+    def reserve(session, kind, window, requests, tokens):
+        reserved.append(tokens)
+        return requests, tokens
+
+    monkeypatch.setattr(connection, "get_session", no_session)
+    monkeypatch.setattr(llm_rate_window_repo, "prune", lambda session, before: None)
+    monkeypatch.setattr(llm_rate_window_repo, "reserve", reserve)
+    # TPM보다 큰 추정치도 빈 창이면 바로 통과하고, 예약은 TPM까지만
+    assert _SharedWindow().acquire("chat", 50_000, KindLimits(rpm=10, tpm=1_000)) == 0.0
+    assert reserved == [1_000]
@@ -0,0 +1,80 @@
+"""
+재시도·서킷 브레이커·헤지 단위 테스트 (OpenAI 불필요, sleep 주입).
+"""
+
+import time
+
+import pytest
+
+from app.services.resilience import CircuitBreaker, CircuitOpenError, ResilientCaller, is_retryable
+
+
+class _StatusError(Exception):
+    def __init__(self, status_code: int):
+        super().__init__(f"status {status_code}")
+        self.status_code = status_code
+
+
+def _flaky(failures: list[Exception], result: str = "ok"):
+    def fn():
+        if failures:
+            raise failures.pop(0)
+        return result
+
+    return fn
+
+
+def test_retryable_classification():
+    assert is_retryable(_StatusError(429)) and is_retryable(_StatusError(503))
+    assert not is_retryable(_StatusError(400)) and not is_retryable(_StatusError(401))
+    assert is_retryable(TimeoutError()) and not is_retryable(ValueError())
+
+
+def test_retries_transient_errors_then_succeeds():
+    delays: list[float] = []
+    caller = ResilientCaller(max_attempts=4, base_delay=0.1, max_delay=1, sleep=delays.append)
+    assert caller.call("chat", _flaky([_StatusError(500), _StatusError(429)])) == "ok"
+    assert len(delays) == 2 and all(0 <= d <= 0.2 for d in delays)
+    assert caller.stats()["chat"]["retries"] == 2
+
+
+def test_non_retryable_fails_immediately():
+    caller = ResilientCaller(max_attempts=4, sleep=lambda _: None)
+    with pytest.raises(_StatusError):
+        caller.call("chat", _flaky([_StatusError(400)]))
+    assert caller.stats()["chat"]["retries"] == 0
+
+
+def test_breaker_opens_then_half_opens():
+    breaker = CircuitBreaker(failure_threshold=2, reset_sec=0.05)
+    breaker.record_failure()
+    breaker.record_failure()
+    assert breaker.state == "open" and not breaker.allow()
+    time.sleep(0.06)
+    assert breaker.allow() and not breaker.allow()  # 반열림: 시험 호출 1건만
+    breaker.record_success()
+    assert breaker.state == "closed"
+
+
+def test_caller_rejects_when_breaker_open():
+    caller = ResilientCaller(max_attempts=1, sleep=lambda _: None)
+    breaker = caller.breaker("embedding")
+    for _ in range(breaker.failure_threshold):
+        breaker.record_failure()
+    with pytest.raises(CircuitOpenError):
+        caller.call("embedding", lambda: "ok")
+
+
+def test_hedge_returns_faster_duplicate():
+    calls = []
+
+    def fn():
+        calls.append(1)
+        if len(calls) == 1:
+            time.sleep(0.3)
+            return "slow"
+        return "fast"
+
+    caller = ResilientCaller(max_attempts=1)
+    assert caller.call("embedding", fn, hedge_after=0.02) == "fast"
+    assert caller.stats()["embedding"]["hedge_wins"] == 1
@@ -0,0 +1,32 @@
+"""
+store_lecture 일괄 저장 보조 함수 단위 테스트 (내용 해시, 진행 기록 재개).
+"""
+
+import json
+from pathlib import Path
+
+from app.services.lecture_store import content_sha256
+from app.store_lecture import lecture_id_from_path, read_progress_log
+
+
+def test_content_hash_ignores_key_order():
+    a = {"segments": [{"text": "안녕", "start": 0}], "meta": {"x": 1}}
+    b = {"meta": {"x": 1}, "segments": [{"start": 0, "text": "안녕"}]}
+    assert content_sha256(a) == content_sha256(b)
+    assert content_sha256(a) != content_sha256({**a, "meta": {"x": 2}})
+
+
+def test_lecture_id_from_path():
+    assert lecture_id_from_path(Path("t/3.aac.raw.json")) == "3"
+
+
+def test_read_progress_log_keeps_finished_and_ignores_torn_line(tmp_path):
+    log = tmp_path / "progress.jsonl"
+    lines = [
+        {"path": "a.json", "status": "stored", "sha256": "h1"},
+        {"path": "b.json", "status": "failed", "sha256": "h2"},
+        {"path": "c.json", "status": "skipped", "sha256": "h3"},
+    ]
+    log.write_text("\n".join(json.dumps(x) for x in lines) + '\n{"path": "d.js', encoding="utf-8")
+    assert read_progress_log(log) == {"a.json": "h1", "c.json": "h3"}
+    assert read_progress_log(tmp_path / "missing.jsonl") == {}
@@ -0,0 +1,73 @@
+"""
+구조화 출력 보조 함수 단위 테스트 (strict 스키마 변환, 문항 단위 salvage, 모자란 문항 재생성, 통계).
+"""
+
+import json
+
+import pytest
+
+from app.schema.models import QuizDraft
+from app.schema.quiz_lecture import QuizQuestionItem
+from app.services.structured_output import (
+    StructuredOutputStats,
+    complete_items,
+    salvage_items,
+    strict_response_format,
+)
+
+GOOD = {"question": "q", "options": ["1", "2", "3", "4", "5"], "answer": 2, "explanation": "e"}
+
+
+def test_strict_schema_requires_all_fields_and_forbids_extra():
+    fmt = strict_response_format(QuizDraft)
+    assert fmt["type"] == "json_schema" and fmt["json_schema"]["strict"] is True
+    question = fmt["json_schema"]["schema"]["$defs"]["QuizQuestion"]
+    assert question["additionalProperties"] is False
+    assert set(question["required"]) == set(question["properties"])  # options(선택)도 required + null 허용
+    assert "default" not in json.dumps(fmt)
+
+
+def test_salvage_keeps_valid_items_and_counts_dropped():
+    bad = dict(GOOD, options=["1", "2"])
+    raw = json.dumps({"title": "t", "questions": [GOOD, bad, dict(GOOD, answer=5)]})
+    rest, items, dropped = salvage_items(raw, QuizQuestionItem)
+    assert rest == {"title": "t"}
+    assert [q.answer for q in items] == [2, 5]
+    assert dropped == 1
+
+
+def test_salvage_truncated_json_keeps_closed_items():
+    raw = json.dumps({"questions": [GOOD, GOOD]})
+    _, items, _ = salvage_items(raw[:-20], QuizQuestionItem)
+    assert len(items) == 1
+
+
+def test_stats_repair_rate():
+    stats = StructuredOutputStats()
+    stats.record("quiz", dropped=0, missing=0)
+    stats.record("quiz", dropped=1, missing=1, topup_sec=2.0)
+    s = stats.stats()["quiz"]
+    assert (s["responses"], s["clean"], s["repaired"], s["repair_rate"], s["avg_repair_sec"]) == (2, 1, 1, 0.5, 2.0)
+
+
+def test_complete_items_tops_up_only_missing():
+    prompts: list[str] = []
+    responses = [
+        json.dumps({"title": "t", "questions": [dict(GOOD, question="첫 문항"), dict(GOOD, options=["1"])]}),
+        json.dumps({"questions": [dict(GOOD, question="새 문항"), dict(GOOD, question="남는 문항")]}),
+    ]
+
+    def call(prompt):
+        prompts.append(prompt)
+        return responses[len(prompts) - 1]
+
+    rest, items = complete_items(call, "원래 요청", QuizQuestionItem, 2, name="test_topup")
+    assert rest == {"title": "t"}
+    assert [q.question for q in items] == ["첫 문항", "새 문항"]
+    assert prompts[0] == "원래 요청"
+    assert prompts[1].startswith("원래 요청") and "- 첫 문항" in prompts[1] and "새 문항 1개" in prompts[1]
+
+
+def test_complete_items_raises_when_nothing_valid():
+    with pytest.raises(ValueError):
+        complete_items(lambda prompt: "{}", "요청", QuizQuestionItem, 1, name="test_empty")
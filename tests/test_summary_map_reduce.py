@@ -0,0 +1,90 @@
+"""
+map-reduce 요약 단위 테스트: 청크 분할·트리 reduce, 저장된 청크 요약의 본문 해시 기반 재사용 (LLM·DB 불필요).
+"""
+
+from contextlib import contextmanager
+from types import SimpleNamespace
+
+import pytest
+
+from app.api.schemas import LectureSummarizeRequest
+from app.core.config import settings
+from app.services import lecture_store
+from app.services.lecture_store import lecture_store_service, text_sha256
+from app.services.summary import MAP_SYSTEM_PROMPT, REDUCE_SYSTEM_PROMPT, summary_service
+
+
+@pytest.fixture
+def chats(monkeypatch):
+    calls: list[str] = []
+
+    def fake_chat(system_prompt: str, user_prompt: str) -> str:
+        kind = {MAP_SYSTEM_PROMPT: "map", REDUCE_SYSTEM_PROMPT: "reduce"}.get(system_prompt, "final")
+        calls.append(kind)
+        return f"{kind}-{len(calls)}"
+
+    monkeypatch.setattr(summary_service, "_chat", fake_chat)
+    monkeypatch.setattr(settings, "MAX_TRANSCRIPT_CHARS", 100)
+    monkeypatch.setattr(settings, "SUMMARY_MAP_CHUNK_CHARS", 50)
+    monkeypatch.setattr(settings, "SUMMARY_REDUCE_GROUP_SIZE", 2)
+    return calls
+
+
+def _content(n: int) -> dict:
+    return {"segments": [{"start": i, "end": i + 1, "text": f"문장{i:02d} " * 4} for i in range(n)]}
+
+
+def test_long_transcript_is_split_and_reduced_as_tree(chats):
+    summary, partials = summary_service.summarize_map_reduce(_content(16))
+    # 문장 23자 → 50자 청크에 2개씩 8청크, reduce 8 → 4 → 2 (group_size 2) 후 최종 1회
+    assert len(partials) == 8 and chats.count("map") == 8
+    assert chats.count("reduce") == 6 and chats[-1] == "final" and summary.startswith("final")
+
+
+def test_short_transcript_skips_map(chats):
+    summary, partials = summary_service.summarize_map_reduce(_content(2))
+    assert partials == [] and chats == ["final"]
+
+
+def test_stored_chunk_summaries_reused_only_when_text_matches(chats, monkeypatch):
+    content = _content(3)
+    texts = [seg["text"].strip() for seg in content["segments"]]
+    metas = [
+        {"summary": "저장1", "summary_sha256": text_sha256(texts[0])},
+        {"summary": "낡음", "summary_sha256": text_sha256("옛 본문")},
+        {"summary": "해시 없음"},
+    ]
+    rows = [SimpleNamespace(id=i + 1, content={"text": t}, metadata_=m) for i, (t, m) in enumerate(zip(texts, metas))]
+    saved: dict = {}
+
+    @contextmanager
+    def fake_session():
+        yield None
+
+    monkeypatch.setattr(lecture_store, "get_session", fake_session)
+    monkeypatch.setattr(lecture_store.lecture_chunk_repo, "get_by_lecture", lambda session, c, l, u: rows)
+    monkeypatch.setattr(lecture_store.lecture_chunk_repo, "set_summaries", lambda session, s: saved.update(s))
+    lecture_store_service._summarize_map_reduce("c1", "l1", "u1", content)
+    assert chats.count("map") == 2  # 1번만 재사용
+    assert set(saved) == {2, 3} and saved[2][1] == text_sha256(texts[1])
+
+
+def test_chunks_from_other_transcript_are_ignored(chats, monkeypatch):
+    rows = [SimpleNamespace(id=1, content={"text": "다른 전사"}, metadata_={})]
+
+    @contextmanager
+    def fake_session():
+        yield None
+
+    monkeypatch.setattr(lecture_store, "get_session", fake_session)
+    monkeypatch.setattr(lecture_store.lecture_chunk_repo, "get_by_lecture", lambda session, c, l, u: rows)
+    monkeypatch.setattr(lecture_store.lecture_chunk_repo, "set_summaries", lambda session, s: pytest.fail("저장 안 함"))
+    lecture_store_service._summarize_map_reduce("c1", "l1", "u1", _content(16))
+    assert chats.count("map") == 8  # 저장된 청크 대신 전사를 새로 나눔
+
+
+def test_invalid_summary_mode_is_rejected():
+    base = {"content": {}, "course_id": "c", "lecture_id": "l", "user_id": "u"}
+    assert LectureSummarizeRequest(**base, summary_mode="map_reduce").summary_mode == "map_reduce"
+    with pytest.raises(ValueError):
+        LectureSummarizeRequest(**base, summary_mode="mapreduce")
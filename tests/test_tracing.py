@@ -0,0 +1,72 @@
+import json
+import threading
+
+import pytest
+
+from app.core.config import settings
+from app.services import tracing
+
+
+@pytest.fixture
+def jsonl_exporter(tmp_path, monkeypatch):
+    path = tmp_path / "traces.jsonl"
+    monkeypatch.setattr(settings, "TRACING_EXPORTER", "jsonl")
+    monkeypatch.setattr(settings, "TRACING_FILE", str(path))
+
+    def read() -> list[dict]:
+        tracing.exporter.flush()
+        if not path.exists():
+            return []
+        return [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines()]
+
+    return read
+
+
+def test_disabled_span_is_noop(monkeypatch):
+    monkeypatch.setattr(settings, "TRACING_EXPORTER", "none")
+    with tracing.span("x") as sp:
+        sp.set(a=1)
+        assert tracing.inject({}) == {}
+
+
+def test_payload_carries_trace_to_worker(jsonl_exporter):
+    with tracing.span("enqueue") as parent:
+        payload = tracing.inject({"transcript": {}})
+    assert payload["trace"]["traceparent"] == parent.traceparent
+    with tracing.continue_from(payload):
+        tracing.record_span("queue_wait", 1, 2)
+        with tracing.span("job") as job:
+            result = {}
+            t = threading.Thread(target=tracing.wrap(lambda: result.setdefault("span", tracing._current.get())))
+            t.start()
+            t.join()
+    assert job.trace_id == parent.trace_id and job.parent_id == parent.span_id
+    assert result["span"] is job
+    spans = {s["name"]: s for s in jsonl_exporter()}
+    assert spans["queue_wait"]["parent_id"] == parent.span_id
+    assert spans["job"]["trace_id"] == parent.trace_id
+
+
+def test_span_records_error(jsonl_exporter):
+    with pytest.raises(ValueError):
+        with tracing.span("boom"):
+            raise ValueError("bad")
+    (span,) = jsonl_exporter()
+    assert span["error"] == "ValueError: bad"
+
+
+def test_invalid_traceparent_starts_new_trace(jsonl_exporter):
+    with tracing.continue_from({"trace": {"traceparent": "garbage"}}):
+        with tracing.span("root") as root:
+            pass
+    assert root.parent_id is None
+
+
+def test_otlp_payload_shape():
+    span = tracing.Span("llm.chat", "a" * 32, "b" * 16, {"llm.model": "m", "llm.prompt_tokens": 10})
+    span.end_ns = span.start_ns + 5
+    body = tracing.otlp_payload([span], "svc")
+    (out,) = body["resourceSpans"][0]["scopeSpans"][0]["spans"]
+    assert out["parentSpanId"] == "b" * 16
+    assert {"key": "llm.prompt_tokens", "value": {"intValue": "10"}} in out["attributes"]
+    assert out["status"] == {"code": 0}
@@ -0,0 +1,80 @@
+"""
+인메모리 강좌 벡터 인덱스 단위 테스트 (DB·OpenAI 불필요).
+"""
+
+import threading
+
+import numpy as np
+
+from app.services.vector_index import CourseVectorIndex, SummaryVectorIndexCache
+
+
+def _rows(n: int, dim: int = 8) -> list[tuple[str, str, list[float]]]:
+    eye = np.eye(dim, dtype=np.float32)
+    return [(f"lecture_{i}", f"요약 {i}", (eye[i % dim] * (i + 1)).tolist()) for i in range(n)]
+
+
+def test_search_top_k_and_exclude():
+    index = CourseVectorIndex(_rows(4))
+    assert index.matrix.flags["C_CONTIGUOUS"] and index.matrix.dtype == np.float32
+    query = [0.0, 1.0, 0.2, 0, 0, 0, 0, 0]
+    assert [lid for lid, _ in index.search(query, limit=2)] == ["lecture_1", "lecture_2"]
+    assert [lid for lid, _ in index.search(query, limit=1, exclude_lecture_id="lecture_1")] == ["lecture_2"]
+
+
+def test_upsert_replaces_and_appends():
+    index = CourseVectorIndex(_rows(2))
+    index.upsert("lecture_0", "새 요약", [0, 0, 0, 1, 0, 0, 0, 0])
+    index.upsert("lecture_9", "추가", [0, 0, 0, 0, 0, 1, 0, 0])
+    assert index.search([0, 0, 0, 1, 0, 0, 0, 0], limit=1) == [("lecture_0", "새 요약")]
+    assert index.search([0, 0, 0, 0, 0, 1, 0, 0], limit=1) == [("lecture_9", "추가")]
+
+
+def test_cache_loads_lazily_updates_and_evicts():
+    loads: list[tuple[str, str]] = []
+
+    def loader(course_id: str, user_id: str):
+        loads.append((course_id, user_id))
+        return _rows(4)
+
+    one_index_bytes = CourseVectorIndex(_rows(4)).nbytes
+    cache = SummaryVectorIndexCache(max_bytes=one_index_bytes * 2 + 100, ttl_sec=60, loader=loader)
+    cache.on_upsert("c0", "u", "lecture_x", "미로드", [1] * 8)  # 로드 전에는 무시
+    assert loads == []
+
+    cache.get_similar_summaries("c0", "u", [1, 0, 0, 0, 0, 0, 0, 0])
+    cache.on_upsert("c0", "u", "lecture_7", "증분", [0, 0, 0, 0, 0, 0, 0, 1])
+    assert cache.get_similar_summaries("c0", "u", [0, 0, 0, 0, 0, 0, 0, 1], limit=1) == [("lecture_7", "증분")]
+    assert loads == [("c0", "u")]
+
+    cache.get_similar_summaries("c1", "u", [1] * 8)
+    cache.get_similar_summaries("c2", "u", [1] * 8)  # 예산 초과 → 가장 오래된 c0 제거
+    cache.get_similar_summaries("c0", "u", [1] * 8)
+    assert loads == [("c0", "u"), ("c1", "u"), ("c2", "u"), ("c0", "u")]
+
+
+def test_search_during_upserts_sees_consistent_snapshot():
+    index = CourseVectorIndex(_rows(2))
+    errors: list[BaseException] = []
+    stop = threading.Event()
+
+    def reader():
+        while not stop.is_set():
+            try:
+                for lid, summary in index.search([1] * 8, limit=50):
+                    assert summary.endswith(lid.rsplit("_", 1)[1])
+            except BaseException as e:  # noqa: BLE001
+                errors.append(e)
+                return
+
+    threads = [threading.Thread(target=reader) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for i in range(2, 400):
+        index.upsert(f"lecture_{i}", f"요약 {i}", np.eye(8)[i % 8] + 0.01)
+    index.upsert("lecture_0", "요약 0", [1] * 8)
+    stop.set()
+    for t in threads:
+        t.join()
+    assert errors == []
+    assert len(index.lecture_ids) == index.matrix.shape[0] == len(index.summaries) == 400
@@ -0,0 +1,99 @@
+"""
+축소 벡터(compact)·2단계 검색 폴백 단위 테스트 (DB 불필요: 실행된 SQL만 기록하는 가짜 세션).
+"""
+
+import numpy as np
+import pytest
+
+from app.core.config import settings
+from app.db.repositories.lecture_chunk import lecture_chunk_repo
+from app.db.repositories.lecture_summary_embeddings import lecture_summary_embeddings_repo
+from app.db.vector import compact_vector, set_ef_search
+
+
+class _Result:
+    def __init__(self, rows):
+        self._rows = rows
+
+    def fetchall(self):
+        return self._rows
+
+
+class FakeSession:
+    """execute 호출을 (SQL, params)로 기록하고, SELECT 검색 쿼리에는 준비된 결과를 차례로 돌려준다."""
+
+    def __init__(self, *results):
+        self.results = list(results)
+        self.calls: list[tuple[str, dict]] = []
+
+    def execute(self, stmt, params=None):
+        sql = str(stmt)
+        self.calls.append((sql, params or {}))
+        if "set_config" in sql:
+            return _Result([])
+        return _Result(self.results.pop(0))
+
+    @property
+    def searches(self) -> list[str]:
+        return [sql for sql, _ in self.calls if "set_config" not in sql]
+
+
+def _chunk_row(i: int):
+    return (i, "c1", "l1", "u1", i, f"text {i}", 0.0, 1.0, None, None, 0.9 - i * 0.01)
+
+
+def test_compact_vector_truncates_and_normalises():
+    v = compact_vector([3.0, 4.0, 12.0], dims=2)
+    assert v == pytest.approx([0.6, 0.8])
+    assert compact_vector([0.0, 0.0, 1.0], dims=2) == [0.0, 0.0]
+    assert len(compact_vector(np.ones(settings.EMBEDDING_DIMENSIONS))) == settings.EMBEDDING_COMPACT_DIMENSIONS
+
+
+def test_ef_search_is_clamped():
+    session = FakeSession()
+    set_ef_search(session, 8)
+    set_ef_search(session, 5000)
+    assert [params["ef"] for _, params in session.calls] == ["40", "1000"]
+
+
+def test_two_pass_keeps_candidates_when_enough(monkeypatch):
+    monkeypatch.setattr(settings, "VECTOR_SEARCH_TWO_PASS", True)
+    session = FakeSession([_chunk_row(i) for i in range(3)])
+    hits = lecture_chunk_repo.search(session, [1.0, 0.0], course_id="c1", limit=3)
+    assert len(hits) == 3
+    assert len(session.searches) == 1 and "embedding_compact" in session.searches[0]
+    assert session.calls[0][1]["ef"] == str(max(40, 3 * settings.VECTOR_SEARCH_OVERSAMPLE))
+
+
+def test_two_pass_falls_back_to_exact_when_filtered_short(monkeypatch):
+    monkeypatch.setattr(settings, "VECTOR_SEARCH_TWO_PASS", True)
+    session = FakeSession([_chunk_row(0)], [_chunk_row(i) for i in range(5)])
+    hits = lecture_chunk_repo.search(session, [1.0, 0.0], course_id="c1", lecture_id="l1", limit=5)
+    assert [h["chunk_id"] for h in hits] == [0, 1, 2, 3, 4]
+    first, second = session.searches
+    assert "embedding_compact" in first and "embedding_compact" not in second
+
+
+def test_exact_only_when_two_pass_off(monkeypatch):
+    monkeypatch.setattr(settings, "VECTOR_SEARCH_TWO_PASS", False)
+    session = FakeSession([_chunk_row(0)])
+    lecture_chunk_repo.search(session, [1.0, 0.0], limit=5)
+    assert len(session.calls) == 1 and "embedding_compact" not in session.calls[0][0]
+
+
+def test_similar_summaries_fall_back(monkeypatch):
+    monkeypatch.setattr(settings, "VECTOR_SEARCH_TWO_PASS", True)
+    session = FakeSession([("l1", "요약1")], [("l1", "요약1"), ("l2", "요약2")])
+    out = lecture_summary_embeddings_repo.get_similar_summaries(session, "c1", "u1", [1.0, 0.0], limit=2)
+    assert out == [("l1", "요약1"), ("l2", "요약2")]
+    assert len(session.searches) == 2
+
+
+def test_recall_report_baseline_is_stored_halfvec():
+    from app.backfill_compact_embeddings import recall_vs_size
+
+    corpus = np.random.default_rng(0).normal(size=(200, 64)).astype(np.float32)
+    baseline, compact = recall_vs_size(corpus, [16], k=5, num_queries=20)
+    assert baseline["storage"] == "halfvec(float16)" and baseline["bytes_per_vector"] == 128
+    assert baseline["recall_compact_only"] > 0.9
+    assert compact["recall_two_pass"] >= compact["recall_compact_only"]